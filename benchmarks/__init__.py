@@ -0,0 +1,6 @@
+"""
+Benchmark untuk Simple AI Chatbot.
+
+Jalankan dari direktori utama proyek, misalnya:
+    python -m benchmarks.bench_storage --scales 100x20,1000x20
+"""
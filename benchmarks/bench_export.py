@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark ekspor massal sesi ke PDF, teks biasa, dan Markdown.
+
+Korpus sintetis diekspor seluruhnya dengan ``export_sessions``, sekali dengan
+satu proses dan sekali dengan proses pekerja, untuk setiap format. Setiap
+percobaan menulis ke direktori tujuan baru. Throughput dilaporkan dalam
+sesi/detik.
+
+Contoh:
+    python -m benchmarks.bench_export --sessions 500 --messages 20 --workers 4
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.chatbot.export import EXPORT_FORMATS, export_sessions
+from src.chatbot.storage import ChatHistory
+from benchmarks.corpus import generate_corpus
+from benchmarks.harness import compare_results, format_result, measure, write_results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark ekspor massal sesi')
+    parser.add_argument('--sessions', type=int, default=200, help='Jumlah sesi dalam korpus')
+    parser.add_argument('--messages', type=int, default=20, help='Jumlah pesan per sesi')
+    parser.add_argument('--message-length', type=int, default=30, help='Jumlah kata per pesan')
+    parser.add_argument('--formats', default=','.join(EXPORT_FORMATS), help='Format yang diukur (dipisah koma)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Jumlah proses pekerja')
+    parser.add_argument('--repeat', type=int, default=3, help='Jumlah pengulangan per operasi')
+    parser.add_argument('--seed', type=int, default=0, help='Seed korpus')
+    parser.add_argument('--output', default='bench_output/export.json', help='File hasil JSON')
+    parser.add_argument('--compare', help='File hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    scale = f"{args.sessions}x{args.messages}"
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as corpus_dir, tempfile.TemporaryDirectory() as out_root:
+        storage = ChatHistory(corpus_dir)
+        # Font bawaan PDF (helvetica) hanya mendukung latin-1
+        generate_corpus(storage, args.sessions, args.messages, args.message_length, 0.0, args.seed)
+        for fmt in args.formats.split(','):
+            for workers in sorted({1, args.workers}):
+                name = f"export_{fmt}_w{workers}"
+                stats: Dict[str, float] = {}
+
+                def run(i: int) -> None:
+                    stats.update(export_sessions(storage, Path(out_root) / f"{name}_{i}", fmt, workers))
+
+                result = measure(run, repeat=args.repeat, track_memory=False)
+                result.update(
+                    name=name, scale=scale,
+                    sessions_per_sec=args.sessions / result['p50'],
+                    bytes=stats['bytes'], errors=stats['errors'],
+                )
+                results.append(result)
+                print(f"{format_result(result)}  {result['sessions_per_sec']:.0f} sesi/detik")
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+    write_results(args.output, 'export', params, results)
+    print(f"\nHasil ditulis ke {args.output}")
+
+    if args.compare:
+        print(f"\nPerbandingan dengan {args.compare}:")
+        for line in compare_results(args.compare, results):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
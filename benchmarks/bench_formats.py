@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark format file sesi: ukuran di disk serta kecepatan simpan, muat,
+dan pencarian pindai penuh untuk setiap format.
+
+Contoh:
+    python -m benchmarks.bench_formats --sessions 200 --messages 50
+    python -m benchmarks.bench_formats --formats json,compact,gzip
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.chatbot.formats import SESSION_FORMATS, encode_session, get_format
+from src.chatbot.storage import ChatHistory
+from benchmarks.corpus import generate_corpus, make_session
+from benchmarks.harness import compare_results, format_result, measure, write_results
+
+
+def available_formats() -> List[str]:
+    """Format yang didukung oleh Python yang sedang berjalan."""
+    formats = []
+    for name in SESSION_FORMATS:
+        try:
+            encode_session({}, name)
+        except ValueError:
+            continue
+        formats.append(name)
+    return formats
+
+
+def bench_format(session_format: str, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Ukur satu format pada korpus yang sama (seed sama)."""
+    get_format(session_format)
+    scale = f"{args.sessions}x{args.messages}"
+    results = []
+
+    with tempfile.TemporaryDirectory() as corpus_dir, tempfile.TemporaryDirectory() as scratch_dir:
+        storage = ChatHistory(corpus_dir)
+        files = generate_corpus(storage, args.sessions, args.messages, args.message_length,
+                                args.unicode_ratio, args.seed, session_format)
+        disk_bytes = sum(Path(f).stat().st_size for f in files)
+        scratch = ChatHistory(scratch_dir)
+        sample = make_session(random.Random(args.seed), args.messages, args.message_length, args.unicode_ratio)
+
+        operations = {
+            'save_chat': lambda i: scratch.save_chat(sample, f"save_{i}", session_format),
+            'load_all': lambda i: [storage.load_chat(f) for f in files],
+            'scan_search': lambda i: storage.search_messages("apa kabar"),
+        }
+        for name, fn in operations.items():
+            result = measure(fn, repeat=args.repeat, track_memory=not args.no_memory)
+            result.update(name=f"{session_format}:{name}", scale=scale,
+                          format=session_format, disk_bytes=disk_bytes)
+            if name == 'load_all':
+                result['mb_per_sec'] = disk_bytes / result['p50'] / 1e6 if result['p50'] else 0.0
+            results.append(result)
+            print(format_result(result))
+        print(f"{session_format + ':disk':<24} {scale:<12} {disk_bytes / 1024:12.1f} KiB "
+              f"({disk_bytes / args.sessions:,.0f} byte/sesi)\n")
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark format file sesi')
+    parser.add_argument('--formats', default='', help='Format yang diuji, dipisah koma (default: semua yang tersedia)')
+    parser.add_argument('--sessions', type=int, default=200, help='Jumlah sesi')
+    parser.add_argument('--messages', type=int, default=50, help='Jumlah pesan per sesi')
+    parser.add_argument('--message-length', type=int, default=30, help='Jumlah kata per pesan')
+    parser.add_argument('--unicode-ratio', type=float, default=0.1, help='Proporsi kata non-ASCII')
+    parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan per operasi')
+    parser.add_argument('--seed', type=int, default=0, help='Seed korpus')
+    parser.add_argument('--no-memory', action='store_true', help='Lewati pengukuran memori puncak')
+    parser.add_argument('--output', default='bench_output/formats.json', help='File hasil JSON')
+    parser.add_argument('--compare', help='File hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    formats = args.formats.split(',') if args.formats else available_formats()
+    results = []
+    for session_format in formats:
+        results.extend(bench_format(session_format, args))
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+    write_results(args.output, 'formats', params, results)
+    print(f"Hasil ditulis ke {args.output}")
+
+    if args.compare:
+        print(f"\nPerbandingan dengan {args.compare}:")
+        for line in compare_results(args.compare, results):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark memori riwayat pesan: list berisi dict dibandingkan ``MessageStore``.
+
+Sesi sintetis di-encode ke JSON lalu dimuat kembali dengan ``json.loads``
+(seperti ``load_chat``), sehingga string peran tidak di-intern. Untuk setiap
+representasi diukur memori yang tetap terpakai setelah dimuat, lalu dihitung
+overhead per pesan di luar string isi pesan (yang sama untuk keduanya).
+Waktu memuat dan iterasi penuh ikut diukur.
+
+Contoh:
+    python -m benchmarks.bench_memory --messages 100000
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.chatbot.messages import MessageStore
+from benchmarks.corpus import make_session
+from benchmarks.harness import compare_results, format_result, measure, write_results
+
+
+def retained_bytes(build: Callable[[], Any]) -> int:
+    """Memori yang masih terpakai oleh hasil ``build()`` setelah sampah dibuang."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        obj = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del obj
+    return current
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark memori riwayat pesan')
+    parser.add_argument('--messages', type=int, default=100_000, help='Jumlah pesan dalam sesi')
+    parser.add_argument('--message-length', type=int, default=20, help='Jumlah kata per pesan')
+    parser.add_argument('--repeat', type=int, default=3, help='Jumlah pengulangan per operasi')
+    parser.add_argument('--seed', type=int, default=0, help='Seed korpus')
+    parser.add_argument('--output', default='bench_output/memory.json', help='File hasil JSON')
+    parser.add_argument('--compare', help='File hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    session = make_session(random.Random(args.seed), args.messages, args.message_length, 0.1)
+    raw = json.dumps({"messages": session}, ensure_ascii=False)
+    del session
+    count = args.messages
+    # String isi pesan dimiliki kedua representasi; dikurangkan dari total
+    content_bytes = sum(sys.getsizeof(m['content']) for m in json.loads(raw)['messages'])
+
+    loaders: Dict[str, Callable[[], Any]] = {
+        'dicts': lambda: json.loads(raw)['messages'],
+        'store': lambda: MessageStore(json.loads(raw)['messages']),
+    }
+    scale = f"{count // 1000}k" if count >= 1000 else str(count)
+    results: List[Dict[str, Any]] = []
+    for name, load in loaders.items():
+        retained = retained_bytes(load)
+        messages = load()
+        for operation, fn in (('load', lambda i: load()), ('iterate', lambda i: sum(1 for _ in messages))):
+            result = measure(fn, repeat=args.repeat, track_memory=False)
+            result.update(
+                name=f"{name}_{operation}", scale=scale,
+                retained_bytes=retained,
+                overhead_per_message=(retained - content_bytes) / count,
+            )
+            results.append(result)
+            print(f"{format_result(result)}  overhead={result['overhead_per_message']:.1f} B/pesan")
+        del messages
+
+    before = results[0]['overhead_per_message']
+    after = results[2]['overhead_per_message']
+    print(f"\nOverhead per pesan: {before:.1f} B -> {after:.1f} B "
+          f"({before / after if after else float('inf'):.1f}x lebih kecil)")
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+    write_results(args.output, 'memory', params, results)
+    print(f"\nHasil ditulis ke {args.output}")
+
+    if args.compare:
+        print(f"\nPerbandingan dengan {args.compare}:")
+        for line in compare_results(args.compare, results):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
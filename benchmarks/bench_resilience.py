@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark ketahanan panggilan model: latensi ekor (p99) dan tingkat
+keberhasilan tanpa perlindungan, dengan timeout + retry, dan dengan hedging.
+
+Backend palsu diberi latensi dasar dengan sebagian kecil permintaan yang
+sangat lambat (lonjakan) serta peluang kegagalan sementara.
+
+Contoh:
+    python -m benchmarks.bench_resilience --requests 200 --spike-rate 0.05
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.chatbot.backends import FakeBackend
+from src.chatbot.resilience import ResilientCaller
+from benchmarks.harness import compare_results, format_result, measure, write_results
+
+
+def make_backend(args: argparse.Namespace) -> FakeBackend:
+    """Backend palsu dengan urutan latensi acak yang bisa diulang."""
+    # Seed berbeda dari injeksi kegagalan agar lonjakan tidak jatuh tepat pada permintaan yang gagal
+    rng = random.Random(args.seed + 1)
+    # Permintaan duplikat dan retry ikut memakai nomor permintaan; sediakan cadangan
+    latencies = [
+        args.spike if rng.random() < args.spike_rate else args.latency
+        for _ in range(args.requests * 4)
+    ]
+    return FakeBackend(latency=args.latency, failure_rate=args.failure_rate,
+                       seed=args.seed, latencies=latencies)
+
+
+def bench_scenario(name: str, caller: ResilientCaller, args: argparse.Namespace) -> Dict[str, Any]:
+    """Kirim ``args.requests`` pesan dan catat latensi serta jumlah kegagalan."""
+    backend = make_backend(args)
+    failures = 0
+
+    def send(i: int) -> None:
+        nonlocal failures
+        chat = backend.start_chat(history=[])
+        try:
+            caller.send(chat, f"pesan {i}", lambda: backend.start_chat(history=[]))
+        except Exception:
+            failures += 1
+
+    result = measure(send, repeat=args.requests, warmup=0, track_memory=False)
+    result.update(name=name, scale=f"{args.requests}req", failures=failures,
+                  backend_requests=backend.requests)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark timeout, retry, dan hedging panggilan model')
+    parser.add_argument('--requests', type=int, default=200, help='Jumlah pesan per skenario')
+    parser.add_argument('--latency', type=float, default=0.02, help='Latensi normal (detik)')
+    parser.add_argument('--spike', type=float, default=0.5, help='Latensi lonjakan (detik)')
+    parser.add_argument('--spike-rate', type=float, default=0.05, help='Peluang lonjakan per permintaan')
+    parser.add_argument('--failure-rate', type=float, default=0.05, help='Peluang kegagalan sementara')
+    parser.add_argument('--timeout', type=float, default=0.2, help='Batas waktu per percobaan (detik)')
+    parser.add_argument('--hedge-after', type=float, default=0.06, help='Jeda sebelum permintaan duplikat (detik)')
+    parser.add_argument('--retries', type=int, default=2, help='Jumlah retry')
+    parser.add_argument('--seed', type=int, default=0, help='Seed latensi dan kegagalan')
+    parser.add_argument('--output', default='bench_output/resilience.json', help='File hasil JSON')
+    parser.add_argument('--compare', help='File hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    # Jeda backoff dibuat singkat agar yang terukur adalah latensi backend
+    scenarios = {
+        'plain': ResilientCaller(),
+        'timeout_retry': ResilientCaller(timeout=args.timeout, max_retries=args.retries,
+                                         backoff=0.01),
+        'hedged': ResilientCaller(timeout=args.timeout, max_retries=args.retries, backoff=0.01,
+                                  hedge_after=args.hedge_after),
+    }
+
+    results: List[Dict[str, Any]] = []
+    for name, caller in scenarios.items():
+        result = bench_scenario(name, caller, args)
+        results.append(result)
+        print(f"{format_result(result)}  gagal={result['failures']} permintaan={result['backend_requests']}")
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+    write_results(args.output, 'resilience', params, results)
+    print(f"\nHasil ditulis ke {args.output}")
+
+    if args.compare:
+        print(f"\nPerbandingan dengan {args.compare}:")
+        for line in compare_results(args.compare, results):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark memuat sesi: memulihkan riwayat model dalam satu langkah
+(``start_chat(history=...)``) dibandingkan mengirim ulang setiap giliran.
+
+Backend palsu dipakai dengan latensi per permintaan yang bisa diatur,
+sehingga biaya pengiriman ulang sebanding dengan jumlah giliran.
+
+Contoh:
+    python -m benchmarks.bench_restore --turns 10,50,200 --latency 0.02
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.chatbot.backends import FakeBackend
+from src.chatbot.core import Chatbot
+from src.chatbot.storage import ChatHistory
+from benchmarks.corpus import make_session
+from benchmarks.harness import compare_results, format_result, measure, write_results
+
+
+def replay(bot: Chatbot, messages: List[Dict[str, str]]) -> None:
+    """Cara naif: mulai chat kosong lalu kirim ulang setiap pesan pengguna."""
+    bot.chat = bot.model.start_chat(history=[])
+    for message in messages:
+        if message['role'] == 'user':
+            bot.chat.send_message(message['content'])
+
+
+def bench_turns(turns: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Bandingkan pemulihan dan pengiriman ulang untuk satu ukuran sesi."""
+    scale = f"{turns}t"
+    results = []
+    with tempfile.TemporaryDirectory() as storage_dir:
+        storage = ChatHistory(storage_dir)
+        messages = make_session(random.Random(args.seed), turns * 2 + 1, args.message_length, 0.1)
+        filepath = storage.save_chat(messages, f"sesi_{turns}")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot = Chatbot(backend=FakeBackend(latency=args.latency))
+        bot.storage = storage
+
+        operations = {
+            'restore': lambda i: bot.load_chat_session(filepath),
+            'replay': lambda i: (bot.load_chat_session(filepath), replay(bot, messages)),
+        }
+        for name, fn in operations.items():
+            result = measure(fn, repeat=args.repeat, track_memory=not args.no_memory)
+            result.update(name=name, scale=scale, turns=turns)
+            results.append(result)
+            print(format_result(result))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark pemulihan sesi vs pengiriman ulang')
+    parser.add_argument('--turns', default='10,50,200',
+                        help='Daftar jumlah giliran per sesi, dipisah koma (default: 10,50,200)')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Latensi backend palsu per permintaan dalam detik (default: 0.02)')
+    parser.add_argument('--message-length', type=int, default=30, help='Jumlah kata per pesan')
+    parser.add_argument('--repeat', type=int, default=3, help='Jumlah pengulangan per operasi')
+    parser.add_argument('--seed', type=int, default=0, help='Seed korpus')
+    parser.add_argument('--no-memory', action='store_true', help='Lewati pengukuran memori puncak')
+    parser.add_argument('--output', default='bench_output/restore.json', help='File hasil JSON')
+    parser.add_argument('--compare', help='File hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    results = []
+    for turns in (int(t) for t in args.turns.split(',')):
+        results.extend(bench_turns(turns, args))
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+    write_results(args.output, 'restore', params, results)
+    print(f"\nHasil ditulis ke {args.output}")
+
+    if args.compare:
+        print(f"\nPerbandingan dengan {args.compare}:")
+        for line in compare_results(args.compare, results):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
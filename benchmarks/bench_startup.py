@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark waktu startup CLI: dari menjalankan ``python -m src.chatbot``
+sampai prompt pertama muncul, serta biaya ``import src.chatbot``.
+
+Backend palsu dipakai agar tidak ada panggilan jaringan. Skrip keluar dengan
+kode 1 jika p50 waktu sampai prompt melebihi anggaran (``--budget-ms``).
+
+Contoh:
+    python -m benchmarks.bench_startup --repeat 10 --budget-ms 400
+"""
+from __future__ import annotations
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.chatbot.config import Config
+from benchmarks.harness import compare_results, format_result, measure, write_results
+
+ROOT = Path(__file__).parent.parent
+
+# Modul berat yang tidak boleh dimuat oleh ``import src.chatbot``
+HEAVY_MODULES = ('google.generativeai', 'grpc', 'fpdf', 'numpy', 'asyncio')
+
+PROMPT_MARKER = f"{Config.USER_NAME}:".encode('utf-8')
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = str(ROOT) + os.pathsep + env.get('PYTHONPATH', '')
+    env['PYTHONUNBUFFERED'] = '1'
+    env['MODEL_BACKEND'] = 'fake'
+    return env
+
+
+def time_to_prompt(workdir: str) -> None:
+    """Jalankan CLI, tunggu prompt pertama, lalu kirim 'keluar'."""
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'src.chatbot', '--backend', 'fake'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        cwd=workdir, env=_env()
+    )
+    output = b''
+    try:
+        while PROMPT_MARKER not in output:
+            chunk = proc.stdout.read1(4096)
+            if not chunk:
+                raise RuntimeError(f"CLI berhenti sebelum prompt muncul:\n{output.decode(errors='replace')}")
+            output += chunk
+    finally:
+        proc.stdin.write(b'keluar\n')
+        proc.stdin.close()
+        proc.wait(timeout=30)
+
+
+def run_python(code: str, workdir: str) -> None:
+    subprocess.run([sys.executable, '-c', code], cwd=workdir, env=_env(), check=True)
+
+
+def loaded_heavy_modules(workdir: str) -> List[str]:
+    """Daftar modul berat yang ikut termuat oleh ``import src.chatbot``."""
+    code = (
+        "import sys, src.chatbot\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=workdir, env=_env(),
+                            capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(',') if m]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark waktu startup CLI')
+    parser.add_argument('--repeat', type=int, default=10, help='Jumlah pengulangan per operasi')
+    parser.add_argument('--budget-ms', type=float, default=400,
+                        help='Anggaran p50 waktu sampai prompt dalam milidetik (default: 400)')
+    parser.add_argument('--output', default='bench_output/startup.json', help='File hasil JSON')
+    parser.add_argument('--compare', help='File hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        operations = {
+            'python_baseline': lambda i: run_python('pass', workdir),
+            'import_chatbot': lambda i: run_python('import src.chatbot', workdir),
+            'cli_to_prompt': lambda i: time_to_prompt(workdir),
+        }
+        for name, fn in operations.items():
+            result = measure(fn, repeat=args.repeat, track_memory=False)
+            result.update(name=name, scale='cli')
+            results.append(result)
+            print(format_result(result))
+        heavy = loaded_heavy_modules(workdir)
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+    write_results(args.output, 'startup', params, results)
+    print(f"\nHasil ditulis ke {args.output}")
+
+    if args.compare:
+        print(f"\nPerbandingan dengan {args.compare}:")
+        for line in compare_results(args.compare, results):
+            print(line)
+
+    failed = False
+    if heavy:
+        print(f"\nGAGAL: 'import src.chatbot' memuat modul berat: {', '.join(heavy)}")
+        failed = True
+    prompt_ms = results[-1]['p50'] * 1000
+    if prompt_ms > args.budget_ms:
+        print(f"\nGAGAL: waktu sampai prompt {prompt_ms:.1f} ms melebihi anggaran {args.budget_ms:.0f} ms")
+        failed = True
+    else:
+        print(f"\nOK: waktu sampai prompt {prompt_ms:.1f} ms (anggaran {args.budget_ms:.0f} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark operasi penyimpanan ChatHistory pada korpus sintetis.
+
+Contoh:
+    python -m benchmarks.bench_storage --scales 100x20,1000x20 --output bench_output/storage.json
+    python -m benchmarks.bench_storage --compare bench_output/storage.json
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.chatbot.scan import scan_messages
+from src.chatbot.storage import ChatHistory
+from benchmarks.corpus import NEEDLE, generate_corpus, make_session
+from benchmarks.harness import compare_results, format_result, measure, write_results
+
+
+def parse_scales(text: str) -> List[Tuple[int, int]]:
+    """Ubah '100x20,1000x20' menjadi [(100, 20), (1000, 20)]."""
+    scales = []
+    for part in text.split(','):
+        sessions, _, messages = part.strip().partition('x')
+        scales.append((int(sessions), int(messages or 20)))
+    return scales
+
+
+def bench_scale(
+    sessions: int,
+    messages: int,
+    args: argparse.Namespace
+) -> List[Dict[str, Any]]:
+    """Jalankan semua operasi untuk satu skala korpus."""
+    scale = f"{sessions}x{messages}"
+    results = []
+
+    with tempfile.TemporaryDirectory() as corpus_dir, tempfile.TemporaryDirectory() as scratch_dir:
+        storage = ChatHistory(corpus_dir)
+        files = generate_corpus(storage, sessions, messages, args.message_length,
+                                args.unicode_ratio, args.seed)
+        scratch = ChatHistory(scratch_dir)
+        rng = random.Random(args.seed)
+        sample = make_session(rng, messages, args.message_length, args.unicode_ratio)
+        # Font bawaan PDF (helvetica) hanya mendukung latin-1
+        pdf_sample = make_session(rng, messages, args.message_length, 0.0)
+
+        operations = {
+            'save_chat': lambda i: scratch.save_chat(sample, f"save_{i}"),
+            'load_chat': lambda i: storage.load_chat(files[i % len(files)]),
+            'search_rare': lambda i: storage.search_messages(NEEDLE),
+            'search_common': lambda i: storage.search_messages("data"),
+            'search_phrase': lambda i: storage.search_messages("apa kabar"),
+            'scan_serial': lambda i: list(scan_messages(storage, "apa kabar", workers=1)),
+            'scan_first_hit': lambda i: list(storage.iter_search("apa kabar", limit=1)),
+            'ranked_search': lambda i: storage.ranked_search("data apa", limit=10),
+            'semantic_search': lambda i: storage.semantic_search("kabar data", limit=10),
+            'list_sessions': lambda i: storage.list_sessions(),
+            'list_sessions_cold': lambda i: (storage.catalog.path.unlink(missing_ok=True),
+                                             storage.list_sessions()),
+            'export_to_pdf': lambda i: scratch.export_to_pdf(pdf_sample, f"export_{i}"),
+        }
+        selected = args.operations.split(',') if args.operations else list(operations)
+
+        for name in selected:
+            result = measure(operations[name], repeat=args.repeat, track_memory=not args.no_memory)
+            result.update(name=name, scale=scale, sessions=sessions, messages=messages)
+            results.append(result)
+            print(format_result(result))
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark penyimpanan ChatHistory')
+    parser.add_argument('--scales', default='10x20,100x20,1000x20',
+                        help="Daftar skala 'sesi x pesan', dipisah koma (default: 10x20,100x20,1000x20)")
+    parser.add_argument('--message-length', type=int, default=30, help='Jumlah kata per pesan')
+    parser.add_argument('--unicode-ratio', type=float, default=0.1, help='Proporsi kata non-ASCII')
+    parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan per operasi')
+    parser.add_argument('--seed', type=int, default=0, help='Seed korpus')
+    parser.add_argument('--operations', default='', help='Hanya jalankan operasi tertentu (dipisah koma)')
+    parser.add_argument('--no-memory', action='store_true', help='Lewati pengukuran memori puncak')
+    parser.add_argument('--output', default='bench_output/storage.json', help='File hasil JSON')
+    parser.add_argument('--compare', help='File hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    results = []
+    for sessions, messages in parse_scales(args.scales):
+        results.extend(bench_scale(sessions, messages, args))
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+    write_results(args.output, 'storage', params, results)
+    print(f"\nHasil ditulis ke {args.output}")
+
+    if args.compare:
+        print(f"\nPerbandingan dengan {args.compare}:")
+        for line in compare_results(args.compare, results):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
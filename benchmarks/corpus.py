@@ -0,0 +1,81 @@
+"""
+Pembuat korpus chat sintetis untuk benchmark.
+"""
+from __future__ import annotations
+import random
+from typing import Dict, List, Optional
+
+ASCII_WORDS = (
+    "halo", "apa", "kabar", "bagaimana", "cara", "membuat", "aplikasi", "python",
+    "server", "data", "model", "respons", "pesan", "sesi", "riwayat", "cari",
+    "simpan", "file", "jaringan", "database", "fungsi", "kelas", "modul", "uji",
+    "performa", "cepat", "lambat", "memori", "disk", "indeks", "kata", "kunci",
+)
+
+UNICODE_WORDS = (
+    "café", "naïve", "Ärger", "straße", "ñandú", "élève", "東京", "数据",
+    "привет", "данные", "مرحبا", "γειά", "😀", "🚀", "✅", "İstanbul",
+)
+
+# Kata langka yang disisipkan ke sebagian kecil pesan untuk kueri "jarum"
+NEEDLE = "kubernetes"
+
+
+def make_message_text(rng: random.Random, length: int, unicode_ratio: float) -> str:
+    """Buat teks pesan dengan jumlah kata tertentu."""
+    words = []
+    for _ in range(length):
+        pool = UNICODE_WORDS if rng.random() < unicode_ratio else ASCII_WORDS
+        words.append(rng.choice(pool))
+    return ' '.join(words)
+
+
+def make_session(
+    rng: random.Random,
+    messages: int,
+    length: int,
+    unicode_ratio: float,
+    needle_ratio: float = 0.01
+) -> List[Dict[str, str]]:
+    """Buat satu sesi: pesan sistem lalu giliran user/assistant bergantian."""
+    session = [{"role": "system", "content": "AI Assistant"}]
+    for i in range(messages - 1):
+        text = make_message_text(rng, length, unicode_ratio)
+        if rng.random() < needle_ratio:
+            text += f" {NEEDLE}"
+        session.append({"role": "user" if i % 2 == 0 else "assistant", "content": text})
+    return session
+
+
+def generate_corpus(
+    storage,
+    sessions: int,
+    messages_per_session: int,
+    message_length: int = 30,
+    unicode_ratio: float = 0.1,
+    seed: Optional[int] = 0,
+    session_format: Optional[str] = None
+) -> List[str]:
+    """Isi ``storage`` dengan sesi sintetis.
+
+    Args:
+        storage: Objek ``ChatHistory`` tujuan
+        sessions: Jumlah sesi
+        messages_per_session: Jumlah pesan per sesi (termasuk pesan sistem)
+        message_length: Jumlah kata per pesan
+        unicode_ratio: Proporsi kata non-ASCII
+        seed: Seed acak agar korpus bisa diulang
+        session_format: Format file sesi (default: Config.SESSION_FORMAT)
+
+    Returns:
+        List[str]: Path file sesi yang dibuat
+    """
+    rng = random.Random(seed)
+    return [
+        storage.save_chat(
+            make_session(rng, messages_per_session, message_length, unicode_ratio),
+            f"bench_{i:06d}",
+            session_format
+        )
+        for i in range(sessions)
+    ]
@@ -0,0 +1,134 @@
+"""
+Alat bantu pengukuran: waktu, persentil, memori puncak, dan output JSON.
+"""
+from __future__ import annotations
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Persentil dengan interpolasi linear."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def measure(
+    fn: Callable[[int], Any],
+    repeat: int = 5,
+    warmup: int = 1,
+    track_memory: bool = True
+) -> Dict[str, float]:
+    """Ukur sebuah operasi.
+
+    ``fn`` dipanggil dengan nomor percobaan. Waktu diukur tanpa tracemalloc,
+    lalu satu percobaan tambahan dijalankan dengan tracemalloc untuk memori
+    puncak agar overhead tracing tidak memengaruhi angka waktu.
+
+    Returns:
+        Dict[str, float]: runs, mean, p50, p99, min, max (detik),
+        ops_per_sec, dan peak_memory_bytes
+    """
+    for i in range(warmup):
+        fn(-1 - i)
+
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - start)
+
+    peak = 0
+    if track_memory:
+        tracemalloc.start()
+        try:
+            fn(repeat)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    mean = sum(timings) / len(timings)
+    return {
+        'runs': repeat,
+        'mean': mean,
+        'p50': percentile(timings, 50),
+        'p99': percentile(timings, 99),
+        'min': min(timings),
+        'max': max(timings),
+        'ops_per_sec': 1 / mean if mean else 0.0,
+        'peak_memory_bytes': peak,
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Hash commit git saat ini, jika tersedia."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(
+    path: Union[str, Path],
+    benchmark: str,
+    params: Dict[str, Any],
+    results: List[Dict[str, Any]]
+) -> None:
+    """Tulis hasil benchmark ke file JSON yang mudah dibandingkan antar commit."""
+    payload = {
+        'benchmark': benchmark,
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'params': params,
+        'results': results,
+    }
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True, parents=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def compare_results(baseline_path: Union[str, Path], results: List[Dict[str, Any]]) -> List[str]:
+    """Bandingkan p50 setiap hasil dengan file baseline.
+
+    Hasil dicocokkan berdasarkan kunci ``name`` dan ``scale``.
+
+    Returns:
+        List[str]: Baris laporan perubahan dalam persen
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['name'], r.get('scale')): r for r in baseline.get('results', [])}
+
+    lines = []
+    for result in results:
+        old = previous.get((result['name'], result.get('scale')))
+        if not old or not old['p50']:
+            continue
+        change = (result['p50'] - old['p50']) / old['p50'] * 100
+        lines.append(f"{result['name']:<24} {result.get('scale', ''):<12} "
+                     f"{old['p50'] * 1000:10.3f} ms -> {result['p50'] * 1000:10.3f} ms ({change:+.1f}%)")
+    return lines
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    """Satu baris ringkasan hasil untuk ditampilkan di terminal."""
+    return (f"{result['name']:<24} {result.get('scale', ''):<12} "
+            f"p50={result['p50'] * 1000:9.3f} ms  p99={result['p99'] * 1000:9.3f} ms  "
+            f"{result['ops_per_sec']:10.1f} ops/s  peak={result['peak_memory_bytes'] / 1024:9.1f} KiB")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Uji beban server HTTP (``chatbot serve``) dengan backend palsu.
+
+Secara default server dijalankan di dalam proses yang sama dengan
+``FakeBackend`` dan direktori riwayat sementara. Setiap klien memakai satu
+koneksi keep-alive, membuat sesinya sendiri, lalu mengirim ``--turns`` pesan.
+Jika ``--clients`` melebihi ``--max-sessions``, sesi terus dikeluarkan ke
+jurnal dan dimuat ulang, sehingga biaya eviksi LRU ikut terukur.
+
+Contoh:
+    python -m benchmarks.load_test --clients 50 --turns 10 --max-sessions 20
+    python -m benchmarks.load_test --url http://127.0.0.1:8080 --mode stream
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.chatbot.aio import AsyncChatbot
+from src.chatbot.backends import FakeBackend
+from src.chatbot.metrics import registry as metrics
+from src.chatbot.server import ChatServer
+from src.chatbot.storage import ChatHistory
+from benchmarks.harness import compare_results, format_result, percentile, write_results
+
+
+class Connection:
+    """Klien HTTP/1.1 minimal di atas satu koneksi keep-alive."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host: str, port: int) -> 'Connection':
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, bytes, float]:
+        """Kirim satu permintaan.
+
+        Returns:
+            Tuple[int, bytes, float]: (status, body, detik sampai byte pertama body)
+        """
+        data = b'' if body is None else json.dumps(body).encode('utf-8')
+        start = time.perf_counter()
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode('latin-1') + data
+        )
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            parts, first = [], None
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                if first is None:
+                    first = time.perf_counter() - start
+                if not size:
+                    await self.reader.readline()
+                    break
+                parts.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            return status, b''.join(parts), first
+        payload = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        return status, payload, time.perf_counter() - start
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+async def run_client(host: str, port: int, client: int, args: argparse.Namespace,
+                     latencies: List[float], ttfbs: List[float]) -> int:
+    """Satu klien: buat sesi lalu kirim ``args.turns`` pesan. Mengembalikan jumlah kegagalan."""
+    failures = 0
+    conn = await Connection.open(host, port)
+    try:
+        status, body, _ = await conn.request('POST', '/sessions')
+        if status != 201:
+            return args.turns
+        session_id = json.loads(body)['session_id']
+        for turn in range(args.turns):
+            start = time.perf_counter()
+            status, _, ttfb = await conn.request('POST', f'/sessions/{session_id}/chat', {
+                'message': f'klien {client} pesan {turn}',
+                'stream': args.mode == 'stream',
+            })
+            if status != 200:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            ttfbs.append(ttfb)
+    finally:
+        conn.close()
+    return failures
+
+
+async def run_load(host: str, port: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Jalankan semua klien bersamaan dan rangkum latensinya."""
+    latencies: List[float] = []
+    ttfbs: List[float] = []
+    start = time.perf_counter()
+    failures = await asyncio.gather(*(
+        run_client(host, port, i, args, latencies, ttfbs) for i in range(args.clients)
+    ))
+    elapsed = time.perf_counter() - start
+
+    mean = sum(latencies) / len(latencies) if latencies else 0.0
+    return {
+        'name': f'serve_{args.mode}',
+        'scale': f'{args.clients}x{args.turns}',
+        'runs': len(latencies),
+        'mean': mean,
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'min': min(latencies, default=0.0),
+        'max': max(latencies, default=0.0),
+        'ttfb_p50': percentile(ttfbs, 50),
+        'ttfb_p99': percentile(ttfbs, 99),
+        # Throughput server: permintaan berhasil per detik jam dinding
+        'ops_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'peak_memory_bytes': 0,
+        'failures': sum(failures),
+    }
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.url:
+        url = urlsplit(args.url)
+        return await run_load(url.hostname or '127.0.0.1', url.port or 80, args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = FakeBackend(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                              failure_rate=args.failure_rate)
+        bot = AsyncChatbot(model=backend, max_concurrency=args.concurrency, storage=ChatHistory(tmp))
+        server = ChatServer(bot, host='127.0.0.1', port=0, max_sessions=args.max_sessions,
+                            max_connections=max(args.clients + 1, 2))
+        host, port = await server.start()
+        try:
+            result = await run_load(host, port, args)
+        finally:
+            await server.close()
+        counters = metrics.snapshot()['counters']
+        result['evictions'] = counters.get('server_sessions_evicted_total', 0)
+        result['reloads'] = counters.get('server_sessions_reloaded_total', 0)
+        return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Uji beban server HTTP chatbot')
+    parser.add_argument('--url', help='Server yang sudah berjalan (default: server di dalam proses)')
+    parser.add_argument('--mode', choices=['chat', 'stream'], default='chat', help='Chat biasa atau streaming')
+    parser.add_argument('--clients', type=int, default=50, help='Jumlah klien bersamaan')
+    parser.add_argument('--turns', type=int, default=10, help='Pesan per klien')
+    parser.add_argument('--max-sessions', type=int, default=20, help='Sesi aktif di memori server')
+    parser.add_argument('--concurrency', type=int, default=8, help='Batas permintaan bersamaan ke model')
+    parser.add_argument('--latency', type=float, default=0.02, help='Latensi backend palsu (detik)')
+    parser.add_argument('--tokens-per-second', type=float, default=0, help='Laju token backend palsu')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Peluang kegagalan backend palsu')
+    parser.add_argument('--output', default='bench_output/load_test.json', help='File hasil JSON')
+    parser.add_argument('--compare', help='File hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    extra = f"  gagal={result['failures']}"
+    if 'evictions' in result:
+        extra += f" eviksi={result['evictions']:.0f} muat-ulang={result['reloads']:.0f}"
+    print(f"{format_result(result)}  ttfb_p99={result['ttfb_p99'] * 1000:.1f} ms{extra}")
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'compare')}
+    write_results(args.output, 'load_test', params, [result])
+    print(f"\nHasil ditulis ke {args.output}")
+
+    if args.compare:
+        print(f"\nPerbandingan dengan {args.compare}:")
+        for line in compare_results(args.compare, [result]):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
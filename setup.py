@@ -10,6 +10,7 @@ setup(
         "python-dotenv>=0.19.0",
         "colorama>=0.4.4",
         "fpdf2>=2.7.0",
+        "numpy>=1.22",
     ],
     python_requires=">=3.8",
     author="Your Name",
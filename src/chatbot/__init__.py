@@ -8,4 +8,12 @@ from .core import Chatbot
 from .config import Config
 from . import storage
 
-__all__ = ['Chatbot', 'Config', 'storage']
+
+def __getattr__(name):
+    # AsyncChatbot (beserta asyncio) dimuat saat pertama kali diakses
+    if name == 'AsyncChatbot':
+        from .aio import AsyncChatbot
+        return AsyncChatbot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ['Chatbot', 'AsyncChatbot', 'Config', 'storage']
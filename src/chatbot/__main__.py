@@ -3,15 +3,161 @@
 Modul utama untuk menjalankan chatbot dari command line.
 """
 import sys
+import argparse
 from colorama import Fore, Style, init as init_colorama
 
+from .config import Config
 from .core import Chatbot, main as core_main
 
+def build_parser() -> argparse.ArgumentParser:
+    """Buat parser argumen command line."""
+    parser = argparse.ArgumentParser(prog='chatbot', description='Simple AI Chatbot dengan Google Gemini')
+    parser.add_argument('--backend', choices=['gemini', 'fake'], default=None,
+                        help=f'Backend model (default: {Config.MODEL_BACKEND})')
+    parser.add_argument('--model', default=None,
+                        help=f'Model yang digunakan (default: {Config.DEFAULT_MODEL})')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    from . import batch
+    batch.add_arguments(subparsers.add_parser('batch', help='Kirim banyak prompt dari file JSONL'))
+    
+    convert = subparsers.add_parser('convert', help='Konversi semua file sesi ke format lain')
+    convert.add_argument('--format', dest='session_format', default=None,
+                         help=f'Format tujuan: json, compact, gzip, bz2, xz, zstd (default: {Config.SESSION_FORMAT})')
+    convert.add_argument('--dir', default=None, help=f'Direktori sesi (default: {Config.STORAGE_DIR})')
+    
+    migrate = subparsers.add_parser('migrate', help='Impor direktori riwayat chat ke database SQLite')
+    migrate.add_argument('--from', dest='source', default=None,
+                         help=f'Direktori sumber (default: {Config.STORAGE_DIR})')
+    migrate.add_argument('--db', default=None,
+                         help='File database tujuan (default: STORAGE_DB atau <STORAGE_DIR>/chat.sqlite3)')
+    
+    archive = subparsers.add_parser('archive', help='Pindahkan sesi lama ke file arsip')
+    archive.add_argument('--days', type=float, default=None,
+                         help=f'Umur minimum sesi dalam hari (default: {Config.ARCHIVE_AFTER_DAYS:g})')
+    archive.add_argument('--dir', default=None, help=f'Direktori sesi (default: {Config.STORAGE_DIR})')
+    
+    layout = subparsers.add_parser('layout', help='Pindahkan file sesi ke tata letak direktori lain')
+    layout.add_argument('--to', dest='layout', choices=['flat', 'date'], default=None,
+                        help=f'Tata letak tujuan (default: {Config.STORAGE_LAYOUT})')
+    layout.add_argument('--dir', default=None, help=f'Direktori sesi (default: {Config.STORAGE_DIR})')
+    
+    export = subparsers.add_parser('export', help='Ekspor semua sesi (termasuk arsip) ke PDF, teks, atau Markdown')
+    export.add_argument('--format', dest='export_format', choices=['pdf', 'txt', 'md'], default='pdf',
+                        help='Format ekspor (default: pdf)')
+    export.add_argument('--out', required=True, help='Direktori tujuan')
+    export.add_argument('--workers', type=int, default=None,
+                        help='Jumlah proses pekerja (default: EXPORT_WORKERS atau jumlah CPU)')
+    export.add_argument('--dir', default=None, help=f'Direktori sesi (default: {Config.STORAGE_DIR})')
+    
+    serve = subparsers.add_parser('serve', help='Jalankan server HTTP lokal (chat, sesi, pencarian)')
+    serve.add_argument('--host', default=None, help=f'Alamat server (default: {Config.SERVER_HOST})')
+    serve.add_argument('--port', type=int, default=None, help=f'Port server (default: {Config.SERVER_PORT})')
+    serve.add_argument('--max-sessions', type=int, default=None,
+                       help=f'Jumlah sesi aktif di memori (default: {Config.SERVER_MAX_SESSIONS})')
+    
+    return parser
+
+def run_serve(args: argparse.Namespace) -> int:
+    """Jalankan server HTTP sampai dihentikan."""
+    from .server import serve
+    
+    Config.validate_config()
+    serve(args.host, args.port, args.max_sessions)
+    return 0
+
+def run_convert(args: argparse.Namespace) -> int:
+    """Konversi semua snapshot sesi di direktori ke format lain."""
+    from .storage import ChatHistory
+    
+    session_format = args.session_format or Config.SESSION_FORMAT
+    storage_dir = args.dir or Config.STORAGE_DIR
+    stats = ChatHistory(storage_dir).convert_all(session_format)
+    before, after = stats['bytes_before'], stats['bytes_after']
+    ratio = f" ({after / before:.0%} dari ukuran awal)" if before else ''
+    print(f"{Fore.GREEN}{stats['sessions']} sesi di {storage_dir} dikonversi ke '{session_format}': "
+          f"{before:,} -> {after:,} byte{ratio}.{Style.RESET_ALL}")
+    return 0
+
+def run_migrate(args: argparse.Namespace) -> int:
+    """Impor sesi dari direktori JSON ke database SQLite."""
+    from pathlib import Path
+    from .sqlite_storage import SQLiteChatHistory
+    
+    source = args.source or Config.STORAGE_DIR
+    db_path = args.db or Config.STORAGE_DB or Path(Config.STORAGE_DIR) / 'chat.sqlite3'
+    storage = SQLiteChatHistory(db_path)
+    try:
+        imported = storage.import_directory(source)
+        total = storage.count_sessions()
+    finally:
+        storage.close()
+    print(f"{Fore.GREEN}{imported} sesi diimpor dari {source} ke {db_path} (total {total} sesi).{Style.RESET_ALL}")
+    print("Gunakan STORAGE_BACKEND=sqlite untuk memakai database ini.")
+    return 0
+
+def run_archive(args: argparse.Namespace) -> int:
+    """Pindahkan sesi yang lebih tua dari batas umur ke arsip."""
+    from .storage import ChatHistory
+    
+    days = Config.ARCHIVE_AFTER_DAYS if args.days is None else args.days
+    storage_dir = args.dir or Config.STORAGE_DIR
+    count = ChatHistory(storage_dir).archive_sessions(days)
+    print(f"{Fore.GREEN}{count} sesi di {storage_dir} yang lebih tua dari {days:g} hari dipindahkan ke arsip.{Style.RESET_ALL}")
+    return 0
+
+def run_layout(args: argparse.Namespace) -> int:
+    """Pindahkan sesi di direktori ke tata letak datar atau shard tanggal."""
+    from .storage import ChatHistory
+    
+    layout = args.layout or Config.STORAGE_LAYOUT
+    storage_dir = args.dir or Config.STORAGE_DIR
+    moved = ChatHistory(storage_dir).migrate_layout(layout)
+    print(f"{Fore.GREEN}{moved} sesi di {storage_dir} dipindah ke tata letak '{layout}'.{Style.RESET_ALL}")
+    if layout != Config.STORAGE_LAYOUT:
+        print(f"Gunakan STORAGE_LAYOUT={layout} agar sesi baru memakai tata letak yang sama.")
+    return 0
+
+def run_export(args: argparse.Namespace) -> int:
+    """Ekspor semua sesi di direktori ke satu format lalu laporkan throughput."""
+    from .export import export_sessions
+    from .storage import ChatHistory
+    
+    storage_dir = args.dir or Config.STORAGE_DIR
+    stats = export_sessions(ChatHistory(storage_dir), args.out, args.export_format, args.workers)
+    print(f"{Fore.GREEN}{stats['sessions']} sesi ({stats['messages']} pesan) di {storage_dir} diekspor ke "
+          f"{args.out} sebagai '{args.export_format}' dalam {stats['seconds']:.2f} detik: "
+          f"{stats['sessions_per_sec']:.1f} sesi/detik, {stats['bytes_per_sec'] / 1e6:.2f} MB/detik.{Style.RESET_ALL}")
+    if stats['errors']:
+        print(f"{Fore.YELLOW}{stats['errors']} sesi gagal diekspor.{Style.RESET_ALL}")
+    return 1 if stats['errors'] else 0
+
 def main():
     """Fungsi utama untuk menjalankan chatbot."""
     init_colorama()  # Inisialisasi colorama
+    args = build_parser().parse_args()
+    if args.backend:
+        Config.MODEL_BACKEND = args.backend
+    if args.model:
+        Config.DEFAULT_MODEL = args.model
     
     try:
+        if args.command == 'batch':
+            from . import batch
+            sys.exit(batch.run_from_args(args))
+        if args.command == 'convert':
+            sys.exit(run_convert(args))
+        if args.command == 'migrate':
+            sys.exit(run_migrate(args))
+        if args.command == 'archive':
+            sys.exit(run_archive(args))
+        if args.command == 'layout':
+            sys.exit(run_layout(args))
+        if args.command == 'export':
+            sys.exit(run_export(args))
+        if args.command == 'serve':
+            sys.exit(run_serve(args))
+        
         # Jalankan fungsi main dari core.py
         core_main()
     except KeyboardInterrupt:
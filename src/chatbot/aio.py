@@ -0,0 +1,287 @@
+"""
+API asinkron untuk menjalankan banyak sesi chat dalam satu event loop.
+"""
+from __future__ import annotations
+import asyncio
+import threading
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, MutableSequence, Optional, Set
+
+from .backends import build_history, create_backend
+from .config import Config
+from .context import restore_window
+from .messages import MessageStore
+from .resilience import ResilientCaller
+from .storage import ChatHistory, create_storage
+
+
+class AsyncSession:
+    """Status satu sesi chat: riwayat pesan dan objek chat milik model."""
+
+    def __init__(self, session_id: str, chat: Any, messages: MutableSequence[Dict[str, str]]):
+        self.session_id = session_id
+        self.chat = chat
+        self.messages = messages
+        self._lock: Optional[asyncio.Lock] = None
+        self.tasks: Set[asyncio.Task] = set()
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Satu giliran per sesi pada satu waktu agar urutan riwayat terjaga.
+        # Dibuat saat pertama dipakai: di Python 3.8/3.9 Lock terikat ke event
+        # loop saat dibuat, padahal sesi bisa dibuat sebelum asyncio.run
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+
+class AsyncChatbot:
+    """Chatbot asinkron dengan banyak sesi independen.
+
+    Setiap sesi punya riwayat dan objek chat sendiri. Jumlah permintaan yang
+    berjalan bersamaan ke model dibatasi oleh semaphore, dan permintaan yang
+    sedang berjalan bisa dibatalkan per sesi. Panggilan ke model melewati
+    ``ResilientCaller`` (timeout, retry, hedging, dan circuit breaker).
+    """
+
+    def __init__(
+        self,
+        model: Any = None,
+        model_name: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        storage: Optional[ChatHistory] = None,
+        caller: Optional[ResilientCaller] = None
+    ):
+        """Inisialisasi chatbot asinkron.
+
+        Args:
+            model: Backend atau objek model dengan ``start_chat(history=...)``.
+                Jika kosong, backend dibuat sesuai ``Config.MODEL_BACKEND``.
+            model_name: Nama model (default: Config.DEFAULT_MODEL)
+            max_concurrency: Batas permintaan bersamaan ke model
+            storage: Penyimpanan riwayat (default: sesuai Config.STORAGE_BACKEND)
+            caller: Pengirim pesan ke model (default: ``ResilientCaller.from_config()``)
+        """
+        self.model_name = model_name or Config.DEFAULT_MODEL
+        self.model = model if model is not None else self._init_model()
+        self.max_concurrency = max_concurrency or Config.MAX_CONCURRENT_REQUESTS
+        self.storage = storage or create_storage()
+        self.caller = caller or ResilientCaller.from_config()
+        self.sessions: Dict[str, AsyncSession] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _init_model(self) -> Any:
+        return create_backend(Config.MODEL_BACKEND, self.model_name)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Dibuat saat pertama dipakai agar terikat ke event loop yang sedang berjalan
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def create_session(
+        self,
+        session_id: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Buat sesi baru dan kembalikan ID-nya."""
+        session_id = session_id or uuid.uuid4().hex
+        if session_id in self.sessions:
+            raise ValueError(f"Sesi sudah ada: {session_id}")
+        # Riwayat pesan yang diberikan langsung dipulihkan ke sesi chat model
+        history = build_history(restore_window(messages, Config.RESTORE_MAX_TURNS)) if messages else []
+        self.sessions[session_id] = AsyncSession(
+            session_id,
+            self.model.start_chat(history=history),
+            MessageStore(messages or [{"role": "system", "content": Config.BOT_NAME}])
+        )
+        return session_id
+
+    def _clone_chat(self, session: AsyncSession) -> Callable[[], Any]:
+        # Retry dan hedging memakai chat baru dari riwayat sebelum giliran ini
+        history = list(getattr(session.chat, 'history', None) or [])
+        return lambda: self.model.start_chat(history=list(history))
+
+    def get_session(self, session_id: str) -> AsyncSession:
+        """Ambil sesi berdasarkan ID."""
+        try:
+            return self.sessions[session_id]
+        except KeyError:
+            raise KeyError(f"Sesi tidak ditemukan: {session_id}") from None
+
+    def close_session(self, session_id: str) -> List[Dict[str, str]]:
+        """Tutup sesi, batalkan permintaan yang berjalan, dan kembalikan riwayatnya."""
+        self.cancel(session_id)
+        return self.sessions.pop(session_id).messages
+
+    def cancel(self, session_id: str) -> int:
+        """Batalkan semua permintaan yang sedang berjalan untuk sebuah sesi.
+
+        Returns:
+            int: Jumlah permintaan yang dibatalkan
+        """
+        session = self.get_session(session_id)
+        cancelled = 0
+        for task in list(session.tasks):
+            if task.cancel():
+                cancelled += 1
+        return cancelled
+
+    async def get_response(self, session_id: str, message: str) -> str:
+        """Kirim pesan dalam sebuah sesi dan tunggu respons model.
+
+        Pesan pengguna dan respons baru ditambahkan ke riwayat sesi setelah
+        respons diterima, sehingga permintaan yang gagal atau dibatalkan tidak
+        meninggalkan riwayat setengah jadi.
+
+        Raises:
+            KeyError: Jika sesi tidak ditemukan
+            asyncio.CancelledError: Jika permintaan dibatalkan lewat ``cancel``
+            RuntimeError: Jika model gagal memberikan respons
+        """
+        session = self.get_session(session_id)
+        task = asyncio.ensure_future(self._turn(session, message))
+        session.tasks.add(task)
+        try:
+            return await task
+        finally:
+            session.tasks.discard(task)
+
+    async def _turn(self, session: AsyncSession, message: str) -> str:
+        async with session.lock:
+            async with self.semaphore:
+                clone = self._clone_chat(session)
+                try:
+                    text, session.chat = await self.caller.send_async(session.chat, message, clone, self._send)
+                except BaseException as e:
+                    # Panggilan yang ditinggalkan masih bisa mengubah chat lama
+                    session.chat = clone()
+                    if isinstance(e, Exception):
+                        raise RuntimeError(f"Gagal mendapatkan respons dari model: {e}") from e
+                    raise
+            session.messages.append({"role": "user", "content": message})
+            session.messages.append({"role": "assistant", "content": text})
+            return text
+
+    async def stream_response(self, session_id: str, message: str) -> AsyncIterator[str]:
+        """Kirim pesan dalam sebuah sesi dan alirkan potongan respons saat tiba.
+
+        Model streaming dibaca di thread pekerja lewat ``ResilientCaller.stream``
+        (batas waktu potongan, retry sebelum potongan pertama, hedging);
+        potongan diteruskan ke event loop lewat antrean. Sesi dan slot konkurensi dipegang sampai respons
+        selesai, dan riwayat hanya diperbarui jika seluruh respons diterima.
+
+        Task yang membaca aliran ini terdaftar di sesi selama streaming
+        berjalan, sehingga ``cancel`` menghentikannya di tengah respons.
+
+        Raises:
+            KeyError: Jika sesi tidak ditemukan
+            asyncio.CancelledError: Jika streaming dibatalkan lewat ``cancel``
+            RuntimeError: Jika model gagal memberikan respons
+        """
+        session = self.get_session(session_id)
+        task = asyncio.current_task()
+        session.tasks.add(task)
+        try:
+            async for text in self._stream_turn(session, message):
+                yield text
+        finally:
+            session.tasks.discard(task)
+
+    async def _stream_turn(self, session: AsyncSession, message: str) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+        winner: List[Any] = []
+        clone = self._clone_chat(session)
+
+        def put(item: Any) -> None:
+            if stop.is_set():
+                # Pembaca sudah berhenti: keluaran thread ini dibuang
+                return
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Event loop sudah ditutup
+                stop.set()
+
+        def produce() -> None:
+            chunks = self.caller.stream(session.chat, message, clone)
+            try:
+                for chunk, source in chunks:
+                    if stop.is_set():
+                        return
+                    if not winner:
+                        winner.append(source)
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Potongan tanpa teks (misalnya hanya metadata)
+                        continue
+                    if text:
+                        put(text)
+            except Exception as e:
+                put(e)
+            else:
+                put(done)
+            finally:
+                chunks.close()
+
+        async with session.lock:
+            async with self.semaphore:
+                loop.run_in_executor(None, produce)
+                parts: List[str] = []
+                completed = False
+                try:
+                    while True:
+                        item = await queue.get()
+                        if item is done:
+                            completed = True
+                            break
+                        if isinstance(item, Exception):
+                            raise RuntimeError(f"Gagal mendapatkan respons dari model: {item}") from item
+                        parts.append(item)
+                        yield item
+                finally:
+                    # Pembaca berhenti lebih awal (klien terputus, cancel): thread pembaca
+                    # berhenti sendiri pada potongan berikutnya, tanpa ditunggu di sini
+                    stop.set()
+                    if not completed:
+                        # Giliran gagal atau terputus: chat lama bisa berisi giliran setengah jadi
+                        session.chat = clone()
+            if winner:
+                session.chat = winner[0]
+            session.messages.append({"role": "user", "content": message})
+            session.messages.append({"role": "assistant", "content": ''.join(parts)})
+
+    @staticmethod
+    async def _send(chat: Any, message: str) -> str:
+        send_async = getattr(chat, 'send_message_async', None)
+        if send_async is not None:
+            response = await send_async(message)
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(None, chat.send_message, message)
+        return response.text
+
+    async def save_session(self, session_id: str, session_name: Optional[str] = None) -> str:
+        """Simpan riwayat sesi tanpa memblokir event loop.
+
+        Returns:
+            str: Path ke file yang disimpan
+        """
+        messages = list(self.get_session(session_id).messages)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.storage.save_chat, messages, session_name)
+
+    async def load_session(self, filepath: str, session_id: Optional[str] = None) -> str:
+        """Muat sesi tersimpan sebagai sesi baru.
+
+        Returns:
+            str: ID sesi yang dibuat
+        """
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, self.storage.load_chat, filepath)
+        return self.create_session(session_id, data.get('messages', []))
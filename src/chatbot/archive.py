@@ -0,0 +1,165 @@
+"""
+Arsip sesi lama dalam satu file pack dengan indeks offset terpisah.
+
+Sesi yang jarang dibuka tidak perlu lagi disimpan sebagai file sendiri yang
+ikut dibuka setiap pemindaian. ``SessionArchive`` menambahkan setiap sesi
+(JSON ringkas) ke ``sessions.pack`` yang hanya ditambah (append-only) dan
+mencatat kunci, offset, panjang, serta metadata daftar sesi di
+``sessions.idx`` (JSON Lines). Memuat satu sesi cukup satu irisan memory map
+dari file pack.
+
+Isi pack ditulis dan di-fsync sebelum baris indeksnya, sehingga crash di
+tengah pengarsipan paling banyak meninggalkan byte tak terpakai di akhir pack
+(atau baris indeks terakhir yang terpotong, yang diabaikan saat dibaca).
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+ARCHIVE_VERSION = 1
+
+ArchiveEntry = Dict[str, Any]
+
+
+class SessionArchive:
+    """Pack sesi append-only beserta indeks offset yang dibaca secara malas (lazy)."""
+
+    def __init__(self, base: Union[str, Path]):
+        self.base = Path(base)
+        self.pack_path = self.base / 'sessions.pack'
+        self.index_path = self.base / 'sessions.idx'
+        self._entries: Dict[str, ArchiveEntry] = {}
+        self._offset = 0
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        """Baca baris indeks baru sejak pembacaan terakhir."""
+        try:
+            size = self.index_path.stat().st_size
+        except FileNotFoundError:
+            self._entries, self._offset = {}, 0
+            return
+        if size < self._offset:
+            # Indeks ditulis ulang oleh proses lain
+            self._entries, self._offset = {}, 0
+        elif size == self._offset:
+            return
+
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    # Baris terakhir belum selesai ditulis
+                    break
+                self._offset += len(raw)
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                if 'version' in entry:
+                    if entry['version'] != ARCHIVE_VERSION:
+                        raise ValueError(f"Versi arsip tidak didukung: {entry['version']}")
+                    continue
+                if entry.get('key'):
+                    # Baris yang lebih baru untuk kunci yang sama menggantikan yang lama
+                    self._entries[entry['key']] = entry
+
+    def keys(self) -> List[str]:
+        """Kunci semua sesi di arsip, sesuai urutan pengarsipan."""
+        with self._lock:
+            self._refresh()
+            return list(self._entries)
+
+    def entries(self) -> List[ArchiveEntry]:
+        """Entri indeks (key, offset, length, name, created_at, message_count)."""
+        with self._lock:
+            self._refresh()
+            return list(self._entries.values())
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def read(self, key: str) -> bytes:
+        """Bytes sesi ``key`` sebagai satu irisan memory map file pack.
+
+        Raises:
+            KeyError: Jika sesi tidak ada di arsip
+            ValueError: Jika pack hilang atau lebih pendek dari yang dicatat indeks
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._entries[key]
+            start, end = entry['offset'], entry['offset'] + entry['length']
+            if self._map is None or len(self._map) < end:
+                # Pack bertambah sejak dipetakan; petakan ulang seluruh file
+                self._remap()
+            if len(self._map) < end:
+                raise ValueError(f"Arsip terpotong untuk sesi {key}")
+            return self._map[start:end]
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        try:
+            with open(self.pack_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # mmap tidak bisa memetakan file kosong
+                    raise ValueError(f"Arsip rusak: {self.pack_path} kosong")
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            # Indeks mencatat sesi tetapi pack-nya hilang; bukan sesi yang terhapus
+            raise ValueError(f"Arsip rusak: {self.pack_path} tidak ditemukan") from None
+
+    def add_many(self, sessions: Iterable[Tuple[str, bytes, Dict[str, Any]]]) -> int:
+        """Tambahkan beberapa sesi sekaligus dengan satu fsync untuk pack dan satu untuk indeks.
+
+        Args:
+            sessions: (kunci, bytes sesi, metadata) untuk setiap sesi
+
+        Returns:
+            int: Jumlah sesi yang ditambahkan
+        """
+        with self._lock:
+            self.base.mkdir(exist_ok=True, parents=True)
+            lines = []
+            with open(self.pack_path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                for key, raw, metadata in sessions:
+                    f.write(raw)
+                    lines.append(dict(metadata, key=key, offset=offset, length=len(raw)))
+                    offset += len(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            if not lines:
+                return 0
+
+            is_new = not self.index_path.exists() or self.index_path.stat().st_size == 0
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                if is_new:
+                    f.write(json.dumps({'version': ARCHIVE_VERSION}) + '\n')
+                for entry in lines:
+                    f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._refresh()
+            return len(lines)
+
+    def close(self) -> None:
+        """Lepaskan memory map file pack."""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
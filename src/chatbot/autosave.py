@@ -0,0 +1,147 @@
+"""
+Penyimpanan otomatis di latar belakang.
+
+``AutoSaver`` menjalankan fungsi simpan di thread latar. ``mark_dirty``
+hanya menandai ada perubahan (tanpa I/O), sehingga loop interaktif tidak
+menunggu disk. Perubahan yang masuk selama jeda dikumpulkan dan ditulis
+sekaligus, paling banyak satu kali per ``interval`` detik. Semua penyimpan
+yang aktif di-flush saat proses keluar (termasuk karena SIGTERM setelah
+``install_signal_handlers``).
+"""
+from __future__ import annotations
+import atexit
+import logging
+import signal
+import sys
+import threading
+import time
+import weakref
+from typing import Callable, Optional
+
+from .metrics import registry as metrics
+
+logger = logging.getLogger(__name__)
+
+# Penyimpan yang masih aktif; di-flush oleh atexit
+_active: 'weakref.WeakSet[AutoSaver]' = weakref.WeakSet()
+
+
+class AutoSaver:
+    """Penulis latar belakang dengan debounce untuk satu sesi chat."""
+
+    def __init__(
+        self,
+        write: Callable[[], None],
+        interval: float = 2.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            write: Fungsi yang menulis semua perubahan yang belum tersimpan
+            interval: Jeda minimum antar penulisan (detik)
+            clock: Sumber waktu (bisa diganti saat pengujian)
+        """
+        self.write = write
+        self.interval = interval
+        self.clock = clock
+        self.writes = 0
+        self._dirty = False
+        self._closed = False
+        self._last_write = float('-inf')
+        self._cond = threading.Condition()
+        # Dipegang selama menulis agar flush menunggu penulisan yang sedang berjalan
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> bool:
+        """True jika ada perubahan yang belum ditulis."""
+        return self._dirty
+
+    def mark_dirty(self) -> None:
+        """Tandai ada perubahan; penulisan dilakukan di thread latar."""
+        with self._cond:
+            if self._closed:
+                return
+            self._dirty = True
+            if self._thread is None:
+                # Thread baru dibuat saat perubahan pertama agar startup tetap ringan
+                self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+                self._thread.start()
+                _active.add(self)
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._dirty and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                delay = self._last_write + self.interval - self.clock()
+                if delay > 0:
+                    # Perubahan yang masuk selama jeda ikut ditulis sekaligus
+                    self._cond.wait(delay)
+                    continue
+            self._write_pending()
+
+    def _write_pending(self) -> bool:
+        with self._write_lock:
+            with self._cond:
+                if not self._dirty:
+                    return False
+                self._dirty = False
+            try:
+                with metrics.timer('autosave_write_seconds'):
+                    self.write()
+                self.writes += 1
+                metrics.inc('autosave_writes_total')
+                return True
+            except Exception as e:
+                # Coba lagi pada jeda berikutnya; riwayat tetap ada di memori
+                metrics.inc('autosave_errors_total')
+                logger.warning("Autosave gagal: %s", e)
+                with self._cond:
+                    self._dirty = True
+                return False
+            finally:
+                self._last_write = self.clock()
+
+    def flush(self) -> bool:
+        """Tulis perubahan yang tertunda sekarang juga (menunggu penulisan yang berjalan).
+
+        Returns:
+            bool: True jika ada yang ditulis
+        """
+        return self._write_pending()
+
+    def close(self) -> None:
+        """Tulis perubahan terakhir lalu hentikan thread latar."""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1)
+        _active.discard(self)
+
+
+@atexit.register
+def flush_all() -> None:
+    """Flush semua penyimpan yang masih aktif (dipanggil saat proses keluar)."""
+    for saver in list(_active):
+        saver.flush()
+
+
+def install_signal_handlers() -> None:
+    """Ubah SIGTERM (dan SIGHUP) menjadi ``SystemExit`` agar autosave sempat di-flush.
+
+    Hanya berlaku di thread utama dan untuk sinyal yang masih memakai penanganan bawaan.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for name in ('SIGTERM', 'SIGHUP'):
+        sig = getattr(signal, name, None)
+        if sig is None or signal.getsignal(sig) is not signal.SIG_DFL:
+            continue
+        signal.signal(sig, lambda signum, frame: sys.exit(128 + signum))
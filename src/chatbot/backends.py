@@ -0,0 +1,272 @@
+"""
+Backend model yang bisa diganti-ganti.
+
+``Chatbot`` berbicara dengan backend lewat antarmuka yang sama dengan
+``google.generativeai.GenerativeModel``: ``start_chat(history=...)`` yang
+mengembalikan objek chat dengan ``send_message(message, stream=False)``,
+serta ``generate_content(prompt)`` untuk permintaan tanpa riwayat.
+
+Tersedia dua backend:
+- ``GeminiBackend``: adaptor untuk Google Gemini
+- ``FakeBackend``: backend lokal deterministik untuk benchmark dan pengujian
+  tanpa koneksi internet, dengan latensi, laju token, dan kegagalan yang
+  bisa diatur
+"""
+from __future__ import annotations
+import hashlib
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import Config
+
+
+# Peran pesan Chatbot -> peran riwayat Gemini
+HISTORY_ROLES = {'user': 'user', 'assistant': 'model', 'system': 'user'}
+
+
+def build_history(messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Ubah pesan ``{'role', 'content'}`` menjadi riwayat format Gemini.
+
+    Pesan berurutan dengan peran yang sama digabung menjadi satu entri
+    berisi beberapa ``parts`` agar peran user/model tetap bergantian. Pesan
+    dari file rusak (isi bukan string) dilewati; peran yang bukan string
+    dianggap 'user'.
+    """
+    history: List[Dict[str, Any]] = []
+    for message in messages:
+        content = message.get('content', '')
+        if not isinstance(content, str):
+            continue
+        role = message.get('role')
+        role = HISTORY_ROLES.get(role if isinstance(role, str) else None, 'user')
+        if history and history[-1]['role'] == role:
+            history[-1]['parts'].append(content)
+        else:
+            history.append({'role': role, 'parts': [content]})
+    return history
+
+
+class BackendError(Exception):
+    """Kesalahan dari backend model."""
+
+
+class TransientBackendError(BackendError):
+    """Kesalahan sementara yang aman untuk dicoba ulang."""
+
+
+class ModelBackend:
+    """Antarmuka dasar backend model."""
+
+    name = 'base'
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def start_chat(self, history: Optional[List[Any]] = None) -> Any:
+        """Mulai sesi chat dengan riwayat awal."""
+        raise NotImplementedError
+
+    def generate_content(self, prompt: str) -> Any:
+        """Kirim satu prompt tanpa riwayat; hasilnya punya atribut ``text``."""
+        raise NotImplementedError
+
+
+class GeminiBackend(ModelBackend):
+    """Adaptor untuk Google Gemini (``google.generativeai``)."""
+
+    name = 'gemini'
+
+    def __init__(self, model_name: str, api_key: Optional[str] = None):
+        super().__init__(model_name)
+        import google.generativeai as genai
+        genai.configure(api_key=api_key or Config.GEMINI_API_KEY)
+        self._model = genai.GenerativeModel(model_name)
+
+    def start_chat(self, history: Optional[List[Any]] = None) -> Any:
+        return self._model.start_chat(history=history or [])
+
+    def generate_content(self, prompt: str) -> Any:
+        return self._model.generate_content(prompt)
+
+
+class FakeResponse:
+    """Respons backend palsu; bisa diiterasi per potongan seperti mode streaming."""
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = ''.join(self._chunks)
+        return self._text
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield FakeResponse(iter([chunk]))
+
+
+class FakeChat:
+    """Sesi chat milik ``FakeBackend`` dengan riwayat format Gemini."""
+
+    def __init__(self, backend: 'FakeBackend', history: Optional[List[Any]] = None):
+        self.backend = backend
+        self.history: List[Any] = list(history or [])
+
+    def send_message(self, message: str, stream: bool = False) -> FakeResponse:
+        chunks = self.backend._reply_chunks(message, len(self.history))
+        if stream:
+            return FakeResponse(self._record(message, chunks))
+        text = ''.join(chunks)
+        self._append(message, text)
+        return FakeResponse(iter([text]))
+
+    async def send_message_async(self, message: str) -> FakeResponse:
+        text = ''.join(await self.backend._reply_chunks_async(message, len(self.history)))
+        self._append(message, text)
+        return FakeResponse(iter([text]))
+
+    def _record(self, message: str, chunks: Iterator[str]) -> Iterator[str]:
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self._append(message, ''.join(parts))
+
+    def _append(self, message: str, text: str) -> None:
+        self.history.append({'role': 'user', 'parts': [message]})
+        self.history.append({'role': 'model', 'parts': [text]})
+
+
+class FakeBackend(ModelBackend):
+    """Backend lokal deterministik untuk benchmark tanpa API.
+
+    Respons dibentuk dari hash prompt sehingga prompt yang sama selalu
+    menghasilkan teks yang sama. Latensi awal, laju token, dan peluang
+    kegagalan bisa diatur untuk mensimulasikan layanan sungguhan.
+    """
+
+    name = 'fake'
+
+    WORDS = (
+        "model", "respons", "data", "contoh", "jawaban", "sistem", "proses",
+        "hasil", "pengguna", "waktu", "cepat", "lokal", "token", "uji",
+    )
+
+    def __init__(
+        self,
+        model_name: str = 'fake-model',
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        failure_rate: float = 0.0,
+        reply_tokens: int = 20,
+        seed: int = 0,
+        fail_first: int = 0,
+        latencies: Sequence[float] = ()
+    ):
+        """
+        Args:
+            model_name: Nama model yang dilaporkan
+            latency: Jeda sebelum token pertama (detik)
+            tokens_per_second: Laju token keluaran (0 = seketika)
+            failure_rate: Peluang setiap permintaan gagal (0.0 - 1.0)
+            reply_tokens: Jumlah kata per respons
+            seed: Seed untuk injeksi kegagalan yang bisa diulang
+            fail_first: Jumlah permintaan pertama yang pasti gagal
+            latencies: Latensi permintaan ke-0, ke-1, ... (sisanya memakai ``latency``)
+        """
+        super().__init__(model_name)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self.reply_tokens = reply_tokens
+        self.fail_first = fail_first
+        self.latencies = list(latencies)
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, model_name: str) -> 'FakeBackend':
+        """Buat backend palsu berdasarkan pengaturan di ``Config``."""
+        return cls(
+            model_name=model_name,
+            latency=Config.FAKE_LATENCY,
+            tokens_per_second=Config.FAKE_TOKENS_PER_SECOND,
+            failure_rate=Config.FAKE_FAILURE_RATE
+        )
+
+    def start_chat(self, history: Optional[List[Any]] = None) -> FakeChat:
+        return FakeChat(self, history)
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        return FakeResponse(iter([''.join(self._reply_chunks(prompt, 0))]))
+
+    def reply_text(self, prompt: str, turn: int = 0) -> str:
+        """Teks respons deterministik untuk sebuah prompt."""
+        digest = hashlib.sha256(f"{turn}:{prompt}".encode('utf-8')).digest()
+        words = [self.WORDS[digest[i % len(digest)] % len(self.WORDS)] for i in range(self.reply_tokens)]
+        return f"[{self.model_name}] " + ' '.join(words)
+
+    def _next_request(self) -> Tuple[bool, float]:
+        """Catat satu permintaan; kembalikan (harus gagal, latensi)."""
+        with self._lock:
+            n = self.requests
+            self.requests += 1
+            fail = n < self.fail_first or (self.failure_rate > 0 and self._random.random() < self.failure_rate)
+            latency = self.latencies[n] if n < len(self.latencies) else self.latency
+        return fail, latency
+
+    def _split(self, prompt: str, turn: int) -> List[str]:
+        words = self.reply_text(prompt, turn).split(' ')
+        return [words[0]] + [' ' + word for word in words[1:]]
+
+    def _reply_chunks(self, prompt: str, turn: int) -> Iterator[str]:
+        fail, latency = self._next_request()
+        if fail:
+            raise TransientBackendError("Kegagalan simulasi dari backend palsu")
+        return self._stream(self._split(prompt, turn), latency)
+
+    def _stream(self, chunks: List[str], latency: float) -> Iterator[str]:
+        if latency:
+            time.sleep(latency)
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for i, chunk in enumerate(chunks):
+            if delay and i:
+                time.sleep(delay)
+            yield chunk
+
+    async def _reply_chunks_async(self, prompt: str, turn: int) -> List[str]:
+        import asyncio  # hanya dibutuhkan oleh jalur async
+
+        fail, latency = self._next_request()
+        if fail:
+            raise TransientBackendError("Kegagalan simulasi dari backend palsu")
+        chunks = self._split(prompt, turn)
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        await asyncio.sleep(latency + delay * (len(chunks) - 1))
+        return chunks
+
+
+BACKENDS: Dict[str, type] = {
+    GeminiBackend.name: GeminiBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+
+def create_backend(name: Optional[str] = None, model_name: Optional[str] = None) -> ModelBackend:
+    """Buat backend berdasarkan nama (default: Config.MODEL_BACKEND).
+
+    Raises:
+        ValueError: Jika nama backend tidak dikenal
+    """
+    name = (name or Config.MODEL_BACKEND).lower()
+    model_name = model_name or Config.DEFAULT_MODEL
+    if name == FakeBackend.name:
+        return FakeBackend.from_config(model_name)
+    if name == GeminiBackend.name:
+        return GeminiBackend(model_name)
+    raise ValueError(f"Backend tidak dikenal: {name}. Pilihan: {', '.join(BACKENDS)}")
@@ -0,0 +1,305 @@
+"""
+Mode batch: kirim banyak prompt ke model dengan worker pool terbatas.
+
+Prompt dibaca dari file JSONL (atau stdin), dikerjakan paralel oleh thread
+pool dengan pembatas laju token bucket dan retry dengan backoff eksponensial,
+lalu hasilnya ditulis ke file JSONL sesuai urutan input. Run yang terputus
+bisa dilanjutkan dari file output-nya; prompt yang sebelumnya gagal
+dikerjakan ulang.
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, TextIO, Tuple, Union
+
+from colorama import Style
+
+from .backends import create_backend
+from .config import Config, Theme, Icons
+from .resilience import backoff_delay, is_retryable
+
+GenerateFn = Callable[[str], str]
+
+# Jumlah prompt yang diajukan ke pool sekaligus, per worker
+WINDOW_PER_WORKER = 2
+
+
+class TokenBucket:
+    """Pembatas laju token bucket yang aman dipakai banyak thread."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Jumlah token per detik; 0 atau negatif berarti tanpa batas
+            capacity: Ukuran burst maksimum (default: max(1, rate))
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Tunggu sampai satu token tersedia lalu pakai token tersebut."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def read_prompts(source: Union[str, Path, TextIO]) -> List[Dict[str, Any]]:
+    """Baca prompt dari file JSONL atau teks biasa.
+
+    Setiap baris boleh berupa objek JSON dengan kunci ``prompt`` (dan ``id``
+    opsional) atau teks biasa yang dipakai langsung sebagai prompt. Baris
+    kosong diabaikan. Gunakan ``-`` untuk membaca dari stdin.
+    """
+    if isinstance(source, (str, Path)):
+        if str(source) == '-':
+            return read_prompts(sys.stdin)
+        with open(source, 'r', encoding='utf-8') as f:
+            return read_prompts(f)
+
+    prompts = []
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        item: Dict[str, Any]
+        try:
+            parsed = json.loads(line)
+        except json.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, dict):
+            if 'prompt' not in parsed:
+                raise ValueError(f"Baris {len(prompts) + 1} tidak memiliki kunci 'prompt'")
+            item = {'prompt': str(parsed['prompt'])}
+            if 'id' in parsed:
+                item['id'] = parsed['id']
+        else:
+            item = {'prompt': line}
+        item['index'] = len(prompts)
+        prompts.append(item)
+    return prompts
+
+
+def _read_records(path: Path) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """Hasil yang utuh di file output beserta offset akhir setiap baris."""
+    records: List[Dict[str, Any]] = []
+    ends: List[int] = []
+    if not path.exists():
+        return records, ends
+    size = 0
+    with open(path, 'rb') as f:
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(raw)
+            except json.JSONDecodeError:
+                break
+            size += len(raw)
+            records.append(record)
+            ends.append(size)
+    return records, ends
+
+
+def count_completed(output_path: Union[str, Path]) -> int:
+    """Hitung hasil berhasil yang berurutan di awal file output.
+
+    File dipotong tepat sebelum hasil gagal pertama (atau baris terakhir
+    yang terpotong), sehingga prompt yang gagal dikerjakan ulang dan run
+    bisa dilanjutkan dengan menambah baris baru di belakangnya.
+    """
+    path = Path(output_path)
+    records, ends = _read_records(path)
+    completed = 0
+    for record in records:
+        if record.get('error') is not None:
+            break
+        completed += 1
+
+    valid_size = ends[completed - 1] if completed else 0
+    if path.exists() and valid_size < path.stat().st_size:
+        with open(path, 'r+b') as f:
+            f.truncate(valid_size)
+    return completed
+
+
+def call_with_retry(
+    generate: GenerateFn,
+    prompt: str,
+    limiter: TokenBucket,
+    max_retries: int = 3,
+    backoff: float = 1.0
+) -> Dict[str, Any]:
+    """Panggil model dengan retry dan backoff eksponensial (dengan jitter).
+
+    Hanya kesalahan sementara (lihat ``is_retryable``) yang dicoba ulang;
+    permintaan tidak valid atau kesalahan autentikasi langsung dicatat gagal.
+
+    Returns:
+        Dict[str, Any]: response/error, jumlah percobaan dan lama waktu
+    """
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        limiter.acquire()
+        try:
+            response = generate(prompt)
+            return {
+                'response': response,
+                'error': None,
+                'attempts': attempt,
+                'elapsed': time.perf_counter() - start
+            }
+        except Exception as e:
+            if attempt > max_retries or not is_retryable(e):
+                return {
+                    'response': None,
+                    'error': str(e),
+                    'attempts': attempt,
+                    'elapsed': time.perf_counter() - start
+                }
+            time.sleep(backoff_delay(attempt, backoff))
+
+
+def run_batch(
+    prompts: List[Dict[str, Any]],
+    generate: GenerateFn,
+    output_path: Union[str, Path],
+    workers: int = 4,
+    rate: float = 0,
+    max_retries: int = 3,
+    backoff: float = 1.0,
+    resume: bool = False
+) -> Dict[str, Any]:
+    """Jalankan semua prompt dan tulis hasilnya ke file JSONL.
+
+    Hasil ditulis sesuai urutan input segera setelah tersedia, sehingga file
+    output selalu berisi awalan (prefix) yang lengkap dari daftar prompt.
+
+    Args:
+        prompts: Hasil ``read_prompts``
+        generate: Fungsi prompt -> teks respons
+        output_path: File JSONL tujuan
+        workers: Jumlah thread pekerja
+        rate: Batas permintaan per detik (0 = tanpa batas)
+        max_retries: Jumlah retry per prompt setelah percobaan pertama gagal
+        backoff: Jeda dasar backoff dalam detik
+        resume: Lanjutkan dari file output yang sudah ada (hasil gagal dikerjakan ulang)
+
+    Returns:
+        Dict[str, Any]: Ringkasan run (total, skipped, completed, failed, elapsed)
+    """
+    output_path = Path(output_path)
+    reused: Dict[int, Dict[str, Any]] = {}
+    skipped = 0
+    if resume:
+        previous, _ = _read_records(output_path)
+        skipped = count_completed(output_path)
+        # Hasil berhasil setelah hasil gagal pertama ditulis ulang tanpa memanggil model
+        reused = {
+            record['index']: record for record in previous[skipped:]
+            if record.get('error') is None and isinstance(record.get('index'), int)
+        }
+    pending = prompts[skipped:]
+    limiter = TokenBucket(rate)
+    summary = {'total': len(prompts), 'skipped': skipped, 'completed': 0, 'failed': 0}
+    start = time.perf_counter()
+
+    output_path.parent.mkdir(exist_ok=True, parents=True)
+    # Hanya sejumlah kecil prompt yang diajukan sekaligus: memori tetap O(workers)
+    # dan saat berhenti (Ctrl-C, kesalahan) hanya sisa jendela yang dibatalkan
+    window: Deque[Tuple[Dict[str, Any], Optional[Future]]] = deque()
+    limit = max(1, workers) * WINDOW_PER_WORKER
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        with open(output_path, 'a' if resume else 'w', encoding='utf-8') as out:
+            def write_next() -> None:
+                # Menunggu future sesuai urutan menjaga urutan output
+                item, future = window.popleft()
+                if future is None:
+                    out.write(json.dumps(reused[item['index']], ensure_ascii=False) + '\n')
+                    summary['skipped'] += 1
+                    return
+                record = dict(item, **future.result())
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                out.flush()
+                summary['completed'] += 1
+                if record['error'] is not None:
+                    summary['failed'] += 1
+
+            for item in pending:
+                if len(window) >= limit:
+                    write_next()
+                window.append((item, None if item['index'] in reused else
+                               pool.submit(call_with_retry, generate, item['prompt'], limiter, max_retries, backoff)))
+            while window:
+                write_next()
+    finally:
+        # Prompt yang belum mulai dibatalkan agar kuota API tidak terpakai sia-sia
+        # (shutdown(cancel_futures=True) baru ada sejak Python 3.9)
+        for _, future in window:
+            if future is not None:
+                future.cancel()
+        pool.shutdown(wait=True)
+
+    summary['elapsed'] = time.perf_counter() - start
+    return summary
+
+
+def _backend_generate(backend_name: str, model_name: str) -> GenerateFn:
+    backend = create_backend(backend_name, model_name)
+
+    def generate(prompt: str) -> str:
+        return backend.generate_content(prompt).text
+
+    return generate
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Tambahkan argumen subperintah ``batch``."""
+    parser.add_argument('input', help="File JSONL berisi prompt, atau '-' untuk stdin")
+    parser.add_argument('-o', '--output', required=True, help='File JSONL untuk hasil')
+    parser.add_argument('--workers', type=int, default=Config.BATCH_WORKERS,
+                        help=f'Jumlah worker (default: {Config.BATCH_WORKERS})')
+    parser.add_argument('--rate', type=float, default=Config.BATCH_RATE_LIMIT,
+                        help='Batas permintaan per detik, 0 = tanpa batas')
+    parser.add_argument('--retries', type=int, default=3, help='Jumlah retry per prompt (default: 3)')
+    parser.add_argument('--resume', action='store_true', help='Lanjutkan dari file output yang ada')
+
+
+def run_from_args(args: argparse.Namespace) -> int:
+    """Jalankan subperintah ``batch`` dari argumen CLI."""
+    Config.validate_config()
+    prompts = read_prompts(args.input)
+    summary = run_batch(
+        prompts,
+        _backend_generate(Config.MODEL_BACKEND, Config.DEFAULT_MODEL),
+        args.output,
+        workers=args.workers,
+        rate=args.rate,
+        max_retries=args.retries,
+        resume=args.resume
+    )
+    throughput = summary['completed'] / summary['elapsed'] if summary['elapsed'] else 0.0
+    print(f"{Theme.SUCCESS}{Icons.SUCCESS} Batch selesai: {summary['completed']} diproses, "
+          f"{summary['skipped']} dilewati, {summary['failed']} gagal "
+          f"({summary['elapsed']:.1f} detik, {throughput:.2f} prompt/detik){Style.RESET_ALL}")
+    return 1 if summary['failed'] else 0
@@ -0,0 +1,217 @@
+"""
+Cache respons model dengan LRU di memori dan tingkat kedua di disk.
+
+Kunci cache dibentuk dari nama model, pengaturan generasi, dan hash dari
+konteks percakapan beserta pesan baru, sehingga respons hanya dipakai ulang
+untuk permintaan yang benar-benar identik.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from .config import Config
+from .metrics import registry as metrics
+
+
+def make_cache_key(
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    context: List[Mapping[str, Any]],
+    message: str
+) -> str:
+    """Buat kunci cache SHA-256 untuk satu permintaan."""
+    payload = json.dumps(
+        {
+            'model': model_name,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'context': [[m.get('role'), m.get('content')] for m in context],
+            'message': message,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Cache dua tingkat: LRU di memori dan direktori berbatas ukuran di disk."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        disk_dir: Optional[Union[str, Path]] = None,
+        max_disk_bytes: int = 50 * 1024 * 1024,
+        ttl: Optional[float] = None
+    ):
+        """
+        Args:
+            max_entries: Jumlah entri maksimum di memori
+            disk_dir: Direktori cache disk (None = hanya memori)
+            max_disk_bytes: Ukuran total maksimum cache disk
+            ttl: Umur maksimum entri dalam detik (None = tanpa batas)
+        """
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._memory: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = self._scan_disk_usage()
+
+    @classmethod
+    def from_config(cls) -> 'ResponseCache':
+        """Buat cache berdasarkan pengaturan di ``Config``."""
+        return cls(
+            max_entries=Config.CACHE_MAX_ENTRIES,
+            disk_dir=Config.CACHE_DIR or None,
+            max_disk_bytes=int(Config.CACHE_MAX_DISK_MB * 1024 * 1024),
+            ttl=Config.CACHE_TTL or None
+        )
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _scan_disk_usage(self) -> int:
+        if not self.disk_dir or not self.disk_dir.exists():
+            return 0
+        return sum(p.stat().st_size for p in self.disk_dir.glob('*/*.json'))
+
+    def get(self, key: str) -> Optional[str]:
+        """Ambil respons dari cache, atau ``None`` jika tidak ada/kedaluwarsa."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                text, created_at = entry
+                if not self._expired(created_at):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    metrics.inc('cache_hits_total', tier='memory')
+                    return text
+                del self._memory[key]
+
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._remember(key, *entry)
+                self.hits += 1
+                self.disk_hits += 1
+                metrics.inc('cache_hits_total', tier='disk')
+                return entry[0]
+
+            self.misses += 1
+            metrics.inc('cache_misses_total')
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        """Simpan respons ke cache memori dan disk."""
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, text, created_at)
+            self._write_disk(key, text, created_at)
+
+    def _remember(self, key: str, text: str, created_at: float) -> None:
+        self._memory[key] = (text, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Tuple[str, float]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        if not (isinstance(data, dict) and isinstance(data.get('text'), str)
+                and isinstance(data.get('created_at'), (int, float))):
+            # Entri rusak diperlakukan seperti gagal decode
+            self._remove_disk(path)
+            return None
+        if self._expired(data['created_at']):
+            self._remove_disk(path)
+            return None
+        # Perbarui mtime agar eviksi berdasarkan mtime menjadi LRU, bukan FIFO
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data['text'], data['created_at']
+
+    def _write_disk(self, key: str, text: str, created_at: float) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(exist_ok=True, parents=True)
+            previous = path.stat().st_size if path.exists() else 0
+            tmp_path = path.with_name(path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'text': text, 'created_at': created_at}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._disk_bytes += path.stat().st_size - previous
+        except OSError:
+            return
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _remove_disk(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            self._disk_bytes -= size
+        except OSError:
+            pass
+
+    def _evict_disk(self) -> None:
+        """Hapus entri disk yang paling lama tidak dipakai sampai ukuran total di bawah 90% batas.
+
+        mtime diperbarui setiap hit disk, sehingga urutan mtime adalah urutan
+        pemakaian terakhir (LRU).
+        """
+        entries = sorted(
+            ((p.stat().st_mtime, p) for p in self.disk_dir.glob('*/*.json')),
+            key=lambda item: item[0]
+        )
+        target = self.max_disk_bytes * 0.9
+        for _, path in entries:
+            if self._disk_bytes <= target:
+                break
+            self._remove_disk(path)
+
+    def clear(self) -> None:
+        """Kosongkan cache memori dan disk."""
+        with self._lock:
+            self._memory.clear()
+            if self.disk_dir:
+                for path in self.disk_dir.glob('*/*.json'):
+                    self._remove_disk(path)
+            self._disk_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistik cache: hit, miss, hit di disk, dan ukuran."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'hit_rate': self.hits / total if total else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._disk_bytes,
+            }
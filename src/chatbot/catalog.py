@@ -0,0 +1,200 @@
+"""
+Katalog metadata sesi chat.
+
+Katalog menyimpan nama sesi, waktu dibuat, jumlah pesan, serta mtime/ukuran
+setiap file sesi dalam satu file JSON kecil. Daftar sesi cukup dibangun dari
+katalog ditambah ``stat`` per file; hanya file yang baru atau berubah yang
+perlu dibaca ulang.
+
+Setiap penyimpanan sesi hanya menambah satu baris ke log pembaruan
+(``catalog.log``, JSON Lines) di samping file katalog, dan isi katalog
+disimpan di memori lalu dibaca ulang hanya jika file berubah. Log digabung
+ke file katalog setelah melebihi jumlah sesi (minimal ``COMPACT_MIN_LINES``
+baris). Pembaruan yang hilang karena dua proses memadatkan bersamaan tidak
+merusak apa pun: ``validate`` membaca ulang file yang mtime/ukurannya tidak
+cocok dengan katalog.
+"""
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from .fsutil import atomic_write
+
+CATALOG_VERSION = 1
+
+# Jumlah baris log minimum sebelum log digabung ke file katalog
+COMPACT_MIN_LINES = 256
+
+SessionMetadata = Dict[str, Any]
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class SessionCatalog:
+    """Penyimpanan metadata sesi yang divalidasi secara malas (lazy)."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.log_path = self.path.with_name(self.path.stem + '.log')
+        self._entries: Dict[str, SessionMetadata] = {}
+        self._snapshot: Optional[Tuple[int, int, int]] = None
+        self._loaded = False
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+        self._log_lines = 0
+
+    def _read_snapshot(self) -> Dict[str, SessionMetadata]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != CATALOG_VERSION:
+            return {}
+        return data.get('sessions', {})
+
+    def _refresh(self) -> None:
+        """Sinkronkan isi di memori dengan file katalog dan log pembaruan."""
+        snapshot = _signature(self.path)
+        try:
+            log_stat = self.log_path.stat()
+        except FileNotFoundError:
+            log_stat = None
+
+        if log_stat is None:
+            log_reset = self._log_offset > 0
+        else:
+            log_reset = (log_stat.st_size < self._log_offset
+                         or self._log_inode is not None and log_stat.st_ino != self._log_inode)
+        if not self._loaded or snapshot != self._snapshot or log_reset:
+            # File katalog ditulis ulang (oleh proses ini atau lain); muat dari awal
+            self._entries = self._read_snapshot()
+            self._snapshot = snapshot
+            self._log_inode, self._log_offset, self._log_lines = None, 0, 0
+            self._loaded = True
+        if log_stat is None or log_stat.st_size == self._log_offset:
+            return
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    # Baris terakhir belum selesai ditulis
+                    break
+                self._log_offset += len(raw)
+                self._log_lines += 1
+                try:
+                    update = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                key = update.get('key') if isinstance(update, dict) else None
+                if not key:
+                    continue
+                if update.get('removed'):
+                    self._entries.pop(key, None)
+                else:
+                    self._entries[key] = update.get('entry', {})
+        self._log_inode = log_stat.st_ino
+
+    def load(self) -> Dict[str, SessionMetadata]:
+        """Muat isi katalog; katalog rusak atau versi lain dianggap kosong."""
+        self._refresh()
+        return dict(self._entries)
+
+    def get(self, key: str) -> SessionMetadata:
+        """Metadata satu sesi, atau dict kosong jika tidak tercatat."""
+        self._refresh()
+        return dict(self._entries.get(key, {}))
+
+    def save(self, entries: Mapping[str, SessionMetadata]) -> None:
+        """Tulis katalog secara atomik (file sementara lalu rename) dan kosongkan log."""
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        payload = json.dumps({'version': CATALOG_VERSION, 'sessions': entries},
+                             ensure_ascii=False, separators=(',', ':'))
+        atomic_write(self.path, payload.encode('utf-8'))
+        try:
+            self.log_path.unlink()
+        except FileNotFoundError:
+            pass
+        self._entries = dict(entries)
+        self._snapshot = _signature(self.path)
+        self._log_inode, self._log_offset, self._log_lines = None, 0, 0
+        self._loaded = True
+
+    @staticmethod
+    def _stat(filepath: Path) -> Tuple[int, int]:
+        st = filepath.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def record(self, key: str, filepath: Path, metadata: SessionMetadata) -> None:
+        """Catat atau perbarui metadata satu sesi setelah disimpan.
+
+        Hanya satu baris yang ditambahkan ke log; file katalog ditulis ulang
+        setelah log lebih panjang dari jumlah sesi.
+        """
+        mtime, size = self._stat(filepath)
+        entry = dict(metadata, mtime=mtime, size=size)
+        self._refresh()
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        line = json.dumps({'key': key, 'entry': entry}, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+        # Baris kita sendiri sudah ada di disk; baca lewat _refresh agar offset konsisten
+        self._refresh()
+        if self._log_lines >= COMPACT_MIN_LINES and self._log_lines > len(self._entries):
+            self.save(self._entries)
+
+    def validate(
+        self,
+        files: Mapping[str, Path],
+        read_metadata: Callable[[Path], Optional[SessionMetadata]]
+    ) -> List[Tuple[str, Path, SessionMetadata]]:
+        """Cocokkan katalog dengan file di disk.
+
+        File yang baru atau mtime/ukurannya berubah dibaca ulang lewat
+        ``read_metadata``; entri untuk file yang sudah hilang dibuang.
+
+        Args:
+            files: Kunci sesi -> path file, sesuai urutan daftar
+            read_metadata: Fungsi pembaca metadata; ``None`` untuk file tidak valid
+
+        Returns:
+            List berisi (kunci, path, metadata) untuk setiap sesi yang valid
+        """
+        self._refresh()
+        entries = dict(self._entries)
+        changed = False
+        result = []
+
+        for key, filepath in files.items():
+            try:
+                mtime, size = self._stat(filepath)
+            except OSError:
+                continue
+
+            entry = entries.get(key)
+            if entry is None or entry.get('mtime') != mtime or entry.get('size') != size:
+                metadata = read_metadata(filepath)
+                if metadata is None:
+                    if entries.pop(key, None) is not None:
+                        changed = True
+                    continue
+                entry = dict(metadata, mtime=mtime, size=size)
+                entries[key] = entry
+                changed = True
+            result.append((key, filepath, entry))
+
+        for key in entries.keys() - files.keys():
+            del entries[key]
+            changed = True
+
+        if changed:
+            self.save(entries)
+        return result
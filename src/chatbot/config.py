@@ -44,18 +44,24 @@ Ketik {Theme.SUCCESS}/bantuan{Style.RESET_ALL} untuk melihat daftar perintah yan
 {Theme.BOLD}Perintah Dasar:{Style.RESET_ALL}
   {Theme.SUCCESS}keluar{Style.RESET_ALL} - Keluar dari aplikasi
   {Theme.SUCCESS}bantuan{Style.RESET_ALL} - Tampilkan pesan bantuan ini
+  {Theme.SUCCESS}statistik{Style.RESET_ALL} - Tampilkan statistik latensi dan metrik
 
 {Theme.BOLD}Manajemen Chat:{Style.RESET_ALL}
   {Theme.SUCCESS}simpan [nama]{Style.RESET_ALL} - Simpan chat saat ini
   {Theme.SUCCESS}daftar{Style.RESET_ALL} - Tampilkan daftar sesi tersimpan
   {Theme.SUCCESS}muat <nomor>{Style.RESET_ALL} - Muat sesi tertentu
+  {Theme.SUCCESS}padatkan{Style.RESET_ALL} - Padatkan jurnal sesi aktif menjadi satu file JSON
+  {Theme.SUCCESS}arsip [hari]{Style.RESET_ALL} - Pindahkan sesi yang lebih tua dari sekian hari ke arsip
 
 {Theme.BOLD}Pencarian:{Style.RESET_ALL}
-  {Theme.SUCCESS}cari <kata kunci>{Style.RESET_ALL} - Cari di semua chat
+  {Theme.SUCCESS}cari <kata kunci>{Style.RESET_ALL} - Cari di semua chat, diurutkan berdasarkan relevansi
+    Sintaks: "frasa persis", /regex/, role:user, session:nama, after:YYYY-MM-DD, before:YYYY-MM-DD
+  {Theme.SUCCESS}cari-mirip <teks>{Style.RESET_ALL} - Cari percakapan dengan makna mirip walaupun katanya berbeda
   {Theme.SUCCESS}cari di <file> <kata kunci>{Style.RESET_ALL} - Cari di file tertentu
+  {Theme.SUCCESS}indeks{Style.RESET_ALL} - Bangun ulang indeks pencarian
 
 {Theme.BOLD}Ekspor:{Style.RESET_ALL}
-  {Theme.SUCCESS}export pdf{Style.RESET_ALL} - Ekspor chat ke file PDF
+  {Theme.SUCCESS}export pdf|txt|md{Style.RESET_ALL} - Ekspor chat ke file PDF, teks biasa, atau Markdown
 """
 
 class Icons:
@@ -71,10 +77,96 @@ class Config:
     """Konfigurasi aplikasi."""
     
     # Konfigurasi API
+    # Backend model: "gemini" atau "fake" (backend lokal untuk benchmark/offline)
+    MODEL_BACKEND = os.getenv("MODEL_BACKEND", "gemini")
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "gemini-1.5-flash")
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", "1000"))
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
+    # Backend palsu: latensi awal (detik), laju token, dan peluang gagal
+    FAKE_LATENCY = float(os.getenv("FAKE_LATENCY", "0.2"))
+    FAKE_TOKENS_PER_SECOND = float(os.getenv("FAKE_TOKENS_PER_SECOND", "50"))
+    FAKE_FAILURE_RATE = float(os.getenv("FAKE_FAILURE_RATE", "0"))
+    # Ketahanan panggilan model: batas waktu per percobaan (detik, 0 = tanpa batas),
+    # jumlah retry untuk kesalahan sementara, dan jeda dasar backoff (detik)
+    MODEL_TIMEOUT = float(os.getenv("MODEL_TIMEOUT", "60"))
+    MODEL_MAX_RETRIES = int(os.getenv("MODEL_MAX_RETRIES", "2"))
+    MODEL_RETRY_BACKOFF = float(os.getenv("MODEL_RETRY_BACKOFF", "0.5"))
+    # Kirim permintaan duplikat jika respons belum tiba setelah sekian detik (0 = nonaktif)
+    MODEL_HEDGE_AFTER = float(os.getenv("MODEL_HEDGE_AFTER", "0"))
+    # Circuit breaker: kegagalan beruntun sebelum menolak panggilan (0 = nonaktif)
+    # dan lama penolakan sebelum mencoba lagi (detik)
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+    # Batas permintaan bersamaan ke model pada AsyncChatbot
+    MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "8"))
+    # Mode batch: jumlah worker dan batas permintaan per detik (0 = tanpa batas)
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+    BATCH_RATE_LIMIT = float(os.getenv("BATCH_RATE_LIMIT", "0"))
+    # Cache respons model (LRU di memori, opsional di disk)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "false").lower() in ("1", "true", "ya", "yes")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+    CACHE_DIR = os.getenv("CACHE_DIR", "")
+    CACHE_MAX_DISK_MB = float(os.getenv("CACHE_MAX_DISK_MB", "50"))
+    CACHE_TTL = float(os.getenv("CACHE_TTL", "86400"))
+    # Jika false, cache dilewati saat TEMPERATURE > 0 (respons tidak deterministik)
+    CACHE_NONDETERMINISTIC = os.getenv("CACHE_NONDETERMINISTIC", "false").lower() in ("1", "true", "ya", "yes")
+    # Jendela konteks: kebijakan pemangkasan riwayat ("sliding", "pinned", "summary")
+    # dan anggaran token prompt (0 = batas konteks model dikurangi MAX_TOKENS)
+    CONTEXT_POLICY = os.getenv("CONTEXT_POLICY", "pinned").lower()
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0"))
+    # Batas giliran terakhir yang dipulihkan ke riwayat model saat memuat sesi (0 = semua)
+    RESTORE_MAX_TURNS = int(os.getenv("RESTORE_MAX_TURNS", "0"))
+    # Tampilkan respons bertahap (streaming) saat teks diterima dari model
+    STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "false").lower() in ("1", "true", "ya", "yes")
+    
+    # Konfigurasi Penyimpanan
+    # Format file sesi: "json" (terformat), "compact" (JSON tanpa spasi),
+    # "gzip", "bz2", "xz", atau "zstd" (Python 3.14+); format dideteksi otomatis saat dimuat
+    SESSION_FORMAT = os.getenv("SESSION_FORMAT", "json").lower()
+    # Backend penyimpanan: "files" (direktori JSON) atau "sqlite" (satu database dengan FTS5)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "files").lower()
+    STORAGE_DIR = os.getenv("STORAGE_DIR", "chat_history")
+    # Tata letak sesi baru: "flat" (semua di STORAGE_DIR) atau "date" (subdirektori
+    # YYYY/MM/DD, untuk ratusan ribu sesi); kedua tata letak selalu terbaca
+    STORAGE_LAYOUT = os.getenv("STORAGE_LAYOUT", "flat").lower()
+    # Umur minimum (hari) sesi yang dipindahkan ke arsip oleh perintah "arsip"
+    ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+    # File database untuk backend sqlite (kosong = <STORAGE_DIR>/chat.sqlite3)
+    STORAGE_DB = os.getenv("STORAGE_DB", "")
+    # Jika aktif, sesi yang disimpan ditulis sebagai jurnal JSON Lines dan
+    # setiap pesan baru langsung ditambahkan ke jurnal tersebut
+    JOURNAL_MODE = os.getenv("JOURNAL_MODE", "false").lower() in ("1", "true", "ya", "yes")
+    # Simpan sesi otomatis di latar belakang, paling sering sekali per AUTOSAVE_INTERVAL detik
+    AUTOSAVE = os.getenv("AUTOSAVE", "false").lower() in ("1", "true", "ya", "yes")
+    AUTOSAVE_INTERVAL = float(os.getenv("AUTOSAVE_INTERVAL", "2"))
+    
+    # Pemindaian pencarian tanpa indeks: jumlah proses pekerja (0 = jumlah CPU)
+    # dan jumlah file minimum sebelum proses pekerja dipakai
+    SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "0"))
+    SCAN_PARALLEL_THRESHOLD = int(os.getenv("SCAN_PARALLEL_THRESHOLD", "500"))
+    # Ekspor massal (python -m src.chatbot export): jumlah proses pekerja (0 = jumlah CPU)
+    EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "0"))
+    # Jumlah hasil teratas yang ditampilkan perintah 'cari'
+    SEARCH_LIMIT = int(os.getenv("SEARCH_LIMIT", "10"))
+    # Perbarui indeks semantik (vektor n-gram lokal) setiap kali sesi disimpan;
+    # jika nonaktif, sesi diindeks saat pencarian semantik pertama
+    SEMANTIC_INDEX = os.getenv("SEMANTIC_INDEX", "true").lower() in ("1", "true", "ya", "yes")
+    
+    # Mode server HTTP ('serve'): alamat, jumlah sesi aktif di memori (sesi terlama
+    # disimpan ke riwayat lalu dikeluarkan), batas koneksi bersamaan, dan ukuran body
+    SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+    SERVER_MAX_SESSIONS = int(os.getenv("SERVER_MAX_SESSIONS", "256"))
+    # Jumlah sesi yang sudah dikeluarkan yang masih bisa dimuat kembali lewat ID-nya
+    SERVER_MAX_JOURNALS = int(os.getenv("SERVER_MAX_JOURNALS", "10000"))
+    SERVER_MAX_CONNECTIONS = int(os.getenv("SERVER_MAX_CONNECTIONS", "128"))
+    SERVER_MAX_BODY_BYTES = int(os.getenv("SERVER_MAX_BODY_BYTES", "1048576"))
+    
+    # Metrik: counter dan histogram latensi di dalam proses
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "ya", "yes")
+    # File ekspor metrik (.json untuk JSON, selain itu format teks Prometheus)
+    METRICS_EXPORT_PATH = os.getenv("METRICS_EXPORT_PATH", "")
     
     # Konfigurasi Aplikasi
     BOT_NAME = "AI Assistant"
@@ -88,7 +180,7 @@ class Config:
     @classmethod
     def validate_config(cls):
         """Validasi konfigurasi yang diperlukan."""
-        required_vars = ["GEMINI_API_KEY"]
+        required_vars = ["GEMINI_API_KEY"] if cls.MODEL_BACKEND == "gemini" else []
         missing_vars = [var for var in required_vars if not getattr(cls, var, None)]
         
         if missing_vars:
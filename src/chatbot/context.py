@@ -0,0 +1,252 @@
+"""
+Pengelolaan jendela konteks berbasis anggaran token.
+
+Setiap pesan diberi perkiraan jumlah token. Sebelum permintaan dikirim,
+``ContextWindow.fit`` memastikan riwayat yang dikirim ke model tidak melebihi
+anggaran dengan salah satu kebijakan berikut:
+
+- ``sliding``: buang pesan terlama (termasuk pesan sistem)
+- ``pinned``: pesan sistem di awal selalu dipertahankan, sisanya giliran terbaru
+- ``summary``: seperti ``pinned``, tetapi pesan yang dibuang diringkas oleh
+  backend menjadi satu ringkasan bergulir
+
+Saat anggaran terlampaui, jendela dipangkas sampai ``low_water`` dari
+anggaran, sehingga pemangkasan (dan pembuatan ringkasan) tidak terjadi di
+setiap giliran dan riwayat chat model cukup dibangun ulang sesekali.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from .config import Config
+
+POLICIES = ('sliding', 'pinned', 'summary')
+
+# Perkiraan overhead token untuk peran dan pemisah tiap pesan
+MESSAGE_OVERHEAD = 4
+
+# Batas konteks input model (token); dicocokkan berdasarkan awalan nama model
+MODEL_CONTEXT_LIMITS = {
+    'gemini-1.5-pro': 2_097_152,
+    'gemini-1.5-flash': 1_048_576,
+    'gemini-2.0-flash': 1_048_576,
+    'gemini-1.0-pro': 30_720,
+    'gemini-pro': 30_720,
+}
+DEFAULT_CONTEXT_LIMIT = 32_768
+
+SUMMARY_PREFIX = "Ringkasan percakapan sebelumnya: "
+
+SUMMARY_PROMPT = (
+    "Ringkas percakapan berikut secara padat dalam bahasa yang sama, "
+    "pertahankan fakta, keputusan, dan pertanyaan yang belum terjawab.\n\n"
+    "{previous}{transcript}\n\nRingkasan:"
+)
+
+Summarizer = Callable[[Optional[str], Sequence[Dict[str, str]]], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Perkiraan jumlah token sebuah teks (sekitar 4 byte UTF-8 per token)."""
+    return (len(text.encode('utf-8')) + 3) // 4
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    """Perkiraan jumlah token sebuah pesan termasuk overhead-nya.
+
+    Isi yang bukan string (mis. null dari file rusak) dihitung 0 token.
+    """
+    content = message.get('content', '')
+    return (estimate_tokens(content) if isinstance(content, str) else 0) + MESSAGE_OVERHEAD
+
+
+def context_budget(model_name: str) -> int:
+    """Anggaran token prompt untuk sebuah model.
+
+    Batas konteks model dikurangi ``Config.MAX_TOKENS`` (cadangan untuk
+    keluaran), lalu dibatasi lagi oleh ``Config.CONTEXT_TOKEN_BUDGET`` jika
+    diatur (> 0).
+    """
+    limit = next(
+        (value for prefix, value in MODEL_CONTEXT_LIMITS.items() if model_name.startswith(prefix)),
+        DEFAULT_CONTEXT_LIMIT
+    )
+    budget = max(limit - Config.MAX_TOKENS, 0)
+    if Config.CONTEXT_TOKEN_BUDGET > 0:
+        budget = min(budget, Config.CONTEXT_TOKEN_BUDGET)
+    return budget
+
+
+def format_transcript(messages: Sequence[Dict[str, str]]) -> str:
+    """Ubah pesan menjadi transkrip teks 'peran: isi' per baris (isi bukan string dilewati)."""
+    return '\n'.join(
+        f"{m.get('role') or 'user'}: {m['content']}" for m in messages if isinstance(m.get('content'), str)
+    )
+
+
+def backend_summarizer(backend: Any) -> Summarizer:
+    """Buat fungsi peringkas yang memakai ``backend.generate_content``."""
+    def summarize(previous: Optional[str], messages: Sequence[Dict[str, str]]) -> str:
+        prompt = SUMMARY_PROMPT.format(
+            previous=f"{SUMMARY_PREFIX}{previous}\n\n" if previous else '',
+            transcript=format_transcript(messages)
+        )
+        return backend.generate_content(prompt).text.strip()
+    return summarize
+
+
+def turn_start(messages: Sequence[Dict[str, str]], max_turns: Optional[int] = None) -> int:
+    """Indeks pesan pengguna yang mengawali ``max_turns`` giliran terakhir.
+
+    Satu giliran diawali satu pesan pengguna. ``None`` atau 0 berarti tanpa
+    batas (indeks 0).
+    """
+    if not max_turns:
+        return 0
+    turns = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get('role') == 'user':
+            turns += 1
+            if turns == max_turns:
+                return i
+    return 0
+
+
+def restore_window(
+    messages: Sequence[Dict[str, str]],
+    max_turns: Optional[int] = None
+) -> List[Dict[str, str]]:
+    """Pesan sistem di awal ditambah ``max_turns`` giliran terakhir."""
+    start = turn_start(messages, max_turns)
+    pinned = 0
+    while pinned < start and messages[pinned].get('role') == 'system':
+        pinned += 1
+    return list(messages[:pinned]) + list(messages[start:])
+
+
+class ContextResult(NamedTuple):
+    """Hasil ``ContextWindow.fit``."""
+    messages: List[Dict[str, str]]  # Pesan yang dikirim sebagai riwayat
+    tokens: int                     # Perkiraan token riwayat + cadangan
+    changed: bool                   # True jika jendela baru saja dipangkas/diringkas
+
+
+class ContextWindow:
+    """Jendela konteks dengan anggaran token dan kebijakan pemangkasan."""
+
+    def __init__(
+        self,
+        budget: int,
+        policy: str = 'pinned',
+        summarizer: Optional[Summarizer] = None,
+        low_water: float = 0.75
+    ):
+        """
+        Args:
+            budget: Anggaran token prompt
+            policy: 'sliding', 'pinned', atau 'summary'
+            summarizer: Fungsi ``(ringkasan_lama, pesan) -> ringkasan`` untuk kebijakan 'summary'
+            low_water: Target pemangkasan sebagai proporsi anggaran
+
+        Raises:
+            ValueError: Jika kebijakan tidak dikenal atau 'summary' tanpa peringkas
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Kebijakan konteks tidak dikenal: {policy} (pilih: {', '.join(POLICIES)})")
+        if policy == 'summary' and summarizer is None:
+            raise ValueError("Kebijakan 'summary' memerlukan fungsi peringkas")
+        self.budget = budget
+        self.policy = policy
+        self.summarizer = summarizer
+        self.low_water = low_water
+        self.reset()
+
+    def reset(self) -> None:
+        """Lupakan posisi jendela dan ringkasan (misalnya setelah memuat sesi lain)."""
+        self.start = 0
+        self.summary: Optional[str] = None
+        self._source: Optional[List[Dict[str, str]]] = None
+        self._counts: List[int] = []
+
+    def token_counts(self, messages: List[Dict[str, str]]) -> List[int]:
+        """Perkiraan token per pesan; dihitung sekali lalu ditambah bertahap."""
+        if messages is not self._source or len(messages) < len(self._counts):
+            self._source = messages
+            self._counts = []
+        for message in messages[len(self._counts):]:
+            self._counts.append(message_tokens(message))
+        return self._counts
+
+    def _pinned(self, messages: List[Dict[str, str]], end: int) -> int:
+        """Jumlah pesan sistem di awal yang selalu dipertahankan."""
+        if self.policy == 'sliding':
+            return 0
+        pinned = 0
+        while pinned < end and messages[pinned].get('role') == 'system':
+            pinned += 1
+        return pinned
+
+    def _summary_message(self) -> Dict[str, str]:
+        return {'role': 'system', 'content': SUMMARY_PREFIX + self.summary}
+
+    def fit(
+        self,
+        messages: List[Dict[str, str]],
+        end: Optional[int] = None,
+        reserve: int = 0
+    ) -> ContextResult:
+        """Pilih pesan ``messages[:end]`` yang muat dalam anggaran.
+
+        Args:
+            messages: Seluruh riwayat pesan
+            end: Batas akhir riwayat (default: semua pesan)
+            reserve: Token yang dicadangkan untuk pesan baru
+
+        Returns:
+            ContextResult: Pesan untuk riwayat model, perkiraan token, dan
+            apakah jendela berubah sejak giliran sebelumnya
+        """
+        end = len(messages) if end is None else end
+        counts = self.token_counts(messages)
+        pinned = self._pinned(messages, end)
+        if self.start > end:
+            self.start = 0
+        start = max(self.start, pinned)
+        summary_tokens = message_tokens(self._summary_message()) if self.summary else 0
+        total = reserve + sum(counts[:pinned]) + summary_tokens + sum(counts[start:end])
+
+        changed = False
+        if total > self.budget:
+            dropped_from = start
+            target = self.budget * self.low_water
+            while start < end and total > target:
+                total -= counts[start]
+                start += 1
+            # Jendela selalu diawali pesan pengguna agar giliran tetap berpasangan
+            while start < end and messages[start].get('role') != 'user':
+                total -= counts[start]
+                start += 1
+            if self.policy == 'summary' and start > dropped_from:
+                total += self._summarize(messages[dropped_from:start]) - summary_tokens
+            self.start = start
+            changed = True
+
+        window = messages[:pinned]
+        if self.summary:
+            window = window + [self._summary_message()]
+        return ContextResult(window + messages[start:end], total, changed)
+
+    def _summarize(self, dropped: List[Dict[str, str]]) -> int:
+        """Gabungkan pesan yang dibuang ke ringkasan; kembalikan token ringkasan baru."""
+        try:
+            summary = self.summarizer(self.summary, dropped)
+        except Exception:
+            # Ringkasan lama tetap dipakai; pesan yang dibuang hilang dari konteks
+            summary = self.summary
+        if summary:
+            # Ringkasan dibatasi seperempat anggaran (~4 byte per token)
+            limit = max(self.budget // 4, 1) * 4
+            encoded = summary.encode('utf-8')
+            if len(encoded) > limit:
+                summary = encoded[:limit].decode('utf-8', errors='ignore')
+        self.summary = summary or None
+        return message_tokens(self._summary_message()) if self.summary else 0
@@ -4,65 +4,288 @@ import sys
 import time
 import json
 import threading
-from typing import List, Dict, Any, Optional, Union
+from typing import Any, Callable, Dict, List, MutableSequence, Optional, TextIO, Union
 from pathlib import Path
 from datetime import datetime
 
-import google.generativeai as genai
 from colorama import Fore, Style, init as init_colorama
 
 from .config import Config, Theme, Messages, Icons
-from .storage import ChatHistory
+from .storage import JOURNAL_SUFFIX, create_storage
+from .cache import ResponseCache, make_cache_key
+from .backends import ModelBackend, build_history, create_backend
+from .context import ContextWindow, backend_summarizer, context_budget, estimate_tokens, turn_start
+from .metrics import registry as metrics, export_if_configured
+from .resilience import CircuitOpenError, ResilientCaller
+from .autosave import AutoSaver, install_signal_handlers
+from .messages import MessageStore
+
+# Perintah CLI yang dicatat terpisah di metrik; input lain dihitung sebagai 'chat'
+COMMANDS = ('keluar', 'bantuan', 'simpan', 'padatkan', 'arsip', 'daftar', 'muat', 'export', 'indeks', 'cari', 'cari-mirip', 'statistik')
+
+def _command_name(user_input: str) -> str:
+    """Nama perintah untuk label metrik."""
+    word = user_input.split(maxsplit=1)[0].lower()
+    return word if word in COMMANDS else 'chat'
 
 class Chatbot:
-    def __init__(self, model: Optional[str] = None):
-        """Inisialisasi chatbot dengan model yang ditentukan."""
+    def __init__(self, model: Optional[str] = None, backend: Optional[ModelBackend] = None):
+        """Inisialisasi chatbot dengan model yang ditentukan.
+        
+        Args:
+            model: Nama model (default: Config.DEFAULT_MODEL)
+            backend: Backend model siap pakai (default: sesuai Config.MODEL_BACKEND)
+        """
         init_colorama()
         self.model_name = model or Config.DEFAULT_MODEL
+        self.backend = backend
         self.model = None
         self.chat = None
-        self.messages: List[Dict[str, str]] = [
+        # Riwayat disimpan per kolom agar sesi panjang hemat memori
+        self.messages: MutableSequence[Dict[str, str]] = MessageStore([
             {"role": "system", "content": Config.BOT_NAME}
-        ]
-        self.storage = ChatHistory()
+        ])
+        self.storage = create_storage()
+        # Jurnal aktif (mode JOURNAL_MODE) dan jumlah pesan yang sudah tertulis
+        self.journal_path: Optional[str] = None
+        self._journaled = 0
+        # Di luar mode jurnal: file sesi yang diperbarui autosave, nama sesinya,
+        # dan jumlah pesan yang sudah tertulis
+        self.session_path: Optional[str] = None
+        self.session_name: Optional[str] = None
+        self._saved = 0
+        # Penulisan sesi bisa berasal dari thread utama maupun thread autosave
+        self._save_lock = threading.RLock()
+        self.autosave: Optional[AutoSaver] = (
+            AutoSaver(self._autosave, Config.AUTOSAVE_INTERVAL) if Config.AUTOSAVE else None
+        )
+        # Statistik waktu per giliran: ttft (time-to-first-token) dan total, dalam detik
+        self.turn_stats: List[Dict[str, float]] = []
+        self.cache: Optional[ResponseCache] = ResponseCache.from_config() if Config.CACHE_ENABLED else None
+        self.resilience = ResilientCaller.from_config()
         self._init_model()
+        self.context = ContextWindow(
+            context_budget(self.model_name),
+            Config.CONTEXT_POLICY,
+            summarizer=backend_summarizer(self.model)
+        )
     
     def _init_model(self) -> None:
-        """Inisialisasi model Gemini."""
+        """Inisialisasi backend model dan sesi chat.
+        
+        Raises:
+            RuntimeError: Jika backend gagal diinisialisasi
+        """
         try:
-            genai.configure(api_key=Config.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel(self.model_name)
+            if self.backend is None:
+                self.backend = create_backend(Config.MODEL_BACKEND, self.model_name)
+            self.model = self.backend
             self.chat = self.model.start_chat(history=[])
-            print(f"{Theme.SUCCESS}{Icons.SUCCESS} Model {self.model_name} berhasil diinisialisasi{Style.RESET_ALL}")
+            print(f"{Theme.SUCCESS}{Icons.SUCCESS} Model {self.model_name} ({self.backend.name}) berhasil diinisialisasi{Style.RESET_ALL}")
         except Exception as e:
-            print(f"{Theme.ERROR}{Icons.ERROR} Gagal menginisialisasi model: {e}{Style.RESET_ALL}")
-            sys.exit(1)
+            raise RuntimeError(f"Gagal menginisialisasi model: {e}") from e
     
     def get_response(self, message: str) -> str:
         """Mendapatkan respons dari model untuk pesan yang diberikan."""
         if not self.chat:
             return f"{Theme.ERROR}Error: Model tidak terinisialisasi dengan benar.{Style.RESET_ALL}"
         
+        cache_key = self._cache_key(message)
+        cached = self._cached_response(cache_key, message)
+        if cached is not None:
+            return cached
+        
+        restart: Optional[Callable[[], Any]] = None
         try:
+            prompt_tokens = self._prepare_context(message)
+            
             # Tampilkan indikator loading
             loading = threading.Thread(target=self._show_loading, args=("Memproses...",))
             loading.daemon = True
             self.loading = True
             loading.start()
             
-            # Dapatkan respons dari model
-            response = self.chat.send_message(message)
+            # Dapatkan respons dari model; retry dan hedging memakai salinan
+            # chat dari riwayat sebelum giliran ini
+            history = list(getattr(self.chat, 'history', None) or [])
+            restart = lambda: self.model.start_chat(history=list(history))
+            start = time.perf_counter()
+            response, self.chat = self.resilience.send(self.chat, message, restart)
+            elapsed = time.perf_counter() - start
             
             # Hentikan loading
             self.loading = False
             loading.join(timeout=0.1)
             
+            # Tanpa streaming, token pertama tiba bersamaan dengan seluruh jawaban
+            self._record_turn(elapsed, elapsed, len(response.text), prompt_tokens)
+            if cache_key:
+                self.cache.put(cache_key, response.text)
             return response.text
             
+        except CircuitOpenError as e:
+            self.loading = False
+            metrics.inc('model_errors_total')
+            return f"{Theme.ERROR}Error: {e}{Style.RESET_ALL}"
         except Exception as e:
             self.loading = False
+            metrics.inc('model_errors_total')
+            self._restart_chat(restart)
             return f"{Theme.ERROR}Error: Gagal mendapatkan respons dari model: {e}{Style.RESET_ALL}"
     
+    def stream_response(self, message: str, output: Optional[TextIO] = None) -> str:
+        """Mendapatkan respons secara streaming dan menampilkannya saat tiba.
+        
+        Args:
+            message: Pesan pengguna
+            output: Tujuan penulisan potongan teks (default: sys.stdout)
+            
+        Returns:
+            str: Teks respons lengkap
+        """
+        if not self.chat:
+            return f"{Theme.ERROR}Error: Model tidak terinisialisasi dengan benar.{Style.RESET_ALL}"
+        
+        output = output or sys.stdout
+        cache_key = self._cache_key(message)
+        cached = self._cached_response(cache_key, message)
+        if cached is not None:
+            output.write(cached)
+            output.flush()
+            return cached
+        
+        parts: List[str] = []
+        first_token: Optional[float] = None
+        start = time.perf_counter()
+        restart: Optional[Callable[[], Any]] = None
+        
+        try:
+            prompt_tokens = self._prepare_context(message)
+            history = list(getattr(self.chat, 'history', None) or [])
+            restart = lambda: self.model.start_chat(history=list(history))
+            chunks = self.resilience.stream(self.chat, message, restart)
+            for chunk, self.chat in chunks:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Potongan tanpa teks (misalnya hanya metadata)
+                    continue
+                if not text:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(text)
+                output.write(text)
+                output.flush()
+        except Exception as e:
+            metrics.inc('model_errors_total')
+            self._restart_chat(restart)
+            error = f"{Theme.ERROR}Error: Gagal mendapatkan respons dari model: {e}{Style.RESET_ALL}"
+            output.write(error)
+            return error
+        
+        total = time.perf_counter() - start
+        text = ''.join(parts)
+        self._record_turn(first_token if first_token is not None else total, total, len(text), prompt_tokens)
+        if cache_key:
+            self.cache.put(cache_key, text)
+        return text
+    
+    def _restart_chat(self, restart: Optional[Callable[[], Any]]) -> None:
+        """Ganti chat model dengan salinan riwayat sebelum giliran yang gagal.
+        
+        Panggilan yang ditinggalkan karena timeout masih bisa menambahkan
+        giliran ke chat lama, sehingga riwayat model menyimpang dari ``messages``.
+        """
+        if restart is None:
+            return
+        try:
+            self.chat = restart()
+        except Exception:
+            # Chat lama tetap dipakai; giliran berikutnya akan melaporkan kesalahannya
+            pass
+    
+    def _prepare_context(self, message: str) -> int:
+        """Terapkan jendela konteks sebelum permintaan dikirim.
+        
+        Jika riwayat baru saja dipangkas atau diringkas, sesi chat model
+        dibangun ulang dari jendela tersebut.
+        
+        Returns:
+            int: Perkiraan token prompt (riwayat + pesan baru)
+        """
+        # Pesan baru biasanya sudah ditambahkan ke riwayat oleh pemanggil
+        end = len(self.messages)
+        if end and self.messages[-1].get('role') == 'user' and self.messages[-1].get('content') == message:
+            end -= 1
+        
+        window = self.context.fit(self.messages, end, reserve=estimate_tokens(message))
+        if window.changed:
+            self.chat = self.model.start_chat(history=build_history(window.messages))
+            metrics.inc('context_trims_total', policy=self.context.policy)
+        return window.tokens
+    
+    def _cache_key(self, message: str) -> Optional[str]:
+        """Kunci cache untuk pesan ini, atau None jika cache tidak dipakai."""
+        if self.cache is None:
+            return None
+        if Config.TEMPERATURE > 0 and not Config.CACHE_NONDETERMINISTIC:
+            return None
+        return make_cache_key(self.model_name, Config.TEMPERATURE, Config.MAX_TOKENS, self.messages, message)
+    
+    def _cached_response(self, cache_key: Optional[str], message: str) -> Optional[str]:
+        """Ambil respons dari cache dan catat gilirannya di riwayat chat model."""
+        if not cache_key:
+            return None
+        text = self.cache.get(cache_key)
+        if text is None:
+            return None
+        
+        # Riwayat model tetap dilengkapi agar giliran berikutnya punya konteks yang sama
+        history = getattr(self.chat, 'history', None)
+        if isinstance(history, list):
+            self.chat.history = history + [
+                {'role': 'user', 'parts': [message]},
+                {'role': 'model', 'parts': [text]},
+            ]
+        self._record_turn(0.0, 0.0, len(text), cached=True)
+        return text
+    
+    def _record_turn(
+        self,
+        ttft: float,
+        total: float,
+        chars: int,
+        prompt_tokens: int = 0,
+        cached: bool = False
+    ) -> None:
+        """Mencatat statistik waktu dan ukuran prompt satu giliran."""
+        self.turn_stats.append({
+            'ttft': ttft, 'total': total, 'chars': chars,
+            'prompt_tokens': prompt_tokens, 'cached': cached
+        })
+        if not cached:
+            metrics.inc('model_requests_total')
+            metrics.inc('model_prompt_tokens_total', prompt_tokens)
+            metrics.observe('model_request_seconds', total)
+            metrics.observe('model_ttft_seconds', ttft)
+            metrics.inc('model_response_chars_total', chars)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Ringkasan statistik sesi ini beserta metrik proses."""
+        turns = [t for t in self.turn_stats if not t['cached']]
+        return {
+            'turns': len(self.turn_stats),
+            'cached_turns': len(self.turn_stats) - len(turns),
+            'avg_ttft': sum(t['ttft'] for t in turns) / len(turns) if turns else 0.0,
+            'avg_total': sum(t['total'] for t in turns) / len(turns) if turns else 0.0,
+            'avg_prompt_tokens': sum(t['prompt_tokens'] for t in turns) / len(turns) if turns else 0.0,
+            'last_prompt_tokens': turns[-1]['prompt_tokens'] if turns else 0,
+            'context_budget': self.context.budget,
+            'cache': self.cache.stats() if self.cache else None,
+            'metrics': metrics.snapshot() if metrics.enabled else None,
+        }
+    
     def _show_loading(self, message: str = "Memproses...") -> None:
         """Menampilkan indikator loading."""
         chars = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
@@ -76,72 +299,231 @@ class Chatbot:
         sys.stdout.write("\r" + " " * (len(message) + 2) + "\r")
         sys.stdout.flush()
     
+    def add_message(self, role: str, content: str) -> None:
+        """Menambahkan pesan ke riwayat.
+        
+        Jika jurnal aktif, pesan langsung ditambahkan ke jurnal; selain itu
+        sesi ditulis oleh autosave di latar belakang tanpa menunggu disk.
+        """
+        self.messages.append({"role": role, "content": content})
+        if self.journal_path:
+            self._flush_journal()
+        elif self.autosave is not None:
+            self.autosave.mark_dirty()
+    
+    def _flush_journal(self) -> None:
+        """Menulis pesan yang belum tercatat ke jurnal aktif."""
+        with self._save_lock:
+            pending = self.messages[self._journaled:]
+            self.storage.append_to_journal(self.journal_path, pending, self._journaled)
+            self._journaled = len(self.messages)
+    
+    def _autosave(self) -> None:
+        """Tulis pesan yang belum tersimpan; dijalankan ``AutoSaver`` di thread latar."""
+        with self._save_lock:
+            if self.journal_path:
+                self._flush_journal()
+                return
+            messages = list(self.messages)
+            # Sesi yang hanya berisi pesan sistem belum perlu disimpan
+            if len(messages) > 1 and len(messages) != self._saved:
+                self._write_session(messages)
+    
+    def _write_session(self, messages: List[Dict[str, str]]) -> str:
+        """Simpan sesi ke filenya sendiri: dibuat sekali, lalu hanya diperbarui."""
+        with self._save_lock:
+            if self.session_path is None:
+                self.session_path = self.storage.save_chat(messages, self.session_name)
+            else:
+                self.session_path = self.storage.update_chat(
+                    self.session_path, messages, min(self._saved, len(messages)), self.session_name
+                )
+            self._saved = len(messages)
+            return self.session_path
+    
+    def close(self) -> None:
+        """Tulis perubahan yang tertunda lalu hentikan autosave."""
+        if self.autosave is not None:
+            self.autosave.close()
+    
     def save_chat_session(self, session_name: Optional[str] = None) -> str:
-        """Menyimpan sesi chat saat ini ke file."""
+        """Menyimpan sesi chat saat ini ke file.
+        
+        Dalam mode jurnal, penyimpanan pertama membuat jurnal dan pesan
+        berikutnya ditambahkan otomatis oleh ``add_message``. Dengan autosave,
+        sesi punya satu file yang terus diperbarui dan ``session_name``
+        mengganti namanya.
+        """
         if not self.messages:
             raise ValueError("Tidak ada pesan untuk disimpan")
         
         try:
-            filepath = self.storage.save_chat(self.messages, session_name)
-            return filepath
+            if Config.JOURNAL_MODE:
+                with self._save_lock:
+                    if self.journal_path:
+                        self._flush_journal()
+                    else:
+                        self.journal_path = self.storage.create_journal(self.messages, session_name)
+                        self._journaled = len(self.messages)
+                    return self.journal_path
+            
+            if self.autosave is None:
+                return self.storage.save_chat(self.messages, session_name)
+            
+            with self._save_lock:
+                if session_name:
+                    self.session_name = session_name
+                return self._write_session(list(self.messages))
         except Exception as e:
             raise RuntimeError(f"Gagal menyimpan sesi chat: {e}")
     
+    def compact_chat_session(self) -> str:
+        """Memadatkan jurnal aktif menjadi snapshot JSON."""
+        if not self.journal_path:
+            raise ValueError("Tidak ada jurnal aktif untuk dipadatkan")
+        
+        with self._save_lock:
+            try:
+                self._flush_journal()
+                snapshot = self.storage.compact_journal(self.journal_path)
+            except Exception as e:
+                raise RuntimeError(f"Gagal memadatkan jurnal: {e}")
+            
+            self.journal_path = None
+            self._journaled = 0
+            # Autosave melanjutkan ke snapshot hasil pemadatan
+            self.session_path = snapshot
+            self._saved = len(self.messages)
+        return snapshot
+    
     def load_chat_session(self, filepath: str) -> str:
-        """Memuat sesi chat dari file."""
+        """Memuat sesi chat dari file.
+        
+        Jurnal yang dimuat dilanjutkan per pesan; snapshot yang dimuat
+        diperbarui oleh autosave (jika aktif).
+        """
+        if self.autosave is not None:
+            # Perubahan sesi sebelumnya ditulis dulu sebelum berganti sesi
+            self.autosave.flush()
         try:
             data = self.storage.load_chat(filepath)
-            self.messages = data.get('messages', [])
+            with self._save_lock:
+                self.messages = MessageStore(data.get('messages', []))
+                self._restore_chat()
+                if Path(filepath).suffix == JOURNAL_SUFFIX:
+                    self.journal_path = str(filepath)
+                    self._journaled = len(self.messages)
+                    self.session_path = None
+                else:
+                    self.journal_path = None
+                    self._journaled = 0
+                    self.session_path = str(filepath)
+                self.session_name = data.get('session_name')
+                self._saved = len(self.messages)
             return f"Sesi chat dimuat: {data.get('session_name', 'Tanpa Judul')}"
         except Exception as e:
             raise RuntimeError(f"Gagal memuat sesi chat: {e}")
     
-    def search_chat_history(self, query: str) -> List[Dict[str, Any]]:
-        """Mencari pesan dalam riwayat chat yang disimpan."""
+    def _restore_chat(self, max_turns: Optional[int] = None) -> None:
+        """Bangun ulang sesi chat model dari ``self.messages`` dalam satu langkah.
+        
+        Riwayat dibatasi ``max_turns`` giliran terakhir (default:
+        ``Config.RESTORE_MAX_TURNS``) lalu dipangkas sesuai anggaran konteks,
+        sehingga sesi besar tidak perlu dikirim ulang giliran demi giliran.
+        """
+        self.context.reset()
+        self.context.start = turn_start(self.messages, max_turns or Config.RESTORE_MAX_TURNS)
+        window = self.context.fit(self.messages)
+        self.chat = self.model.start_chat(history=build_history(window.messages))
+    
+    def search_chat_history(
+        self,
+        query: str,
+        ranked: bool = False,
+        limit: Optional[int] = None,
+        semantic: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Mencari pesan dalam riwayat chat yang disimpan.
+        
+        Args:
+            query: Kata kunci, atau kueri lengkap jika ``ranked``
+            ranked: Pakai sintaks kueri dan peringkat BM25 (lihat query.py)
+            limit: Jumlah hasil teratas untuk ``ranked``/``semantic`` (default: Config.SEARCH_LIMIT)
+            semantic: Cari berdasarkan kemiripan makna (lihat semantic.py)
+        """
+        if semantic:
+            return self.storage.semantic_search(query, limit or Config.SEARCH_LIMIT)
+        if ranked:
+            return self.storage.ranked_search(query, limit or Config.SEARCH_LIMIT)
         return self.storage.search_messages(query)
     
     def export_chat(self, format_type: str = 'pdf', session_name: Optional[str] = None) -> str:
-        """Mengekspor chat ke format PDF.
+        """Mengekspor chat ke format PDF, teks biasa, atau Markdown.
         
         Args:
-            format_type: Format ekspor (hanya 'pdf' yang didukung)
+            format_type: Format ekspor ('pdf', 'txt', atau 'md')
             session_name: Nama sesi (opsional)
             
         Returns:
             str: Path ke file yang diekspor
             
         Raises:
-            ValueError: Jika tidak ada pesan untuk diekspor
+            ValueError: Jika tidak ada pesan atau format tidak didukung
             RuntimeError: Jika gagal mengekspor chat
         """
+        from .export import check_format
+
         if not self.messages:
             raise ValueError("Tidak ada pesan untuk diekspor")
         
-        format_type = format_type.lower()
-        if format_type != 'pdf':
-            raise ValueError("Hanya format 'pdf' yang didukung untuk ekspor")
+        format_type = check_format(format_type)
         
         try:
-            return self.storage.export_to_pdf(self.messages, session_name)
+            return self.storage.export_messages(self.messages, format_type, session_name)
         except Exception as e:
             raise RuntimeError(f"Gagal mengekspor chat: {e}")
     
     def list_saved_sessions(self) -> List[Dict[str, str]]:
         """Mendapatkan daftar sesi yang tersimpan."""
-        sessions = []
-        for filepath in self.storage.storage_dir.glob('*.json'):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    sessions.append({
-                        'name': data.get('session_name', 'Tanpa Judul'),
-                        'filepath': str(filepath),
-                        'created_at': data.get('created_at', 'Tidak Diketahui'),
-                        'message_count': len(data.get('messages', []))
-                    })
-            except (json.JSONDecodeError, KeyError):
-                continue
-        return sessions
+        return self.storage.list_sessions()
+
+def _print_search_results(query: str, results: List[Dict[str, Any]]) -> None:
+    """Tampilkan hasil pencarian beserta skor dan cuplikannya."""
+    if not results:
+        print(f"{Theme.WARNING}{Icons.INFO} Tidak ditemukan hasil untuk '{query}'.{Style.RESET_ALL}")
+        return
+    print(f"\n{Theme.PRIMARY}{Theme.BOLD}=== Hasil Pencarian: '{query}' ==={Style.RESET_ALL}")
+    for i, result in enumerate(results, 1):
+        role = Config.USER_NAME if result.get('role') == 'user' else Config.BOT_NAME
+        score = result.get('score', 0.0)
+        print(f"\n{Theme.SECONDARY}{i}. [{role}] {result.get('session')}"
+              f"{f' (skor {score:.2f})' if score else ''}{Style.RESET_ALL}")
+        print(f"   {result.get('snippet', '')}")
+
+
+def _print_statistics(stats: Dict[str, Any]) -> None:
+    """Menampilkan hasil ``Chatbot.get_statistics`` di terminal."""
+    print(f"\n{Theme.PRIMARY}{Theme.BOLD}=== Statistik ==={Style.RESET_ALL}")
+    print(f"Giliran: {stats['turns']} ({stats['cached_turns']} dari cache)")
+    print(f"Rata-rata waktu token pertama: {stats['avg_ttft'] * 1000:.0f} ms")
+    print(f"Rata-rata waktu respons: {stats['avg_total'] * 1000:.0f} ms")
+    print(f"Token prompt: terakhir ~{stats['last_prompt_tokens']}, "
+          f"rata-rata ~{stats['avg_prompt_tokens']:.0f} (anggaran {stats['context_budget']})")
+    
+    cache = stats.get('cache')
+    if cache:
+        print(f"Cache: {cache['hits']} hit, {cache['misses']} miss ({cache['hit_rate']:.0%})")
+    
+    snapshot = stats.get('metrics')
+    if not snapshot:
+        print(f"{Theme.TEXT_SECONDARY}Metrik dinonaktifkan (METRICS_ENABLED=false).{Style.RESET_ALL}")
+        return
+    
+    for name, value in sorted(snapshot['counters'].items()):
+        print(f"  {Theme.TEXT_SECONDARY}{name}{Style.RESET_ALL} {value:g}")
+    for name, h in sorted(snapshot['histograms'].items()):
+        print(f"  {Theme.TEXT_SECONDARY}{name}{Style.RESET_ALL} n={h['count']} "
+              f"rata-rata={h['mean'] * 1000:.1f} ms p50={h['p50'] * 1000:.1f} ms p99={h['p99'] * 1000:.1f} ms")
 
 def main():
     """Fungsi utama untuk menjalankan chatbot."""
@@ -152,12 +534,19 @@ def main():
         print(f"{Theme.ERROR}{Icons.ERROR} {e}{Style.RESET_ALL}")
         sys.exit(1)
     
+    # SIGTERM diubah menjadi exit biasa agar autosave sempat di-flush
+    install_signal_handlers()
+    
     # Tampilkan pesan selamat datang
     print(f"\n{Theme.PRIMARY}{Theme.BOLD}=== {Config.BOT_NAME} ==={Style.RESET_ALL}")
     print(Messages.WELCOME)
     
     # Inisialisasi chatbot
-    bot = Chatbot()
+    try:
+        bot = Chatbot()
+    except (RuntimeError, ValueError) as e:
+        print(f"{Theme.ERROR}{Icons.ERROR} {e}{Style.RESET_ALL}")
+        sys.exit(1)
     
     while True:
         try:
@@ -166,109 +555,164 @@ def main():
             if not user_input:
                 continue
                 
-            if user_input.lower() == 'keluar':
-                # Tawarkan untuk menyimpan sebelum keluar
-                if len(bot.messages) > 1:  # Lebih dari sekedar pesan sistem
-                    save = input(f"{Theme.WARNING}{Icons.WARNING} Simpan chat sebelum keluar? (y/n): {Style.RESET_ALL}").strip().lower()
-                    if save in ('y', 'ya'):
-                        session_name = input(f"{Theme.INFO}Nama sesi (kosongkan untuk nama default): {Style.RESET_ALL}")
-                        try:
-                            filepath = bot.save_chat_session(session_name or None)
-                            print(f"{Theme.SUCCESS}{Icons.SUCCESS} Chat disimpan di: {filepath}{Style.RESET_ALL}")
-                        except Exception as e:
-                            print(f"{Theme.ERROR}{Icons.ERROR} Gagal menyimpan chat: {e}{Style.RESET_ALL}")
-                print(f"\n{Theme.INFO}{Icons.INFO} Sampai jumpa!{Style.RESET_ALL}")
-                break
+            # Catat durasi setiap perintah (tidak termasuk waktu menunggu input)
+            with metrics.timer('command_duration_seconds', command=_command_name(user_input)):
+                if user_input.lower() == 'keluar':
+                    # Tawarkan untuk menyimpan sebelum keluar (jurnal dan autosave sudah tersimpan)
+                    if len(bot.messages) > 1 and not bot.journal_path and bot.autosave is None:  # Lebih dari sekedar pesan sistem
+                        save = input(f"{Theme.WARNING}{Icons.WARNING} Simpan chat sebelum keluar? (y/n): {Style.RESET_ALL}").strip().lower()
+                        if save in ('y', 'ya'):
+                            session_name = input(f"{Theme.INFO}Nama sesi (kosongkan untuk nama default): {Style.RESET_ALL}")
+                            try:
+                                filepath = bot.save_chat_session(session_name or None)
+                                print(f"{Theme.SUCCESS}{Icons.SUCCESS} Chat disimpan di: {filepath}{Style.RESET_ALL}")
+                            except Exception as e:
+                                print(f"{Theme.ERROR}{Icons.ERROR} Gagal menyimpan chat: {e}{Style.RESET_ALL}")
+                    bot.close()
+                    if bot.session_path:
+                        print(f"{Theme.SUCCESS}{Icons.SUCCESS} Chat tersimpan otomatis di: {bot.session_path}{Style.RESET_ALL}")
+                    export_if_configured()
+                    print(f"\n{Theme.INFO}{Icons.INFO} Sampai jumpa!{Style.RESET_ALL}")
+                    break
                 
-            if user_input.lower() == 'bantuan':
-                print(Messages.HELP)
-                continue
+                if user_input.lower() == 'bantuan':
+                    print(Messages.HELP)
+                    continue
                 
-            if user_input.lower() == 'simpan':
-                session_name = input(f"{Theme.INFO}Nama sesi (kosongkan untuk nama default): {Style.RESET_ALL}")
-                try:
-                    filepath = bot.save_chat_session(session_name or None)
-                    print(f"{Theme.SUCCESS}{Icons.SUCCESS} Chat disimpan di: {filepath}{Style.RESET_ALL}")
-                except Exception as e:
-                    print(f"{Theme.ERROR}{Icons.ERROR} Gagal menyimpan chat: {e}{Style.RESET_ALL}")
-                continue
+                if user_input.lower() == 'simpan':
+                    session_name = None
+                    if not bot.journal_path:
+                        session_name = input(f"{Theme.INFO}Nama sesi (kosongkan untuk nama default): {Style.RESET_ALL}")
+                    try:
+                        filepath = bot.save_chat_session(session_name or None)
+                        print(f"{Theme.SUCCESS}{Icons.SUCCESS} Chat disimpan di: {filepath}{Style.RESET_ALL}")
+                    except Exception as e:
+                        print(f"{Theme.ERROR}{Icons.ERROR} Gagal menyimpan chat: {e}{Style.RESET_ALL}")
+                    continue
                 
-            if user_input.lower() == 'daftar':
-                sessions = bot.list_saved_sessions()
-                if not sessions:
-                    print(f"{Theme.WARNING}{Icons.INFO} Tidak ada sesi yang tersimpan.{Style.RESET_ALL}")
-                else:
-                    print(f"\n{Theme.PRIMARY}{Theme.BOLD}=== Daftar Sesi Tersimpan ==={Style.RESET_ALL}")
-                    for i, session in enumerate(sessions, 1):
-                        print(f"{Theme.PRIMARY}{i}. {session.get('name', 'Tanpa Judul')}{Style.RESET_ALL}")
-                        print(f"   {Theme.TEXT_SECONDARY}Dibuat: {session.get('created_at', 'Tidak Diketahui')}")
-                        print(f"   {Theme.TEXT_SECONDARY}Jumlah pesan: {session.get('message_count', 0)}")
-                        print(f"   {Theme.TEXT_SECONDARY}Lokasi: {session.get('filepath', 'tidak_terdeteksi.json')}\n{Style.RESET_ALL}")
-                continue
+                if user_input.lower() == 'padatkan':
+                    try:
+                        filepath = bot.compact_chat_session()
+                        print(f"{Theme.SUCCESS}{Icons.SUCCESS} Jurnal dipadatkan ke: {filepath}{Style.RESET_ALL}")
+                    except Exception as e:
+                        print(f"{Theme.ERROR}{Icons.ERROR} Gagal memadatkan jurnal: {e}{Style.RESET_ALL}")
+                    continue
                 
-            if user_input.lower().startswith('muat '):
-                try:
-                    session_num = int(user_input.split()[1])
+                if user_input.lower().split()[:1] == ['arsip']:
+                    parts = user_input.split()
+                    if not hasattr(bot.storage, 'archive_sessions'):
+                        print(f"{Theme.WARNING}{Icons.INFO} Arsip hanya tersedia untuk penyimpanan file (STORAGE_BACKEND=files).{Style.RESET_ALL}")
+                        continue
+                    try:
+                        days = float(parts[1]) if len(parts) > 1 else Config.ARCHIVE_AFTER_DAYS
+                        count = bot.storage.archive_sessions(days)
+                        print(f"{Theme.SUCCESS}{Icons.SUCCESS} {count} sesi yang lebih tua dari {days:g} hari dipindahkan ke arsip.{Style.RESET_ALL}")
+                    except ValueError:
+                        print(f"{Theme.ERROR}{Icons.ERROR} Jumlah hari tidak valid. Contoh: arsip 30{Style.RESET_ALL}")
+                    except Exception as e:
+                        print(f"{Theme.ERROR}{Icons.ERROR} Gagal mengarsipkan sesi: {e}{Style.RESET_ALL}")
+                    continue
+                
+                if user_input.lower() == 'daftar':
                     sessions = bot.list_saved_sessions()
-                    if 1 <= session_num <= len(sessions):
-                        filepath = sessions[session_num-1].get('filepath')
-                        if filepath:
-                            try:
-                                result = bot.load_chat_session(filepath)
-                                print(f"{Theme.SUCCESS}{Icons.SUCCESS} {result}{Style.RESET_ALL}")
-                            except Exception as e:
-                                print(f"{Theme.ERROR}{Icons.ERROR} Gagal memuat sesi: {e}{Style.RESET_ALL}")
+                    if not sessions:
+                        print(f"{Theme.WARNING}{Icons.INFO} Tidak ada sesi yang tersimpan.{Style.RESET_ALL}")
                     else:
-                        print(f"{Theme.ERROR}{Icons.ERROR} Nomor sesi tidak valid.{Style.RESET_ALL}")
-                except (ValueError, IndexError):
-                    print(f"{Theme.ERROR}{Icons.ERROR} Format perintah tidak valid. Gunakan: muat <nomor>{Style.RESET_ALL}")
-                continue
+                        print(f"\n{Theme.PRIMARY}{Theme.BOLD}=== Daftar Sesi Tersimpan ==={Style.RESET_ALL}")
+                        for i, session in enumerate(sessions, 1):
+                            print(f"{Theme.PRIMARY}{i}. {session.get('name', 'Tanpa Judul')}{Style.RESET_ALL}")
+                            print(f"   {Theme.TEXT_SECONDARY}Dibuat: {session.get('created_at', 'Tidak Diketahui')}")
+                            print(f"   {Theme.TEXT_SECONDARY}Jumlah pesan: {session.get('message_count', 0)}")
+                            print(f"   {Theme.TEXT_SECONDARY}Lokasi: {session.get('filepath', 'tidak_terdeteksi.json')}\n{Style.RESET_ALL}")
+                    continue
                 
-            if user_input.lower().startswith('export '):
-                export_cmd = user_input.split()
-                if len(export_cmd) == 2 and export_cmd[1].lower() in ['txt', 'pdf']:
+                if user_input.lower().startswith('muat '):
                     try:
-                        filepath = bot.export_chat(export_cmd[1])
-                        print(f"{Theme.SUCCESS}{Icons.SUCCESS} Chat berhasil diekspor ke: {filepath}{Style.RESET_ALL}")
-                    except Exception as e:
-                        print(f"{Theme.ERROR}{Icons.ERROR} Gagal mengekspor chat: {e}{Style.RESET_ALL}")
-                else:
-                    print(f"{Theme.WARNING}{Icons.INFO} Format ekspor tidak valid. Gunakan 'export txt' atau 'export pdf'{Style.RESET_ALL}")
-                continue
+                        session_num = int(user_input.split()[1])
+                        sessions = bot.list_saved_sessions()
+                        if 1 <= session_num <= len(sessions):
+                            filepath = sessions[session_num-1].get('filepath')
+                            if filepath:
+                                try:
+                                    result = bot.load_chat_session(filepath)
+                                    print(f"{Theme.SUCCESS}{Icons.SUCCESS} {result}{Style.RESET_ALL}")
+                                except Exception as e:
+                                    print(f"{Theme.ERROR}{Icons.ERROR} Gagal memuat sesi: {e}{Style.RESET_ALL}")
+                        else:
+                            print(f"{Theme.ERROR}{Icons.ERROR} Nomor sesi tidak valid.{Style.RESET_ALL}")
+                    except (ValueError, IndexError):
+                        print(f"{Theme.ERROR}{Icons.ERROR} Format perintah tidak valid. Gunakan: muat <nomor>{Style.RESET_ALL}")
+                    continue
+                
+                if user_input.lower().startswith('export '):
+                    export_cmd = user_input.split()
+                    if len(export_cmd) == 2 and export_cmd[1].lower() in ['txt', 'md', 'pdf']:
+                        try:
+                            filepath = bot.export_chat(export_cmd[1])
+                            print(f"{Theme.SUCCESS}{Icons.SUCCESS} Chat berhasil diekspor ke: {filepath}{Style.RESET_ALL}")
+                        except Exception as e:
+                            print(f"{Theme.ERROR}{Icons.ERROR} Gagal mengekspor chat: {e}{Style.RESET_ALL}")
+                    else:
+                        print(f"{Theme.WARNING}{Icons.INFO} Format ekspor tidak valid. Gunakan 'export txt', 'export md', atau 'export pdf'{Style.RESET_ALL}")
+                    continue
                 
-            if user_input.lower().startswith('cari '):
-                search_query = user_input[5:].strip()
-                if not search_query:
-                    print(f"{Theme.WARNING}{Icons.INFO} Masukkan kata kunci pencarian.{Style.RESET_ALL}")
+                if user_input.lower() == 'statistik':
+                    _print_statistics(bot.get_statistics())
+                    exported = export_if_configured()
+                    if exported:
+                        print(f"{Theme.TEXT_SECONDARY}Metrik diekspor ke: {exported}{Style.RESET_ALL}")
                     continue
+                
+                if user_input.lower() == 'indeks':
+                    try:
+                        count = bot.storage.rebuild_index()
+                        print(f"{Theme.SUCCESS}{Icons.SUCCESS} Indeks pencarian dibangun ulang untuk {count} sesi.{Style.RESET_ALL}")
+                    except Exception as e:
+                        print(f"{Theme.ERROR}{Icons.ERROR} Gagal membangun indeks: {e}{Style.RESET_ALL}")
+                    continue
+                
+                if user_input.lower().startswith('cari-mirip '):
+                    search_query = user_input[11:].strip()
+                    if not search_query:
+                        print(f"{Theme.WARNING}{Icons.INFO} Masukkan teks pencarian.{Style.RESET_ALL}")
+                        continue
                     
-                try:
-                    results = bot.search_chat_history(search_query)
-                    if not results:
-                        print(f"{Theme.WARNING}{Icons.INFO} Tidak ditemukan hasil untuk '{search_query}'.{Style.RESET_ALL}")
-                    else:
-                        print(f"\n{Theme.PRIMARY}{Theme.BOLD}=== Hasil Pencarian: '{search_query}' ==={Style.RESET_ALL}")
-                        for i, result in enumerate(results, 1):
-                            role = Config.USER_NAME if result.get('role') == 'user' else Config.BOT_NAME
-                            print(f"\n{Theme.SECONDARY}{i}. [{role}]{Style.RESET_ALL}")
-                            print(f"   {result.get('content', '')}")
-                except Exception as e:
-                    print(f"{Theme.ERROR}{Icons.ERROR} Gagal melakukan pencarian: {e}{Style.RESET_ALL}")
-                continue
+                    try:
+                        _print_search_results(search_query, bot.search_chat_history(search_query, semantic=True))
+                    except Exception as e:
+                        print(f"{Theme.ERROR}{Icons.ERROR} Gagal melakukan pencarian: {e}{Style.RESET_ALL}")
+                    continue
                 
-            # Jika bukan perintah khusus, proses sebagai pesan chat
-            if user_input:
-                # Tambahkan pesan pengguna ke riwayat
-                bot.messages.append({"role": "user", "content": user_input})
+                if user_input.lower().startswith('cari '):
+                    search_query = user_input[5:].strip()
+                    if not search_query:
+                        print(f"{Theme.WARNING}{Icons.INFO} Masukkan kata kunci pencarian.{Style.RESET_ALL}")
+                        continue
+                    
+                    try:
+                        _print_search_results(search_query, bot.search_chat_history(search_query, ranked=True))
+                    except ValueError as e:
+                        print(f"{Theme.WARNING}{Icons.INFO} Kueri tidak valid: {e}{Style.RESET_ALL}")
+                    except Exception as e:
+                        print(f"{Theme.ERROR}{Icons.ERROR} Gagal melakukan pencarian: {e}{Style.RESET_ALL}")
+                    continue
                 
-                # Dapatkan respons dari model
-                response = bot.get_response(user_input)
+                # Jika bukan perintah khusus, proses sebagai pesan chat
+                if user_input:
+                    # Tambahkan pesan pengguna ke riwayat
+                    bot.add_message("user", user_input)
                 
-                # Tampilkan respons
-                print(f"\n{Theme.SECONDARY}{Icons.BOT} {Config.BOT_NAME}: {response}{Style.RESET_ALL}")
+                    # Dapatkan dan tampilkan respons dari model
+                    if Config.STREAM_RESPONSES:
+                        print(f"\n{Theme.SECONDARY}{Icons.BOT} {Config.BOT_NAME}: ", end='', flush=True)
+                        response = bot.stream_response(user_input)
+                        print(Style.RESET_ALL)
+                    else:
+                        response = bot.get_response(user_input)
+                        print(f"\n{Theme.SECONDARY}{Icons.BOT} {Config.BOT_NAME}: {response}{Style.RESET_ALL}")
                 
-                # Tambahkan respons asisten ke riwayat
-                bot.messages.append({"role": "assistant", "content": response})
+                    # Tambahkan respons asisten ke riwayat
+                    bot.add_message("assistant", response)
                 
         except KeyboardInterrupt:
             print(f"\n{Theme.WARNING}{Icons.WARNING} Gunakan 'keluar' untuk keluar dengan benar.{Style.RESET_ALL}")
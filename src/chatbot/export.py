@@ -0,0 +1,286 @@
+"""
+Ekspor sesi chat ke PDF, teks biasa, atau Markdown, satu per satu maupun massal.
+
+Teks dan Markdown ditulis per pesan langsung ke file, tanpa membangun seluruh
+dokumen di memori. PDF dirender dengan fpdf; modul fpdf (berat untuk dimuat)
+dan pengaturan tata letaknya disiapkan sekali per proses lewat ``pdf_layout``
+lalu dipakai ulang untuk setiap sesi.
+
+``export_sessions`` mengekspor semua sesi sebuah ``ChatHistory`` (termasuk
+sesi arsip). Sesi dibagi ke proses pekerja per potongan; yang dikirim
+antarproses hanya path, dan setiap pekerja memuat sesinya sendiri. File hasil
+mengikuti kunci sesi (path relatif) dengan akhiran format ekspor.
+"""
+from __future__ import annotations
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple, Union
+
+from .config import Config
+from .formats import strip_suffix
+from .metrics import registry as metrics
+
+# Format ekspor -> akhiran file
+EXPORT_FORMATS = {'pdf': '.pdf', 'txt': '.txt', 'md': '.md'}
+
+# Label peran di dokumen ekspor
+ROLE_LABELS = {'user': 'Anda', 'assistant': 'Asisten'}
+
+# Jumlah sesi per tugas yang dikirim ke proses pekerja
+CHUNK_SIZE = 16
+
+
+def check_format(fmt: str) -> str:
+    """Normalisasi nama format ekspor.
+
+    Raises:
+        ValueError: Jika format tidak didukung
+    """
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format ekspor tidak didukung: {fmt} (pilih: {', '.join(EXPORT_FORMATS)})")
+    return fmt
+
+
+def session_title(messages: Iterable[Mapping[str, Any]], session_name: Optional[str] = None) -> str:
+    """Judul dokumen: isi pesan sistem pertama, atau nama sesi."""
+    return next(
+        (msg['content'] for msg in messages if msg.get('role') == 'system'),
+        session_name or "Riwayat Chat"
+    )
+
+
+def _turns(messages: Iterable[Mapping[str, Any]]) -> Iterable[Tuple[str, str]]:
+    """(label peran, isi) untuk setiap pesan yang ditampilkan di ekspor."""
+    for msg in messages:
+        role = str(msg.get('role') or '')
+        content = msg.get('content')
+        content = content.strip() if isinstance(content, str) else ''
+        if role == 'system' or not content:
+            continue
+        yield ROLE_LABELS.get(role, role.capitalize()), content
+
+
+def write_text(messages: Iterable[Mapping[str, Any]], out: TextIO, title: str) -> None:
+    """Tulis sesi sebagai teks biasa, pesan demi pesan."""
+    out.write(f"{title}\n{'=' * len(title)}\n\n")
+    for label, content in _turns(messages):
+        out.write(f"{label}:\n{content}\n\n")
+
+
+def write_markdown(messages: Iterable[Mapping[str, Any]], out: TextIO, title: str) -> None:
+    """Tulis sesi sebagai Markdown, pesan demi pesan."""
+    out.write(f"# {title}\n\n")
+    for label, content in _turns(messages):
+        out.write(f"**{label}:**\n\n{content}\n\n")
+
+
+class PdfLayout:
+    """Tata letak PDF yang disiapkan sekali lalu dipakai untuk banyak dokumen.
+
+    ``multi_cell`` fpdf menghitung ulang lebar teks per karakter untuk setiap
+    baris. Karena font bawaan lebarnya tetap, tabel lebar karakter dihitung
+    sekali di sini; isi pesan dipecah menjadi baris dengan aturan yang sama
+    dengan ``multi_cell`` lalu ditulis per baris dengan ``cell``.
+    """
+
+    def __init__(self, font: str = 'helvetica', size: int = 12, title_size: int = 16, line_height: int = 10):
+        # fpdf (beserta fontTools) berat untuk dimuat; impor saat dibutuhkan saja
+        from fpdf import FPDF
+        self.fpdf = FPDF
+        self.font = font
+        self.size = size
+        self.title_size = title_size
+        self.line_height = line_height
+
+        probe = FPDF()
+        probe.set_font(font, size=size)
+        scale = size / 1000 / probe.k
+        self._widths = {char: width * scale for char, width in probe.current_font.cw.items()}
+        # Lebar isi multi_cell(0, ...): lebar halaman efektif dikurangi margin sel
+        self._line_width = probe.epw - 2 * probe.c_margin
+
+    @staticmethod
+    def _latin1(text: str) -> str:
+        # Font bawaan PDF hanya mengenal Latin-1; karakter lain diganti '?'
+        return text.encode('latin-1', 'replace').decode('latin-1')
+
+    def wrap(self, text: str) -> Iterator[str]:
+        """Pecah teks (Latin-1) menjadi baris selebar halaman, seperti ``multi_cell``."""
+        widths, limit = self._widths, self._line_width
+        space = widths[' ']
+        paragraphs = text.split('\n')
+        if len(paragraphs) > 1 and not paragraphs[-1]:
+            # Baris baru di akhir teks tidak menambah baris kosong
+            paragraphs.pop()
+        for paragraph in paragraphs:
+            line: List[str] = []
+            used = 0.0
+            for word in paragraph.split(' '):
+                size = sum(widths[char] for char in word)
+                if line and used + space + size > limit:
+                    yield ' '.join(line)
+                    line, used = [], 0.0
+                # Kata yang lebih lebar dari satu baris dipotong per karakter
+                while size > limit:
+                    cut, part = 0, 0.0
+                    while cut < len(word) and part + widths[word[cut]] <= limit:
+                        part += widths[word[cut]]
+                        cut += 1
+                    cut = max(cut, 1)
+                    yield word[:cut]
+                    word, size = word[cut:], size - sum(widths[char] for char in word[:cut])
+                used += (space if line else 0.0) + size
+                line.append(word)
+            yield ' '.join(line)
+
+    def render(self, messages: Iterable[Mapping[str, Any]], path: Union[str, Path], title: str) -> None:
+        """Render sesi ke file PDF ``path``."""
+        pdf = self.fpdf()
+        pdf.add_page()
+        pdf.set_font(self.font, 'B', self.title_size)
+        pdf.cell(0, self.line_height, text=self._latin1(title), new_x="LMARGIN", new_y="NEXT", align='C')
+        pdf.ln(self.line_height)
+        for label, content in _turns(messages):
+            pdf.set_font(self.font, 'B', self.size)
+            pdf.cell(0, self.line_height, text=f"{label}:", new_x="LMARGIN", new_y="NEXT")
+            pdf.set_font(self.font, size=self.size)
+            for line in self.wrap(self._latin1(content)):
+                pdf.cell(0, self.line_height, text=line, new_x="LMARGIN", new_y="NEXT")
+            pdf.ln(5)
+        pdf.output(str(path))
+
+
+_pdf_layout: Optional[PdfLayout] = None
+
+
+def pdf_layout() -> PdfLayout:
+    """Tata letak PDF milik proses ini (dibuat saat pertama dipakai)."""
+    global _pdf_layout
+    if _pdf_layout is None:
+        _pdf_layout = PdfLayout()
+    return _pdf_layout
+
+
+def export_messages(
+    messages: Iterable[Mapping[str, Any]],
+    path: Union[str, Path],
+    fmt: str,
+    title: str
+) -> int:
+    """Ekspor satu sesi ke ``path``.
+
+    File ditulis ke file sementara lalu di-rename, sehingga ekspor yang
+    terputus tidak meninggalkan dokumen setengah jadi.
+
+    Returns:
+        int: Ukuran file hasil (byte)
+
+    Raises:
+        ValueError: Jika format tidak didukung
+    """
+    fmt = check_format(fmt)
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        if fmt == 'pdf':
+            pdf_layout().render(messages, tmp_path, title)
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                (write_text if fmt == 'txt' else write_markdown)(messages, f, title)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+    return path.stat().st_size
+
+
+def export_files(storage, files: Iterable[Tuple[str, Path]], out_dir: Union[str, Path], fmt: str) -> Dict[str, int]:
+    """Ekspor sesi ``(kunci, path)`` ke ``out_dir``; dipakai juga oleh proses pekerja.
+
+    Returns:
+        Dict[str, int]: sessions, messages, bytes, errors
+    """
+    out_dir = Path(out_dir)
+    stats = {'sessions': 0, 'messages': 0, 'bytes': 0, 'errors': 0}
+    for key, filepath in files:
+        target = out_dir / (strip_suffix(key) + EXPORT_FORMATS[fmt])
+        try:
+            data = storage.load_chat(filepath)
+            messages = data.get('messages', [])
+            target.parent.mkdir(exist_ok=True, parents=True)
+            stats['bytes'] += export_messages(messages, target, fmt, session_title(messages, data.get('session_name')))
+        except (ValueError, KeyError, OSError) as e:
+            storage._warn_corrupt(filepath, e)
+            stats['errors'] += 1
+            continue
+        except Exception as e:
+            # Kegagalan render satu sesi tidak menghentikan ekspor massal
+            storage._warn_corrupt(filepath, e)
+            stats['errors'] += 1
+            continue
+        stats['sessions'] += 1
+        stats['messages'] += len(messages)
+    return stats
+
+
+def _export_chunk(storage_dir: str, files: List[Tuple[str, str]], out_dir: str, fmt: str) -> Dict[str, int]:
+    # Dijalankan di proses pekerja; ChatHistory dibuat ulang di sana
+    from .storage import ChatHistory
+    return export_files(ChatHistory(storage_dir), [(k, Path(p)) for k, p in files], out_dir, fmt)
+
+
+def export_sessions(
+    storage,
+    out_dir: Union[str, Path],
+    fmt: str,
+    workers: Optional[int] = None
+) -> Dict[str, float]:
+    """Ekspor semua sesi ``storage`` (termasuk arsip) ke ``out_dir``.
+
+    Args:
+        storage: ``ChatHistory`` sumber
+        out_dir: Direktori tujuan
+        fmt: 'pdf', 'txt', atau 'md'
+        workers: Jumlah proses pekerja (default: Config.EXPORT_WORKERS atau jumlah CPU)
+
+    Returns:
+        Dict[str, float]: sessions, messages, bytes, errors, seconds, sessions_per_sec, bytes_per_sec
+
+    Raises:
+        ValueError: Jika format tidak didukung
+    """
+    fmt = check_format(fmt)
+    start = time.perf_counter()
+    files = [(key, str(path)) for key, path in storage._iter_sessions()]
+    workers = workers or Config.EXPORT_WORKERS or os.cpu_count() or 1
+    totals = {'sessions': 0, 'messages': 0, 'bytes': 0, 'errors': 0}
+
+    if workers <= 1 or len(files) <= CHUNK_SIZE:
+        parts = [export_files(storage, [(k, Path(p)) for k, p in files], out_dir, fmt)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_export_chunk, str(storage.storage_dir), files[i:i + CHUNK_SIZE], str(out_dir), fmt)
+                for i in range(0, len(files), CHUNK_SIZE)
+            ]
+            parts = [future.result() for future in futures]
+
+    for part in parts:
+        for name in totals:
+            totals[name] += part[name]
+    seconds = time.perf_counter() - start
+    metrics.inc('export_sessions_total', totals['sessions'], format=fmt)
+    metrics.inc('export_errors_total', totals['errors'], format=fmt)
+    metrics.observe('export_seconds', seconds, format=fmt)
+    return dict(
+        totals,
+        seconds=seconds,
+        sessions_per_sec=totals['sessions'] / seconds if seconds else 0.0,
+        bytes_per_sec=totals['bytes'] / seconds if seconds else 0.0,
+    )
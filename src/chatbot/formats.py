@@ -0,0 +1,119 @@
+"""
+Format file sesi: JSON terformat, JSON ringkas, dan JSON terkompresi.
+
+``encode_session`` mengubah data sesi menjadi bytes sesuai format yang
+dipilih, sedangkan ``decode_session`` mendeteksi format dari magic bytes di
+awal file sehingga file lama maupun baru bisa dimuat tanpa melihat ekstensi.
+Modul kompresi dari stdlib baru diimpor saat dipakai.
+"""
+from __future__ import annotations
+import importlib
+import json
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class SessionFormat(NamedTuple):
+    suffix: str            # Ekstensi file, termasuk titik
+    module: Optional[str]  # Modul kompresi (None = tanpa kompresi)
+    magic: bytes           # Magic bytes di awal file terkompresi
+
+
+SESSION_FORMATS: Dict[str, SessionFormat] = {
+    # Format lama: JSON dengan indentasi, mudah dibaca manusia
+    'json': SessionFormat('.json', None, b''),
+    # JSON tanpa spasi
+    'compact': SessionFormat('.json', None, b''),
+    'gzip': SessionFormat('.json.gz', 'gzip', b'\x1f\x8b'),
+    'bz2': SessionFormat('.json.bz2', 'bz2', b'BZh'),
+    'xz': SessionFormat('.json.xz', 'lzma', b'\xfd7zXZ\x00'),
+    # Hanya tersedia di Python 3.14+ (compression.zstd)
+    'zstd': SessionFormat('.json.zst', 'compression.zstd', b'\x28\xb5\x2f\xfd'),
+}
+
+# Ekstensi terakhir file sesi terkompresi (Path.suffix)
+COMPRESSED_SUFFIXES = tuple(sorted({'.' + f.suffix.rsplit('.', 1)[-1] for f in SESSION_FORMATS.values() if f.module}))
+
+
+def strip_suffix(filename: str) -> str:
+    """Nama file tanpa ekstensi format sesi (``a.json.gz`` -> ``a``)."""
+    for suffix in sorted({f.suffix for f in SESSION_FORMATS.values()}, key=len, reverse=True):
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+
+def format_for_path(filename: str, preferred: str = 'json') -> str:
+    """Nama format yang cocok dengan ekstensi file.
+
+    ``preferred`` diutamakan jika ekstensinya sama (json dan compact sama-sama ``.json``).
+    """
+    suffix = filename[len(strip_suffix(filename)):]
+    names = [name for name, fmt in SESSION_FORMATS.items() if fmt.suffix == suffix]
+    if preferred in names or not names:
+        return preferred
+    return names[0]
+
+
+def _compression_module(name: str, fmt: SessionFormat) -> Any:
+    try:
+        return importlib.import_module(fmt.module)
+    except ImportError:
+        raise ValueError(f"Format sesi '{name}' tidak didukung oleh Python ini") from None
+
+
+def get_format(name: str) -> SessionFormat:
+    """Ambil definisi format berdasarkan nama.
+
+    Raises:
+        ValueError: Jika format tidak dikenal
+    """
+    try:
+        return SESSION_FORMATS[name]
+    except KeyError:
+        raise ValueError(
+            f"Format sesi tidak dikenal: {name} (pilih: {', '.join(SESSION_FORMATS)})"
+        ) from None
+
+
+def encode_session(data: Dict[str, Any], name: str = 'json') -> bytes:
+    """Ubah data sesi menjadi bytes dalam format ``name``."""
+    fmt = get_format(name)
+    if name == 'json':
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if fmt.module is None:
+        return raw
+    return _compression_module(name, fmt).compress(raw)
+
+
+def detect_format(head: bytes) -> Optional[str]:
+    """Nama format terkompresi dari magic bytes, atau None untuk JSON biasa."""
+    for name, fmt in SESSION_FORMATS.items():
+        if fmt.magic and head.startswith(fmt.magic):
+            return name
+    return None
+
+
+def decompress_session(raw: bytes) -> bytes:
+    """Dekompresi bytes file sesi jika terkompresi; JSON biasa dikembalikan apa adanya.
+
+    Raises:
+        ValueError: Jika data terkompresi rusak
+    """
+    name = detect_format(raw[:8])
+    if name is None:
+        return raw
+    module = _compression_module(name, SESSION_FORMATS[name])
+    try:
+        return module.decompress(raw)
+    except Exception as e:
+        raise ValueError(f"File sesi {name} rusak: {e}") from e
+
+
+def decode_session(raw: bytes) -> Dict[str, Any]:
+    """Muat data sesi dari bytes dengan format apa pun yang dikenal.
+
+    Raises:
+        ValueError: Jika isi file rusak atau bukan JSON yang valid
+    """
+    return json.loads(decompress_session(raw))
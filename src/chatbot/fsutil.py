@@ -0,0 +1,55 @@
+"""
+Penulisan file yang aman dari crash.
+
+``atomic_write`` menulis ke file sementara di direktori yang sama, memanggil
+fsync, lalu mengganti file tujuan dengan rename. Pembaca selalu melihat isi
+lama atau isi baru yang utuh, tidak pernah file setengah tertulis.
+"""
+from __future__ import annotations
+import os
+import threading
+from pathlib import Path
+from typing import Union
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Rename baru tahan crash setelah entri direktorinya ikut di-fsync (POSIX)
+    if os.name != 'posix':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Union[str, Path], data: bytes, fsync: bool = True) -> None:
+    """Tulis ``data`` ke ``path`` secara atomik (file sementara, fsync, rename).
+
+    File sementara diawali titik sehingga tidak ikut terbaca sebagai sesi.
+
+    Raises:
+        OSError: Jika gagal menulis; file tujuan tidak berubah
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+    if fsync:
+        _fsync_dir(path.parent)
@@ -0,0 +1,247 @@
+"""
+Indeks terbalik (inverted index) untuk pencarian riwayat chat.
+
+Indeks disimpan sebagai log JSON Lines yang hanya ditambah (append-only).
+Setiap baris berisi posting token -> (nomor pesan, frekuensi) dan panjang
+setiap pesan (jumlah token) untuk satu sesi, sehingga ``ChatHistory.save_chat``
+cukup menambah satu baris tanpa menulis ulang indeks. Frekuensi dan panjang
+dipakai untuk penilaian BM25 (lihat query.py).
+
+Baris milik sesi yang dihapus atau disimpan ulang menjadi baris mati. Jika
+jumlahnya melebihi baris yang masih hidup, log ditulis ulang secara atomik
+dengan satu baris per sesi (``compact``).
+"""
+from __future__ import annotations
+import json
+from pathlib import Path
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from .fsutil import atomic_write
+
+# Versi 2: posting menyimpan frekuensi token dan panjang pesan
+INDEX_VERSION = 2
+
+# Jumlah baris mati minimum sebelum log dipadatkan
+COMPACT_MIN_DEAD = 64
+
+
+def tokenize(text: str) -> List[str]:
+    """Pecah teks menjadi token huruf kecil berdasarkan spasi.
+
+    Token sengaja tidak dibersihkan dari tanda baca agar setiap kata kunci
+    tanpa spasi yang cocok sebagai substring pasti berada di dalam satu token.
+    """
+    return text.lower().split()
+
+
+class SearchIndex:
+    """Indeks token -> (sesi, nomor pesan) yang disimpan di disk."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._postings: Dict[str, Dict[str, Dict[int, int]]] = {}
+        self._lengths: Dict[str, Dict[int, int]] = {}
+        self._sessions: Set[str] = set()
+        # Token milik setiap sesi, agar penghapusan tidak menelusuri seluruh kosakata
+        self._terms: Dict[str, Set[str]] = {}
+        # Jumlah baris log per sesi yang masih hidup, dan jumlah baris mati
+        self._lines: Dict[str, int] = {}
+        self._dead = 0
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._loaded = False
+
+    @property
+    def sessions(self) -> Set[str]:
+        """Kunci sesi yang sudah terindeks."""
+        self._refresh()
+        return set(self._sessions)
+
+    def _reset_memory(self) -> None:
+        self._postings = {}
+        self._lengths = {}
+        self._sessions = set()
+        self._terms = {}
+        self._lines = {}
+        self._dead = 0
+        self._inode = None
+        self._offset = 0
+
+    def _refresh(self) -> None:
+        """Baca baris log baru sejak pembacaan terakhir."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._reset_memory()
+            self._loaded = True
+            return
+
+        size = stat.st_size
+        if size < self._offset or (self._inode is not None and stat.st_ino != self._inode):
+            # File dibangun ulang atau dipadatkan oleh proses lain
+            self._reset_memory()
+        elif self._loaded and size == self._offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    # Baris terakhir belum selesai ditulis
+                    break
+                self._offset += len(raw)
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                self._apply(entry)
+        self._inode = stat.st_ino
+        self._loaded = True
+
+    def _apply(self, entry: Mapping) -> None:
+        if 'version' in entry:
+            if entry['version'] != INDEX_VERSION:
+                # Jangan lanjut membaca posting dengan format lain
+                self._reset_memory()
+                raise ValueError(f"Versi indeks tidak didukung: {entry['version']}")
+            return
+
+        key = entry.get('key')
+        if not key:
+            return
+
+        if entry.get('removed'):
+            self._sessions.discard(key)
+            self._lengths.pop(key, None)
+            for token in self._terms.pop(key, ()):
+                sessions = self._postings.get(token)
+                if sessions is not None:
+                    sessions.pop(key, None)
+                    if not sessions:
+                        del self._postings[token]
+            # Baris sesi ini beserta baris penghapusannya sudah tidak dipakai
+            self._dead += self._lines.pop(key, 0) + 1
+            return
+
+        self._sessions.add(key)
+        self._lines[key] = self._lines.get(key, 0) + 1
+        lengths = self._lengths.setdefault(key, {})
+        for i, length in entry.get('lengths', {}).items():
+            lengths[int(i)] = length
+        terms = self._terms.setdefault(key, set())
+        for token, pairs in entry.get('postings', {}).items():
+            self._postings.setdefault(token, {}).setdefault(key, {}).update(pairs)
+            terms.add(token)
+
+    def _append(self, entry: Mapping) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if is_new:
+                f.write(json.dumps({'version': INDEX_VERSION}) + '\n')
+            f.write(line)
+        # Baris kita sendiri sudah ada di disk; baca lewat _refresh agar offset konsisten
+        self._refresh()
+        if self._dead >= COMPACT_MIN_DEAD and self._dead > sum(self._lines.values()):
+            self.compact()
+
+    def compact(self) -> None:
+        """Tulis ulang log dengan satu baris per sesi, tanpa baris mati."""
+        self._refresh()
+        lines = [json.dumps({'version': INDEX_VERSION})]
+        for key in sorted(self._sessions):
+            postings = {
+                token: sorted(self._postings[token][key].items())
+                for token in sorted(self._terms.get(key, ()))
+            }
+            lines.append(json.dumps(
+                {'key': key, 'postings': postings, 'lengths': self._lengths.get(key, {})},
+                ensure_ascii=False, separators=(',', ':')
+            ))
+        atomic_write(self.path, ('\n'.join(lines) + '\n').encode('utf-8'), fsync=False)
+        # Muat ulang dari file baru agar offset dan inode sesuai
+        self._reset_memory()
+        self._refresh()
+
+    def add_messages(
+        self,
+        key: str,
+        messages: Iterable[Mapping],
+        start: int = 0
+    ) -> None:
+        """Indeks pesan-pesan sebuah sesi.
+
+        Args:
+            key: Kunci sesi (path relatif terhadap direktori penyimpanan)
+            messages: Pesan yang akan diindeks
+            start: Nomor pesan pertama di dalam sesi
+        """
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths: Dict[int, int] = {}
+        for i, msg in enumerate(messages, start):
+            content = msg.get('content', '')
+            if not isinstance(content, str):
+                continue
+            tokens = tokenize(content)
+            lengths[i] = len(tokens)
+            for token, tf in Counter(tokens).items():
+                postings.setdefault(token, []).append((i, tf))
+        self._append({'key': key, 'postings': postings, 'lengths': lengths})
+
+    def remove_session(self, key: str) -> None:
+        """Hapus semua posting milik sebuah sesi."""
+        self._refresh()
+        if key in self._sessions:
+            self._append({'key': key, 'removed': True})
+
+    def clear(self) -> None:
+        """Kosongkan indeks di disk dan di memori."""
+        if self.path.exists():
+            self.path.unlink()
+        self._reset_memory()
+        self._loaded = True
+
+    def lookup(self, term: str) -> Dict[str, List[int]]:
+        """Cari kandidat pesan untuk satu kata kunci tanpa spasi.
+
+        Semua token yang mengandung ``term`` sebagai substring digabungkan,
+        sehingga hasilnya adalah superset dari pesan yang benar-benar cocok.
+
+        Returns:
+            Dict[str, List[int]]: Kunci sesi -> nomor pesan terurut
+        """
+        return {key: sorted(tfs) for key, tfs in self.lookup_tf(term).items()}
+
+    def lookup_tf(self, term: str) -> Dict[str, Dict[int, int]]:
+        """Seperti ``lookup``, beserta frekuensi ``term`` di setiap pesan.
+
+        Frekuensi adalah jumlah token pesan yang mengandung ``term``.
+
+        Returns:
+            Dict[str, Dict[int, int]]: Kunci sesi -> nomor pesan -> frekuensi
+        """
+        self._refresh()
+        term = term.lower()
+        matches: Dict[str, Dict[int, int]] = {}
+        for token, sessions in self._postings.items():
+            if term in token:
+                for key, tfs in sessions.items():
+                    counts = matches.setdefault(key, {})
+                    for i, tf in tfs.items():
+                        counts[i] = counts.get(i, 0) + tf
+        return matches
+
+    def lengths(self, key: str) -> Dict[int, int]:
+        """Jumlah token setiap pesan terindeks di sesi ``key``."""
+        self._refresh()
+        return dict(self._lengths.get(key, {}))
+
+    def stats(self) -> Tuple[int, float]:
+        """Jumlah pesan terindeks dan rata-rata panjangnya dalam token."""
+        self._refresh()
+        count = sum(len(lengths) for lengths in self._lengths.values())
+        total = sum(sum(lengths.values()) for lengths in self._lengths.values())
+        return count, (total / count if count else 0.0)
+
@@ -0,0 +1,176 @@
+"""
+Penyimpanan pesan yang hemat memori untuk sesi panjang.
+
+Satu pesan sebagai ``dict`` memakan ~180 byte sebelum isinya dihitung,
+ditambah string peran yang (jika berasal dari ``json.loads``) disalin per
+pesan. ``MessageStore`` menyimpan pesan per kolom: kode peran 2 byte dalam
+``array`` dengan tabel peran yang di-intern, dan daftar isi pesan. Pesan
+yang bentuknya lain (kunci tambahan, tanpa role/content, atau peran yang
+bukan string; jarang) disimpan utuh di kolom terpisah yang baru dibuat saat
+dibutuhkan.
+
+``MessageStore`` berperilaku seperti ``list`` berisi ``dict``: indeks, irisan,
+iterasi, ``append``, dan perbandingan dengan list menghasilkan dict baru.
+Karena itu mengubah dict hasil indeks tidak mengubah isi penyimpanan; ganti
+pesannya dengan ``store[i] = {...}``.
+"""
+from __future__ import annotations
+import sys
+from array import array
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+Message = Dict[str, Any]
+
+# Tabel peran bersama: kode -> nama (di-intern) dan sebaliknya
+_ROLE_NAMES: List[Optional[str]] = []
+_ROLE_CODES: Dict[Optional[str], int] = {}
+
+
+def _role_code(role: Optional[str]) -> int:
+    code = _ROLE_CODES.get(role)
+    if code is None:
+        if len(_ROLE_NAMES) >= 1 << 16:
+            raise ValueError("Terlalu banyak nama peran yang berbeda")
+        code = len(_ROLE_NAMES)
+        _ROLE_NAMES.append(sys.intern(role) if isinstance(role, str) else role)
+        _ROLE_CODES[_ROLE_NAMES[code]] = code
+    return code
+
+
+class MessageStore(MutableSequence):
+    """Daftar pesan kolumnar yang bisa dipakai di mana pun list berisi dict dipakai."""
+
+    __slots__ = ('_roles', '_contents', '_extra')
+
+    def __init__(self, messages: Iterable[Mapping[str, Any]] = ()):
+        self._roles = array('H')
+        self._contents: List[Any] = []
+        # Salinan pesan yang bukan tepat {role, content}; None sampai ada yang perlu
+        self._extra: Optional[List[Optional[Message]]] = None
+        self.extend(messages)
+
+    def _unpack(self, message: Mapping[str, Any]):
+        extra = None
+        role = message.get('role')
+        if role is not None and not isinstance(role, str):
+            # Peran dari file rusak (mis. list) tidak masuk tabel peran bersama
+            extra, role = dict(message), None
+        elif len(message) != 2 or 'role' not in message or 'content' not in message:
+            extra = dict(message)
+        return _role_code(role), message.get('content'), extra
+
+    def _pack(self, i: int) -> Message:
+        extra = self._extra[i] if self._extra is not None else None
+        if extra is not None:
+            return dict(extra)
+        return {'role': _ROLE_NAMES[self._roles[i]], 'content': self._contents[i]}
+
+    def _set_extra(self, i: int, extra: Optional[Message]) -> None:
+        if extra is None and self._extra is None:
+            return
+        if self._extra is None:
+            self._extra = [None] * len(self._contents)
+        self._extra[i] = extra
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Message, List[Message]]:
+        if isinstance(index, slice):
+            return [self._pack(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("indeks pesan di luar jangkauan")
+        return self._pack(index)
+
+    def __iter__(self) -> Iterator[Message]:
+        if self._extra is None:
+            # Jalur cepat untuk pesan tanpa kunci tambahan
+            names = _ROLE_NAMES
+            for code, content in zip(self._roles, self._contents):
+                yield {'role': names[code], 'content': content}
+        else:
+            for i in range(len(self)):
+                yield self._pack(i)
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        if isinstance(index, slice):
+            messages = list(self)
+            messages[index] = value
+            self.clear()
+            self.extend(messages)
+            return
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("indeks pesan di luar jangkauan")
+        role, content, extra = self._unpack(value)
+        self._roles[index] = role
+        self._contents[index] = content
+        self._set_extra(index, extra)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        del self._roles[index]
+        del self._contents[index]
+        if self._extra is not None:
+            del self._extra[index]
+
+    def insert(self, index: int, value: Mapping[str, Any]) -> None:
+        size = len(self)
+        index = max(0, min(index + size if index < 0 else index, size))
+        role, content, extra = self._unpack(value)
+        self._roles.insert(index, role)
+        self._contents.insert(index, content)
+        if self._extra is not None:
+            self._extra.insert(index, extra)
+        else:
+            self._set_extra(index, extra)
+
+    def append(self, value: Mapping[str, Any]) -> None:
+        role, content, extra = self._unpack(value)
+        self._roles.append(role)
+        self._contents.append(content)
+        if self._extra is not None:
+            self._extra.append(extra)
+        else:
+            self._set_extra(len(self._contents) - 1, extra)
+
+    def extend(self, values: Iterable[Mapping[str, Any]]) -> None:
+        if values is self:
+            values = list(values)
+        # Jalur cepat tanpa panggilan metode per pesan (memuat sesi besar)
+        codes, add_role, add_content = _ROLE_CODES, self._roles.append, self._contents.append
+        for value in values:
+            if self._extra is None and len(value) == 2 and 'role' in value and 'content' in value:
+                role = value['role']
+                code = codes.get(role) if isinstance(role, str) else None
+                if code is not None:
+                    add_role(code)
+                    add_content(value['content'])
+                    continue
+            self.append(value)
+
+    def clear(self) -> None:
+        self._roles = array('H')
+        self._contents = []
+        self._extra = None
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (MessageStore, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other: Any) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"MessageStore({list(self)!r})"
+
+    def __reduce__(self):
+        return (MessageStore, (list(self),))
+
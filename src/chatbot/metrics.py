@@ -0,0 +1,201 @@
+"""
+Registry metrik di dalam proses: counter dan histogram latensi.
+
+Metrik bisa ditampilkan lewat perintah ``statistik`` atau diekspor ke file
+dalam format teks Prometheus maupun JSON. Saat registry dinonaktifkan,
+setiap pemanggilan langsung kembali tanpa mengambil lock atau mengalokasi
+objek, sehingga overhead-nya bisa diabaikan.
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Optional, Sequence, Tuple, Union
+
+from .config import Config
+
+# Batas bucket histogram dalam detik
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = FrozenSet[Tuple[str, str]]
+
+
+class Histogram:
+    """Histogram kumulatif dengan bucket tetap."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # bucket terakhir: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, pct: float) -> float:
+        """Perkiraan persentil dengan interpolasi linear di dalam bucket."""
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else lower
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return lower
+
+
+class _Timer:
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, labels: Dict[str, str]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Kumpulan counter dan histogram, masing-masing dengan label opsional."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Tambah nilai counter."""
+        if not self.enabled:
+            return
+        key = frozenset(labels.items())
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Catat satu nilai ke histogram."""
+        if not self.enabled:
+            return
+        key = frozenset(labels.items())
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def timer(self, name: str, **labels: str) -> Union[_Timer, _NullTimer]:
+        """Context manager yang mencatat lama eksekusi ke histogram ``name``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def reset(self) -> None:
+        """Hapus semua metrik."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _label_text(labels: Labels) -> str:
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in sorted(labels)) + '}'
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Salinan semua metrik dalam bentuk dict yang bisa di-JSON-kan."""
+        with self._lock:
+            counters = {
+                name + self._label_text(labels): value
+                for name, series in self._counters.items()
+                for labels, value in series.items()
+            }
+            histograms = {
+                name + self._label_text(labels): {
+                    'count': h.count,
+                    'sum': h.sum,
+                    'mean': h.sum / h.count if h.count else 0.0,
+                    'p50': h.percentile(50),
+                    'p99': h.percentile(99),
+                }
+                for name, series in self._histograms.items()
+                for labels, h in series.items()
+            }
+        return {'counters': counters, 'histograms': histograms}
+
+    def to_prometheus(self) -> str:
+        """Format eksposisi teks Prometheus."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{self._label_text(labels)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, h in series.items():
+                    cumulative = 0
+                    for bound, count in zip(h.buckets + (float('inf'),), h.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        bucket_labels = labels | {('le', le)}
+                        lines.append(f"{name}_bucket{self._label_text(bucket_labels)} {cumulative}")
+                    lines.append(f"{name}_sum{self._label_text(labels)} {h.sum}")
+                    lines.append(f"{name}_count{self._label_text(labels)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: Union[str, Path]) -> None:
+        """Tulis metrik ke file; ``.json`` untuk JSON, selain itu teks Prometheus."""
+        path = Path(path)
+        path.parent.mkdir(exist_ok=True, parents=True)
+        if path.suffix == '.json':
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        else:
+            content = self.to_prometheus()
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+# Registry global yang dipakai seluruh aplikasi
+registry = MetricsRegistry(enabled=Config.METRICS_ENABLED)
+
+
+def export_if_configured(path: Optional[str] = None) -> Optional[str]:
+    """Ekspor metrik ke ``Config.METRICS_EXPORT_PATH`` jika diatur."""
+    path = path or Config.METRICS_EXPORT_PATH
+    if not path or not registry.enabled:
+        return None
+    registry.export(path)
+    return path
@@ -0,0 +1,265 @@
+"""
+Mesin kueri untuk pencarian riwayat chat dengan peringkat BM25.
+
+Sintaks kueri (semua bagian opsional dan bisa digabung):
+
+- ``kata lain``: setiap kata harus muncul (substring, tanpa memperhatikan
+  huruf besar); pesan diurutkan dengan skor BM25
+- ``"frasa persis"``: frasa harus muncul utuh
+- ``/pola/``: ekspresi reguler (tanpa memperhatikan huruf besar)
+- ``role:user`` (``peran:``): hanya pesan dengan peran tersebut
+- ``session:nama`` (``sesi:``): hanya sesi yang namanya memuat teks tersebut
+- ``after:2024-01-31`` (``setelah:``): sesi yang dibuat pada atau sesudah tanggal
+- ``before:2024-01-31`` (``sebelum:``): sesi yang dibuat sebelum tanggal
+
+Kandidat diambil dari indeks terbalik; hanya ``limit`` hasil teratas yang
+dipertahankan lewat heap, dan cuplikan dipusatkan pada kecocokan pertama.
+"""
+from __future__ import annotations
+import heapq
+import math
+import re
+from datetime import date
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+
+from .metrics import registry as metrics
+
+# Parameter BM25 standar
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Panjang cuplikan dalam karakter
+SNIPPET_WIDTH = 100
+
+FILTERS = {
+    'role': 'role', 'peran': 'role',
+    'session': 'session', 'sesi': 'session',
+    'after': 'after', 'setelah': 'after',
+    'before': 'before', 'sebelum': 'before',
+}
+
+_TOKEN = re.compile(r'"([^"]*)"|/((?:[^/\\]|\\.)+)/(?=\s|$)|(\S+)')
+
+
+class ParsedQuery(NamedTuple):
+    terms: List[str]             # Kata lepas, huruf kecil
+    phrases: List[str]           # Frasa dalam tanda kutip, huruf kecil
+    pattern: Optional[Pattern]   # Ekspresi reguler
+    role: Optional[str] = None
+    session: Optional[str] = None
+    after: Optional[str] = None  # Tanggal ISO (inklusif)
+    before: Optional[str] = None # Tanggal ISO (eksklusif)
+
+    @property
+    def scoring_terms(self) -> List[str]:
+        """Kata yang dinilai BM25: kata lepas dan kata di dalam frasa."""
+        return self.terms + [word for phrase in self.phrases for word in phrase.split()]
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.terms or self.phrases or self.pattern or self.role
+                    or self.session or self.after or self.before)
+
+    def matches_session(self, name: Optional[str], created_at: Optional[str]) -> bool:
+        """True jika sesi lolos filter nama dan tanggal."""
+        if self.session and self.session not in (name or '').lower():
+            return False
+        created = (created_at or '')[:10]
+        if self.after and created < self.after:
+            return False
+        if self.before and (not created or created >= self.before):
+            return False
+        return True
+
+    def match_span(self, content: str) -> Optional[Tuple[int, int]]:
+        """Posisi kecocokan pertama di ``content``, atau None jika pesan tidak cocok."""
+        lowered = content.lower()
+        spans = []
+        for needle in self.phrases + self.terms:
+            pos = lowered.find(needle)
+            if pos < 0:
+                return None
+            spans.append((pos, pos + len(needle)))
+        if self.pattern is not None:
+            found = self.pattern.search(content)
+            if found is None:
+                return None
+            spans.append(found.span())
+        return min(spans, default=(0, 0))
+
+
+def _parse_date(key: str, value: str) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Tanggal tidak valid untuk {key}: {value} (gunakan YYYY-MM-DD)") from None
+
+
+def parse_query(text: str) -> ParsedQuery:
+    """Uraikan teks kueri menjadi kata, frasa, pola, dan filter.
+
+    Raises:
+        ValueError: Jika tanggal atau ekspresi reguler tidak valid
+    """
+    terms: List[str] = []
+    phrases: List[str] = []
+    pattern = None
+    filters: Dict[str, str] = {}
+
+    for phrase, regex, word in _TOKEN.findall(text):
+        if phrase:
+            if phrase.strip():
+                phrases.append(phrase.strip().lower())
+        elif regex:
+            try:
+                pattern = re.compile(regex, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Ekspresi reguler tidak valid: {e}") from None
+        elif word:
+            key, sep, value = word.partition(':')
+            name = FILTERS.get(key.lower())
+            if sep and name and value:
+                if name in ('after', 'before'):
+                    value = _parse_date(key, value)
+                filters[name] = value.lower()
+            else:
+                terms.append(word.lower())
+
+    return ParsedQuery(terms, phrases, pattern, **filters)
+
+
+def bm25_idf(df: int, count: int) -> float:
+    """IDF BM25 (selalu positif)."""
+    return math.log(1 + (count - df + 0.5) / (df + 0.5))
+
+
+def bm25_score(tfs: List[int], idfs: List[float], length: int, avg_length: float) -> float:
+    """Skor BM25 sebuah pesan dari frekuensi dan IDF setiap kata kueri."""
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) if avg_length else BM25_K1
+    return sum(idf * tf * (BM25_K1 + 1) / (tf + norm) for tf, idf in zip(tfs, idfs) if tf)
+
+
+def make_snippet(content: str, span: Tuple[int, int], width: int = SNIPPET_WIDTH) -> str:
+    """Potongan ``content`` sepanjang ``width`` yang dipusatkan pada ``span``."""
+    if len(content) <= width:
+        return content
+    start, end = span
+    left = start - max(width - (end - start), 0) // 2
+    left = max(0, min(left, len(content) - width))
+    right = left + width
+    return ('...' if left else '') + content[left:right] + ('...' if right < len(content) else '')
+
+
+def top_k(scored: Iterator[Tuple[float, Any]], limit: Optional[int]) -> List[Any]:
+    """Ambil ``limit`` item dengan skor tertinggi; urutan awal dipertahankan bila seri."""
+    if limit is None:
+        ranked = sorted(scored, key=itemgetter(0), reverse=True)
+    else:
+        ranked = heapq.nlargest(limit, scored, key=itemgetter(0))
+    return [item for _, item in ranked]
+
+
+Candidates = Dict[str, Dict[int, List[int]]]
+
+
+def _candidates(storage, parsed: ParsedQuery) -> Tuple[Optional[Candidates], List[float], float]:
+    """Pesan kandidat dari indeks beserta IDF setiap kata dan rata-rata panjang pesan.
+
+    Kandidat berupa kunci sesi -> nomor pesan -> frekuensi setiap kata;
+    None jika kueri tidak punya kata (semua pesan menjadi kandidat).
+    """
+    words = parsed.scoring_terms
+    if not words:
+        return None, [], 0.0
+    storage._sync_index()
+    count, avg_length = storage.index.stats()
+    candidates: Optional[Candidates] = None
+    idfs = []
+    for word in words:
+        found = storage.index.lookup_tf(word)
+        idfs.append(bm25_idf(sum(len(tfs) for tfs in found.values()), count))
+        if candidates is None:
+            candidates = {key: {i: [tf] for i, tf in tfs.items()} for key, tfs in found.items()}
+            continue
+        # Semua kata harus muncul: irisan dengan kandidat sebelumnya
+        for key in list(candidates):
+            tfs = found.get(key, {})
+            messages = candidates[key]
+            for i in list(messages):
+                if i in tfs:
+                    messages[i].append(tfs[i])
+                else:
+                    del messages[i]
+            if not messages:
+                del candidates[key]
+    return candidates, idfs, avg_length
+
+
+def _scored_messages(storage, parsed: ParsedQuery) -> Iterator[Tuple[float, Tuple]]:
+    candidates, idfs, avg_length = _candidates(storage, parsed)
+    if candidates is None:
+        keys = sorted(key for key, _ in storage._iter_sessions())
+    else:
+        keys = sorted(candidates)
+
+    for key in keys:
+        filepath = storage.storage_dir / key
+        try:
+            data = storage.load_chat(filepath)
+        except (ValueError, KeyError, OSError) as e:
+            storage._warn_corrupt(filepath, e)
+            continue
+        session_name = data.get('session_name', 'Tanpa Judul')
+        if not parsed.matches_session(session_name, data.get('created_at')):
+            continue
+        messages = data.get('messages', [])
+        if candidates is None:
+            indices, lengths = range(len(messages)), {}
+        else:
+            indices, lengths = sorted(candidates[key]), storage.index.lengths(key)
+        for i in indices:
+            if i >= len(messages):
+                continue
+            msg = messages[i]
+            if parsed.role and str(msg.get('role') or '').lower() != parsed.role:
+                continue
+            content = msg.get('content')
+            if not isinstance(content, str):
+                # Pesan rusak tanpa teks (misalnya "content": null) tidak bisa cocok
+                continue
+            span = parsed.match_span(content)
+            if span is None:
+                continue
+            score = 0.0
+            if candidates is not None:
+                score = bm25_score(candidates[key][i], idfs, lengths.get(i, 0), avg_length)
+            yield score, (filepath, session_name, msg, span, score)
+
+
+def ranked_search(storage, query: str, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+    """Cari di ``ChatHistory`` dengan sintaks kueri lengkap dan peringkat BM25.
+
+    Args:
+        storage: ``ChatHistory`` yang dicari
+        query: Teks kueri (lihat docstring modul)
+        limit: Jumlah hasil teratas (None = semua)
+
+    Returns:
+        List[SearchResult]: Hasil dengan skor menurun
+
+    Raises:
+        ValueError: Jika kueri tidak valid
+    """
+    parsed = parse_query(query)
+    if parsed.is_empty or limit == 0:
+        return []
+
+    with metrics.timer('storage_search_seconds'):
+        results = [
+            storage._make_result(filepath, session_name, msg, score,
+                                 make_snippet(msg.get('content', ''), span))
+            for filepath, session_name, msg, span, score in top_k(_scored_messages(storage, parsed), limit)
+        ]
+    metrics.inc('storage_search_results_total', len(results))
+    return results
@@ -0,0 +1,543 @@
+"""
+Panggilan model yang tahan gangguan: timeout, retry, hedging, dan circuit breaker.
+
+``ResilientCaller.send`` membungkus ``chat.send_message``:
+
+- setiap percobaan dijalankan di thread pekerja dan ditunggu paling lama
+  ``timeout`` detik (panggilan yang melewati batas ditinggalkan, tidak
+  dihentikan paksa); jika terlalu banyak panggilan yang ditinggalkan masih
+  berjalan, panggilan baru langsung ditolak
+- kesalahan sementara (lihat ``is_retryable``) dicoba ulang dengan backoff
+  eksponensial dan jitter
+- jika respons belum tiba setelah ``hedge_after`` detik, permintaan duplikat
+  dikirim dan respons yang tiba lebih dulu dipakai
+- ``CircuitBreaker`` menolak panggilan seketika setelah beberapa kegagalan
+  beruntun, lalu mengizinkan satu percobaan setelah ``reset_timeout`` detik
+
+Karena ``send_message`` mengubah riwayat objek chat, percobaan ulang dan
+permintaan duplikat memakai salinan chat dari riwayat sebelum giliran ini.
+Pemanggil menerima objek chat milik respons yang menang; jika giliran gagal,
+pemanggil sebaiknya memakai chat salinan karena panggilan yang ditinggalkan
+masih bisa mengubah chat lama.
+
+``ResilientCaller.stream`` untuk mode streaming membaca aliran di thread
+pekerja dengan dua batas waktu ``timeout``: sampai potongan pertama dan
+antarpotongan. Hedging berlaku sampai potongan pertama; aliran yang lebih dulu
+mengirim potongan dipakai. Retry hanya dilakukan sebelum potongan pertama
+tiba, karena potongan yang sudah ditampilkan tidak bisa ditarik kembali.
+
+``ResilientCaller.send_async`` memberi perlindungan yang sama untuk pengirim
+asinkron (dipakai ``AsyncChatbot`` dan server HTTP).
+"""
+from __future__ import annotations
+import queue
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .backends import BackendError, TransientBackendError
+from .config import Config
+from .metrics import registry as metrics
+
+# Nama kelas kesalahan google.api_core yang bersifat sementara; dicocokkan
+# berdasarkan nama agar modul ini tidak perlu mengimpor pustaka Google
+RETRYABLE_ERROR_NAMES = frozenset({
+    'ServiceUnavailable', 'DeadlineExceeded', 'TooManyRequests', 'ResourceExhausted',
+    'InternalServerError', 'BadGateway', 'GatewayTimeout', 'Aborted',
+})
+
+# Jumlah panggilan yang ditinggalkan (timeout atau kalah hedging) yang boleh
+# masih berjalan per ResilientCaller sebelum panggilan baru ditolak
+MAX_ABANDONED = 8
+
+
+class CircuitOpenError(BackendError):
+    """Panggilan ditolak karena backend sedang dianggap tidak sehat."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True jika kesalahan bersifat sementara dan aman untuk dicoba ulang."""
+    if isinstance(error, (TransientBackendError, TimeoutError, FutureTimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def backoff_delay(attempt: int, base: float, cap: Optional[float] = None) -> float:
+    """Jeda sebelum percobaan ulang ke-``attempt`` (mulai 1): eksponensial dengan jitter.
+
+    Separuh jeda tetap dan separuhnya acak, sehingga klien yang gagal
+    bersamaan tidak mencoba ulang pada saat yang sama.
+    """
+    delay = base * (2 ** (attempt - 1))
+    if cap is not None:
+        delay = min(delay, cap)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Circuit breaker sederhana: tertutup -> terbuka -> setengah terbuka."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            failure_threshold: Jumlah kegagalan beruntun sebelum terbuka (0 = nonaktif)
+            reset_timeout: Lama terbuka sebelum satu percobaan diizinkan (detik)
+            clock: Sumber waktu (bisa diganti saat pengujian)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """Izinkan panggilan atau tolak seketika.
+
+        Raises:
+            CircuitOpenError: Jika breaker terbuka atau percobaan setengah terbuka sedang berjalan
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self._state == self.OPEN:
+                remaining = self.reset_timeout - (self.clock() - self._opened_at)
+                if remaining > 0:
+                    metrics.inc('model_circuit_rejections_total')
+                    raise CircuitOpenError(
+                        f"Backend model sedang bermasalah; coba lagi dalam {remaining:.0f} detik"
+                    )
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    metrics.inc('model_circuit_rejections_total')
+                    raise CircuitOpenError("Backend model sedang diuji ulang; coba lagi sebentar lagi")
+                self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._probing = False
+
+    def release(self) -> None:
+        """Lepaskan percobaan setengah terbuka yang berhenti tanpa hasil (dibatalkan atau ditutup)."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    metrics.inc('model_circuit_opened_total')
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+                self._probing = False
+
+
+def _send(chat: Any, message: str) -> Any:
+    response = chat.send_message(message)
+    # Baca teks di thread pekerja agar waktu menunggu isi respons ikut dibatasi timeout
+    response.text
+    return response
+
+
+def _pump(chat: Any, message: str, items: queue.Queue, stop: threading.Event) -> None:
+    # Dijalankan di thread pekerja: teruskan potongan aliran ke antrean pembaca
+    try:
+        for chunk in chat.send_message(message, stream=True):
+            if stop.is_set():
+                return
+            items.put((chat, chunk, None))
+    except Exception as e:
+        items.put((chat, None, e))
+    else:
+        items.put((chat, None, None))
+
+
+class ResilientCaller:
+    """Pengirim pesan ke model dengan timeout, retry, hedging, dan circuit breaker."""
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_retries: int = 0,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        hedge_after: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            timeout: Batas waktu per percobaan dalam detik (None = tanpa batas)
+            max_retries: Jumlah percobaan ulang setelah percobaan pertama gagal
+            backoff: Jeda dasar backoff (detik)
+            max_backoff: Jeda backoff maksimum (detik)
+            hedge_after: Kirim permintaan duplikat setelah sekian detik (None = nonaktif)
+            breaker: Circuit breaker (default: tanpa breaker)
+            sleep: Fungsi jeda (bisa diganti saat pengujian)
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker(failure_threshold=0)
+        self.sleep = sleep
+        self._abandoned = 0
+        self._abandoned_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> 'ResilientCaller':
+        """Buat pengirim berdasarkan pengaturan di ``Config`` (0 = nonaktif)."""
+        return cls(
+            timeout=Config.MODEL_TIMEOUT or None,
+            max_retries=Config.MODEL_MAX_RETRIES,
+            backoff=Config.MODEL_RETRY_BACKOFF,
+            hedge_after=Config.MODEL_HEDGE_AFTER or None,
+            breaker=CircuitBreaker(Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_RESET_TIMEOUT)
+        )
+
+    @property
+    def uses_threads(self) -> bool:
+        return self.timeout is not None or self.hedge_after is not None
+
+    @staticmethod
+    def _run(fn: Callable[..., Any], *args: Any) -> Future:
+        """Jalankan ``fn`` di thread daemon sendiri; thread yang menggantung tidak memakai slot pool."""
+        future: Future = Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name='model-call', daemon=True).start()
+        return future
+
+    def _abandon(self, future: Future) -> None:
+        """Catat panggilan yang ditinggalkan sampai threadnya selesai."""
+        with self._abandoned_lock:
+            self._abandoned += 1
+        future.add_done_callback(self._forget_abandoned)
+
+    def _forget_abandoned(self, future: Future) -> None:
+        with self._abandoned_lock:
+            self._abandoned -= 1
+
+    def _check_abandoned(self) -> None:
+        """Tolak panggilan baru jika terlalu banyak panggilan lama masih menggantung.
+
+        Raises:
+            BackendError: Jika batas ``MAX_ABANDONED`` tercapai
+        """
+        with self._abandoned_lock:
+            abandoned = self._abandoned
+        if abandoned >= MAX_ABANDONED:
+            metrics.inc('model_abandoned_rejections_total')
+            raise BackendError(
+                f"{abandoned} panggilan model sebelumnya belum selesai; coba lagi sebentar lagi"
+            )
+
+    def send(self, chat: Any, message: str, clone_chat: Callable[[], Any]) -> Tuple[Any, Any]:
+        """Kirim ``message`` dengan semua perlindungan yang aktif.
+
+        Args:
+            chat: Objek chat aktif (dipakai untuk percobaan pertama)
+            message: Pesan pengguna
+            clone_chat: Fungsi yang membuat chat baru dari riwayat sebelum giliran ini
+
+        Returns:
+            Tuple[Any, Any]: (respons, objek chat yang menghasilkan respons)
+
+        Raises:
+            CircuitOpenError: Jika breaker menolak panggilan
+            Exception: Kesalahan terakhir jika semua percobaan gagal
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            self._check_abandoned()
+            self.breaker.before_call()
+            try:
+                response, winner = self._attempt(chat, message, clone_chat)
+            except Exception as e:
+                if not self._record_failure(e) or attempt > self.max_retries:
+                    raise
+                metrics.inc('model_retries_total')
+                self.sleep(backoff_delay(attempt, self.backoff, self.max_backoff))
+                # Chat lama mungkin masih diubah oleh panggilan yang ditinggalkan
+                chat = clone_chat()
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return response, winner
+
+    def stream(self, chat: Any, message: str, clone_chat: Callable[[], Any]) -> Iterator[Tuple[Any, Any]]:
+        """Kirim ``message`` dalam mode streaming.
+
+        Kesalahan sementara sebelum potongan pertama (termasuk timeout) dicoba
+        ulang dengan chat salinan; setelah potongan pertama kesalahan
+        diteruskan ke pemanggil.
+
+        Yields:
+            Tuple[Any, Any]: (potongan respons, objek chat yang menghasilkannya)
+
+        Raises:
+            CircuitOpenError: Jika breaker menolak panggilan
+            TimeoutError: Jika potongan berikutnya tidak tiba dalam ``timeout`` detik
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            self._check_abandoned()
+            self.breaker.before_call()
+            started = False
+            try:
+                for chunk, source in self._stream_attempt(chat, message, clone_chat):
+                    started = True
+                    yield chunk, source
+            except Exception as e:
+                if not self._record_failure(e) or started or attempt > self.max_retries:
+                    raise
+                metrics.inc('model_retries_total')
+                self.sleep(backoff_delay(attempt, self.backoff, self.max_backoff))
+                chat = clone_chat()
+                continue
+            except BaseException:
+                # Pemanggil menutup aliran lebih awal (GeneratorExit) atau dihentikan
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return
+
+    async def send_async(
+        self,
+        chat: Any,
+        message: str,
+        clone_chat: Callable[[], Any],
+        send: Callable[[Any, str], Awaitable[Any]]
+    ) -> Tuple[Any, Any]:
+        """Versi asinkron ``send`` untuk pengirim ``send(chat, message)`` yang bisa di-await.
+
+        Timeout, hedging, dan jeda backoff memakai event loop, sehingga tidak
+        ada thread yang diblokir; percobaan yang ditinggalkan dibatalkan.
+
+        Returns:
+            Tuple[Any, Any]: (hasil ``send``, objek chat yang menghasilkannya)
+
+        Raises:
+            CircuitOpenError: Jika breaker menolak panggilan
+            Exception: Kesalahan terakhir jika semua percobaan gagal
+        """
+        import asyncio  # hanya dibutuhkan oleh jalur async
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            try:
+                result, winner = await self._attempt_async(chat, message, clone_chat, send)
+            except Exception as e:
+                if not self._record_failure(e) or attempt > self.max_retries:
+                    raise
+                metrics.inc('model_retries_total')
+                await asyncio.sleep(backoff_delay(attempt, self.backoff, self.max_backoff))
+                chat = clone_chat()
+                continue
+            except BaseException:
+                # Dibatalkan (CancelledError): uji setengah terbuka tidak boleh tertahan
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result, winner
+
+    def _record_failure(self, error: Exception) -> bool:
+        """Catat percobaan yang gagal ke breaker; True jika kesalahannya sementara."""
+        retryable = is_retryable(error)
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            # Kesalahan permintaan (mis. prompt ditolak): backend tetap merespons
+            self.breaker.record_success()
+        return retryable
+
+    @property
+    def _hedges(self) -> bool:
+        return self.hedge_after is not None and (self.timeout is None or self.hedge_after < self.timeout)
+
+    def _attempt(self, chat: Any, message: str, clone_chat: Callable[[], Any]) -> Tuple[Any, Any]:
+        """Satu percobaan, termasuk permintaan duplikat jika hedging aktif."""
+        if not self.uses_threads:
+            return _send(chat, message), chat
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        futures: Dict[Future, Any] = {self._run(_send, chat, message): chat}
+
+        if self._hedges:
+            done, _ = wait(futures, timeout=self.hedge_after)
+            if not done:
+                hedge = clone_chat()
+                futures[self._run(_send, hedge, message)] = hedge
+                metrics.inc('model_hedged_requests_total')
+
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                for future in pending:
+                    self._abandon(future)
+                metrics.inc('model_timeouts_total')
+                raise TimeoutError(f"Model tidak merespons dalam {self.timeout:g} detik")
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        self._abandon(other)
+                    if futures[future] is not chat:
+                        metrics.inc('model_hedge_wins_total')
+                    return future.result(), futures[future]
+                error = future.exception()
+        raise error
+
+    def _stream_attempt(self, chat: Any, message: str, clone_chat: Callable[[], Any]) -> Iterator[Tuple[Any, Any]]:
+        """Satu percobaan streaming dengan batas waktu potongan dan hedging."""
+        if not self.uses_threads:
+            for chunk in chat.send_message(message, stream=True):
+                yield chunk, chat
+            return
+
+        items: queue.Queue = queue.Queue()
+        streams: List[Tuple[Any, threading.Event, Future]] = []
+
+        def start(source: Any) -> None:
+            stop = threading.Event()
+            streams.append((source, stop, self._run(_pump, source, message, items, stop)))
+
+        start(chat)
+        now = time.monotonic()
+        deadline = None if self.timeout is None else now + self.timeout
+        hedge_at = now + self.hedge_after if self._hedges else None
+        winner: Any = None
+        running = 1
+        try:
+            while True:
+                wake = min((t for t in (deadline, hedge_at) if t is not None), default=None)
+                remaining = None if wake is None else max(wake - time.monotonic(), 0)
+                try:
+                    source, chunk, error = items.get(timeout=remaining)
+                except queue.Empty:
+                    if hedge_at is not None and time.monotonic() >= hedge_at:
+                        hedge_at = None
+                        start(clone_chat())
+                        running += 1
+                        metrics.inc('model_hedged_requests_total')
+                        continue
+                    metrics.inc('model_timeouts_total')
+                    if winner is None:
+                        raise TimeoutError(f"Model tidak mulai merespons dalam {self.timeout:g} detik")
+                    raise TimeoutError(f"Model berhenti mengirim potongan selama {self.timeout:g} detik")
+                if winner is not None and source is not winner:
+                    continue
+                if error is not None:
+                    running -= 1
+                    if winner is None and running:
+                        # Aliran lain masih bisa berhasil
+                        continue
+                    raise error
+                if winner is None:
+                    # Aliran pertama yang mengirim potongan (atau selesai) dipakai
+                    winner, hedge_at = source, None
+                    for other, stop, _ in streams:
+                        if other is not source:
+                            stop.set()
+                    if source is not chat:
+                        metrics.inc('model_hedge_wins_total')
+                if chunk is None:
+                    return
+                if deadline is not None:
+                    deadline = time.monotonic() + self.timeout
+                yield chunk, source
+        finally:
+            # Pemanggil berhenti, timeout, atau gagal: hentikan semua thread pembaca
+            for _, stop, future in streams:
+                stop.set()
+                if not future.done():
+                    # Thread pembaca berhenti pada potongan berikutnya (jika ada)
+                    self._abandon(future)
+
+    async def _attempt_async(
+        self,
+        chat: Any,
+        message: str,
+        clone_chat: Callable[[], Any],
+        send: Callable[[Any, str], Awaitable[Any]]
+    ) -> Tuple[Any, Any]:
+        """Satu percobaan asinkron, termasuk permintaan duplikat jika hedging aktif."""
+        import asyncio  # hanya dibutuhkan oleh jalur async
+
+        if not self.uses_threads:
+            return await send(chat, message), chat
+
+        loop = asyncio.get_running_loop()
+        deadline = None if self.timeout is None else loop.time() + self.timeout
+        tasks: Dict[asyncio.Future, Any] = {asyncio.ensure_future(send(chat, message)): chat}
+        try:
+            if self._hedges:
+                done, _ = await asyncio.wait(list(tasks), timeout=self.hedge_after)
+                if not done:
+                    hedge = clone_chat()
+                    tasks[asyncio.ensure_future(send(hedge, message))] = hedge
+                    metrics.inc('model_hedged_requests_total')
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                remaining = None if deadline is None else max(deadline - loop.time(), 0)
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    metrics.inc('model_timeouts_total')
+                    raise TimeoutError(f"Model tidak merespons dalam {self.timeout:g} detik")
+                for task in done:
+                    if task.exception() is None:
+                        if tasks[task] is not chat:
+                            metrics.inc('model_hedge_wins_total')
+                        return task.result(), tasks[task]
+                    error = task.exception()
+            raise error
+        finally:
+            # Percobaan yang kalah, kedaluwarsa, atau ikut dibatalkan tidak dibiarkan berjalan
+            for task in tasks:
+                task.cancel()
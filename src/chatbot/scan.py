@@ -0,0 +1,233 @@
+"""
+Pemindaian file sesi untuk pencarian tanpa indeks.
+
+Setiap file lebih dulu disaring di level byte lewat memory map: file yang
+tidak mungkin memuat kueri (tanpa memperhatikan huruf besar) dilewati tanpa
+di-parse. Saringan memakai potongan ASCII terpanjang dari kueri, karena
+karakter ASCII cetak selain ``"`` dan ``\\`` ditulis apa adanya oleh JSON,
+dan huruf besar/kecilnya bisa dicocokkan langsung pada bytes. Satu-satunya
+karakter non-ASCII yang huruf kecilnya memuat ASCII adalah ``İ`` dan tanda
+Kelvin ``K``; file yang memuatnya, atau memuat escape ``\\u``, selalu
+dianggap kandidat.
+
+Untuk direktori besar, file dibagi ke beberapa proses. Hasil dialirkan
+sebagai generator sesuai urutan file sehingga hasil pertama langsung bisa
+ditampilkan, dan pemindaian berhenti begitu ``limit`` tercapai. Sesi arsip
+dipindai terakhir: setiap sesi disaring pada irisan file pack tanpa membuka
+file terpisah.
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Pattern, Sequence, Set, Tuple
+
+from .config import Config
+from .formats import COMPRESSED_SUFFIXES, decode_session, decompress_session
+
+# Byte UTF-8 untuk 'İ' (U+0130) dan tanda Kelvin (U+212A)
+_DOTTED_CAPITAL_I = b'\xc4\xb0'
+_KELVIN_SIGN = b'\xe2\x84\xaa'
+
+# Jumlah file maksimum per tugas yang dikirim ke proses pekerja
+CHUNK_SIZE = 64
+
+Prefilter = Tuple[Optional[Pattern[bytes]], Optional[Pattern[bytes]]]
+
+
+def longest_ascii_run(query: str) -> str:
+    """Potongan terpanjang dari kueri yang hanya berisi ASCII cetak selain ``"`` dan ``\\``."""
+    runs = re.findall(r'[\x20-\x21\x23-\x5b\x5d-\x7e]+', query.lower())
+    return max(runs, key=len, default='')
+
+
+def build_prefilter(query: str) -> Prefilter:
+    """Buat pola byte untuk menyaring file kandidat.
+
+    Returns:
+        Prefilter: (pola kueri, pola karakter khusus); pola kueri ``None``
+        berarti semua file harus di-parse
+    """
+    run = longest_ascii_run(query)
+    if not run:
+        return None, None
+    specials = [re.escape(b'\\u')]
+    if 'i' in run:
+        specials.append(re.escape(_DOTTED_CAPITAL_I))
+    if 'k' in run:
+        specials.append(re.escape(_KELVIN_SIGN))
+    return (
+        re.compile(re.escape(run.encode('ascii')), re.IGNORECASE),
+        re.compile(b'|'.join(specials))
+    )
+
+
+def may_contain(data, prefilter: Prefilter) -> bool:
+    """True jika ``data`` (bytes atau mmap) mungkin memuat kueri."""
+    pattern, specials = prefilter
+    if pattern is None:
+        return True
+    return pattern.search(data) is not None or specials.search(data) is not None
+
+
+def is_candidate(filepath: Path, prefilter: Prefilter) -> bool:
+    """Saring satu file lewat memory map tanpa membaca seluruhnya ke memori.
+
+    File terkompresi selalu lolos di sini; isinya disaring setelah
+    didekompresi oleh ``scan_file``.
+    """
+    if prefilter[0] is None or filepath.suffix in COMPRESSED_SUFFIXES:
+        return True
+    try:
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return may_contain(data, prefilter)
+    except (OSError, ValueError):
+        return False
+
+
+def _load_candidate(storage, filepath: Path, prefilter: Prefilter) -> Optional[dict]:
+    """Muat file yang lolos saringan, atau None jika ternyata tidak mungkin cocok."""
+    if filepath.suffix not in COMPRESSED_SUFFIXES:
+        return storage.load_chat(filepath)
+    with open(filepath, 'rb') as f:
+        raw = decompress_session(f.read())
+    if not may_contain(raw, prefilter):
+        return None
+    return json.loads(raw)
+
+
+def scan_file(storage, filepath: Path, term: str, prefilter: Prefilter) -> List[dict]:
+    """Cari ``term`` (huruf kecil) di satu file sesi."""
+    if not is_candidate(filepath, prefilter):
+        return []
+    try:
+        data = _load_candidate(storage, filepath, prefilter)
+    except (ValueError, KeyError, OSError) as e:
+        storage._warn_corrupt(filepath, e)
+        return []
+    if data is None:
+        return []
+    return _message_results(storage, filepath, data, term)
+
+
+def _message_results(storage, filepath: Path, data: dict, term: str) -> List[dict]:
+    session_name = data.get('session_name', 'Tanpa Judul')
+    return [
+        storage._make_result(filepath, session_name, msg)
+        for msg in data.get('messages', [])
+        if term in msg.get('content', '').lower()
+    ]
+
+
+def scan_archive(storage, term: str, prefilter: Prefilter, skip: Set[str] = frozenset()) -> Iterator[dict]:
+    """Cari ``term`` (huruf kecil) di sesi arsip, kecuali kunci di ``skip`` (masih ada filenya)."""
+    for key in storage.archive.keys():
+        if key in skip:
+            continue
+        filepath = storage.storage_dir / key
+        try:
+            raw = storage.archive.read(key)
+            if not may_contain(raw, prefilter):
+                continue
+            data = decode_session(raw)
+        except (ValueError, KeyError, OSError) as e:
+            storage._warn_corrupt(filepath, e)
+            continue
+        yield from _message_results(storage, filepath, data, term)
+
+
+def scan_files(storage, files: Sequence[Path], query: str) -> List[dict]:
+    """Cari ``query`` di sejumlah file sesi; dipakai juga oleh proses pekerja."""
+    term = query.lower()
+    prefilter = build_prefilter(query)
+    results = []
+    for filepath in files:
+        results.extend(scan_file(storage, filepath, term, prefilter))
+    return results
+
+
+def _scan_chunk(storage_dir: str, files: List[str], query: str) -> List[dict]:
+    # Dijalankan di proses pekerja; ChatHistory dibuat ulang di sana
+    from .storage import ChatHistory
+    return scan_files(ChatHistory(storage_dir), [Path(f) for f in files], query)
+
+
+def scan_messages(
+    storage,
+    query: str,
+    limit: Optional[int] = None,
+    workers: Optional[int] = None,
+    parallel_threshold: Optional[int] = None
+) -> Iterator[dict]:
+    """Cari pesan yang memuat ``query`` di semua file sesi ``storage``.
+
+    Args:
+        storage: ``ChatHistory`` yang dipindai
+        query: Teks yang dicari (substring, tanpa memperhatikan huruf besar)
+        limit: Jumlah hasil maksimum (None = semua)
+        workers: Jumlah proses pekerja (default: Config.SCAN_WORKERS atau jumlah CPU)
+        parallel_threshold: Jumlah file minimum untuk memakai proses pekerja
+            (default: Config.SCAN_PARALLEL_THRESHOLD)
+
+    Yields:
+        SearchResult: Hasil sesuai urutan file
+    """
+    if not query or limit == 0:
+        return
+    files = list(storage.iter_session_files())
+    term = query.lower()
+    prefilter = build_prefilter(query)
+    count = 0
+    for result in _scan_all_files(storage, files, query, workers, parallel_threshold):
+        yield result
+        count += 1
+        if limit is not None and count >= limit:
+            return
+    on_disk = {storage._session_key(f) for f in files}
+    for result in scan_archive(storage, term, prefilter, on_disk):
+        yield result
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+
+def _scan_all_files(
+    storage,
+    files: List[Path],
+    query: str,
+    workers: Optional[int],
+    parallel_threshold: Optional[int]
+) -> Iterator[dict]:
+    """Pindai ``files`` secara serial atau dengan proses pekerja untuk direktori besar."""
+    workers = workers or Config.SCAN_WORKERS or os.cpu_count() or 1
+    threshold = Config.SCAN_PARALLEL_THRESHOLD if parallel_threshold is None else parallel_threshold
+
+    if workers <= 1 or len(files) < max(threshold, 2):
+        term = query.lower()
+        prefilter = build_prefilter(query)
+        for filepath in files:
+            yield from scan_file(storage, filepath, term, prefilter)
+        return
+
+    # Potongan kecil agar hasil pertama cepat tiba dan beban terbagi rata
+    chunk_size = max(1, min(CHUNK_SIZE, -(-len(files) // (workers * 4))))
+    executor = ProcessPoolExecutor(max_workers=workers)
+    futures: List[Future] = []
+    try:
+        for i in range(0, len(files), chunk_size):
+            futures.append(executor.submit(_scan_chunk, str(storage.storage_dir),
+                                           [str(f) for f in files[i:i + chunk_size]], query))
+        for future in futures:
+            yield from future.result()
+    finally:
+        # Pembaca berhenti lebih awal: batalkan potongan yang belum berjalan
+        # (shutdown(cancel_futures=True) baru ada sejak Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
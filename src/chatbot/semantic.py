@@ -0,0 +1,359 @@
+"""
+Pencarian semantik lokal (tanpa layanan luar) atas riwayat chat.
+
+Setiap pesan diubah menjadi vektor dengan hashing fitur: setiap kata dan
+n-gram byte-nya di-hash ke ``SEMANTIC_DIM`` dimensi lalu dinormalisasi, sehingga
+pesan dengan kata dasar atau imbuhan yang mirip ("deploy", "deployment",
+"men-deploy") tetap berdekatan walaupun kata persisnya berbeda.
+
+Vektor disimpan berurutan sebagai float32 mentah di ``<base>.f32`` dan
+hanya ditambah di akhir; ``<base>.jsonl`` mencatat baris mana milik pesan
+mana (format log seperti index.py). Pembuatan vektor hanya memakai stdlib;
+NumPy baru dimuat saat mencari, ketika seluruh matriks dibaca sebagai satu
+array kontigu dan kemiripan kosinus dihitung dalam satu perkalian
+matriks-vektor.
+
+Baris milik sesi yang dihapus atau disimpan ulang menjadi baris mati. Jika
+jumlahnya melebihi baris yang masih dipakai, matriks dan log ditulis ulang
+hanya dengan baris hidup (``compact``).
+"""
+from __future__ import annotations
+import json
+import math
+import os
+import re
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+from .metrics import registry as metrics
+
+SEMANTIC_VERSION = 1
+SEMANTIC_DIM = 512
+
+# Jumlah baris mati minimum sebelum matriks dipadatkan
+COMPACT_MIN_DEAD_ROWS = 1024
+
+# Panjang n-gram (byte UTF-8) per kata; kata diberi batas spasi di kedua sisi
+NGRAM_SIZES = (3, 4)
+
+_WORD = re.compile(r'\w+')
+
+# Hasil pencarian vektor: (kunci sesi, nomor pesan, skor)
+Hit = Tuple[str, int, float]
+
+
+def _features(text: str) -> Iterable[bytes]:
+    # N-gram diambil dari bytes UTF-8 agar tidak perlu meng-encode setiap potongan
+    for word in _WORD.findall(text.lower()):
+        padded = b' ' + word.encode('utf-8') + b' '
+        yield padded
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                yield padded[i:i + n]
+
+
+def embed(text: str, dim: int = SEMANTIC_DIM) -> array:
+    """Vektor ternormalisasi (norma L2 = 1, atau nol) untuk sebuah teks.
+
+    Indeks dimensi diambil dari bit rendah CRC32 fitur dan tandanya dari bit
+    tertinggi, sehingga tabrakan hash cenderung saling meniadakan.
+    """
+    buckets: Dict[int, float] = {}
+    # Fitur yang berulang (kata umum, n-gram imbuhan) cukup di-hash sekali
+    for feature, count in Counter(_features(text)).items():
+        h = zlib.crc32(feature)
+        bucket = h % dim
+        buckets[bucket] = buckets.get(bucket, 0.0) + (-count if h & 0x80000000 else count)
+    vector = array('f', bytes(4 * dim))
+    norm = math.sqrt(sum(x * x for x in buckets.values()))
+    if norm:
+        for bucket, value in buckets.items():
+            vector[bucket] = value / norm
+    return vector
+
+
+class SemanticIndex:
+    """Matriks vektor pesan di disk beserta peta baris -> (sesi, nomor pesan)."""
+
+    def __init__(self, base: Union[str, Path], dim: int = SEMANTIC_DIM):
+        """
+        Args:
+            base: Path tanpa ekstensi; dipakai ``<base>.f32`` dan ``<base>.jsonl``
+            dim: Jumlah dimensi vektor
+        """
+        base = Path(base)
+        self.vectors_path = base.with_name(base.name + '.f32')
+        self.log_path = base.with_name(base.name + '.jsonl')
+        self.dim = dim
+        self._reset_memory()
+        self._loaded = False
+
+    def _reset_memory(self) -> None:
+        # Kunci sesi -> daftar (baris pertama, nomor pesan pertama, jumlah)
+        self._rows: Dict[str, List[Tuple[int, int, int]]] = {}
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._matrix = None
+        self._live = None
+
+    @property
+    def sessions(self) -> Set[str]:
+        """Kunci sesi yang sudah punya vektor."""
+        self._refresh()
+        return set(self._rows)
+
+    def _refresh(self) -> None:
+        """Baca baris log baru sejak pembacaan terakhir."""
+        try:
+            stat = self.log_path.stat()
+        except FileNotFoundError:
+            self._reset_memory()
+            self._loaded = True
+            return
+        size = stat.st_size
+        if size < self._offset or (self._inode is not None and stat.st_ino != self._inode):
+            # Log dibangun ulang atau dipadatkan (oleh proses ini atau lain)
+            self._reset_memory()
+        elif self._loaded and size == self._offset:
+            return
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                self._offset += len(raw)
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                self._apply(entry)
+        self._inode = stat.st_ino
+        self._live = None
+        self._loaded = True
+
+    def _apply(self, entry: Mapping) -> None:
+        if 'version' in entry:
+            if entry['version'] != SEMANTIC_VERSION or entry.get('dim') != self.dim:
+                self._reset_memory()
+                raise ValueError(f"Indeks semantik tidak cocok: {entry}")
+            return
+        key = entry.get('key')
+        if not key:
+            return
+        if entry.get('removed'):
+            self._rows.pop(key, None)
+            return
+        self._rows.setdefault(key, []).append((entry['row'], entry['start'], entry['count']))
+
+    def add_messages(self, key: str, messages: Sequence[Mapping], start: int = 0) -> None:
+        """Tambahkan vektor pesan-pesan sebuah sesi di akhir matriks.
+
+        Args:
+            key: Kunci sesi
+            messages: Pesan yang akan diindeks
+            start: Nomor pesan pertama di dalam sesi
+        """
+        if not messages:
+            return
+        vectors = array('f')
+        for msg in messages:
+            content = msg.get('content', '')
+            vectors.extend(embed(content if isinstance(content, str) else '', self.dim))
+
+        self.log_path.parent.mkdir(exist_ok=True, parents=True)
+        with open(self.vectors_path, 'ab') as f:
+            # Baris dihitung dari ukuran file agar sisa tulisan yang gagal tidak menggeser indeks
+            row = f.tell() // (4 * self.dim)
+            f.seek(row * 4 * self.dim)
+            f.truncate()
+            vectors.tofile(f)
+        self._append({'key': key, 'row': row, 'start': start, 'count': len(messages)})
+
+    def _append(self, entry: Mapping) -> None:
+        is_new = not self.log_path.exists() or self.log_path.stat().st_size == 0
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            if is_new:
+                f.write(json.dumps({'version': SEMANTIC_VERSION, 'dim': self.dim}) + '\n')
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._refresh()
+
+    def remove_session(self, key: str) -> None:
+        """Lupakan vektor milik sebuah sesi (barisnya tetap ada sampai dipadatkan)."""
+        self._refresh()
+        if key in self._rows:
+            self._append({'key': key, 'removed': True})
+            self._compact_if_needed()
+
+    def _compact_if_needed(self) -> None:
+        try:
+            rows = self.vectors_path.stat().st_size // (4 * self.dim)
+        except FileNotFoundError:
+            return
+        live = sum(count for spans in self._rows.values() for _, _, count in spans)
+        dead = rows - live
+        if dead >= COMPACT_MIN_DEAD_ROWS and dead > live:
+            self.compact()
+
+    def compact(self) -> None:
+        """Tulis ulang matriks dan log hanya dengan baris milik sesi yang masih ada.
+
+        Log lama dihapus sebelum file baru dipasang, sehingga crash di tengah
+        jalan hanya membuat sesi diindeks ulang oleh ``sync`` berikutnya.
+        """
+        self._refresh()
+        row_bytes = 4 * self.dim
+        tmp_vectors = self.vectors_path.with_name(f".{self.vectors_path.name}.{os.getpid()}.tmp")
+        tmp_log = self.log_path.with_name(f".{self.log_path.name}.{os.getpid()}.tmp")
+        lines = [json.dumps({'version': SEMANTIC_VERSION, 'dim': self.dim})]
+        row = 0
+        with open(self.vectors_path, 'rb') as src, open(tmp_vectors, 'wb') as dst:
+            for key, spans in self._rows.items():
+                for first, start, count in spans:
+                    src.seek(first * row_bytes)
+                    data = src.read(count * row_bytes)
+                    count = len(data) // row_bytes
+                    if not count:
+                        continue
+                    dst.write(data[:count * row_bytes])
+                    lines.append(json.dumps({'key': key, 'row': row, 'start': start, 'count': count},
+                                            ensure_ascii=False, separators=(',', ':')))
+                    row += count
+        with open(tmp_log, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        self.log_path.unlink()
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_log, self.log_path)
+        metrics.inc('semantic_compactions_total')
+        self._reset_memory()
+        self._refresh()
+
+    def clear(self) -> None:
+        """Hapus matriks dan log dari disk."""
+        for path in (self.vectors_path, self.log_path):
+            if path.exists():
+                path.unlink()
+        self._reset_memory()
+        self._loaded = True
+
+    def sync(self, keys: Iterable[str], load: Callable[[str], Sequence[Mapping]]) -> None:
+        """Samakan isi indeks dengan daftar sesi yang ada.
+
+        Args:
+            keys: Kunci semua sesi yang ada
+            load: Fungsi kunci -> pesan untuk sesi yang belum punya vektor
+        """
+        try:
+            indexed = self.sessions
+        except ValueError:
+            self.clear()
+            indexed = set()
+        keys = set(keys)
+        for key in indexed - keys:
+            self.remove_session(key)
+        for key in sorted(keys - indexed):
+            try:
+                messages = load(key)
+            except (ValueError, KeyError, OSError):
+                continue
+            self.add_messages(key, messages)
+
+    def _load_matrix(self, np: Any) -> Any:
+        """Matriks float32 (baris x dim); hanya bagian baru file yang dibaca."""
+        try:
+            rows = self.vectors_path.stat().st_size // (4 * self.dim)
+        except FileNotFoundError:
+            rows = 0
+        cached = 0 if self._matrix is None else len(self._matrix)
+        if rows < cached:
+            self._matrix, cached = None, 0
+        if self._matrix is None or rows > cached:
+            tail = np.fromfile(self.vectors_path, dtype=np.float32, count=(rows - cached) * self.dim,
+                               offset=cached * 4 * self.dim).reshape(-1, self.dim)
+            self._matrix = tail if self._matrix is None else np.concatenate([self._matrix, tail])
+        return self._matrix
+
+    def _live_rows(self, np: Any, rows: int) -> Tuple[Any, List[Tuple[str, int]]]:
+        """Nomor baris milik sesi yang masih ada beserta (kunci, nomor pesan)-nya."""
+        if self._live is None or self._live[2] != rows:
+            indices, refs = [], []
+            for key, spans in self._rows.items():
+                for first, start, count in spans:
+                    for j in range(count):
+                        if first + j < rows:
+                            indices.append(first + j)
+                            refs.append((key, start + j))
+            self._live = (np.asarray(indices, dtype=np.intp), refs, rows)
+        return self._live[0], self._live[1]
+
+    def search(self, text: str, limit: Optional[int] = 10) -> List[Hit]:
+        """Pesan paling mirip dengan ``text`` berdasarkan kemiripan kosinus.
+
+        Returns:
+            List[Hit]: (kunci sesi, nomor pesan, skor) terurut menurun
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("Pencarian semantik membutuhkan NumPy: pip install numpy") from None
+
+        self._refresh()
+        matrix = self._load_matrix(np)
+        rows, refs = self._live_rows(np, len(matrix))
+        if not len(rows) or limit == 0:
+            return []
+
+        query = np.frombuffer(embed(text, self.dim), dtype=np.float32)
+        # Vektor sudah ternormalisasi: hasil kali titik = kemiripan kosinus
+        scores = (matrix @ query)[rows]
+        k = len(scores) if limit is None else min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(refs[i][0], refs[i][1], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def semantic_search(storage, query: str, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+    """Cari pesan yang maknanya mirip ``query`` di ``ChatHistory``/``SQLiteChatHistory``.
+
+    Sesi yang belum punya vektor (disimpan sebelum indeks semantik aktif atau
+    oleh proses lain) diindeks terlebih dahulu.
+
+    Returns:
+        List[SearchResult]: Hasil dengan skor kemiripan kosinus menurun
+    """
+    from .query import make_snippet
+
+    if not query.strip():
+        return []
+    with metrics.timer('storage_semantic_search_seconds'):
+        sources = storage._semantic_sources()
+        storage.semantic.sync(sources, lambda key: storage.load_chat(sources[key]).get('messages', []))
+        hits = storage.semantic.search(query, limit)
+
+        sessions: Dict[str, Dict[str, Any]] = {}
+        results = []
+        for key, index, score in hits:
+            if key not in sessions:
+                try:
+                    sessions[key] = storage.load_chat(sources[key])
+                except (ValueError, KeyError, OSError):
+                    sessions[key] = {}
+            data = sessions[key]
+            messages = data.get('messages', [])
+            if index >= len(messages):
+                continue
+            msg = messages[index]
+            content = msg.get('content', '')
+            results.append({
+                'session': data.get('session_name') or 'Tanpa Judul',
+                'content': content,
+                'role': msg.get('role', 'unknown'),
+                'snippet': make_snippet(content, (0, 0)),
+                'filepath': str(sources[key]),
+                'score': score
+            })
+    metrics.inc('storage_search_results_total', len(results))
+    return results
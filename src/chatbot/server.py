@@ -0,0 +1,642 @@
+"""
+Mode server HTTP lokal di atas ``AsyncChatbot`` (hanya stdlib/asyncio).
+
+Endpoint (body dan respons JSON, kecuali chat streaming):
+
+- ``GET /health``: status server dan jumlah sesi aktif
+- ``POST /sessions``: buat sesi baru -> ``{"session_id"}``
+- ``GET /sessions``: sesi aktif dan sesi tersimpan (``?limit=&offset=``)
+- ``POST /sessions/load``: ``{"filepath"}`` -> sesi baru dari riwayat tersimpan
+- ``POST /sessions/<id>/chat``: ``{"message"}`` -> ``{"response"}``; dengan
+  ``"stream": true`` respons dialirkan sebagai teks (chunked) saat tiba
+- ``POST /sessions/<id>/save``: ``{"name"}`` -> ``{"filepath"}`` (snapshot baru)
+- ``DELETE /sessions/<id>``: tulis sesi ke jurnal lalu tutup -> ``{"filepath"}``
+- ``GET /search?q=...``: pencarian riwayat (``mode=ranked|semantic|plain``, ``limit``)
+
+Sesi aktif dipegang ``SessionPool`` yang dibatasi ``SERVER_MAX_SESSIONS``.
+Saat penuh, sesi yang paling lama tidak dipakai ditulis ke jurnal di
+penyimpanan riwayat lalu dikeluarkan dari memori; permintaan berikutnya untuk
+ID tersebut memuatnya kembali secara otomatis. Jurnal hanya ditambah pesan
+baru, sehingga sesi yang berulang kali dikeluarkan tetap murah ditulis. Pool
+hanya mengingat jurnal ``SERVER_MAX_JOURNALS`` sesi terakhir; sesi yang lebih
+lama dimuat lewat ``/sessions/load`` dengan path jurnalnya.
+
+Permintaan ke model dibatasi ``MAX_CONCURRENT_REQUESTS`` (semaphore
+``AsyncChatbot``) dan koneksi bersamaan dibatasi ``SERVER_MAX_CONNECTIONS``;
+koneksi di atas batas langsung dijawab 503.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import re
+import signal
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .aio import AsyncChatbot, AsyncSession
+from .config import Config
+from .metrics import registry as metrics
+from .storage import ChatHistory
+
+# Jumlah header maksimum per permintaan
+MAX_HEADERS = 100
+
+SEARCH_MODES = ('ranked', 'semantic', 'plain')
+
+
+class HTTPError(Exception):
+    """Kesalahan yang dijawab dengan status HTTP tertentu."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+    version: str
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    def json(self) -> Dict[str, Any]:
+        """Body sebagai objek JSON (kosong = ``{}``).
+
+        Raises:
+            HTTPError: Jika body bukan objek JSON
+        """
+        if not self.body.strip():
+            return {}
+        try:
+            data = json.loads(self.body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPError(400, f"Body bukan JSON yang valid: {e}") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body harus berupa objek JSON")
+        return data
+
+
+async def read_request(reader: asyncio.StreamReader, max_body: int) -> Optional[Request]:
+    """Baca satu permintaan HTTP/1.x; None jika koneksi ditutup klien.
+
+    Raises:
+        HTTPError: Jika permintaan tidak valid atau body terlalu besar
+    """
+    try:
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "Baris permintaan tidak valid") from None
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(431, "Terlalu banyak header")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+    except ValueError:
+        # Baris melebihi batas StreamReader
+        raise HTTPError(431, "Header terlalu panjang") from None
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise HTTPError(411, "Body chunked tidak didukung; kirim Content-Length")
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HTTPError(400, "Content-Length tidak valid") from None
+    if length < 0:
+        raise HTTPError(400, "Content-Length tidak valid")
+    if length > max_body:
+        raise HTTPError(413, f"Body melebihi {max_body} byte")
+    body = await reader.readexactly(length) if length else b''
+
+    url = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    return Request(method.upper(), unquote(url.path), query, headers, body, version.upper())
+
+
+def error_status(error: BaseException) -> Tuple[int, str]:
+    """Status HTTP dan pesan untuk sebuah kesalahan handler."""
+    if isinstance(error, HTTPError):
+        return error.status, str(error)
+    if isinstance(error, (KeyError, FileNotFoundError)):
+        return 404, str(error.args[0] if isinstance(error, KeyError) and error.args else error)
+    if isinstance(error, ValueError):
+        return 400, str(error)
+    if isinstance(error, RuntimeError):
+        # Kegagalan model dari AsyncChatbot
+        return 502, str(error)
+    return 500, f"Kesalahan internal: {error}"
+
+
+class SessionPool:
+    """Sesi ``AsyncChatbot`` yang aktif di memori dengan batas jumlah dan eviksi LRU.
+
+    Sesi yang sedang dipakai (lewat ``use``) atau sedang menunggu model tidak
+    pernah dikeluarkan; jika semuanya sibuk, batas dilampaui sementara.
+    """
+
+    def __init__(self, bot: AsyncChatbot, max_sessions: Optional[int] = None, max_journals: Optional[int] = None):
+        """
+        Args:
+            bot: Chatbot asinkron pemilik sesi dan penyimpanan
+            max_sessions: Jumlah sesi aktif maksimum (default: Config.SERVER_MAX_SESSIONS)
+            max_journals: Jumlah jurnal sesi yang diingat (default: Config.SERVER_MAX_JOURNALS)
+        """
+        self.bot = bot
+        self.max_sessions = max(1, max_sessions or Config.SERVER_MAX_SESSIONS)
+        self.max_journals = max(1, max_journals or Config.SERVER_MAX_JOURNALS)
+        # ID sesi aktif, yang paling lama tidak dipakai di depan
+        self._lru: OrderedDict[str, None] = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        # ID sesi -> (path jurnal, jumlah pesan yang sudah tertulis), yang paling
+        # lama tidak dipakai di depan
+        self._journals: OrderedDict[str, Tuple[str, int]] = OrderedDict()
+        # Sesi yang sedang ditulis ke jurnal sebelum dikeluarkan
+        self._evicting: Dict[str, AsyncSession] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self.bot.sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return (session_id in self.bot.sessions or session_id in self._evicting
+                or session_id in self._journals)
+
+    @property
+    def live_ids(self) -> List[str]:
+        """ID sesi yang ada di memori, terlama dipakai lebih dulu."""
+        return list(self._lru)
+
+    async def create(
+        self,
+        session_id: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Buat sesi baru di pool dan kembalikan ID-nya.
+
+        Raises:
+            ValueError: Jika ID sudah dipakai
+        """
+        if session_id is not None and session_id in self:
+            raise ValueError(f"Sesi sudah ada: {session_id}")
+        session_id = self.bot.create_session(session_id, messages)
+        self._lru[session_id] = None
+        await self._evict()
+        return session_id
+
+    @asynccontextmanager
+    async def use(self, session_id: str) -> AsyncIterator[AsyncSession]:
+        """Pakai sebuah sesi; sesi yang sudah dikeluarkan dimuat kembali.
+
+        Raises:
+            KeyError: Jika sesi tidak dikenal
+        """
+        # Disematkan sebelum menunggu apa pun agar tidak ikut dikeluarkan
+        self._pins[session_id] = self._pins.get(session_id, 0) + 1
+        try:
+            yield await self._acquire(session_id)
+        finally:
+            self._pins[session_id] -= 1
+            if not self._pins[session_id]:
+                del self._pins[session_id]
+
+    async def _acquire(self, session_id: str) -> AsyncSession:
+        while session_id not in self.bot.sessions:
+            if session_id in self._evicting:
+                # Masih ditulis ke jurnal: pakai kembali objek yang sama
+                self.bot.sessions[session_id] = self._evicting.pop(session_id)
+            elif session_id in self._journals:
+                self._journals.move_to_end(session_id)
+                await self._reload(session_id)
+            else:
+                raise KeyError(f"Sesi tidak ditemukan: {session_id}")
+        self._lru[session_id] = None
+        self._lru.move_to_end(session_id)
+        await self._evict()
+        return self.bot.sessions[session_id]
+
+    async def _reload(self, session_id: str) -> None:
+        # Permintaan bersamaan untuk sesi yang sama menunggu satu pemuatan
+        future = self._loading.get(session_id)
+        if future is None:
+            future = asyncio.ensure_future(self._load(session_id))
+            self._loading[session_id] = future
+            future.add_done_callback(lambda _: self._loading.pop(session_id, None))
+        await future
+
+    async def _load(self, session_id: str) -> None:
+        filepath, _ = self._journals[session_id]
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, self.bot.storage.load_chat, filepath)
+        if session_id not in self.bot.sessions:
+            self.bot.create_session(session_id, data.get('messages', []))
+            self._lru[session_id] = None
+            metrics.inc('server_sessions_reloaded_total')
+
+    def _idle(self, session_id: str) -> bool:
+        session = self.bot.sessions[session_id]
+        return not self._pins.get(session_id) and not session.lock.locked() and not session.tasks
+
+    async def _evict(self) -> None:
+        while len(self.bot.sessions) > self.max_sessions:
+            victim = next((sid for sid in self._lru if self._idle(sid)), None)
+            if victim is None:
+                return
+            del self._lru[victim]
+            session = self.bot.sessions.pop(victim)
+            self._evicting[victim] = session
+            try:
+                await self.persist(victim, session)
+            except (IOError, OSError):
+                # Riwayat tidak boleh hilang: kembalikan ke memori dan coba lagi nanti
+                metrics.inc('server_eviction_errors_total')
+                if self._evicting.pop(victim, None) is not None:
+                    self.bot.sessions[victim] = session
+                    self._lru[victim] = None
+                    self._lru.move_to_end(victim, last=False)
+                return
+            # Sesi yang dipakai lagi selama ditulis sudah kembali ke memori
+            if self._evicting.pop(victim, None) is not None:
+                metrics.inc('server_sessions_evicted_total')
+
+    async def persist(self, session_id: str, session: AsyncSession) -> str:
+        """Tulis pesan sesi yang belum tersimpan ke jurnalnya.
+
+        Returns:
+            str: Path jurnal sesi
+        """
+        loop = asyncio.get_running_loop()
+        storage = self.bot.storage
+        async with session.lock:
+            messages = list(session.messages)
+            filepath, written = self._journals.get(session_id, (None, 0))
+            if filepath is None:
+                # ID sesi unik, sehingga nama jurnal tidak bertabrakan
+                filepath = await loop.run_in_executor(None, storage.create_journal, messages, session_id)
+            elif len(messages) > written:
+                await loop.run_in_executor(
+                    None, storage.append_to_journal, filepath, messages[written:], written
+                )
+            self._journals[session_id] = (filepath, len(messages))
+            self._journals.move_to_end(session_id)
+            self._forget_journals()
+            return filepath
+
+    def _forget_journals(self) -> None:
+        # Lupakan jurnal sesi yang sudah dikeluarkan jika melewati batas; file
+        # jurnalnya tetap ada di riwayat. Jurnal sesi di memori selalu diingat
+        # agar pesan berikutnya ditambahkan ke file yang sama.
+        excess = len(self._journals) - self.max_journals
+        if excess <= 0:
+            return
+        dormant: List[str] = []
+        for sid in self._journals:
+            if len(dormant) == excess:
+                break
+            if sid not in self.bot.sessions and sid not in self._evicting and sid not in self._loading:
+                dormant.append(sid)
+        for sid in dormant:
+            del self._journals[sid]
+        if dormant:
+            metrics.inc('server_journals_forgotten_total', len(dormant))
+
+    async def close(self, session_id: str) -> str:
+        """Tulis sesi ke jurnal lalu lupakan ID-nya.
+
+        Returns:
+            str: Path jurnal, bisa dimuat lagi lewat ``/sessions/load``
+        """
+        async with self.use(session_id) as session:
+            filepath = await self.persist(session_id, session)
+            self.bot.close_session(session_id)
+            self._lru.pop(session_id, None)
+            self._journals.pop(session_id, None)
+        return filepath
+
+    async def flush(self) -> int:
+        """Tulis semua sesi aktif ke jurnal (saat server berhenti).
+
+        Returns:
+            int: Jumlah sesi yang ditulis
+        """
+        count = 0
+        for session_id in list(self._lru):
+            session = self.bot.sessions.get(session_id)
+            if session is not None:
+                await self.persist(session_id, session)
+                count += 1
+        return count
+
+
+ROUTES = [
+    ('GET', re.compile(r'/health'), 'health'),
+    ('GET', re.compile(r'/sessions'), 'list_sessions'),
+    ('POST', re.compile(r'/sessions'), 'create_session'),
+    ('POST', re.compile(r'/sessions/load'), 'load_session'),
+    ('POST', re.compile(r'/sessions/(?P<session_id>[^/]+)/chat'), 'chat'),
+    ('POST', re.compile(r'/sessions/(?P<session_id>[^/]+)/save'), 'save_session'),
+    ('DELETE', re.compile(r'/sessions/(?P<session_id>[^/]+)'), 'close_session'),
+    ('GET', re.compile(r'/search'), 'search'),
+]
+
+
+class ChatServer:
+    """Server HTTP asyncio untuk ``AsyncChatbot``."""
+
+    def __init__(
+        self,
+        bot: Optional[AsyncChatbot] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        max_body: Optional[int] = None
+    ):
+        """
+        Args:
+            bot: Chatbot asinkron (default: dibuat sesuai Config)
+            host: Alamat (default: Config.SERVER_HOST)
+            port: Port, 0 = pilih port bebas (default: Config.SERVER_PORT)
+            max_sessions: Jumlah sesi aktif di memori (default: Config.SERVER_MAX_SESSIONS)
+            max_connections: Koneksi bersamaan (default: Config.SERVER_MAX_CONNECTIONS)
+            max_body: Ukuran body maksimum dalam byte (default: Config.SERVER_MAX_BODY_BYTES)
+        """
+        self.bot = bot or AsyncChatbot()
+        self.pool = SessionPool(self.bot, max_sessions)
+        self.host = host or Config.SERVER_HOST
+        self.port = Config.SERVER_PORT if port is None else port
+        self.max_connections = max_connections or Config.SERVER_MAX_CONNECTIONS
+        self.max_body = max_body or Config.SERVER_MAX_BODY_BYTES
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> Tuple[str, int]:
+        """Mulai menerima koneksi.
+
+        Returns:
+            Tuple[str, int]: Alamat dan port yang dipakai
+        """
+        self._server = await asyncio.start_server(self._on_connect, self.host, self.port)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return host, port
+
+    async def close(self) -> int:
+        """Berhenti menerima koneksi, tutup koneksi terbuka, dan simpan semua sesi.
+
+        Returns:
+            int: Jumlah sesi yang ditulis ke jurnal
+        """
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        return await self.pool.flush()
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if len(self._writers) >= self.max_connections:
+            metrics.inc('server_rejected_connections_total')
+            try:
+                await self._write_json(writer, 503, {'error': "Server sedang penuh, coba lagi nanti"}, False)
+            except ConnectionError:
+                pass
+            writer.close()
+            return
+
+        self._writers.add(writer)
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await read_request(reader, self.max_body)
+                except HTTPError as e:
+                    await self._write_json(writer, e.status, {'error': str(e)}, False)
+                    break
+                if request is None:
+                    break
+                keep_alive = await self._respond(request, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _match(self, request: Request) -> Tuple[str, Dict[str, str]]:
+        allowed = False
+        for method, pattern, name in ROUTES:
+            found = pattern.fullmatch(request.path)
+            if found is None:
+                continue
+            if method == request.method:
+                return name, found.groupdict()
+            allowed = True
+        if allowed:
+            raise HTTPError(405, f"Metode {request.method} tidak didukung untuk {request.path}")
+        raise HTTPError(404, f"Endpoint tidak ditemukan: {request.path}")
+
+    async def _respond(self, request: Request, writer: asyncio.StreamWriter) -> bool:
+        """Jawab satu permintaan; False jika koneksi harus ditutup."""
+        keep_alive = request.keep_alive
+        route = 'unknown'
+        start = time.perf_counter()
+        try:
+            route, params = self._match(request)
+            status, payload = await getattr(self, f'_handle_{route}')(request, **params)
+            if hasattr(payload, '__aiter__'):
+                keep_alive = await self._write_stream(writer, payload, keep_alive) and keep_alive
+            else:
+                await self._write_json(writer, status, payload, keep_alive)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            status, message = error_status(e)
+            await self._write_json(writer, status, {'error': message}, keep_alive)
+        metrics.inc('server_requests_total', route=route, status=str(status))
+        metrics.observe('server_request_seconds', time.perf_counter() - start, route=route)
+        return keep_alive
+
+    @staticmethod
+    def _head(status: int, headers: Dict[str, str], keep_alive: bool) -> bytes:
+        headers = dict(headers, Connection='keep-alive' if keep_alive else 'close')
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _write_json(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(self._head(status, {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Content-Length': str(len(body)),
+        }, keep_alive) + body)
+        await writer.drain()
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, chunks: AsyncIterator[str], keep_alive: bool) -> bool:
+        """Kirim potongan teks dengan Transfer-Encoding chunked.
+
+        Potongan pertama ditunggu sebelum header dikirim, sehingga kegagalan
+        awal masih bisa dijawab dengan status kesalahan biasa.
+
+        Returns:
+            bool: False jika respons terputus di tengah jalan
+        """
+        iterator = chunks.__aiter__()
+        try:
+            first = await iterator.__anext__()
+        except StopAsyncIteration:
+            first = ''
+        try:
+            writer.write(self._head(200, {
+                'Content-Type': 'text/plain; charset=utf-8',
+                'Transfer-Encoding': 'chunked',
+            }, keep_alive))
+            text = first
+            while True:
+                if text:
+                    data = text.encode('utf-8')
+                    writer.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+                    await writer.drain()
+                try:
+                    text = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+            writer.write(b'0\r\n\r\n')
+            await writer.drain()
+            return True
+        except Exception:
+            # Header sudah terkirim: putuskan koneksi agar klien tahu respons tidak lengkap
+            metrics.inc('server_stream_errors_total')
+            return False
+        finally:
+            await iterator.aclose()
+
+    def _session_path(self, value: Any) -> str:
+        """Path sesi dari body permintaan; untuk ``ChatHistory`` harus di dalam direktori riwayat."""
+        if not isinstance(value, (str, int)) or value == '':
+            raise HTTPError(400, "Field 'filepath' wajib diisi")
+        storage = self.bot.storage
+        if not isinstance(storage, ChatHistory):
+            return value
+        base = storage.storage_dir.resolve()
+        path = (base / str(value)).resolve()
+        try:
+            path.relative_to(base)
+        except ValueError:
+            raise HTTPError(400, "Path sesi harus berada di direktori riwayat chat") from None
+        return str(path)
+
+    async def _run(self, fn, *args) -> Any:
+        # Operasi penyimpanan bersifat blocking; jalankan di thread pekerja
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def _handle_health(self, request: Request) -> Tuple[int, Any]:
+        return 200, {'status': 'ok', 'sessions': len(self.pool), 'max_sessions': self.pool.max_sessions}
+
+    async def _handle_list_sessions(self, request: Request) -> Tuple[int, Any]:
+        try:
+            limit = int(request.query['limit']) if 'limit' in request.query else None
+            offset = int(request.query.get('offset', 0))
+        except ValueError:
+            raise HTTPError(400, "limit dan offset harus berupa angka") from None
+        saved = await self._run(self.bot.storage.list_sessions, limit, offset)
+        return 200, {'active': self.pool.live_ids, 'saved': saved}
+
+    async def _handle_create_session(self, request: Request) -> Tuple[int, Any]:
+        body = request.json()
+        session_id = await self.pool.create(body.get('session_id') or None)
+        return 201, {'session_id': session_id}
+
+    async def _handle_load_session(self, request: Request) -> Tuple[int, Any]:
+        filepath = self._session_path(request.json().get('filepath'))
+        data = await self._run(self.bot.storage.load_chat, filepath)
+        session_id = await self.pool.create(None, data.get('messages', []))
+        return 201, {'session_id': session_id, 'session_name': data.get('session_name')}
+
+    async def _handle_chat(self, request: Request, session_id: str) -> Tuple[int, Any]:
+        body = request.json()
+        message = body.get('message')
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "Field 'message' wajib diisi")
+        if body.get('stream') or request.query.get('stream', '').lower() in ('1', 'true'):
+            return 200, self._stream_chat(session_id, message)
+        async with self.pool.use(session_id):
+            text = await self.bot.get_response(session_id, message)
+        return 200, {'session_id': session_id, 'response': text}
+
+    async def _stream_chat(self, session_id: str, message: str) -> AsyncIterator[str]:
+        async with self.pool.use(session_id):
+            async for chunk in self.bot.stream_response(session_id, message):
+                yield chunk
+
+    async def _handle_save_session(self, request: Request, session_id: str) -> Tuple[int, Any]:
+        name = request.json().get('name') or None
+        async with self.pool.use(session_id) as session:
+            messages = list(session.messages)
+        filepath = await self._run(self.bot.storage.save_chat, messages, name)
+        return 201, {'session_id': session_id, 'filepath': filepath}
+
+    async def _handle_close_session(self, request: Request, session_id: str) -> Tuple[int, Any]:
+        filepath = await self.pool.close(session_id)
+        return 200, {'session_id': session_id, 'filepath': filepath}
+
+    async def _handle_search(self, request: Request) -> Tuple[int, Any]:
+        query = request.query.get('q', '')
+        mode = request.query.get('mode', 'ranked')
+        if mode not in SEARCH_MODES:
+            raise HTTPError(400, f"Mode pencarian tidak dikenal: {mode} (pilih: {', '.join(SEARCH_MODES)})")
+        try:
+            limit = int(request.query.get('limit', Config.SEARCH_LIMIT))
+        except ValueError:
+            raise HTTPError(400, "limit harus berupa angka") from None
+        storage = self.bot.storage
+        if mode == 'ranked':
+            results = await self._run(storage.ranked_search, query, limit)
+        elif mode == 'semantic':
+            results = await self._run(storage.semantic_search, query, limit)
+        else:
+            results = (await self._run(storage.search_messages, query))[:limit]
+        return 200, {'query': query, 'mode': mode, 'results': results}
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, max_sessions: Optional[int] = None) -> None:
+    """Jalankan server sampai dihentikan (Ctrl+C atau SIGTERM); sesi aktif disimpan saat berhenti."""
+    async def run() -> None:
+        server = ChatServer(host=host, port=port, max_sessions=max_sessions)
+        address, bound_port = await server.start()
+        print(f"Server berjalan di http://{address}:{bound_port} "
+              f"(model {server.bot.model_name}, maks {server.pool.max_sessions} sesi aktif)")
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                # Windows: Ctrl+C tetap dihentikan lewat KeyboardInterrupt
+                pass
+        try:
+            await stop.wait()
+        finally:
+            flushed = await server.close()
+            print(f"Server berhenti; {flushed} sesi aktif disimpan.")
+
+    asyncio.run(run())
@@ -0,0 +1,553 @@
+"""
+Penyimpanan riwayat chat di SQLite dengan pencarian teks penuh FTS5.
+
+Alternatif untuk ``ChatHistory`` berbasis direktori dengan antarmuka yang
+sama. Semua sesi berada di satu file database (mode WAL) dengan tabel
+``sessions`` dan ``messages``; setiap penulisan berjalan dalam transaksi.
+
+Pencarian memakai tabel FTS5 dengan tokenizer trigram sehingga semantiknya
+sama dengan ``ChatHistory`` (substring tanpa memperhatikan huruf besar),
+tetapi diurutkan berdasarkan relevansi (bm25) dan dilengkapi cuplikan.
+Kueri yang lebih pendek dari tiga karakter dijawab dengan pemindaian ``LIKE``.
+
+Sesi dirujuk dengan string ``"<path database>#<id sesi>"`` yang berperan
+seperti path file pada ``ChatHistory``.
+"""
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .config import Config
+from .metrics import registry as metrics
+from .query import ParsedQuery, make_snippet, parse_query
+from .semantic import SemanticIndex, semantic_search
+from .storage import ChatHistory, SearchResult
+
+SCHEMA_VERSION = 1
+
+# Pemisah antara path database dan ID sesi dalam rujukan sesi
+REF_SEPARATOR = '#'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    created_at TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    source TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS sessions_created_at ON sessions(created_at);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    extra TEXT,
+    UNIQUE (session_id, position)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, content='messages', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+# Panjang minimum kueri untuk tokenizer trigram
+MIN_FTS_QUERY = 3
+
+
+def _like_pattern(text: str) -> str:
+    """Pola ``LIKE`` (dengan escape ``\\``) untuk mencari ``text`` sebagai substring."""
+    return '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+class SQLiteChatHistory:
+    """Penyimpanan riwayat chat di satu database SQLite."""
+
+    def __init__(
+        self,
+        db_path: Union[str, Path] = 'chat_history/chat.sqlite3',
+        storage_dir: Optional[Union[str, Path]] = None
+    ):
+        """
+        Args:
+            db_path: Path file database
+            storage_dir: Direktori untuk file ekspor (default: direktori database)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self.storage_dir = Path(storage_dir) if storage_dir else self.db_path.parent
+        self._lock = threading.Lock()
+        # Satu koneksi dipakai bersama antar-thread (AsyncChatbot memakai executor)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+        # Vektor semantik disimpan di samping database (seperti file -wal)
+        self.semantic = SemanticIndex(self.db_path.with_name(self.db_path.name + '-vectors'))
+        self._semantic_lock = threading.Lock()
+
+    def _init_schema(self) -> None:
+        with self._lock:
+            conn = self._conn
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version > SCHEMA_VERSION:
+                raise ValueError(f"Versi skema database tidak didukung: {version}")
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Tutup koneksi database."""
+        with self._lock:
+            self._conn.close()
+
+    def _ref(self, session_id: int) -> str:
+        return f"{self.db_path.resolve()}{REF_SEPARATOR}{session_id}"
+
+    @staticmethod
+    def _session_id(ref: Union[str, Path, int]) -> int:
+        """Ambil ID sesi dari rujukan ``db#id`` (atau ID langsung)."""
+        if isinstance(ref, int):
+            return ref
+        _, sep, session_id = str(ref).rpartition(REF_SEPARATOR)
+        if not sep or not session_id.isdigit():
+            raise ValueError(f"Rujukan sesi SQLite tidak valid: {ref}")
+        return int(session_id)
+
+    @staticmethod
+    def _message_row(session_id: int, position: int, msg: Dict[str, Any]) -> Tuple:
+        # Kolom selain role/content disimpan apa adanya agar load_chat mengembalikan pesan utuh
+        extra = {k: v for k, v in msg.items() if k not in ('role', 'content')}
+        role, content = msg.get('role', 'user'), msg.get('content', '')
+        # Kolom role/content NOT NULL TEXT: nilai lain (mis. null dari file rusak)
+        # disimpan di extra, yang menimpa kolomnya saat dimuat
+        if not isinstance(role, str):
+            extra['role'], role = role, 'user'
+        if not isinstance(content, str):
+            extra['content'], content = content, ''
+        return (
+            session_id, position, role, content,
+            json.dumps(extra, ensure_ascii=False) if extra else None
+        )
+
+    def _insert_session(
+        self,
+        messages: List[Dict[str, Any]],
+        session_name: Optional[str],
+        created_at: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> Optional[int]:
+        """Sisipkan satu sesi (tanpa transaksi; dipanggil di dalam ``with self._lock``)."""
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO sessions (name, created_at, message_count, source) VALUES (?, ?, ?, ?)",
+            (session_name, created_at or datetime.now().isoformat(), len(messages), source)
+        )
+        if not cursor.rowcount:
+            return None
+        session_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT INTO messages (session_id, position, role, content, extra) VALUES (?, ?, ?, ?, ?)",
+            (self._message_row(session_id, i, msg) for i, msg in enumerate(messages))
+        )
+        return session_id
+
+    def save_chat(
+        self,
+        messages: List[Dict[str, str]],
+        session_name: Optional[str] = None
+    ) -> str:
+        """Simpan riwayat chat sebagai sesi baru.
+
+        Returns:
+            str: Rujukan sesi (``db#id``)
+
+        Raises:
+            ValueError: Jika tidak ada pesan
+            IOError: Jika gagal menulis ke database
+        """
+        if not messages:
+            raise ValueError("Tidak ada pesan untuk disimpan")
+
+        try:
+            with metrics.timer('storage_save_seconds'), self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    session_id = self._insert_session(messages, session_name)
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            raise IOError(f"Gagal menyimpan chat ke {self.db_path}: {e}")
+        self._embed_messages(session_id, messages)
+        return self._ref(session_id)
+
+    def _embed_messages(self, session_id: int, messages: List[Dict[str, str]], start: int = 0) -> None:
+        """Perbarui indeks semantik untuk pesan yang baru ditulis."""
+        if not Config.SEMANTIC_INDEX:
+            return
+        try:
+            with self._semantic_lock:
+                self.semantic.add_messages(str(session_id), messages, start)
+        except (ValueError, OSError):
+            # Sesi yang terlewat diindeks saat pencarian semantik berikutnya
+            pass
+
+    def create_journal(
+        self,
+        messages: List[Dict[str, str]],
+        session_name: Optional[str] = None
+    ) -> str:
+        """Buat sesi yang bisa ditambah per pesan (setara jurnal pada ``ChatHistory``)."""
+        return self.save_chat(messages, session_name)
+
+    def append_to_journal(
+        self,
+        filepath: Union[str, Path],
+        messages: List[Dict[str, str]],
+        start: int
+    ) -> None:
+        """Tambahkan pesan baru ke sesi dalam satu transaksi.
+
+        Args:
+            filepath: Rujukan sesi
+            messages: Pesan yang belum tertulis
+            start: Nomor urut pesan pertama di dalam sesi
+
+        Raises:
+            IOError: Jika gagal menulis ke database
+        """
+        if not messages:
+            return
+        session_id = self._session_id(filepath)
+        try:
+            with metrics.timer('storage_journal_append_seconds'), self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO messages (session_id, position, role, content, extra) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (self._message_row(session_id, start + i, msg) for i, msg in enumerate(messages))
+                    )
+                    self._conn.execute(
+                        "UPDATE sessions SET message_count = "
+                        "(SELECT COUNT(*) FROM messages WHERE session_id = ?) WHERE id = ?",
+                        (session_id, session_id)
+                    )
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            raise IOError(f"Gagal menulis sesi {filepath}: {e}")
+        self._embed_messages(session_id, messages, start)
+
+    def update_chat(
+        self,
+        filepath: Union[str, Path],
+        messages: List[Dict[str, str]],
+        start: int = 0,
+        session_name: Optional[str] = None
+    ) -> str:
+        """Perbarui sesi tersimpan dengan riwayat terbaru (dipakai autosave).
+
+        Hanya pesan mulai ``start`` yang ditulis; nama sesi ikut diperbarui.
+
+        Returns:
+            str: Rujukan sesi
+
+        Raises:
+            IOError: Jika gagal menulis ke database
+        """
+        session_id = self._session_id(filepath)
+        self.append_to_journal(filepath, messages[start:], start)
+        try:
+            with self._lock:
+                self._conn.execute("UPDATE sessions SET name = ? WHERE id = ?", (session_name, session_id))
+        except sqlite3.Error as e:
+            raise IOError(f"Gagal menulis sesi {filepath}: {e}")
+        return self._ref(session_id)
+
+    def compact_journal(self, filepath: Union[str, Path]) -> str:
+        """Sesi SQLite sudah padat; rujukannya dikembalikan apa adanya."""
+        return self._ref(self._session_id(filepath))
+
+    def load_chat(self, filepath: Union[str, Path, int]) -> Dict[str, Any]:
+        """Muat satu sesi beserta semua pesannya.
+
+        Raises:
+            KeyError: Jika sesi tidak ditemukan
+        """
+        session_id = self._session_id(filepath)
+        with self._lock:
+            session = self._conn.execute(
+                "SELECT name, created_at FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if session is None:
+                raise KeyError(f"Sesi tidak ditemukan: {filepath}")
+            rows = self._conn.execute(
+                "SELECT role, content, extra FROM messages WHERE session_id = ? ORDER BY position",
+                (session_id,)
+            ).fetchall()
+
+        messages = []
+        for row in rows:
+            msg = {'role': row['role'], 'content': row['content']}
+            if row['extra']:
+                msg.update(json.loads(row['extra']))
+            messages.append(msg)
+        return {
+            'session_name': session['name'],
+            'messages': messages,
+            'created_at': session['created_at'],
+        }
+
+    def count_sessions(self) -> int:
+        """Jumlah sesi tersimpan."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def list_sessions(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Daftar sesi, terbaru lebih dulu, dengan paginasi.
+
+        Args:
+            limit: Jumlah sesi maksimum (None = semua)
+            offset: Jumlah sesi yang dilewati
+
+        Returns:
+            List[Dict[str, Any]]: name, filepath, created_at, message_count
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, name, created_at, message_count FROM sessions "
+                "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset)
+            ).fetchall()
+        return [
+            {
+                'name': row['name'] if row['name'] is not None else 'Tanpa Judul',
+                'filepath': self._ref(row['id']),
+                'created_at': row['created_at'],
+                'message_count': row['message_count']
+            }
+            for row in rows
+        ]
+
+    def export_messages(
+        self,
+        messages: List[Dict[str, str]],
+        fmt: str = 'pdf',
+        session_name: Optional[str] = None
+    ) -> str:
+        """Ekspor riwayat chat ke file PDF, teks, atau Markdown di ``storage_dir``."""
+        return ChatHistory(self.storage_dir).export_messages(messages, fmt, session_name)
+
+    def export_to_pdf(
+        self,
+        messages: List[Dict[str, str]],
+        session_name: Optional[str] = None
+    ) -> str:
+        """Ekspor riwayat chat ke file PDF di ``storage_dir``."""
+        return self.export_messages(messages, 'pdf', session_name)
+
+    def rebuild_index(self) -> int:
+        """Bangun ulang indeks FTS dari tabel pesan.
+
+        Returns:
+            int: Jumlah sesi yang terindeks
+        """
+        with self._semantic_lock:
+            self.semantic.clear()
+        with self._lock:
+            self._conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def semantic_search(self, query: str, limit: Optional[int] = 10) -> List[SearchResult]:
+        """Cari pesan yang maknanya mirip ``query`` (lihat semantic.py)."""
+        with self._semantic_lock:
+            return semantic_search(self, query, limit)
+
+    def _semantic_sources(self) -> Dict[str, str]:
+        """ID sesi (sebagai teks) -> rujukan sesi untuk indeks semantik."""
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute("SELECT id FROM sessions")]
+        return {str(session_id): self._ref(session_id) for session_id in ids}
+
+    def search_messages(self, query: str, limit: Optional[int] = None) -> List[SearchResult]:
+        """Cari pesan yang memuat ``query``, diurutkan berdasarkan relevansi.
+
+        Args:
+            query: Teks yang dicari (substring, tanpa memperhatikan huruf besar)
+            limit: Jumlah hasil maksimum (None = semua)
+        """
+        if not query:
+            return []
+
+        with metrics.timer('storage_search_seconds'):
+            results = list(self._search(query, limit))
+        metrics.inc('storage_search_results_total', len(results))
+        return results
+
+    def _search(self, query: str, limit: Optional[int]) -> Iterator[SearchResult]:
+        limit = -1 if limit is None else limit
+        if len(query) >= MIN_FTS_QUERY:
+            # Seluruh kueri sebagai satu frasa trigram = pencocokan substring
+            phrase = '"' + query.replace('"', '""') + '"'
+            sql = (
+                "SELECT m.session_id, m.role, m.content, s.name, "
+                "snippet(messages_fts, 0, '', '', '...', 16) AS snippet, "
+                "-bm25(messages_fts) AS score "
+                "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                "JOIN sessions s ON s.id = m.session_id "
+                "WHERE messages_fts MATCH ? ORDER BY bm25(messages_fts) LIMIT ?"
+            )
+            params: Tuple = (phrase, limit)
+        else:
+            sql = (
+                "SELECT m.session_id, m.role, m.content, s.name, NULL AS snippet, 0.0 AS score "
+                "FROM messages m JOIN sessions s ON s.id = m.session_id "
+                "WHERE m.content LIKE ? ESCAPE '\\' ORDER BY m.session_id, m.position LIMIT ?"
+            )
+            params = (_like_pattern(query), limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        for row in rows:
+            content = row['content']
+            yield self._row_result(row, row['snippet'] or (content[:100] + '...' if len(content) > 100 else content))
+
+    def _row_result(self, row: sqlite3.Row, snippet: str) -> SearchResult:
+        return {
+            'session': row['name'] if row['name'] is not None else 'Tanpa Judul',
+            'content': row['content'],
+            'role': row['role'],
+            'snippet': snippet,
+            'filepath': self._ref(row['session_id']),
+            'score': row['score']
+        }
+
+    def ranked_search(self, query: str, limit: Optional[int] = 10) -> List[SearchResult]:
+        """Cari dengan sintaks kueri ``query.py``, diurutkan dengan bm25 FTS5.
+
+        Kata dan frasa minimal tiga karakter dicocokkan lewat FTS5, sisanya
+        dengan ``LIKE``; filter menjadi klausa ``WHERE`` dan ``/regex/``
+        diperiksa pada baris hasil.
+
+        Raises:
+            ValueError: Jika kueri tidak valid
+        """
+        parsed = parse_query(query)
+        if parsed.is_empty or limit == 0:
+            return []
+
+        with metrics.timer('storage_search_seconds'):
+            results = list(self._ranked_search(parsed, limit))
+        metrics.inc('storage_search_results_total', len(results))
+        return results
+
+    def _ranked_search(self, parsed: ParsedQuery, limit: Optional[int]) -> Iterator[SearchResult]:
+        needles = parsed.terms + parsed.phrases
+        fts = ['"' + n.replace('"', '""') + '"' for n in needles if len(n) >= MIN_FTS_QUERY]
+        where: List[str] = []
+        params: List[Any] = []
+        if fts:
+            sql = (
+                "SELECT m.session_id, m.role, m.content, s.name, -bm25(messages_fts) AS score "
+                "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                "JOIN sessions s ON s.id = m.session_id"
+            )
+            where.append("messages_fts MATCH ?")
+            params.append(' AND '.join(fts))
+            order = "bm25(messages_fts), m.session_id, m.position"
+        else:
+            sql = (
+                "SELECT m.session_id, m.role, m.content, s.name, 0.0 AS score "
+                "FROM messages m JOIN sessions s ON s.id = m.session_id"
+            )
+            order = "m.session_id, m.position"
+        for needle in needles:
+            if len(needle) < MIN_FTS_QUERY:
+                where.append("m.content LIKE ? ESCAPE '\\'")
+                params.append(_like_pattern(needle))
+        if parsed.role:
+            where.append("lower(m.role) = ?")
+            params.append(parsed.role)
+        if parsed.session:
+            where.append("s.name LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(parsed.session))
+        if parsed.after:
+            where.append("s.created_at >= ?")
+            params.append(parsed.after)
+        if parsed.before:
+            where.append("s.created_at < ?")
+            params.append(parsed.before)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order}"
+        # Baris yang tidak cocok dengan /regex/ baru tersaring di Python
+        if parsed.pattern is None and limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        count = 0
+        for row in rows:
+            span = parsed.match_span(row['content'])
+            if span is None:
+                continue
+            yield self._row_result(row, make_snippet(row['content'], span))
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+    def import_directory(self, source: Union[str, Path, ChatHistory]) -> int:
+        """Impor semua sesi dari direktori ``ChatHistory`` dalam satu transaksi.
+
+        Sesi yang sudah pernah diimpor (berdasarkan path relatifnya) dilewati,
+        sehingga impor aman diulang.
+
+        Returns:
+            int: Jumlah sesi yang baru diimpor
+        """
+        history = source if isinstance(source, ChatHistory) else ChatHistory(source)
+        imported = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, filepath in history._iter_sessions():
+                    try:
+                        data = history.load_chat(filepath)
+                    except (ValueError, KeyError, OSError) as e:
+                        history._warn_corrupt(filepath, e)
+                        continue
+                    session_id = self._insert_session(
+                        data.get('messages', []),
+                        data.get('session_name'),
+                        data.get('created_at'),
+                        source=key
+                    )
+                    if session_id is not None:
+                        imported += 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return imported
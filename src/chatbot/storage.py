@@ -1,11 +1,41 @@
 from __future__ import annotations
 from pathlib import Path
 import json
+import logging
 import re
 import os
-from typing import List, Dict, Any, Optional, TypedDict, Union
-from datetime import datetime
-from fpdf import FPDF
+import secrets
+import sys
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple, TypedDict, Union
+from datetime import datetime, timedelta
+
+from .archive import SessionArchive
+from .fsutil import atomic_write
+from .config import Config
+from .catalog import SessionCatalog
+from .formats import COMPRESSED_SUFFIXES, decode_session, encode_session, format_for_path, get_format, strip_suffix
+from .index import SearchIndex
+from .metrics import registry as metrics
+from .semantic import SemanticIndex, semantic_search
+
+# Direktori tersembunyi untuk metadata (indeks, katalog) di dalam storage_dir
+META_DIR = '.meta'
+# Direktori tersembunyi untuk arsip sesi lama (pack + indeks offset)
+ARCHIVE_DIR = '.archive'
+# Jumlah sesi per penulisan ke arsip (satu fsync per kelompok)
+ARCHIVE_BATCH = 256
+
+# Ekstensi file sesi: snapshot JSON, jurnal JSON Lines (append-only),
+# dan snapshot terkompresi (.json.gz, .json.xz, ...; lihat formats.py)
+SNAPSHOT_SUFFIX = '.json'
+JOURNAL_SUFFIX = '.jsonl'
+SESSION_SUFFIXES = (SNAPSHOT_SUFFIX, JOURNAL_SUFFIX) + COMPRESSED_SUFFIXES
+
+# Tata letak direktori sesi baru: semua file di storage_dir ("flat") atau
+# dibagi ke subdirektori tanggal pembuatan YYYY/MM/DD ("date")
+LAYOUTS = ('flat', 'date')
+
+logger = logging.getLogger(__name__)
 
 class SearchResult(TypedDict):
     session: str
@@ -13,11 +43,30 @@ class SearchResult(TypedDict):
     role: str
     snippet: str
     filepath: str
+    score: float
 
 class ChatHistory:
-    def __init__(self, storage_dir: Union[str, Path] = 'chat_history'):
+    def __init__(self, storage_dir: Union[str, Path] = 'chat_history', layout: Optional[str] = None):
+        """
+        Args:
+            storage_dir: Direktori riwayat chat
+            layout: Tata letak untuk sesi baru (default: Config.STORAGE_LAYOUT);
+                sesi dengan tata letak lain tetap terbaca
+        
+        Raises:
+            ValueError: Jika tata letak tidak dikenal
+        """
+        self.layout = layout or Config.STORAGE_LAYOUT
+        if self.layout not in LAYOUTS:
+            raise ValueError(f"Tata letak penyimpanan tidak dikenal: {self.layout} (pilih: {', '.join(LAYOUTS)})")
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(exist_ok=True, parents=True)
+        self.index = SearchIndex(self.storage_dir / META_DIR / 'search_index.jsonl')
+        self.catalog = SessionCatalog(self.storage_dir / META_DIR / 'catalog.json')
+        self.semantic = SemanticIndex(self.storage_dir / META_DIR / 'vectors')
+        self.archive = SessionArchive(self.storage_dir / ARCHIVE_DIR)
+        # (path, mtime) file rusak yang sudah diperingatkan
+        self._warned: Set[Tuple[str, int]] = set()
     
     def _sanitize_filename(self, filename: str) -> str:
         """Sanitize nama file untuk menghindari karakter yang tidak valid."""
@@ -33,21 +82,92 @@ class ChatHistory:
         return safe_name
     
     def _get_filename(self, session_name: Optional[str] = None, extension: str = 'json') -> str:
-        """Generate nama file dengan timestamp dan nama sesi."""
+        """Generate nama file dengan nama sesi, timestamp, dan akhiran acak.
+        
+        Akhiran acak mencegah dua sesi yang disimpan pada detik yang sama
+        saling menimpa.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_name = self._sanitize_filename(session_name) if session_name else 'chat'
-        return f"{safe_name}_{timestamp}.{extension}"
+        return f"{safe_name}_{timestamp}_{secrets.token_hex(4)}.{extension}"
+    
+    def _shard_dir(self, created: datetime, layout: Optional[str] = None) -> Path:
+        """Direktori untuk sesi yang dibuat pada ``created`` menurut tata letak."""
+        if (layout or self.layout) == 'date':
+            return self.storage_dir / created.strftime('%Y') / created.strftime('%m') / created.strftime('%d')
+        return self.storage_dir
+    
+    def _new_session_path(self, session_name: Optional[str], extension: str) -> Path:
+        """Path unik untuk file sesi baru; direktori shard dibuat bila perlu."""
+        directory = self._shard_dir(datetime.now())
+        directory.mkdir(exist_ok=True, parents=True)
+        return directory / self._get_filename(session_name, extension)
+    
+    def iter_session_files(self) -> Iterator[Path]:
+        """Iterasi semua file sesi, baik di storage_dir maupun di subdirektori shard.
+        
+        Direktori dibaca satu per satu dengan ``os.scandir`` dan hasilnya
+        dialirkan tanpa membangun daftar lengkap, sehingga direktori dengan
+        jutaan sesi tidak perlu dimuat sekaligus. Direktori dan file yang
+        diawali titik (misalnya ``.meta``) dilewati.
+        """
+        pending = [str(self.storage_dir)]
+        while pending:
+            subdirs = []
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1] in SESSION_SUFFIXES:
+                            yield Path(entry.path)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            # Shard dikunjungi berurutan (tanggal terlama dulu)
+            pending.extend(sorted(subdirs, reverse=True))
+    
+    def _iter_sessions(self) -> Iterator[Tuple[str, Path]]:
+        """(kunci, path) semua sesi: file di disk, lalu sesi arsip yang tidak punya file.
+        
+        Path sesi arsip adalah path aslinya (sudah tidak ada di disk);
+        ``load_chat`` memuatnya dari arsip.
+        """
+        on_disk = set()
+        for filepath in self.iter_session_files():
+            key = self._session_key(filepath)
+            on_disk.add(key)
+            yield key, filepath
+        for key in self.archive.keys():
+            if key not in on_disk:
+                yield key, self.storage_dir / key
+    
+    def _session_key(self, filepath: Union[str, Path]) -> str:
+        """Kunci sesi yang stabil: path relatif terhadap storage_dir."""
+        filepath = Path(filepath)
+        try:
+            # Jalur cepat untuk path hasil iterasi storage_dir (tanpa resolve ke disk)
+            return filepath.relative_to(self.storage_dir).as_posix()
+        except ValueError:
+            pass
+        try:
+            return filepath.resolve().relative_to(self.storage_dir.resolve()).as_posix()
+        except ValueError:
+            return filepath.name
     
     def save_chat(
         self, 
         messages: List[Dict[str, str]], 
-        session_name: Optional[str] = None
+        session_name: Optional[str] = None,
+        session_format: Optional[str] = None
     ) -> str:
         """Simpan riwayat chat ke file JSON.
         
         Args:
             messages: Daftar pesan chat
             session_name: Nama sesi (opsional)
+            session_format: Format file (default: Config.SESSION_FORMAT)
             
         Returns:
             str: Path lengkap ke file yang disimpan
@@ -58,134 +178,673 @@ class ChatHistory:
         if not messages:
             raise ValueError("Tidak ada pesan untuk disimpan")
             
-        # Pastikan direktori ada
-        self.storage_dir.mkdir(exist_ok=True, parents=True)
-        
-        # Generate nama file yang aman
-        filename = self._get_filename(session_name, 'json')
-        filepath = self.storage_dir / filename
+        # Generate nama file yang aman (direktori shard dibuat bila perlu)
+        session_format = session_format or Config.SESSION_FORMAT
+        filepath = self._new_session_path(session_name, get_format(session_format).suffix[1:])
         
         data = {
             "session_name": session_name,
-            "messages": messages,
+            "messages": list(messages),
             "created_at": datetime.now().isoformat(),
         }
         
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+        self._write_session(filepath, data, session_format)
+        self._index_session(filepath, messages)
+        self._catalog_session(filepath, data)
+        return str(filepath.resolve())
+    
+    def update_chat(
+        self,
+        filepath: Union[str, Path],
+        messages: List[Dict[str, str]],
+        start: int = 0,
+        session_name: Optional[str] = None
+    ) -> str:
+        """Perbarui sesi tersimpan dengan riwayat terbaru (dipakai autosave).
+        
+        Snapshot ditulis ulang secara atomik dengan format yang sama; jurnal
+        cukup ditambah pesan baru. Tanggal pembuatan sesi dipertahankan.
+        
+        Args:
+            filepath: Path file sesi yang sudah ada
+            messages: Seluruh pesan sesi
+            start: Jumlah pesan awal yang sudah tersimpan dan tidak berubah
+            session_name: Nama sesi
+            
+        Returns:
+            str: Path lengkap ke file sesi
+            
+        Raises:
+            IOError: Jika gagal menulis ke file
+        """
+        filepath = Path(filepath)
+        if filepath.suffix == JOURNAL_SUFFIX:
+            self.append_to_journal(filepath, messages[start:], start)
             return str(filepath.resolve())
+        
+        previous = self.catalog.get(self._session_key(filepath))
+        data = {
+            "session_name": session_name,
+            "messages": list(messages),
+            "created_at": previous.get('created_at') or datetime.now().isoformat(),
+        }
+        self._write_session(filepath, data, format_for_path(filepath.name, Config.SESSION_FORMAT))
+        self._index_session(filepath, messages[start:], start)
+        self._catalog_session(filepath, data)
+        return str(filepath.resolve())
+    
+    def _write_session(self, filepath: Path, data: Dict[str, Any], session_format: str) -> None:
+        """Tulis data sesi ke file dalam format yang dipilih.
+        
+        File ditulis secara atomik (file sementara, fsync, rename), sehingga
+        crash saat menyimpan tidak meninggalkan file setengah tertulis.
+        
+        Raises:
+            IOError: Jika gagal menulis ke file
+        """
+        try:
+            with metrics.timer('storage_save_seconds'):
+                payload = encode_session(data, session_format)
+                atomic_write(filepath, payload)
+            metrics.inc('storage_bytes_saved_total', len(payload))
         except (IOError, OSError) as e:
             raise IOError(f"Gagal menyimpan chat ke {filepath}: {e}")
     
+    @staticmethod
+    def _session_metadata(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Ringkasan sesi yang disimpan di katalog."""
+        return {
+            'name': data.get('session_name', 'Tanpa Judul'),
+            'created_at': data.get('created_at', 'Tidak Diketahui'),
+            'message_count': len(data.get('messages', []))
+        }
+    
+    def _catalog_session(self, filepath: Path, data: Dict[str, Any]) -> None:
+        """Catat metadata sesi yang baru disimpan ke katalog."""
+        try:
+            self.catalog.record(self._session_key(filepath), filepath, self._session_metadata(data))
+        except OSError:
+            # Katalog akan diperbaiki saat validasi berikutnya
+            pass
+    
+    def _index_session(self, filepath: Path, messages: List[Dict[str, str]], start: int = 0) -> None:
+        """Perbarui indeks pencarian (dan indeks semantik) untuk satu file sesi.
+        
+        Dengan ``start`` > 0 pesan ditambahkan ke sesi yang sudah terindeks.
+        """
+        key = self._session_key(filepath)
+        try:
+            if not start:
+                self.index.remove_session(key)
+            self.index.add_messages(key, messages, start)
+        except (ValueError, OSError):
+            # Indeks rusak atau versi lama; akan dibangun ulang saat pencarian
+            pass
+        if Config.SEMANTIC_INDEX:
+            try:
+                if not start:
+                    self.semantic.remove_session(key)
+                self.semantic.add_messages(key, messages, start)
+            except (ValueError, OSError):
+                # Sesi yang terlewat diindeks saat pencarian semantik berikutnya
+                pass
+    
+    def _unindex_session(self, filepath: Path) -> None:
+        """Hapus file sesi yang sudah tidak ada dari indeks."""
+        key = self._session_key(filepath)
+        for index in (self.index, self.semantic):
+            try:
+                index.remove_session(key)
+            except (ValueError, OSError):
+                pass
+    
+    def create_journal(
+        self,
+        messages: List[Dict[str, str]],
+        session_name: Optional[str] = None
+    ) -> str:
+        """Buat jurnal sesi JSON Lines yang bisa ditambah per pesan.
+        
+        Baris pertama berisi header sesi, setiap baris berikutnya satu pesan.
+        
+        Args:
+            messages: Pesan awal yang langsung ditulis ke jurnal
+            session_name: Nama sesi (opsional)
+            
+        Returns:
+            str: Path lengkap ke file jurnal
+            
+        Raises:
+            IOError: Jika gagal menulis ke file
+        """
+        filepath = self._new_session_path(session_name, JOURNAL_SUFFIX[1:])
+        header = {
+            "session_name": session_name,
+            "created_at": datetime.now().isoformat(),
+            "format": "journal",
+        }
+        
+        lines = [json.dumps(header, ensure_ascii=False)]
+        lines.extend(json.dumps(msg, ensure_ascii=False) for msg in messages)
+        
+        # Ditulis atomik seperti _write_session: crash tidak meninggalkan jurnal terpotong
+        try:
+            atomic_write(filepath, ('\n'.join(lines) + '\n').encode('utf-8'))
+        except (IOError, OSError) as e:
+            raise IOError(f"Gagal membuat jurnal di {filepath}: {e}")
+        
+        self._index_session(filepath, messages)
+        self._catalog_session(filepath, dict(header, messages=messages))
+        return str(filepath.resolve())
+    
+    def append_to_journal(
+        self,
+        filepath: Union[str, Path],
+        messages: List[Dict[str, str]],
+        start: int
+    ) -> None:
+        """Tambahkan pesan baru ke akhir jurnal, satu baris per pesan.
+        
+        Args:
+            filepath: Path ke file jurnal
+            messages: Pesan yang belum tertulis
+            start: Nomor urut pesan pertama di dalam sesi
+            
+        Raises:
+            IOError: Jika gagal menulis ke file
+        """
+        if not messages:
+            return
+        
+        filepath = Path(filepath)
+        try:
+            with metrics.timer('storage_journal_append_seconds'):
+                payload = ''.join(json.dumps(msg, ensure_ascii=False) + '\n' for msg in messages)
+                with open(filepath, 'a', encoding='utf-8') as f:
+                    f.write(payload)
+            metrics.inc('storage_bytes_saved_total', len(payload.encode('utf-8')))
+        except (IOError, OSError) as e:
+            raise IOError(f"Gagal menulis jurnal {filepath}: {e}")
+        
+        self._index_session(filepath, messages, start)
+    
+    def compact_journal(self, filepath: Union[str, Path]) -> str:
+        """Padatkan jurnal menjadi satu snapshot JSON lalu hapus jurnalnya.
+        
+        Returns:
+            str: Path lengkap ke file snapshot
+        """
+        filepath = Path(filepath)
+        if filepath.suffix != JOURNAL_SUFFIX:
+            raise ValueError(f"Bukan file jurnal: {filepath}")
+        
+        data = self.load_chat(filepath)
+        data.pop("format", None)
+        snapshot = filepath.with_suffix(get_format(Config.SESSION_FORMAT).suffix)
+        self._write_session(snapshot, data, Config.SESSION_FORMAT)
+        
+        filepath.unlink()
+        self._unindex_session(filepath)
+        self._index_session(snapshot, data.get("messages", []))
+        self._catalog_session(snapshot, data)
+        return str(snapshot.resolve())
+    
     def load_chat(self, filepath: Union[str, Path]) -> Dict[str, Any]:
-        """Muat riwayat chat dari file JSON."""
+        """Muat riwayat chat dari file JSON (biasa, ringkas, atau terkompresi)
+        atau jurnal JSON Lines. Format snapshot dideteksi dari magic bytes.
+        
+        Sesi yang sudah diarsipkan dimuat dari arsip lewat path aslinya.
+        """
+        try:
+            if Path(filepath).suffix == JOURNAL_SUFFIX:
+                return self._load_journal(filepath)
+            with open(filepath, 'rb') as f:
+                return decode_session(f.read())
+        except FileNotFoundError:
+            key = self._session_key(filepath)
+            if key not in self.archive:
+                raise
+            return decode_session(self.archive.read(key))
+    
+    def _load_journal(self, filepath: Union[str, Path]) -> Dict[str, Any]:
+        """Bangun ulang sesi dengan membaca jurnal baris demi baris."""
+        data: Dict[str, Any] = {}
+        messages: List[Dict[str, Any]] = []
+        
         with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            header = f.readline()
+            if header:
+                data.update(json.loads(header))
+            for line in f:
+                if not line.endswith('\n'):
+                    # Baris terakhir terpotong (misalnya proses berhenti saat menulis)
+                    break
+                try:
+                    messages.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        
+        data["messages"] = messages
+        return data
     
-    def export_to_pdf(
-        self, 
-        messages: List[Dict[str, str]], 
+    def _read_metadata(self, filepath: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return self._session_metadata(self.load_chat(filepath))
+        except (ValueError, KeyError, OSError) as e:
+            self._warn_corrupt(filepath, e)
+            return None
+    
+    def _warn_corrupt(self, filepath: Union[str, Path], error: Exception) -> None:
+        """Peringatkan file sesi yang tidak bisa dibaca dan karena itu dilewati.
+        
+        Setiap versi file hanya diperingatkan sekali; file yang terhapus di
+        tengah operasi tidak dianggap rusak.
+        """
+        if isinstance(error, FileNotFoundError):
+            return
+        try:
+            mtime = Path(filepath).stat().st_mtime_ns
+        except OSError:
+            mtime = 0
+        if (str(filepath), mtime) in self._warned:
+            return
+        self._warned.add((str(filepath), mtime))
+        metrics.inc('storage_corrupt_files_total')
+        logger.warning("File sesi rusak dilewati: %s (%s)", filepath, error)
+    
+    def list_sessions(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Daftar sesi tersimpan beserta metadatanya.
+        
+        Metadata diambil dari katalog; hanya file yang baru atau berubah
+        sejak dicatat yang dibaca ulang.
+        
+        Args:
+            limit: Jumlah sesi maksimum (None = semua)
+            offset: Jumlah sesi yang dilewati
+        
+        Returns:
+            List[Dict[str, Any]]: name, filepath, created_at, message_count
+        """
+        files = {self._session_key(p): p for p in self.iter_session_files()}
+        sessions = [
+            {
+                'name': entry.get('name'),
+                'filepath': str(filepath),
+                'created_at': entry.get('created_at'),
+                'message_count': entry.get('message_count', 0)
+            }
+            for _, filepath, entry in self.catalog.validate(files, self._read_metadata)
+        ]
+        # Sesi arsip: metadata sudah tercatat di indeks arsip, tanpa membuka file
+        sessions.extend(
+            {
+                'name': entry.get('name'),
+                'filepath': str(self.storage_dir / entry['key']),
+                'created_at': entry.get('created_at'),
+                'message_count': entry.get('message_count', 0)
+            }
+            for entry in self.archive.entries()
+            if entry['key'] not in files
+        )
+        return sessions[offset:] if limit is None else sessions[offset:offset + limit]
+    
+    def export_messages(
+        self,
+        messages: List[Dict[str, str]],
+        fmt: str = 'pdf',
         session_name: Optional[str] = None
     ) -> str:
-        """Ekspor riwayat chat ke file PDF.
+        """Ekspor riwayat chat ke file PDF, teks biasa, atau Markdown.
         
         Args:
             messages: Daftar pesan chat
+            fmt: 'pdf', 'txt', atau 'md'
             session_name: Nama sesi (opsional)
             
         Returns:
             str: Path lengkap ke file yang diekspor
             
         Raises:
-            ValueError: Jika tidak ada pesan untuk diekspor
-            IOError: Jika gagal membuat PDF
+            ValueError: Jika tidak ada pesan atau format tidak didukung
+            IOError: Jika gagal membuat file
         """
+        from .export import check_format, export_messages, session_title
+
+        fmt = check_format(fmt)
         if not messages:
             raise ValueError("Tidak ada pesan untuk diekspor")
             
-        # Dapatkan nama sesi dari pesan sistem atau gunakan default
-        session_title = next(
-            (msg['content'] for msg in messages if msg.get('role') == 'system'),
-            session_name or "Riwayat Chat"
-        )
-            
-        # Generate nama file yang aman
-        safe_name = self._sanitize_filename(session_name or "export")
-        filename = f"{safe_name}_{self._get_filename()}.pdf"
-        filepath = self.storage_dir / filename
+        # Generate nama file yang aman dengan akhiran format ekspor
+        filepath = self.storage_dir / self._get_filename(session_name or "export", fmt)
         
         try:
-            # Pastikan direktori ada
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            
-            pdf = FPDF()
-            pdf.add_page()
-            
-            # Set font default
-            pdf.set_font("helvetica", size=12)
-            
-            # Tambahkan judul
-            pdf.set_font("helvetica", 'B', 16)
-            pdf.cell(0, 10, text=session_title, new_x="LMARGIN", new_y="NEXT", align='C')
-            pdf.ln(10)
-            
-            # Tambahkan konten
-            for msg in messages:
-                if msg['role'] == 'system':
-                    continue
-                    
-                role = msg.get('role', '').capitalize()
-                if role == 'User':
-                    role = "Anda"
-                elif role == 'Assistant':
-                    role = "Asisten"
-                
-                content = msg.get('content', '').strip()
-                if not content:
-                    continue
-                
-                # Tambahkan peran (bold)
-                pdf.set_font("helvetica", 'B', 12)
-                pdf.cell(0, 10, text=f"{role}:", new_x="LMARGIN", new_y="NEXT")
-                
-                # Tambahkan konten (normal)
-                pdf.set_font("helvetica", size=12)
-                pdf.multi_cell(0, 10, text=content)
-                pdf.ln(5)
-            
-            # Simpan file
-            pdf.output(str(filepath))
+            export_messages(messages, filepath, fmt, session_title(messages, session_name))
             return str(filepath)
-            
         except Exception as e:
-            raise IOError(f"Gagal membuat file PDF: {str(e)}")
+            raise IOError(f"Gagal membuat file {fmt.upper()}: {str(e)}")
+    
+    def export_to_pdf(
+        self, 
+        messages: List[Dict[str, str]], 
+        session_name: Optional[str] = None
+    ) -> str:
+        """Ekspor riwayat chat ke file PDF (lihat ``export_messages``)."""
+        return self.export_messages(messages, 'pdf', session_name)
+    
+    def convert_session(self, filepath: Union[str, Path], session_format: str) -> str:
+        """Tulis ulang satu snapshot sesi ke format lain lalu hapus file lamanya.
+        
+        Jurnal aktif (.jsonl) tidak dikonversi; gunakan ``compact_journal``.
+        
+        Returns:
+            str: Path lengkap ke file baru
+        """
+        filepath = Path(filepath)
+        if filepath.suffix == JOURNAL_SUFFIX:
+            raise ValueError(f"Jurnal tidak bisa dikonversi langsung: {filepath}")
+        
+        data = self.load_chat(filepath)
+        target = filepath.with_name(strip_suffix(filepath.name) + get_format(session_format).suffix)
+        
+        self._write_session(target, data, session_format)
+        if target != filepath:
+            filepath.unlink()
+            self._unindex_session(filepath)
+        self._index_session(target, data.get("messages", []))
+        self._catalog_session(target, data)
+        return str(target.resolve())
+    
+    def convert_all(self, session_format: str) -> Dict[str, int]:
+        """Konversi semua snapshot sesi ke ``session_format``.
+        
+        Returns:
+            Dict[str, int]: sessions, bytes_before, bytes_after
+        """
+        get_format(session_format)
+        stats = {'sessions': 0, 'bytes_before': 0, 'bytes_after': 0}
+        for filepath in list(self.iter_session_files()):
+            if filepath.suffix == JOURNAL_SUFFIX:
+                continue
+            try:
+                before = filepath.stat().st_size
+                target = self.convert_session(filepath, session_format)
+            except (ValueError, KeyError, OSError) as e:
+                self._warn_corrupt(filepath, e)
+                continue
+            stats['sessions'] += 1
+            stats['bytes_before'] += before
+            stats['bytes_after'] += Path(target).stat().st_size
+        return stats
+    
+    def migrate_layout(self, layout: Optional[str] = None) -> int:
+        """Pindahkan semua file sesi ke tata letak ``layout`` (default: ``self.layout``).
+        
+        File dipindah dengan rename (isinya tidak ditulis ulang) ke shard
+        tanggal pembuatannya, atau kembali ke storage_dir untuk "flat". Entri
+        katalog ikut dipindah dan indeks pencarian dibangun ulang sekali di
+        akhir. Aman diulang.
+        
+        Returns:
+            int: Jumlah file yang dipindah
+        
+        Raises:
+            ValueError: Jika tata letak tidak dikenal
+        """
+        layout = layout or self.layout
+        if layout not in LAYOUTS:
+            raise ValueError(f"Tata letak penyimpanan tidak dikenal: {layout} (pilih: {', '.join(LAYOUTS)})")
+        
+        files = {self._session_key(p): p for p in self.iter_session_files()}
+        # Pastikan tanggal pembuatan setiap sesi ada di katalog
+        self.catalog.validate(files, self._read_metadata)
+        entries = self.catalog.load()
+        moved = 0
+        
+        for key, filepath in files.items():
+            target = self._shard_dir(self._created_at(filepath, entries.get(key, {})), layout) / filepath.name
+            if target == filepath:
+                continue
+            if target.exists():
+                logger.warning("Sesi tidak dipindah, tujuan sudah ada: %s", target)
+                continue
+            target.parent.mkdir(exist_ok=True, parents=True)
+            os.replace(filepath, target)
+            if key in entries:
+                entries[self._session_key(target)] = entries.pop(key)
+            self._remove_empty_shards(filepath.parent)
+            moved += 1
+        
+        if moved:
+            self.catalog.save(entries)
+            self.rebuild_index()
+        return moved
+    
+    def _created_at(self, filepath: Path, entry: Dict[str, Any]) -> datetime:
+        """Waktu pembuatan sesi dari entri katalog, atau mtime file jika tidak tercatat."""
+        try:
+            return datetime.fromisoformat(entry['created_at'])
+        except (KeyError, TypeError, ValueError):
+            return datetime.fromtimestamp(filepath.stat().st_mtime)
+    
+    def archive_sessions(self, older_than_days: float) -> int:
+        """Pindahkan snapshot sesi yang dibuat lebih dari ``older_than_days`` hari lalu ke arsip.
+        
+        Setiap sesi ditambahkan ke pack arsip sebagai JSON ringkas lalu filenya
+        dihapus. Kuncinya tidak berubah, sehingga indeks pencarian tetap berlaku
+        dan sesi tetap bisa dimuat, dicari, dan didaftar lewat path aslinya.
+        Jurnal dilewati karena masih bisa ditambah; padatkan dulu jika perlu.
+        
+        Returns:
+            int: Jumlah sesi yang diarsipkan
+        """
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        files = {self._session_key(p): p for p in self.iter_session_files()}
+        batch: List[Tuple[str, bytes, Dict[str, Any]]] = []
+        paths: List[Path] = []
+        archived = 0
+        
+        def flush() -> int:
+            count = self.archive.add_many(batch)
+            # File baru dihapus setelah isinya tersimpan permanen di arsip
+            for path in paths:
+                path.unlink()
+                self._remove_empty_shards(path.parent)
+            batch.clear()
+            paths.clear()
+            return count
+        
+        for key, filepath, entry in self.catalog.validate(files, self._read_metadata):
+            if filepath.suffix == JOURNAL_SUFFIX or self._created_at(filepath, entry) >= cutoff:
+                continue
+            try:
+                data = self.load_chat(filepath)
+            except (ValueError, KeyError, OSError) as e:
+                self._warn_corrupt(filepath, e)
+                continue
+            data.pop("format", None)
+            batch.append((key, encode_session(data, 'compact'), self._session_metadata(data)))
+            paths.append(filepath)
+            if len(batch) >= ARCHIVE_BATCH:
+                archived += flush()
+        if batch:
+            archived += flush()
+        return archived
+    
+    def _remove_empty_shards(self, directory: Path) -> None:
+        """Hapus direktori shard yang sudah kosong, naik sampai storage_dir."""
+        while directory != self.storage_dir and self.storage_dir in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                return
+            directory = directory.parent
+    
+    def rebuild_index(self) -> int:
+        """Bangun ulang indeks pencarian dari semua file sesi (termasuk arsip).
+        
+        Returns:
+            int: Jumlah sesi yang berhasil diindeks
+        """
+        self.index.clear()
+        # Indeks semantik diisi ulang saat pencarian semantik berikutnya
+        self.semantic.clear()
+        count = 0
+        for key, filepath in self._iter_sessions():
+            try:
+                data = self.load_chat(filepath)
+            except (ValueError, KeyError, OSError) as e:
+                self._warn_corrupt(filepath, e)
+                continue
+            self.index.add_messages(key, data.get('messages', []))
+            count += 1
+        return count
+    
+    def _sync_index(self) -> None:
+        """Sinkronkan indeks dengan isi direktori (file baru atau terhapus)."""
+        try:
+            indexed = self.index.sessions
+        except ValueError:
+            self.rebuild_index()
+            return
+        
+        on_disk = dict(self._iter_sessions())
+        for key in indexed - on_disk.keys():
+            self.index.remove_session(key)
+        for key in on_disk.keys() - indexed:
+            try:
+                data = self.load_chat(on_disk[key])
+            except (ValueError, KeyError, OSError) as e:
+                self._warn_corrupt(on_disk[key], e)
+                continue
+            self.index.add_messages(key, data.get('messages', []))
+    
+    def _make_result(
+        self,
+        filepath: Path,
+        session_name: str,
+        msg: Dict[str, Any],
+        score: float = 0.0,
+        snippet: Optional[str] = None
+    ) -> SearchResult:
+        content = msg.get('content', '')
+        if snippet is None:
+            snippet = content[:100] + '...' if len(content) > 100 else content
+        role = msg.get('role', 'unknown')
+        return {
+            'session': session_name,
+            'content': content,
+            # Peran dari json.loads disalin per pesan; hasil pencarian berbagi satu string
+            'role': sys.intern(role) if isinstance(role, str) else role,
+            'snippet': snippet,
+            'filepath': str(filepath),
+            'score': score
+        }
     
     def search_messages(self, query: str) -> List[SearchResult]:
-        """Cari pesan dalam semua file chat."""
+        """Cari pesan dalam semua file chat.
+        
+        Kata kunci tunggal (tanpa spasi) dijawab lewat indeks terbalik,
+        sehingga hanya file kandidat yang dibuka. Kueri lain dipindai penuh.
+        Semantik pencocokan sama: substring tanpa memperhatikan huruf besar.
+        """
         if not query:
             return []
-            
+        
+        with metrics.timer('storage_search_seconds'):
+            results = self._search_indexed(query)
+        metrics.inc('storage_search_results_total', len(results))
+        return results
+    
+    def ranked_search(self, query: str, limit: Optional[int] = 10) -> List[SearchResult]:
+        """Cari dengan kata, "frasa", /regex/, dan filter role:/session:/after:/before:.
+        
+        Hasil diurutkan dengan skor BM25 dari indeks terbalik (lihat query.py).
+        
+        Args:
+            query: Teks kueri
+            limit: Jumlah hasil teratas (None = semua)
+        
+        Raises:
+            ValueError: Jika kueri tidak valid
+        """
+        from .query import ranked_search
+        return ranked_search(self, query, limit)
+    
+    def semantic_search(self, query: str, limit: Optional[int] = 10) -> List[SearchResult]:
+        """Cari pesan yang maknanya mirip ``query`` walaupun katanya berbeda.
+        
+        Args:
+            query: Teks bebas
+            limit: Jumlah hasil teratas (None = semua)
+        """
+        return semantic_search(self, query, limit)
+    
+    def _semantic_sources(self) -> Dict[str, Path]:
+        """Kunci sesi -> path untuk indeks semantik."""
+        return dict(self._iter_sessions())
+    
+    def _search_indexed(self, query: str) -> List[SearchResult]:
+        """Implementasi search_messages (tanpa pencatatan metrik)."""
+        term = query.lower()
+        if term.split() != [term]:
+            return self._scan_messages(query)
+        
+        self._sync_index()
         results: List[SearchResult] = []
         
-        for filepath in self.storage_dir.glob('*.json'):
+        for key, indices in sorted(self.index.lookup(term).items()):
+            filepath = self.storage_dir / key
             try:
                 data = self.load_chat(filepath)
-                session_name = data.get('session_name', 'Tanpa Judul')
-                
-                for msg in data.get('messages', []):
-                    content = msg.get('content', '')
-                    if query.lower() in content.lower():
-                        snippet = content[:100] + '...' if len(content) > 100 else content
-                        results.append({
-                            'session': session_name,
-                            'content': content,
-                            'role': msg.get('role', 'unknown'),
-                            'snippet': snippet,
-                            'filepath': str(filepath)
-                        })
-                        
-            except (json.JSONDecodeError, KeyError):
+            except (ValueError, KeyError, OSError) as e:
+                self._warn_corrupt(filepath, e)
                 continue
-                
+            session_name = data.get('session_name', 'Tanpa Judul')
+            messages = data.get('messages', [])
+            
+            for i in indices:
+                if i >= len(messages):
+                    continue
+                content = messages[i].get('content', '')
+                if term in content.lower():
+                    results.append(self._make_result(filepath, session_name, messages[i]))
+        
         return results
+    
+    def _scan_messages(self, query: str) -> List[SearchResult]:
+        """Cari pesan dengan memindai semua file chat."""
+        return list(self.iter_search(query))
+    
+    def iter_search(self, query: str, limit: Optional[int] = None) -> Iterator[SearchResult]:
+        """Pindai semua file sesi dan alirkan hasilnya satu per satu.
+        
+        File disaring di level byte sebelum di-parse dan, untuk direktori
+        besar, dipindai paralel oleh beberapa proses (lihat scan.py).
+        
+        Args:
+            query: Teks yang dicari (substring, tanpa memperhatikan huruf besar)
+            limit: Jumlah hasil maksimum (None = semua)
+        """
+        # scan.py memuat multiprocessing; impor hanya saat pemindaian dibutuhkan
+        from .scan import scan_messages
+        return scan_messages(self, query, limit)
+
+
+def create_storage(backend: Optional[str] = None):
+    """Buat penyimpanan riwayat chat sesuai ``Config.STORAGE_BACKEND``.
+    
+    Args:
+        backend: 'files' atau 'sqlite' (default: Config.STORAGE_BACKEND)
+    
+    Raises:
+        ValueError: Jika backend tidak dikenal
+    """
+    backend = backend or Config.STORAGE_BACKEND
+    if backend == 'files':
+        return ChatHistory(Config.STORAGE_DIR)
+    if backend == 'sqlite':
+        from .sqlite_storage import SQLiteChatHistory
+        db_path = Config.STORAGE_DB or Path(Config.STORAGE_DIR) / 'chat.sqlite3'
+        return SQLiteChatHistory(db_path, Config.STORAGE_DIR)
+    raise ValueError(f"Backend penyimpanan tidak dikenal: {backend} (pilih: files, sqlite)")
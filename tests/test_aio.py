@@ -0,0 +1,198 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.aio import AsyncChatbot
+from src.chatbot.backends import FakeBackend
+from src.chatbot.resilience import ResilientCaller
+from src.chatbot.storage import ChatHistory
+
+
+class FakeChat:
+    """Objek chat palsu yang mencatat jumlah permintaan bersamaan."""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def send_message_async(self, message):
+        self.model.in_flight += 1
+        self.model.peak = max(self.model.peak, self.model.in_flight)
+        try:
+            await asyncio.sleep(self.model.delay)
+            return SimpleNamespace(text=f"balasan: {message}")
+        finally:
+            self.model.in_flight -= 1
+
+    def send_message(self, message, stream=False):
+        # Streaming sinkron, dibaca aio.py di thread pekerja
+        for i in range(self.model.chunks):
+            self.model.produced += 1
+            time.sleep(self.model.delay)
+            yield SimpleNamespace(text=f"bagian{i} ")
+
+
+class FakeModel:
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.chunks = 3
+        self.produced = 0
+
+    def start_chat(self, history=None):
+        self.history = history
+        return FakeChat(self)
+
+
+class TestAsyncChatbot(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model = FakeModel()
+        self.bot = AsyncChatbot(
+            model=self.model,
+            max_concurrency=4,
+            storage=ChatHistory(storage_dir=self.temp_dir.name)
+        )
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def test_concurrent_sessions_are_independent_and_bounded(self):
+        """Test banyak sesi berjalan bersamaan dengan batas konkurensi."""
+        async def run():
+            ids = [self.bot.create_session() for _ in range(50)]
+            replies = await asyncio.gather(*(
+                self.bot.get_response(session_id, f"pesan {i}")
+                for i, session_id in enumerate(ids)
+            ))
+            return ids, replies
+
+        ids, replies = asyncio.run(run())
+
+        self.assertEqual(replies[7], "balasan: pesan 7")
+        self.assertEqual(self.model.peak, 4)
+        messages = self.bot.get_session(ids[7]).messages
+        self.assertEqual([m["content"] for m in messages[1:]], ["pesan 7", "balasan: pesan 7"])
+
+    def test_cancel_in_flight_request(self):
+        """Test membatalkan permintaan yang sedang berjalan."""
+        self.model.delay = 10
+
+        async def run():
+            session_id = self.bot.create_session()
+            task = asyncio.ensure_future(self.bot.get_response(session_id, "lama"))
+            await asyncio.sleep(0.01)
+            self.assertEqual(self.bot.cancel(session_id), 1)
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return session_id
+
+        session_id = asyncio.run(run())
+        self.assertEqual(len(self.bot.get_session(session_id).messages), 1)
+
+    def test_cancel_in_flight_stream(self):
+        """Test membatalkan streaming di tengah respons menghentikan pembaca dan tidak mengubah riwayat."""
+        self.model.chunks = 100
+
+        async def run():
+            session_id = self.bot.create_session()
+            received = []
+
+            async def consume():
+                async for chunk in self.bot.stream_response(session_id, "panjang"):
+                    received.append(chunk)
+
+            task = asyncio.ensure_future(consume())
+            while len(received) < 2:
+                await asyncio.sleep(0.005)
+            self.assertEqual(self.bot.cancel(session_id), 1)
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(self.bot.get_session(session_id).tasks, set())
+            return session_id
+
+        session_id = asyncio.run(run())
+        self.assertEqual(len(self.bot.get_session(session_id).messages), 1)
+        self.assertLess(self.model.produced, 10)
+
+    def test_cancel_does_not_wait_for_next_chunk(self):
+        """Test cancel saat model lambat mengirim potongan berikutnya selesai seketika."""
+        self.model.delay = 0.5
+
+        async def run():
+            session_id = self.bot.create_session()
+            received = []
+
+            async def consume():
+                async for chunk in self.bot.stream_response(session_id, "lambat"):
+                    received.append(chunk)
+
+            task = asyncio.ensure_future(consume())
+            while not received:
+                await asyncio.sleep(0.005)
+            start = time.perf_counter()
+            self.bot.cancel(session_id)
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return time.perf_counter() - start
+
+        self.assertLess(asyncio.run(run()), 0.3)
+
+    def test_session_lock_is_created_lazily(self):
+        """Test lock sesi baru dibuat di dalam event loop yang memakainya."""
+        session_id = self.bot.create_session()
+        self.assertIsNone(self.bot.get_session(session_id)._lock)
+
+        async def run():
+            return await asyncio.gather(*(self.bot.get_response(session_id, f"p{i}") for i in range(3)))
+
+        self.assertEqual(len(asyncio.run(run())), 3)
+
+    def test_slow_request_is_retried_through_caller(self):
+        """Test permintaan yang melewati batas waktu dicoba ulang lewat ResilientCaller."""
+        backend = FakeBackend(latencies=[10, 0.0])
+        bot = AsyncChatbot(
+            model=backend,
+            storage=ChatHistory(storage_dir=self.temp_dir.name),
+            caller=ResilientCaller(timeout=0.05, max_retries=1, backoff=0)
+        )
+
+        async def run():
+            session_id = bot.create_session()
+            reply = await bot.get_response(session_id, "halo")
+            chunks = [chunk async for chunk in bot.stream_response(session_id, "lagi")]
+            return session_id, reply, chunks
+
+        session_id, reply, chunks = asyncio.run(run())
+        self.assertTrue(reply)
+        self.assertTrue(chunks)
+        self.assertEqual(backend.requests, 3)
+        self.assertEqual(len(bot.get_session(session_id).messages), 5)
+        self.assertEqual(len(bot.get_session(session_id).chat.history), 4)
+
+    def test_save_and_load_session(self):
+        """Test menyimpan dan memuat sesi tanpa memblokir event loop."""
+        async def run():
+            session_id = self.bot.create_session()
+            await self.bot.get_response(session_id, "halo")
+            filepath = await self.bot.save_session(session_id, "sesi_async")
+            return session_id, await self.bot.load_session(filepath)
+
+        original, loaded = asyncio.run(run())
+        self.assertEqual(self.bot.get_session(loaded).messages,
+                         self.bot.get_session(original).messages)
+        # Riwayat model dipulihkan: pesan sistem + "halo", lalu balasannya
+        self.assertEqual([h["role"] for h in self.model.history], ["user", "model"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.archive import SessionArchive
+from src.chatbot.export import export_sessions
+from src.chatbot.storage import ChatHistory
+
+
+class TestSessionArchive(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.archive = SessionArchive(Path(self.temp_dir.name) / 'arsip')
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.archive.close()
+        self.temp_dir.cleanup()
+
+    def test_add_and_read_slices(self):
+        """Test setiap sesi dibaca kembali sebagai irisan pack yang tepat."""
+        self.archive.add_many([('a.json', b'{"a":1}', {'name': 'A'}), ('b.json', b'{"b":2}', {'name': 'B'})])
+        self.archive.add_many([('c.json', b'{"c":3}', {'name': 'C'})])
+        self.assertEqual(self.archive.read('b.json'), b'{"b":2}')
+        self.assertEqual(self.archive.read('c.json'), b'{"c":3}')
+        self.assertEqual(self.archive.keys(), ['a.json', 'b.json', 'c.json'])
+        self.assertEqual([e['name'] for e in self.archive.entries()], ['A', 'B', 'C'])
+        with self.assertRaises(KeyError):
+            self.archive.read('tidak-ada.json')
+
+    def test_truncated_index_line_is_ignored(self):
+        """Test baris indeks terakhir yang terpotong (crash saat menulis) diabaikan."""
+        self.archive.add_many([('a.json', b'{"a":1}', {})])
+        with open(self.archive.index_path, 'a', encoding='utf-8') as f:
+            f.write('{"key":"b.json","offset":7')
+        reopened = SessionArchive(self.archive.base)
+        self.assertEqual(reopened.keys(), ['a.json'])
+        self.assertEqual(reopened.read('a.json'), b'{"a":1}')
+        reopened.close()
+
+
+class TestChatHistoryArchive(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ChatHistory(storage_dir=self.temp_dir.name)
+        self.recent = self.storage.save_chat([
+            {"role": "system", "content": "AI Assistant"},
+            {"role": "user", "content": "Resep rendang baru"},
+        ], "baru")
+        # Sesi lama ditulis langsung dengan tanggal pembuatan di masa lalu
+        self.old = Path(self.temp_dir.name) / 'lama_20200101.json'
+        self.old.write_text(json.dumps({
+            "session_name": "lama",
+            "created_at": "2020-01-01T00:00:00",
+            "messages": [
+                {"role": "system", "content": "AI Assistant"},
+                {"role": "user", "content": "Resep nasi goreng kampung"},
+            ],
+        }), encoding='utf-8')
+        self.storage.search_messages("resep")
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.storage.archive.close()
+        self.temp_dir.cleanup()
+
+    def test_archive_keeps_sessions_readable(self):
+        """Test sesi arsip tetap bisa dimuat, dicari, dan didaftar lewat path aslinya."""
+        self.assertEqual(self.storage.archive_sessions(30), 1)
+        self.assertFalse(self.old.exists())
+        self.assertEqual(self.storage.archive_sessions(30), 0)
+
+        self.assertEqual(self.storage.load_chat(self.old)['session_name'], "lama")
+        sessions = {s['name']: s for s in self.storage.list_sessions()}
+        self.assertEqual(set(sessions), {"baru", "lama"})
+        self.assertEqual(sessions["lama"]['message_count'], 2)
+        self.assertEqual(self.storage.load_chat(sessions["lama"]['filepath'])['messages'][1]['content'],
+                         "Resep nasi goreng kampung")
+
+        self.assertEqual(len(self.storage.search_messages("resep")), 2)
+        self.assertEqual([r['session'] for r in self.storage.search_messages("nasi goreng")], ["lama"])
+        self.assertEqual([r['session'] for r in self.storage.ranked_search('"goreng kampung"')], ["lama"])
+        self.assertEqual(self.storage.rebuild_index(), 2)
+        self.assertEqual(len(self.storage.search_messages("resep")), 2)
+
+    def test_missing_session_still_raises(self):
+        """Test path yang tidak ada di disk maupun di arsip tetap gagal dimuat."""
+        self.storage.archive_sessions(30)
+        with self.assertRaises(FileNotFoundError):
+            self.storage.load_chat(Path(self.temp_dir.name) / 'tidak_ada.json')
+
+    def test_missing_or_empty_pack_is_reported_as_corrupt(self):
+        """Test pack yang hilang atau kosong dilaporkan sebagai arsip rusak, bukan sesi terhapus."""
+        self.storage.archive_sessions(30)
+        self.storage.archive.close()
+        pack = self.storage.archive.pack_path
+        for damage in (pack.unlink, lambda: pack.write_bytes(b'')):
+            damage()
+            storage = ChatHistory(storage_dir=self.temp_dir.name)
+            with self.assertRaises(ValueError):
+                storage.load_chat(self.old)
+            with self.assertLogs('src.chatbot.storage', level='WARNING') as logs:
+                stats = export_sessions(storage, Path(self.temp_dir.name) / 'ekspor', 'txt', workers=1)
+            self.assertEqual((stats['sessions'], stats['errors']), (1, 1))
+            self.assertIn('Arsip rusak', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import json
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from pathlib import Path
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.autosave import AutoSaver
+from src.chatbot.fsutil import atomic_write
+from src.chatbot.config import Config
+from src.chatbot.core import Chatbot
+from src.chatbot.storage import ChatHistory
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / 'sesi.json'
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def test_write_replaces_without_leftovers(self):
+        """Test penulisan atomik mengganti isi file tanpa meninggalkan file sementara."""
+        atomic_write(self.path, b'lama')
+        atomic_write(self.path, b'baru')
+        self.assertEqual(self.path.read_bytes(), b'baru')
+        self.assertEqual(list(Path(self.temp_dir.name).iterdir()), [self.path])
+
+    def test_failed_write_keeps_old_content(self):
+        """Test kegagalan di tengah penulisan tidak mengubah file lama."""
+        atomic_write(self.path, b'lama')
+        with patch('src.chatbot.fsutil.os.replace', side_effect=OSError('disk penuh')):
+            with self.assertRaises(OSError):
+                atomic_write(self.path, b'baru')
+        self.assertEqual(self.path.read_bytes(), b'lama')
+        self.assertEqual(list(Path(self.temp_dir.name).iterdir()), [self.path])
+
+
+class TestAutoSaver(unittest.TestCase):
+    def test_debounces_bursts_into_one_write(self):
+        """Test banyak perubahan dalam satu jeda digabung menjadi satu penulisan."""
+        written = threading.Event()
+        write = MagicMock(side_effect=lambda: written.set())
+        saver = AutoSaver(write, interval=60)
+        try:
+            saver.mark_dirty()
+            self.assertTrue(written.wait(5))
+            for _ in range(100):
+                saver.mark_dirty()
+            # Penulisan berikutnya baru boleh terjadi setelah 60 detik
+            self.assertEqual(write.call_count, 1)
+            self.assertTrue(saver.pending)
+            self.assertTrue(saver.flush())
+            self.assertEqual(write.call_count, 2)
+            self.assertFalse(saver.flush())
+        finally:
+            saver.close()
+
+    def test_failed_write_is_retried(self):
+        """Test perubahan tetap tertunda jika penulisan gagal."""
+        write = MagicMock(side_effect=[OSError('disk penuh'), None])
+        saver = AutoSaver(write, interval=60)
+        saver._dirty = True
+        with self.assertLogs('src.chatbot.autosave', level='WARNING'):
+            self.assertFalse(saver.flush())
+        self.assertTrue(saver.pending)
+        self.assertTrue(saver.flush())
+        self.assertFalse(saver.pending)
+
+
+class TestChatbotAutosave(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        Config.GEMINI_API_KEY = "test_api_key"
+        Config.DEFAULT_MODEL = "test-model"
+        with patch.object(Config, 'AUTOSAVE', True), patch.object(Config, 'AUTOSAVE_INTERVAL', 60), \
+                patch.object(Config, 'MODEL_BACKEND', 'fake'):
+            self.chatbot = Chatbot()
+        self.chatbot.storage = ChatHistory(self.temp_dir.name)
+        self.chatbot.chat = MagicMock()
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.chatbot.close()
+        self.temp_dir.cleanup()
+
+    def test_updates_one_session_file(self):
+        """Test autosave membuat satu file sesi lalu memperbaruinya, dengan tanggal dibuat tetap."""
+        self.chatbot.add_message('user', 'halo')
+        self.chatbot.autosave.flush()
+        path = self.chatbot.session_path
+        created_at = json.loads(Path(path).read_text(encoding='utf-8'))['created_at']
+
+        self.chatbot.add_message('assistant', 'hai')
+        self.assertEqual(self.chatbot.save_chat_session('Autosave'), path)
+
+        data = self.chatbot.storage.load_chat(path)
+        self.assertEqual([m['content'] for m in data['messages'][1:]], ['halo', 'hai'])
+        self.assertEqual(data['session_name'], 'Autosave')
+        self.assertEqual(data['created_at'], created_at)
+        self.assertEqual(len(self.chatbot.storage.list_sessions()), 1)
+        self.assertEqual(len(self.chatbot.storage.search_messages('hai')), 1)
+
+    def test_close_flushes_pending_changes(self):
+        """Test perubahan yang tertunda ditulis saat chatbot ditutup."""
+        self.chatbot.add_message('user', 'pertama')
+        self.chatbot.autosave.flush()
+        self.chatbot.add_message('user', 'terakhir')
+        self.chatbot.close()
+        data = self.chatbot.storage.load_chat(self.chatbot.session_path)
+        self.assertEqual(data['messages'][-1]['content'], 'terakhir')
+
+
+class TestCorruptFileWarning(unittest.TestCase):
+    def test_corrupt_file_is_logged_once(self):
+        """Test file sesi rusak dilaporkan lewat logging, cukup sekali per file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = ChatHistory(temp_dir)
+            (Path(temp_dir) / 'rusak.json').write_text('{"messages": [', encoding='utf-8')
+            with self.assertLogs('src.chatbot.storage', level='WARNING') as logs:
+                storage.list_sessions()
+                storage.list_sessions()
+            self.assertEqual(len(logs.records), 1)
+            self.assertIn('rusak.json', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
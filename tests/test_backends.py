@@ -0,0 +1,76 @@
+import io
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.backends import FakeBackend, TransientBackendError, create_backend
+from src.chatbot.core import Chatbot
+
+
+class TestFakeBackend(unittest.TestCase):
+    def test_deterministic_replies(self):
+        """Test prompt yang sama selalu menghasilkan respons yang sama."""
+        backend = FakeBackend(reply_tokens=5)
+        first = backend.generate_content("halo").text
+        self.assertEqual(first, FakeBackend(reply_tokens=5).generate_content("halo").text)
+        self.assertNotEqual(first, backend.generate_content("apa kabar").text)
+        self.assertEqual(len(first.split()), 6)  # nama model + 5 kata
+
+    def test_streaming_latency_and_token_rate(self):
+        """Test streaming mengikuti latensi awal dan laju token."""
+        backend = FakeBackend(latency=0.05, tokens_per_second=100, reply_tokens=5)
+        chat = backend.start_chat()
+
+        start = time.perf_counter()
+        chunks = iter(chat.send_message("halo", stream=True))
+        first = next(chunks).text
+        ttft = time.perf_counter() - start
+        rest = [chunk.text for chunk in chunks]
+        total = time.perf_counter() - start
+
+        self.assertGreaterEqual(ttft, 0.05)
+        self.assertGreaterEqual(total, 0.05 + 0.04)
+        self.assertEqual(first + ''.join(rest), backend.reply_text("halo"))
+        self.assertEqual(len(chat.history), 2)
+
+    def test_failure_injection(self):
+        """Test kegagalan disuntikkan sesuai peluang yang diatur."""
+        backend = FakeBackend(failure_rate=1.0)
+        with self.assertRaises(TransientBackendError):
+            backend.start_chat().send_message("halo")
+
+        backend = FakeBackend(failure_rate=0.5, seed=42)
+        failures = 0
+        for _ in range(200):
+            try:
+                backend.generate_content("halo")
+            except TransientBackendError:
+                failures += 1
+        self.assertTrue(50 < failures < 150)
+
+    def test_chatbot_with_fake_backend(self):
+        """Test Chatbot berjalan penuh tanpa API dengan backend palsu."""
+        with patch('builtins.print'):
+            bot = Chatbot(backend=FakeBackend(model_name="fake-model"))
+            response = bot.get_response("halo")
+        streamed = bot.stream_response("lagi", output=io.StringIO())
+
+        self.assertTrue(response.startswith("[fake-model]"))
+        self.assertTrue(streamed.startswith("[fake-model]"))
+        self.assertEqual(len(bot.chat.history), 4)
+        self.assertEqual(len(bot.turn_stats), 2)
+
+    def test_create_backend(self):
+        """Test memilih backend berdasarkan nama."""
+        self.assertIsInstance(create_backend("fake", "uji"), FakeBackend)
+        with self.assertRaises(ValueError):
+            create_backend("tidak-ada")
+
+
+if __name__ == "__main__":
+    unittest.main()
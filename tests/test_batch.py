@@ -0,0 +1,142 @@
+import io
+import json
+import random
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.batch import TokenBucket, read_prompts, run_batch
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output = Path(self.temp_dir.name) / "hasil.jsonl"
+        self.prompts = read_prompts(io.StringIO(
+            '{"id": "a", "prompt": "satu"}\n'
+            '\n'
+            'dua\n'
+            '{"prompt": "tiga"}\n'
+            '{"prompt": "empat"}\n'
+        ))
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def _read_output(self):
+        with open(self.output, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_read_prompts(self):
+        """Test membaca prompt JSONL dan teks biasa."""
+        self.assertEqual([p["prompt"] for p in self.prompts], ["satu", "dua", "tiga", "empat"])
+        self.assertEqual(self.prompts[0]["id"], "a")
+        self.assertEqual([p["index"] for p in self.prompts], [0, 1, 2, 3])
+
+    def test_output_preserves_input_order(self):
+        """Test output tetap berurutan walau worker selesai acak."""
+        def generate(prompt):
+            time.sleep(random.uniform(0, 0.02))
+            return prompt.upper()
+
+        summary = run_batch(self.prompts, generate, self.output, workers=4)
+
+        self.assertEqual(summary["completed"], 4)
+        self.assertEqual([r["response"] for r in self._read_output()], ["SATU", "DUA", "TIGA", "EMPAT"])
+
+    def test_retry_with_backoff(self):
+        """Test prompt yang gagal sementara dicoba ulang."""
+        failures = {"dua": 2}
+
+        def generate(prompt):
+            if failures.get(prompt, 0) > 0:
+                failures[prompt] -= 1
+                raise ConnectionError("gangguan sementara")
+            return prompt
+
+        summary = run_batch(self.prompts, generate, self.output, max_retries=2, backoff=0.001)
+        records = self._read_output()
+
+        self.assertEqual(summary["failed"], 0)
+        self.assertEqual(records[1]["attempts"], 3)
+        self.assertEqual(records[1]["response"], "dua")
+
+    def test_resume_partial_run(self):
+        """Test melanjutkan run dari file output yang terpotong."""
+        run_batch(self.prompts[:2], lambda p: p, self.output)
+        with open(self.output, 'a', encoding='utf-8') as f:
+            f.write('{"index": 2, "resp')
+
+        calls = []
+        summary = run_batch(self.prompts, lambda p: calls.append(p) or p, self.output, resume=True)
+
+        self.assertEqual(summary["skipped"], 2)
+        self.assertEqual(calls, ["tiga", "empat"])
+        self.assertEqual([r["index"] for r in self._read_output()], [0, 1, 2, 3])
+
+    def test_non_retryable_error_is_not_retried(self):
+        """Test kesalahan permanen (misalnya permintaan tidak valid) tidak dicoba ulang."""
+        calls = []
+
+        def generate(prompt):
+            calls.append(prompt)
+            raise ValueError("permintaan tidak valid")
+
+        summary = run_batch(self.prompts[:1], generate, self.output, max_retries=3, backoff=0.001)
+
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(calls, ["satu"])
+        self.assertEqual(self._read_output()[0]["attempts"], 1)
+
+    def test_resume_retries_failed_prompts(self):
+        """Test melanjutkan run mengerjakan ulang prompt yang gagal dan memakai ulang hasil yang berhasil."""
+        def flaky(prompt):
+            if prompt in ("dua", "empat"):
+                raise ValueError("gagal")
+            return prompt
+
+        run_batch(self.prompts, flaky, self.output, max_retries=0)
+        calls = []
+        summary = run_batch(self.prompts, lambda p: calls.append(p) or p.upper(), self.output, resume=True)
+
+        self.assertEqual(calls, ["dua", "empat"])
+        self.assertEqual(summary["skipped"], 2)
+        self.assertEqual(summary["failed"], 0)
+        records = self._read_output()
+        self.assertEqual([r["index"] for r in records], [0, 1, 2, 3])
+        self.assertEqual([r["response"] for r in records], ["satu", "DUA", "tiga", "EMPAT"])
+
+    def test_interrupt_cancels_queued_prompts(self):
+        """Test run yang terhenti (Ctrl-C) tidak terus mengirim prompt yang masih antre."""
+        prompts = [{"index": i, "prompt": f"p{i}"} for i in range(200)]
+        calls = []
+
+        def generate(prompt):
+            calls.append(prompt)
+            if prompt == "p0":
+                raise KeyboardInterrupt
+            time.sleep(0.01)
+            return prompt
+
+        with self.assertRaises(KeyboardInterrupt):
+            run_batch(prompts, generate, self.output, workers=2)
+        self.assertLess(len(calls), 10)
+
+    def test_token_bucket_limits_rate(self):
+        """Test token bucket membatasi laju permintaan."""
+        bucket = TokenBucket(rate=100, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.045)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.cache import ResponseCache, make_cache_key
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.context = [{"role": "system", "content": "AI Assistant"}]
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def test_key_depends_on_settings_and_context(self):
+        """Test kunci cache berubah jika model, pengaturan, atau konteks berubah."""
+        base = make_cache_key("model-a", 0.0, 1000, self.context, "halo")
+        self.assertEqual(base, make_cache_key("model-a", 0.0, 1000, list(self.context), "halo"))
+        self.assertNotEqual(base, make_cache_key("model-b", 0.0, 1000, self.context, "halo"))
+        self.assertNotEqual(base, make_cache_key("model-a", 0.5, 1000, self.context, "halo"))
+        self.assertNotEqual(base, make_cache_key("model-a", 0.0, 500, self.context, "halo"))
+        self.assertNotEqual(base, make_cache_key("model-a", 0.0, 1000, [], "halo"))
+
+    def test_memory_lru_eviction(self):
+        """Test entri yang paling lama tidak dipakai dibuang lebih dulu."""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_disk_tier_and_size_bound(self):
+        """Test entri yang dibuang dari memori masih tersedia di disk."""
+        cache = ResponseCache(max_entries=1, disk_dir=self.temp_dir.name, max_disk_bytes=2000)
+        cache.put("a" * 64, "A")
+        cache.put("b" * 64, "B")
+
+        self.assertEqual(cache.get("a" * 64), "A")
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+        for i in range(100):
+            cache.put(f"{i:064d}", "x" * 100)
+        self.assertLessEqual(cache.stats()["disk_bytes"], 2000)
+
+    def test_disk_eviction_is_lru(self):
+        """Test hit disk memperbarui urutan sehingga entri yang baru dipakai tidak dibuang."""
+        cache = ResponseCache(max_entries=1, disk_dir=self.temp_dir.name)
+        keys = [c * 64 for c in "abc"]
+        for age, key in zip((300, 200, 100), keys):
+            cache.put(key, "x" * 50)
+            old = time.time() - age
+            os.utime(cache._disk_path(key), (old, old))
+
+        self.assertEqual(cache.get(keys[0]), "x" * 50)  # hit disk pada entri tertua
+
+        size = cache._disk_path(keys[0]).stat().st_size
+        cache.max_disk_bytes = int(size * 3.5)
+        cache.put("d" * 64, "x" * 50)
+
+        self.assertTrue(cache._disk_path(keys[0]).exists())
+        self.assertFalse(cache._disk_path(keys[1]).exists())
+        self.assertTrue(cache._disk_path(keys[2]).exists())
+
+    def test_corrupt_disk_entry_is_miss(self):
+        """Test entri disk dengan isi tidak valid dianggap miss, bukan error."""
+        cache = ResponseCache(max_entries=1, disk_dir=self.temp_dir.name)
+        for i, payload in enumerate(([1, 2], {"created_at": 1.0}, {"text": ["a"], "created_at": 1.0},
+                                     {"text": "a", "created_at": "kemarin"})):
+            key = f"{i:064d}"
+            path = cache._disk_path(key)
+            path.parent.mkdir(exist_ok=True, parents=True)
+            path.write_text(json.dumps(payload), encoding='utf-8')
+            with self.subTest(payload=payload):
+                self.assertIsNone(cache.get(key))
+                self.assertFalse(path.exists())
+
+    def test_ttl_expiry(self):
+        """Test entri kedaluwarsa setelah TTL."""
+        cache = ResponseCache(disk_dir=self.temp_dir.name, ttl=60)
+        with patch("src.chatbot.cache.time.time", return_value=1000.0):
+            cache.put("k" * 64, "lama")
+        with patch("src.chatbot.cache.time.time", return_value=1100.0):
+            self.assertIsNone(cache.get("k" * 64))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.backends import FakeBackend, build_history
+from src.chatbot.config import Config
+from src.chatbot.context import (
+    ContextWindow, context_budget, estimate_tokens, format_transcript, message_tokens, SUMMARY_PREFIX
+)
+from src.chatbot.core import Chatbot
+
+
+def make_messages(turns, length=40):
+    """Pesan sistem diikuti ``turns`` pasang giliran user/assistant."""
+    messages = [{"role": "system", "content": "AI Assistant"}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"pertanyaan {i} " + "x" * length})
+        messages.append({"role": "assistant", "content": f"jawaban {i} " + "y" * length})
+    return messages
+
+
+class TestContextWindow(unittest.TestCase):
+    def test_estimate_tokens(self):
+        """Test perkiraan token berbasis byte UTF-8."""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("abcd"), 1)
+        self.assertEqual(estimate_tokens("東京"), 2)  # 6 byte
+
+    def test_null_content_counts_as_zero_tokens(self):
+        """Test pesan dengan content null (file rusak) dihitung 0 token dan dilewati di transkrip."""
+        messages = [{"role": "user", "content": None}, {"role": "assistant", "content": "halo"}]
+        self.assertEqual(message_tokens(messages[0]), message_tokens({"role": "user", "content": ""}))
+        self.assertEqual(format_transcript(messages), "assistant: halo")
+
+    def test_within_budget_keeps_everything(self):
+        """Test riwayat yang muat anggaran dikirim utuh tanpa perubahan."""
+        messages = make_messages(3)
+        window = ContextWindow(budget=10_000).fit(messages)
+        self.assertEqual(window.messages, messages)
+        self.assertFalse(window.changed)
+        self.assertEqual(window.tokens, sum(message_tokens(m) for m in messages))
+
+    def test_pinned_keeps_system_and_recent_turns(self):
+        """Test kebijakan pinned mempertahankan pesan sistem dan giliran terbaru."""
+        messages = make_messages(20)
+        window = ContextWindow(budget=200, policy='pinned').fit(messages, reserve=10)
+
+        self.assertTrue(window.changed)
+        self.assertLessEqual(window.tokens, 200 * 0.75)
+        self.assertEqual(window.messages[0]["role"], "system")
+        self.assertEqual(window.messages[1]["role"], "user")
+        self.assertEqual(window.messages[-1], messages[-1])
+
+    def test_sliding_drops_system_message(self):
+        """Test kebijakan sliding ikut membuang pesan sistem."""
+        window = ContextWindow(budget=200, policy='sliding').fit(make_messages(20))
+        self.assertEqual(window.messages[0]["role"], "user")
+
+    def test_trim_is_sticky_until_budget_exceeded(self):
+        """Test jendela hanya bertambah sampai anggaran terlampaui lagi."""
+        messages = make_messages(20)
+        context = ContextWindow(budget=200, policy='pinned')
+        first = context.fit(messages)
+
+        messages.append({"role": "user", "content": "lanjut"})
+        second = context.fit(messages)
+        self.assertFalse(second.changed)
+        self.assertEqual(second.messages, first.messages + [messages[-1]])
+
+    def test_summary_policy_summarizes_dropped_turns(self):
+        """Test kebijakan summary meringkas pesan yang dibuang."""
+        calls = []
+
+        def summarizer(previous, dropped):
+            calls.append((previous, len(dropped)))
+            return f"ringkasan {len(calls)}"
+
+        messages = make_messages(20)
+        context = ContextWindow(budget=200, policy='summary', summarizer=summarizer)
+        window = context.fit(messages)
+
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(calls[0][0])
+        self.assertEqual(window.messages[1], {"role": "system", "content": SUMMARY_PREFIX + "ringkasan 1"})
+
+        messages.extend(make_messages(10)[1:])
+        context.fit(messages)
+        self.assertEqual(calls[1][0], "ringkasan 1")
+
+    def test_invalid_policy(self):
+        """Test kebijakan tidak dikenal ditolak."""
+        with self.assertRaises(ValueError):
+            ContextWindow(budget=100, policy='acak')
+        with self.assertRaises(ValueError):
+            ContextWindow(budget=100, policy='summary')
+
+    def test_context_budget(self):
+        """Test anggaran diturunkan dari batas model, MAX_TOKENS, dan konfigurasi."""
+        with patch.object(Config, 'MAX_TOKENS', 1000), patch.object(Config, 'CONTEXT_TOKEN_BUDGET', 0):
+            self.assertEqual(context_budget("gemini-pro"), 30_720 - 1000)
+        with patch.object(Config, 'CONTEXT_TOKEN_BUDGET', 500):
+            self.assertEqual(context_budget("gemini-1.5-flash"), 500)
+
+    def test_build_history_merges_roles(self):
+        """Test konversi pesan ke riwayat Gemini menggabungkan peran berurutan."""
+        history = build_history(make_messages(1))
+        self.assertEqual([h["role"] for h in history], ["user", "model"])
+        self.assertEqual(len(history[0]["parts"]), 2)
+
+    def test_chatbot_trims_model_history(self):
+        """Test riwayat chat model tetap dalam anggaran pada sesi panjang."""
+        with patch.object(Config, 'CONTEXT_TOKEN_BUDGET', 300), patch.object(Config, 'AUTOSAVE', False), \
+                patch.object(Config, 'CONTEXT_POLICY', 'pinned'), patch('builtins.print'):
+            bot = Chatbot(backend=FakeBackend(reply_tokens=10))
+            for i in range(30):
+                message = f"pesan nomor {i} " + "z" * 40
+                bot.add_message("user", message)
+                bot.add_message("assistant", bot.get_response(message))
+
+        self.assertLess(len(bot.chat.history), 30)
+        self.assertTrue(all(t['prompt_tokens'] <= 300 for t in bot.turn_stats))
+        self.assertGreater(bot.get_statistics()['last_prompt_tokens'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
 import tempfile
 import os
+import io
+import time
+import json
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
@@ -10,6 +13,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.chatbot.core import Chatbot
 from src.chatbot.config import Config
+from src.chatbot.storage import ChatHistory
+from src.chatbot.cache import ResponseCache
 
 class TestChatbot(unittest.TestCase):
     def setUp(self):
@@ -19,8 +24,10 @@ class TestChatbot(unittest.TestCase):
         Config.GEMINI_API_KEY = "test_api_key"
         Config.DEFAULT_MODEL = "test-model"
         
-        # Inisialisasi chatbot dengan mock
-        self.chatbot = Chatbot()
+        # Inisialisasi chatbot dengan mock; riwayat ditulis ke direktori sementara
+        with patch.object(Config, 'AUTOSAVE', False), patch.object(Config, 'MODEL_BACKEND', 'fake'):
+            self.chatbot = Chatbot()
+        self.chatbot.storage = ChatHistory(storage_dir=self.temp_dir.name)
         
         # Mock model Gemini
         self.chatbot.model = MagicMock()
@@ -44,6 +51,40 @@ class TestChatbot(unittest.TestCase):
         self.assertEqual(response, "Ini adalah respons dari AI")
         self.chatbot.chat.send_message.assert_called_once_with("Halo")
     
+    def test_cached_response_skips_model(self):
+        """Test respons identik diambil dari cache tanpa memanggil model."""
+        self.chatbot.cache = ResponseCache()
+        
+        with patch.object(Config, 'TEMPERATURE', 0.0), patch('builtins.print'):
+            first = self.chatbot.get_response("Halo")
+            second = self.chatbot.get_response("Halo")
+            
+            with patch.object(Config, 'CACHE_NONDETERMINISTIC', False), \
+                    patch.object(Config, 'TEMPERATURE', 0.7):
+                self.chatbot.get_response("Halo")
+        
+        self.assertEqual(first, second)
+        self.assertEqual(self.chatbot.chat.send_message.call_count, 2)
+        self.assertEqual(self.chatbot.cache.stats()["hits"], 1)
+    
+    def test_stream_response(self):
+        """Test respons streaming ditulis per potongan dan waktunya dicatat."""
+        def fake_stream(message, stream=False):
+            for text in ["Halo", ", apa ", "kabar?"]:
+                time.sleep(0.01)
+                yield MagicMock(text=text)
+        
+        self.chatbot.chat.send_message.side_effect = fake_stream
+        output = io.StringIO()
+        
+        response = self.chatbot.stream_response("Halo", output=output)
+        
+        self.assertEqual(response, "Halo, apa kabar?")
+        self.assertEqual(output.getvalue(), "Halo, apa kabar?")
+        stats = self.chatbot.turn_stats[-1]
+        self.assertGreater(stats["ttft"], 0)
+        self.assertGreater(stats["total"], stats["ttft"])
+    
     def test_save_chat_session(self):
         """Test menyimpan sesi chat."""
         # Setup
@@ -60,8 +101,78 @@ class TestChatbot(unittest.TestCase):
         self.assertTrue(os.path.exists(filepath))
         self.assertTrue(filepath.endswith('.json'))
     
+    def test_journal_mode_appends_each_message(self):
+        """Test mode jurnal menulis setiap pesan baru sebagai satu baris."""
+        self.chatbot.storage = ChatHistory(storage_dir=self.temp_dir.name)
+        
+        with patch.object(Config, 'JOURNAL_MODE', True):
+            filepath = self.chatbot.save_chat_session("sesi_jurnal")
+            self.chatbot.add_message("user", "Halo")
+            self.chatbot.add_message("assistant", "Halo juga")
+        
+        self.assertTrue(filepath.endswith('.jsonl'))
+        data = self.chatbot.storage.load_chat(filepath)
+        self.assertEqual(data["messages"], self.chatbot.messages)
+        
+        snapshot = self.chatbot.compact_chat_session()
+        self.assertIsNone(self.chatbot.journal_path)
+        self.assertEqual(self.chatbot.storage.load_chat(snapshot)["messages"], self.chatbot.messages)
+    
+    def test_load_chat_session_restores_model_history(self):
+        """Test memuat sesi membangun ulang riwayat chat model dalam satu langkah."""
+        storage = ChatHistory(storage_dir=self.temp_dir.name)
+        messages = [{"role": "system", "content": "Test system message"}]
+        for i in range(5):
+            messages.append({"role": "user", "content": f"pertanyaan {i}"})
+            messages.append({"role": "assistant", "content": f"jawaban {i}"})
+        filepath = storage.save_chat(messages, "sesi_lama")
+        self.chatbot.storage = storage
+        
+        self.chatbot.load_chat_session(filepath)
+        history = self.chatbot.model.start_chat.call_args.kwargs["history"]
+        self.assertEqual(len(history), 10)
+        self.assertEqual(history[0]["parts"], ["Test system message", "pertanyaan 0"])
+        self.assertEqual(history[-1], {"role": "model", "parts": ["jawaban 4"]})
+        self.chatbot.chat.send_message.assert_not_called()
+        
+        # Batas giliran: pesan sistem + 2 giliran terakhir
+        with patch.object(Config, 'RESTORE_MAX_TURNS', 2):
+            self.chatbot.load_chat_session(filepath)
+        history = self.chatbot.model.start_chat.call_args.kwargs["history"]
+        self.assertEqual(history[0]["parts"], ["Test system message", "pertanyaan 3"])
+        self.assertEqual(len(history), 4)
+    
+    def test_load_chat_session_with_non_string_role(self):
+        """Test sesi dengan peran yang bukan string (file rusak) tetap bisa dimuat."""
+        filepath = Path(self.temp_dir.name) / 'peran_aneh.json'
+        filepath.write_text(json.dumps({"session_name": "aneh", "messages": [
+            {"role": "system", "content": "Test system message"},
+            {"role": ["user"], "content": "pertanyaan"},
+            {"role": "assistant", "content": "jawaban"},
+        ]}), encoding='utf-8')
+        
+        self.chatbot.load_chat_session(str(filepath))
+        history = self.chatbot.model.start_chat.call_args.kwargs["history"]
+        self.assertEqual(history[0]["parts"], ["Test system message", "pertanyaan"])
+        self.assertEqual(self.chatbot.messages[1]["role"], ["user"])
+    
+    def test_load_chat_session_with_null_content(self):
+        """Test sesi berisi pesan dengan content null bisa dimuat lalu dilanjutkan."""
+        filepath = Path(self.temp_dir.name) / 'isi_null.json'
+        filepath.write_text(json.dumps({"session_name": "null", "messages": [
+            {"role": "system", "content": "Test system message"},
+            {"role": "user", "content": None},
+            {"role": "assistant", "content": "jawaban"},
+        ]}), encoding='utf-8')
+        
+        self.chatbot.load_chat_session(str(filepath))
+        self.chatbot.chat = MagicMock()
+        self.chatbot.chat.send_message.return_value = self.mock_response
+        with patch('builtins.print'):
+            self.assertEqual(self.chatbot.get_response("lanjut"), "Ini adalah respons dari AI")
+    
     def test_export_chat(self):
-        """Test ekspor chat ke PDF."""
+        """Test ekspor chat ke PDF, teks biasa, dan Markdown."""
         # Setup
         self.chatbot.messages = [
             {"role": "system", "content": "Test system message"},
@@ -75,10 +186,18 @@ class TestChatbot(unittest.TestCase):
         # Verifikasi
         self.assertTrue(os.path.exists(filepath))
         self.assertTrue(filepath.endswith('.pdf'))
+        self.assertNotIn('.json', Path(filepath).name)
+        
+        # Format teks ikut didukung
+        for fmt in ('txt', 'md'):
+            filepath = self.chatbot.export_chat(fmt)
+            self.assertTrue(filepath.endswith(f'.{fmt}'))
+            self.assertNotIn('.json', Path(filepath).name)
+            self.assertIn("Test user message", Path(filepath).read_text(encoding='utf-8'))
         
         # Test error untuk format tidak didukung
         with self.assertRaises(ValueError):
-            self.chatbot.export_chat("txt")
+            self.chatbot.export_chat("docx")
     
     def test_search_chat_history(self):
         """Test pencarian riwayat chat."""
@@ -0,0 +1,145 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot import export
+from src.chatbot.export import export_sessions, write_markdown, write_text
+from src.chatbot.storage import ChatHistory
+
+
+class TestWriters(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.messages = [
+            {"role": "system", "content": "Resep Nusantara"},
+            {"role": "user", "content": "Bagaimana membuat rendang?"},
+            {"role": "assistant", "content": "Masak daging dengan santan 🌶️"},
+            {"role": "user", "content": "   "},
+        ]
+
+    def test_text_and_markdown(self):
+        """Test teks dan Markdown memakai judul sesi, label peran, dan melewati pesan kosong."""
+        out = io.StringIO()
+        write_text(self.messages, out, "Resep Nusantara")
+        self.assertEqual(out.getvalue(), (
+            "Resep Nusantara\n===============\n\n"
+            "Anda:\nBagaimana membuat rendang?\n\n"
+            "Asisten:\nMasak daging dengan santan 🌶️\n\n"
+        ))
+        out = io.StringIO()
+        write_markdown(self.messages, out, "Resep Nusantara")
+        self.assertTrue(out.getvalue().startswith("# Resep Nusantara\n\n**Anda:**\n\nBagaimana membuat rendang?"))
+
+    def test_null_role_and_content(self):
+        """Test pesan dengan role atau content null tidak menggagalkan ekspor."""
+        out = io.StringIO()
+        write_text([{"role": None, "content": "tanpa peran"}, {"role": "user", "content": None}], out, "Judul")
+        self.assertEqual(out.getvalue(), "Judul\n=====\n\n:\ntanpa peran\n\n")
+
+    def test_text_is_streamed_per_message(self):
+        """Test pesan ditulis satu per satu dari iterator, bukan dokumen yang dibangun utuh."""
+        out = io.StringIO()
+        written = []
+        out.write = lambda text: written.append(text)
+        write_text(iter(self.messages), out, "Judul")
+        self.assertEqual(len(written), 3)
+
+    def test_pdf_layout_is_reused(self):
+        """Test tata letak PDF (dan impor fpdf) disiapkan sekali untuk banyak dokumen."""
+        with tempfile.TemporaryDirectory() as temp_dir, patch.object(export, '_pdf_layout', None):
+            with patch.object(export, 'PdfLayout', wraps=export.PdfLayout) as layout:
+                for i in range(3):
+                    size = export.export_messages(self.messages, Path(temp_dir) / f"{i}.pdf", 'pdf', "Judul")
+                    self.assertGreater(size, 0)
+            self.assertEqual(layout.call_count, 1)
+            self.assertEqual(sorted(p.name for p in Path(temp_dir).iterdir()), ['0.pdf', '1.pdf', '2.pdf'])
+
+    def test_pdf_wrap_matches_multi_cell(self):
+        """Test pemecahan baris sama dengan multi_cell fpdf, termasuk kata yang lebih lebar dari halaman."""
+        from fpdf import FPDF
+        from fpdf.enums import MethodReturnValue
+
+        layout = export.PdfLayout()
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_font(layout.font, size=layout.size)
+        texts = [
+            "Masak daging dengan santan, cabai, lengkuas, dan serai " * 6,
+            "kata " + "x" * 150 + " akhir",
+            "a  " + "m" * 80 + " b",
+            "baris satu\n\nbaris tiga\n",
+        ]
+        for text in texts:
+            expected = pdf.multi_cell(0, layout.line_height, text=text, dry_run=True, output=MethodReturnValue.LINES)
+            self.assertEqual(list(layout.wrap(text)), expected)
+
+
+class TestExportSessions(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ChatHistory(storage_dir=Path(self.temp_dir.name) / 'riwayat', layout='date')
+        self.out_dir = Path(self.temp_dir.name) / 'ekspor'
+        self.keys = []
+        for i in range(6):
+            filepath = self.storage.save_chat([
+                {"role": "system", "content": f"Sesi {i}"},
+                {"role": "user", "content": f"Pertanyaan nomor {i}"},
+                {"role": "assistant", "content": f"Jawaban nomor {i}"},
+            ], f"sesi{i}")
+            self.keys.append(self.storage._session_key(filepath))
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def test_export_all_sessions_serial(self):
+        """Test semua sesi diekspor mengikuti kunci sesinya, termasuk sesi di arsip."""
+        # Umur 0 hari: semua sesi dipindahkan ke arsip
+        self.assertEqual(self.storage.archive_sessions(0), 6)
+        self.assertEqual(list(self.storage.iter_session_files()), [])
+        stats = export_sessions(self.storage, self.out_dir, 'md', workers=1)
+        self.assertEqual((stats['sessions'], stats['messages'], stats['errors']), (6, 18, 0))
+        self.assertGreater(stats['sessions_per_sec'], 0)
+        for i, key in enumerate(self.keys):
+            target = self.out_dir / key.replace('.json', '.md')
+            self.assertIn(f"Jawaban nomor {i}", target.read_text(encoding='utf-8'))
+        self.assertEqual(stats['bytes'], sum(p.stat().st_size for p in self.out_dir.rglob('*.md')))
+
+    def test_export_with_process_pool(self):
+        """Test ekspor dengan proses pekerja menghasilkan file yang sama dengan ekspor serial."""
+        with patch.object(export, 'CHUNK_SIZE', 2):
+            stats = export_sessions(self.storage, self.out_dir, 'txt', workers=2)
+        self.assertEqual((stats['sessions'], stats['errors']), (6, 0))
+        self.assertEqual(len(list(self.out_dir.rglob('*.txt'))), 6)
+
+    def test_corrupt_session_is_counted(self):
+        """Test sesi rusak dihitung sebagai gagal tanpa menghentikan ekspor."""
+        (Path(self.temp_dir.name) / 'riwayat' / 'rusak.json').write_text('{bukan json', encoding='utf-8')
+        with patch('builtins.print'):
+            stats = export_sessions(self.storage, self.out_dir, 'pdf', workers=1)
+        self.assertEqual((stats['sessions'], stats['errors']), (6, 1))
+        self.assertEqual(len(list(self.out_dir.rglob('*.pdf'))), 6)
+
+    def test_render_failure_is_reported(self):
+        """Test kegagalan render satu sesi dicatat ke log beserta path sesinya."""
+        with patch.object(export, 'pdf_layout', side_effect=RuntimeError("font rusak")), \
+                self.assertLogs('src.chatbot.storage', level='WARNING') as logs:
+            stats = export_sessions(self.storage, self.out_dir, 'pdf', workers=1)
+        self.assertEqual((stats['sessions'], stats['errors']), (0, 6))
+        self.assertIn("font rusak", logs.output[0])
+
+    def test_unknown_format(self):
+        """Test format yang tidak didukung ditolak."""
+        with self.assertRaises(ValueError):
+            export_sessions(self.storage, self.out_dir, 'docx')
+
+
+if __name__ == '__main__':
+    unittest.main()
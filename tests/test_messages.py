@@ -0,0 +1,67 @@
+import json
+import pickle
+import unittest
+from pathlib import Path
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.messages import MessageStore
+
+
+class TestMessageStore(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.messages = [
+            {"role": "system", "content": "AI Assistant"},
+            {"role": "user", "content": "Halo"},
+            {"role": "assistant", "content": "Hai"},
+        ]
+        self.store = MessageStore(self.messages)
+
+    def test_behaves_like_list_of_dicts(self):
+        """Test indeks, irisan, iterasi, dan perbandingan sama seperti list."""
+        self.assertEqual(self.store, self.messages)
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store[-1], {"role": "assistant", "content": "Hai"})
+        self.assertEqual(self.store[1:], self.messages[1:])
+        self.assertEqual(list(self.store), self.messages)
+        self.assertEqual(json.loads(json.dumps(list(self.store))), self.messages)
+        with self.assertRaises(IndexError):
+            self.store[3]
+
+    def test_mutation(self):
+        """Test append, insert, ganti, dan hapus pesan."""
+        self.store.append({"role": "user", "content": "Lagi"})
+        self.store.insert(1, {"role": "user", "content": "Awal"})
+        self.store[0] = {"role": "system", "content": "Baru"}
+        del self.store[2]
+        self.assertEqual([m["content"] for m in self.store], ["Baru", "Awal", "Hai", "Lagi"])
+        self.store[1:3] = []
+        self.assertEqual([m["content"] for m in self.store], ["Baru", "Lagi"])
+
+    def test_roles_are_interned(self):
+        """Test peran dari JSON disimpan sebagai satu string bersama."""
+        loaded = MessageStore(json.loads(json.dumps(self.messages * 2)))
+        self.assertIs(loaded[1]["role"], loaded[4]["role"])
+
+    def test_irregular_messages_round_trip(self):
+        """Test pesan dengan kunci tambahan atau tanpa content dikembalikan utuh."""
+        irregular = [{"role": "user", "content": "x", "extra": 1}, {"role": "user"}]
+        store = MessageStore(irregular)
+        store.insert(0, {"role": "system", "content": "s"})
+        self.assertEqual(store, [{"role": "system", "content": "s"}] + irregular)
+        self.assertEqual(pickle.loads(pickle.dumps(store)), store)
+
+    def test_non_string_roles_round_trip(self):
+        """Test peran yang bukan string (mis. dari file rusak) diterima dan dikembalikan utuh."""
+        odd = [{"role": ["user"], "content": "x"}, {"role": 7, "content": "y"}]
+        store = MessageStore(self.messages + odd)
+        self.assertEqual(store, self.messages + odd)
+        store.append({"role": {"nama": "user"}, "content": "z"})
+        self.assertEqual(store[-1], {"role": {"nama": "user"}, "content": "z"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.backends import FakeBackend
+from src.chatbot.core import Chatbot
+from src.chatbot.metrics import Histogram, MetricsRegistry, registry
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.registry = MetricsRegistry()
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def test_counters_and_histograms(self):
+        """Test counter dengan label dan ringkasan histogram."""
+        self.registry.inc('requests_total')
+        self.registry.inc('requests_total', 2)
+        self.registry.inc('hits_total', tier='disk')
+        for value in (0.002, 0.004, 0.2):
+            self.registry.observe('latency_seconds', value)
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot['counters']['requests_total'], 3)
+        self.assertEqual(snapshot['counters']['hits_total{tier="disk"}'], 1)
+        latency = snapshot['histograms']['latency_seconds']
+        self.assertEqual(latency['count'], 3)
+        self.assertAlmostEqual(latency['sum'], 0.206)
+        self.assertLessEqual(latency['p50'], 0.005)
+
+    def test_histogram_percentile(self):
+        """Test perkiraan persentil dari bucket."""
+        histogram = Histogram(buckets=(1, 2, 3, 4))
+        for value in (0.5, 1.5, 2.5, 3.5):
+            histogram.observe(value)
+        self.assertAlmostEqual(histogram.percentile(50), 2.0)
+        self.assertAlmostEqual(histogram.percentile(100), 4.0)
+
+    def test_disabled_registry_is_noop(self):
+        """Test registry nonaktif tidak mencatat apa pun."""
+        disabled = MetricsRegistry(enabled=False)
+        disabled.inc('requests_total')
+        with disabled.timer('latency_seconds'):
+            pass
+        self.assertEqual(disabled.snapshot(), {'counters': {}, 'histograms': {}})
+
+    def test_export_prometheus_and_json(self):
+        """Test ekspor ke teks Prometheus dan JSON."""
+        self.registry.inc('requests_total')
+        with self.registry.timer('command_duration_seconds', command='cari'):
+            pass
+
+        text = self.registry.to_prometheus()
+        self.assertIn('# TYPE requests_total counter', text)
+        self.assertIn('command_duration_seconds_bucket{command="cari",le="+Inf"} 1', text)
+        self.assertIn('command_duration_seconds_count{command="cari"} 1', text)
+
+        path = Path(self.temp_dir.name) / 'metrics.json'
+        self.registry.export(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['counters']['requests_total'], 1)
+
+    def test_chatbot_records_model_metrics(self):
+        """Test Chatbot mencatat latensi permintaan ke registry global."""
+        registry.reset()
+        with patch('builtins.print'):
+            bot = Chatbot(backend=FakeBackend())
+            bot.get_response("halo")
+
+        stats = bot.get_statistics()
+        self.assertEqual(stats['turns'], 1)
+        self.assertEqual(stats['metrics']['counters']['model_requests_total'], 1)
+        self.assertEqual(stats['metrics']['histograms']['model_request_seconds']['count'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
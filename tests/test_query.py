@@ -0,0 +1,119 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.query import make_snippet, parse_query
+from src.chatbot.sqlite_storage import SQLiteChatHistory
+from src.chatbot.storage import ChatHistory
+
+
+def write_session(storage, filename, name, created_at, messages):
+    """Tulis file sesi dengan tanggal pembuatan tertentu."""
+    data = {"session_name": name, "created_at": created_at, "messages": messages}
+    (Path(storage.storage_dir) / filename).write_text(json.dumps(data), encoding='utf-8')
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ChatHistory(storage_dir=self.temp_dir.name)
+        write_session(self.storage, "python.json", "Belajar Python", "2024-01-10T09:00:00", [
+            {"role": "user", "content": "Bagaimana cara membaca file di Python?"},
+            {"role": "assistant", "content": "Gunakan open(). Python python python sangat mudah."},
+        ])
+        write_session(self.storage, "resep.json", "Resep", "2024-03-05T12:00:00", [
+            {"role": "user", "content": "Resep nasi goreng dong"},
+            {"role": "assistant", "content": "Nasi goreng: nasi, bawang, kecap. Bisa juga pakai python? Tidak."},
+        ])
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def test_parse_query(self):
+        """Test menguraikan kata, frasa, regex, dan filter."""
+        parsed = parse_query('Nasi "Goreng Enak" /ke?cap/ role:User sesi:resep after:2024-01-01 a/b')
+        self.assertEqual(parsed.terms, ["nasi", "a/b"])
+        self.assertEqual(parsed.phrases, ["goreng enak"])
+        self.assertTrue(parsed.pattern.search("KECAP"))
+        self.assertEqual((parsed.role, parsed.session, parsed.after), ("user", "resep", "2024-01-01"))
+        with self.assertRaises(ValueError):
+            parse_query("before:kemarin")
+        with self.assertRaises(ValueError):
+            parse_query("/[/")
+
+    def test_bm25_ranking(self):
+        """Test pesan dengan frekuensi kata lebih tinggi berada di atas."""
+        results = self.storage.ranked_search("python")
+        self.assertEqual(len(results), 3)
+        self.assertIn("python python", results[0]["content"])
+        scores = [r["score"] for r in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertGreater(scores[-1], 0)
+        self.assertEqual(len(self.storage.ranked_search("python", limit=1)), 1)
+
+    def test_all_terms_and_phrases(self):
+        """Test semua kata harus muncul dan frasa harus utuh."""
+        self.assertEqual(len(self.storage.ranked_search("nasi goreng")), 2)
+        self.assertEqual(len(self.storage.ranked_search('"nasi goreng dong"')), 1)
+        self.assertEqual(self.storage.ranked_search('"goreng nasi"'), [])
+
+    def test_filters_and_regex(self):
+        """Test filter peran, sesi, tanggal, dan ekspresi reguler."""
+        self.assertEqual(len(self.storage.ranked_search("python role:user")), 1)
+        self.assertEqual(len(self.storage.ranked_search("python session:resep")), 1)
+        self.assertEqual(len(self.storage.ranked_search("python after:2024-02-01")), 1)
+        self.assertEqual(len(self.storage.ranked_search("python before:2024-02-01")), 2)
+        results = self.storage.ranked_search(r"/open\(\)/")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["score"], 0.0)
+        self.assertEqual(len(self.storage.ranked_search("role:assistant", limit=None)), 2)
+
+    def test_null_role_and_content_are_skipped(self):
+        """Test pesan dengan role atau content null tidak membuat pencarian gagal."""
+        write_session(self.storage, "rusak.json", "Rusak", "2024-02-01T00:00:00", [
+            {"role": None, "content": "python tanpa peran"},
+            {"role": "user", "content": None},
+        ])
+        self.assertEqual(len(self.storage.ranked_search("python role:user")), 1)
+        self.assertEqual(len(self.storage.ranked_search("role:user", limit=None)), 2)
+
+    def test_snippet_centered_on_match(self):
+        """Test cuplikan memuat kecocokan yang jauh dari awal pesan."""
+        content = "awal " * 50 + "KATA_KUNCI" + " akhir" * 50
+        self.assertIn("KATA_KUNCI", make_snippet(content, (250, 260)))
+        write_session(self.storage, "panjang.json", "Panjang", "2024-01-01", [{"role": "user", "content": content}])
+        snippet = self.storage.ranked_search("kata_kunci")[0]["snippet"]
+        self.assertIn("KATA_KUNCI", snippet)
+        self.assertTrue(snippet.startswith("...") and snippet.endswith("..."))
+
+    def test_old_index_is_rebuilt(self):
+        """Test indeks versi lama dibangun ulang otomatis."""
+        self.storage.index.path.parent.mkdir(parents=True, exist_ok=True)
+        self.storage.index.path.write_text('{"version": 1}\n{"key": "python.json", "postings": {"python": [0]}}\n')
+        self.storage.index = type(self.storage.index)(self.storage.index.path)
+        self.assertEqual(len(self.storage.ranked_search("python")), 3)
+
+    def test_sqlite_ranked_search(self):
+        """Test backend SQLite mendukung sintaks kueri yang sama."""
+        db = SQLiteChatHistory(Path(self.temp_dir.name) / "chat.sqlite3")
+        try:
+            db.import_directory(self.storage)
+            self.assertEqual(len(db.ranked_search("python")), 3)
+            self.assertEqual(len(db.ranked_search("nasi goreng")), 2)
+            self.assertEqual(len(db.ranked_search("python role:user")), 1)
+            self.assertEqual(len(db.ranked_search("python after:2024-02-01")), 1)
+            self.assertEqual(len(db.ranked_search(r"/open\(\)/")), 1)
+            self.assertEqual(len(db.ranked_search('"goreng dong" role:user')), 1)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+import asyncio
+import io
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.backends import BackendError, FakeBackend, TransientBackendError
+from src.chatbot import resilience
+from src.chatbot.core import Chatbot
+from src.chatbot.resilience import (
+    CircuitBreaker, CircuitOpenError, ResilientCaller, backoff_delay, is_retryable
+)
+
+
+class ServiceUnavailable(Exception):
+    """Tiruan google.api_core.exceptions.ServiceUnavailable."""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def send(caller, backend, message="Halo"):
+    """Kirim pesan lewat caller dengan chat baru dari backend."""
+    chat = backend.start_chat(history=[])
+    return caller.send(chat, message, lambda: backend.start_chat(history=[]))
+
+
+class TestResilience(unittest.TestCase):
+    def test_is_retryable(self):
+        """Test klasifikasi kesalahan sementara, termasuk kelas Google berdasarkan nama."""
+        self.assertTrue(is_retryable(TransientBackendError()))
+        self.assertTrue(is_retryable(TimeoutError()))
+        self.assertTrue(is_retryable(ConnectionResetError()))
+        self.assertTrue(is_retryable(ServiceUnavailable()))
+        self.assertFalse(is_retryable(ValueError()))
+        self.assertFalse(is_retryable(BackendError()))
+
+    def test_backoff_delay(self):
+        """Test backoff eksponensial dengan jitter dan batas atas."""
+        for attempt, base in ((1, 1.0), (3, 1.0), (10, 0.5)):
+            delay = backoff_delay(attempt, base, cap=4.0)
+            expected = min(base * 2 ** (attempt - 1), 4.0)
+            self.assertGreaterEqual(delay, expected / 2)
+            self.assertLessEqual(delay, expected)
+
+    def test_retry_then_success(self):
+        """Test kesalahan sementara dicoba ulang memakai chat salinan."""
+        backend = FakeBackend(fail_first=2)
+        sleeps = []
+        caller = ResilientCaller(max_retries=2, sleep=sleeps.append)
+        response, chat = send(caller, backend)
+        self.assertTrue(response.text)
+        self.assertEqual(backend.requests, 3)
+        self.assertEqual(len(sleeps), 2)
+        self.assertEqual(len(chat.history), 2)
+
+        with self.assertRaises(TransientBackendError):
+            send(ResilientCaller(max_retries=1, sleep=lambda s: None), FakeBackend(fail_first=2))
+
+    def test_timeout(self):
+        """Test percobaan yang terlalu lama dihentikan dengan TimeoutError."""
+        backend = FakeBackend(latencies=[0.5])
+        caller = ResilientCaller(timeout=0.05)
+        start = time.perf_counter()
+        with self.assertRaises(TimeoutError):
+            send(caller, backend)
+        self.assertLess(time.perf_counter() - start, 0.4)
+
+        # Percobaan ulang berikutnya cepat dan berhasil
+        caller = ResilientCaller(timeout=0.05, max_retries=1, sleep=lambda s: None)
+        response, _ = send(caller, FakeBackend(latencies=[0.5]))
+        self.assertTrue(response.text)
+
+    def test_hedged_request_wins(self):
+        """Test permintaan duplikat dipakai jika permintaan pertama lambat."""
+        backend = FakeBackend(latencies=[0.5, 0.0])
+        caller = ResilientCaller(hedge_after=0.05)
+        start = time.perf_counter()
+        response, chat = send(caller, backend)
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(backend.requests, 2)
+        self.assertEqual(len(chat.history), 2)
+
+        # Tanpa keterlambatan tidak ada permintaan duplikat
+        backend = FakeBackend()
+        send(caller, backend)
+        self.assertEqual(backend.requests, 1)
+
+    def test_stream_first_chunk_timeout_is_retried(self):
+        """Test aliran yang tidak mulai dalam batas waktu dicoba ulang dengan chat salinan."""
+        backend = FakeBackend(latencies=[0.5])
+        caller = ResilientCaller(timeout=0.05, max_retries=1, sleep=lambda s: None)
+        chat = backend.start_chat(history=[])
+        start = time.perf_counter()
+        chunks = list(caller.stream(chat, "Halo", lambda: backend.start_chat(history=[])))
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(backend.requests, 2)
+        self.assertTrue(chunks)
+        self.assertIsNot(chunks[0][1], chat)
+
+    def test_stream_inter_chunk_timeout(self):
+        """Test aliran yang berhenti di tengah dihentikan dengan TimeoutError tanpa retry."""
+        backend = FakeBackend(tokens_per_second=2)
+        caller = ResilientCaller(timeout=0.05, max_retries=2, sleep=lambda s: None)
+        chat = backend.start_chat(history=[])
+        received = []
+        start = time.perf_counter()
+        with self.assertRaises(TimeoutError):
+            for chunk, _ in caller.stream(chat, "Halo", lambda: backend.start_chat(history=[])):
+                received.append(chunk.text)
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(backend.requests, 1)
+
+    def test_stream_hedge_wins(self):
+        """Test aliran duplikat dipakai jika aliran pertama lambat memulai."""
+        backend = FakeBackend(latencies=[0.5, 0.0])
+        caller = ResilientCaller(hedge_after=0.05)
+        chat = backend.start_chat(history=[])
+        start = time.perf_counter()
+        chunks = list(caller.stream(chat, "Halo", lambda: backend.start_chat(history=[])))
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(backend.requests, 2)
+        winner = chunks[-1][1]
+        self.assertIsNot(winner, chat)
+        self.assertTrue(all(source is winner for _, source in chunks))
+        self.assertEqual(len(winner.history), 2)
+
+    def test_circuit_breaker(self):
+        """Test breaker terbuka setelah kegagalan beruntun dan pulih setelah reset."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        caller = ResilientCaller(breaker=breaker)
+        backend = FakeBackend(fail_first=3)
+
+        for _ in range(2):
+            with self.assertRaises(TransientBackendError):
+                send(caller, backend)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            send(caller, backend)
+        self.assertEqual(backend.requests, 2)
+
+        # Setelah reset_timeout satu percobaan diizinkan; gagal -> terbuka lagi
+        clock.now = 11
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(TransientBackendError):
+            send(caller, backend)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        clock.now = 22
+        send(caller, backend)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_closed_stream_releases_half_open_probe(self):
+        """Test aliran yang ditutup pemanggil saat breaker setengah terbuka tidak menahan uji ulang."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        caller = ResilientCaller(breaker=breaker)
+        backend = FakeBackend(fail_first=1)
+        with self.assertRaises(TransientBackendError):
+            send(caller, backend)
+        clock.now = 11
+
+        chunks = caller.stream(backend.start_chat(history=[]), "Halo", lambda: backend.start_chat(history=[]))
+        next(chunks)
+        chunks.close()
+        response, _ = send(caller, backend)
+        self.assertTrue(response.text)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_cancelled_send_async_releases_half_open_probe(self):
+        """Test send_async yang dibatalkan saat breaker setengah terbuka tidak menahan uji ulang."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        caller = ResilientCaller(breaker=breaker)
+        backend = FakeBackend(fail_first=1, latencies=[0, 10])
+
+        async def reply(chat, message):
+            return (await chat.send_message_async(message)).text
+
+        async def run():
+            with self.assertRaises(TransientBackendError):
+                await caller.send_async(backend.start_chat(history=[]), "Halo", lambda: None, reply)
+            clock.now = 11
+            task = asyncio.ensure_future(
+                caller.send_async(backend.start_chat(history=[]), "Halo", lambda: None, reply)
+            )
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return await caller.send_async(backend.start_chat(history=[]), "Lagi", lambda: None, reply)
+
+        text, _ = asyncio.run(run())
+        self.assertTrue(text)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_abandoned_calls_are_bounded(self):
+        """Test panggilan yang ditinggalkan tidak memenuhi pool; di atas batas panggilan baru ditolak."""
+        backend = FakeBackend(latency=0.3)
+        caller = ResilientCaller(timeout=0.02)
+        with patch.object(resilience, 'MAX_ABANDONED', 2):
+            for _ in range(2):
+                with self.assertRaises(TimeoutError):
+                    send(caller, backend)
+            with self.assertRaises(BackendError) as ctx:
+                send(caller, backend)
+            self.assertNotIsInstance(ctx.exception, TimeoutError)
+            self.assertEqual(backend.requests, 2)
+            # Setelah panggilan lama selesai, panggilan baru diizinkan lagi
+            time.sleep(0.5)
+            caller.timeout = 1
+            response, _ = send(caller, backend)
+        self.assertTrue(response.text)
+
+    def test_chatbot_drops_chat_of_timed_out_turn(self):
+        """Test Chatbot memakai chat salinan setelah giliran timeout agar riwayat model tidak menyimpang."""
+        with patch('builtins.print'):
+            bot = Chatbot(backend=FakeBackend(latencies=[0.2]))
+        bot.resilience = ResilientCaller(timeout=0.02)
+        old_chat = bot.chat
+        with patch('builtins.print'):
+            response = bot.get_response("Halo")
+        self.assertIn("Error", response)
+        self.assertIsNot(bot.chat, old_chat)
+        time.sleep(0.3)
+        self.assertEqual(len(old_chat.history), 2)
+        self.assertEqual(bot.chat.history, [])
+
+    def test_chatbot_recovers_turn(self):
+        """Test Chatbot tidak kehilangan giliran saat backend gagal sementara."""
+        with patch('builtins.print'):
+            bot = Chatbot(backend=FakeBackend(fail_first=1))
+        bot.resilience = ResilientCaller(max_retries=1, sleep=lambda s: None)
+        with patch('builtins.print'):
+            response = bot.get_response("Halo")
+        self.assertFalse(response.startswith("\x1b"), response)
+        self.assertEqual(len(bot.chat.history), 2)
+
+        output = io.StringIO()
+        bot.model.fail_first = bot.model.requests + 1
+        text = bot.stream_response("Lagi", output=output)
+        self.assertEqual(output.getvalue(), text)
+        self.assertEqual(len(bot.chat.history), 4)
+
+    def test_chatbot_fails_fast_when_circuit_open(self):
+        """Test Chatbot langsung mengembalikan pesan error saat breaker terbuka."""
+        with patch('builtins.print'):
+            bot = Chatbot(backend=FakeBackend(fail_first=10))
+        bot.resilience = ResilientCaller(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+        with patch('builtins.print'):
+            bot.get_response("Halo")
+            response = bot.get_response("Halo")
+        self.assertIn("coba lagi", response)
+        self.assertEqual(bot.model.requests, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.scan import build_prefilter, longest_ascii_run, may_contain, scan_messages
+from src.chatbot.storage import ChatHistory
+
+
+def naive_scan(storage, query):
+    """Pemindaian acuan: parse setiap file dan cocokkan substring."""
+    results = []
+    for filepath in storage.iter_session_files():
+        data = storage.load_chat(filepath)
+        for msg in data.get('messages', []):
+            if query.lower() in msg.get('content', '').lower():
+                results.append(storage._make_result(filepath, data.get('session_name'), msg))
+    return results
+
+
+class TestScan(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ChatHistory(storage_dir=self.temp_dir.name)
+        texts = [
+            "Halo, apa kabar?", "Kubernetes cluster", "İstanbul indah",
+            "Suhu 300 Kelvin", "kutipan \"Kubernetes\" di sini", "東京 dan 数据",
+        ]
+        for i, text in enumerate(texts):
+            messages = [{"role": "user", "content": text}, {"role": "assistant", "content": f"balasan {i}"}]
+            self.storage.save_chat(messages, f"sesi_{i}", 'gzip' if i % 2 else 'json')
+        # File dari penulis lain dengan ensure_ascii=True (escape \\u)
+        with open(Path(self.temp_dir.name) / "ascii.json", 'w', encoding='utf-8') as f:
+            json.dump({"session_name": "ascii", "messages": [{"role": "user", "content": "KUBERNETES é"}]}, f)
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def test_prefilter(self):
+        """Test saringan byte tidak pernah menolak file yang mungkin cocok."""
+        self.assertEqual(longest_ascii_run('Apa "kabar" 東京'), 'kabar')
+        prefilter = build_prefilter("Kabar")
+        self.assertTrue(may_contain(b'APA KABAR', prefilter))
+        self.assertFalse(may_contain(b'apa khabar', prefilter))
+        self.assertTrue(may_contain('Kabar'.encode('utf-8'), prefilter))
+        self.assertTrue(may_contain(b'\\u004babar', prefilter))
+        self.assertEqual(build_prefilter("東京"), (None, None))
+
+    def test_matches_naive_scan(self):
+        """Test hasil pemindaian sama dengan pemindaian acuan untuk berbagai kueri."""
+        for query in ("kubernetes", "KELVIN", "i̇stanbul", "东京", "東京", "\"kubernetes\"", "apa kabar", "é"):
+            with self.subTest(query=query):
+                self.assertEqual(list(scan_messages(self.storage, query, workers=1)),
+                                 naive_scan(self.storage, query))
+
+    def test_parallel_scan_matches_serial(self):
+        """Test pemindaian paralel menghasilkan urutan yang sama dengan serial."""
+        serial = list(scan_messages(self.storage, "balasan", workers=1))
+        parallel = list(scan_messages(self.storage, "balasan", workers=2, parallel_threshold=0))
+        self.assertEqual(parallel, serial)
+        self.assertEqual(len(parallel), 6)
+
+    def test_limit_stops_early(self):
+        """Test generator berhenti setelah limit tercapai."""
+        results = self.storage.iter_search("balasan", limit=2)
+        self.assertEqual(len(list(results)), 2)
+        self.assertEqual(list(scan_messages(self.storage, "balasan", limit=0)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
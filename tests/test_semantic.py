@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.config import Config
+from src.chatbot.semantic import SemanticIndex, embed
+from src.chatbot.sqlite_storage import SQLiteChatHistory
+from src.chatbot.storage import ChatHistory
+
+
+class TestSemantic(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ChatHistory(storage_dir=self.temp_dir.name)
+        self.storage.save_chat([
+            {"role": "user", "content": "Bagaimana cara deploy aplikasi ke cluster Kubernetes?"},
+            {"role": "assistant", "content": "Buat Deployment dan Service lalu jalankan kubectl apply."},
+        ], "k8s")
+        self.storage.save_chat([
+            {"role": "user", "content": "Resep nasi goreng yang enak"},
+            {"role": "assistant", "content": "Tumis bawang, masukkan nasi dan kecap."},
+        ], "masak")
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def test_embed_normalized(self):
+        """Test vektor ternormalisasi dan teks kosong menjadi vektor nol."""
+        vector = embed("deploy ke kubernetes")
+        self.assertAlmostEqual(sum(x * x for x in vector), 1.0, places=4)
+        self.assertFalse(any(embed("")))
+
+    def test_finds_related_wording(self):
+        """Test pesan dengan kata yang berbeda tetapi mirip tetap ditemukan."""
+        results = self.storage.semantic_search("deployment kubernetes", limit=2)
+        self.assertEqual(results[0]["session"], "k8s")
+        self.assertGreater(results[0]["score"], 0)
+        self.assertEqual(self.storage.semantic_search("menggoreng nasi", limit=1)[0]["session"], "masak")
+
+    def test_incremental_and_catch_up(self):
+        """Test sesi disimpan tanpa indeks semantik diindeks saat pencarian."""
+        self.assertEqual(len(self.storage.semantic.sessions), 2)
+        with patch.object(Config, 'SEMANTIC_INDEX', False):
+            filepath = self.storage.save_chat([{"role": "user", "content": "liburan ke pantai Bali"}], "libur")
+        self.assertEqual(len(self.storage.semantic.sessions), 2)
+        results = self.storage.semantic_search("pantai", limit=1)
+        self.assertEqual(results[0]["filepath"], str(Path(filepath)))
+
+        # File yang dihapus tidak muncul lagi
+        Path(filepath).unlink()
+        self.assertNotEqual(self.storage.semantic_search("pantai", limit=1)[0]["session"], "libur")
+
+    def test_journal_append(self):
+        """Test pesan yang ditambah ke jurnal langsung bisa dicari."""
+        filepath = self.storage.create_journal([{"role": "user", "content": "halo"}], "jurnal")
+        self.storage.append_to_journal(filepath, [{"role": "assistant", "content": "gunung berapi meletus"}], 1)
+        result = self.storage.semantic_search("letusan gunung", limit=1)[0]
+        self.assertEqual(result["content"], "gunung berapi meletus")
+
+    def test_dead_rows_are_compacted(self):
+        """Test baris vektor sesi yang disimpan ulang dibuang saat melebihi baris hidup."""
+        from src.chatbot import semantic as semantic_module
+
+        index = self.storage.semantic
+        filepath = self.storage.save_chat([{"role": "user", "content": "liburan ke pantai"}], "libur")
+        with patch.object(semantic_module, 'COMPACT_MIN_DEAD_ROWS', 4):
+            for i in range(10):
+                self.storage.update_chat(filepath, [
+                    {"role": "user", "content": "liburan ke pantai"},
+                    {"role": "assistant", "content": f"gunung nomor {i}"},
+                ])
+        rows = index.vectors_path.stat().st_size // (4 * index.dim)
+        self.assertLess(rows, 12)
+        self.assertEqual(self.storage.semantic_search("gunung", limit=1)[0]["content"], "gunung nomor 9")
+        self.assertEqual(self.storage.semantic_search("menggoreng nasi", limit=1)[0]["session"], "masak")
+
+        # Proses lain melihat matriks hasil pemadatan
+        reopened = SemanticIndex(index.vectors_path.with_suffix(''))
+        self.assertEqual(reopened.sessions, index.sessions)
+        self.assertEqual(reopened.search("gunung", limit=1), index.search("gunung", limit=1))
+
+    def test_dimension_mismatch_rebuilds(self):
+        """Test indeks dengan dimensi lain dibangun ulang."""
+        other = SemanticIndex(self.storage.semantic.vectors_path.with_suffix(''), dim=64)
+        with self.assertRaises(ValueError):
+            other.sessions
+        other.sync(["k8s"], lambda key: [{"content": "kubernetes"}])
+        self.assertEqual(other.search("kubernetes")[0][:2], ("k8s", 0))
+
+    def test_sqlite_semantic_search(self):
+        """Test backend SQLite memakai indeks semantik yang sama."""
+        db = SQLiteChatHistory(Path(self.temp_dir.name) / "db" / "chat.sqlite3")
+        try:
+            db.import_directory(self.storage)
+            db.save_chat([{"role": "user", "content": "liburan ke pantai Bali"}], "libur")
+            self.assertEqual(db.semantic_search("deployment kubernetes", limit=1)[0]["session"], "k8s")
+            self.assertEqual(db.semantic_search("pantai", limit=1)[0]["session"], "libur")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
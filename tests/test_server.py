@@ -0,0 +1,170 @@
+import asyncio
+import json
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.aio import AsyncChatbot
+from src.chatbot.backends import FakeBackend
+from src.chatbot.server import ChatServer, SessionPool
+from src.chatbot.storage import ChatHistory
+
+
+class TestChatServer(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.backend = FakeBackend(reply_tokens=5)
+        self.storage = ChatHistory(storage_dir=self.temp_dir.name)
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.temp_dir.cleanup()
+
+    def run_server(self, scenario, **kwargs):
+        """Jalankan ``scenario(server, request)`` terhadap server di port bebas."""
+        async def run():
+            bot = AsyncChatbot(model=self.backend, max_concurrency=4, storage=self.storage)
+            server = ChatServer(bot, host='127.0.0.1', port=0, **kwargs)
+            _, port = await server.start()
+            loop = asyncio.get_running_loop()
+
+            def request(method, path, body=None):
+                data = None if body is None else json.dumps(body).encode('utf-8')
+                req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method)
+                try:
+                    with urllib.request.urlopen(req, timeout=5) as resp:
+                        raw = resp.read().decode('utf-8')
+                        is_json = resp.headers.get_content_type() == 'application/json'
+                        return resp.status, json.loads(raw) if is_json else raw
+                except urllib.error.HTTPError as e:
+                    return e.code, json.loads(e.read())
+
+            async def call(method, path, body=None):
+                return await loop.run_in_executor(None, request, method, path, body)
+
+            try:
+                await scenario(server, call, port)
+            finally:
+                await server.close()
+        asyncio.run(run())
+
+    def test_chat_save_list_and_search(self):
+        """Test alur chat, simpan, daftar sesi, dan pencarian lewat HTTP."""
+        async def scenario(server, call, port):
+            status, body = await call('POST', '/sessions')
+            self.assertEqual(status, 201)
+            session_id = body['session_id']
+
+            status, body = await call('POST', f'/sessions/{session_id}/chat', {'message': 'halo kubernetes'})
+            self.assertEqual(status, 200)
+            self.assertEqual(body['response'], self.backend.reply_text('halo kubernetes', 0))
+
+            status, body = await call('POST', f'/sessions/{session_id}/save', {'name': 'Server'})
+            self.assertEqual(status, 201)
+            self.assertTrue(Path(body['filepath']).exists())
+
+            status, body = await call('GET', '/sessions')
+            self.assertEqual(body['active'], [session_id])
+            self.assertEqual([s['name'] for s in body['saved']], ['Server'])
+
+            status, body = await call('GET', '/search?q=kubernetes')
+            self.assertEqual(status, 200)
+            self.assertEqual(len(body['results']), 1)
+            self.assertEqual(body['results'][0]['session'], 'Server')
+
+        self.run_server(scenario)
+
+    def test_streaming_chat(self):
+        """Test chat streaming mengirim teks lengkap dan memperbarui riwayat sesi."""
+        async def scenario(server, call, port):
+            _, body = await call('POST', '/sessions')
+            session_id = body['session_id']
+            status, text = await call('POST', f'/sessions/{session_id}/chat',
+                                      {'message': 'alirkan', 'stream': True})
+            self.assertEqual(status, 200)
+            self.assertEqual(text, self.backend.reply_text('alirkan', 0))
+            messages = server.bot.get_session(session_id).messages
+            self.assertEqual(messages[-1], {'role': 'assistant', 'content': text})
+
+        self.run_server(scenario)
+
+    def test_lru_eviction_and_transparent_reload(self):
+        """Test sesi terlama ditulis ke jurnal saat pool penuh lalu dimuat ulang otomatis."""
+        async def scenario(server, call, port):
+            ids = []
+            for i in range(3):
+                _, body = await call('POST', '/sessions')
+                ids.append(body['session_id'])
+                await call('POST', f"/sessions/{ids[-1]}/chat", {'message': f'pesan {i}'})
+
+            self.assertEqual(server.pool.live_ids, ids[1:])
+            self.assertEqual(len(list(Path(self.temp_dir.name).glob('*.jsonl'))), 1)
+
+            status, _ = await call('POST', f'/sessions/{ids[0]}/chat', {'message': 'lanjut'})
+            self.assertEqual(status, 200)
+            messages = server.bot.get_session(ids[0]).messages
+            self.assertEqual([m['content'] for m in messages if m['role'] == 'user'], ['pesan 0', 'lanjut'])
+            self.assertNotIn(ids[1], server.pool.live_ids)
+
+            # Sesi yang dikeluarkan lagi hanya menambah pesan baru ke jurnal yang sama
+            status, body = await call('DELETE', f'/sessions/{ids[0]}')
+            self.assertEqual(status, 200)
+            self.assertEqual(len(self.storage.load_chat(body['filepath'])['messages']), len(messages))
+
+        self.run_server(scenario, max_sessions=2)
+
+    def test_journals_of_evicted_sessions_are_bounded(self):
+        """Test pool hanya mengingat jurnal terbaru; jurnal lama tetap bisa dimuat lewat path-nya."""
+        async def run():
+            bot = AsyncChatbot(model=self.backend, storage=self.storage)
+            pool = SessionPool(bot, max_sessions=1, max_journals=2)
+            ids = [await pool.create() for _ in range(6)]
+            self.assertEqual(len(pool._journals), 2)
+            self.assertNotIn(ids[0], pool)
+            self.assertIn(ids[4], pool)
+            with self.assertRaises(KeyError):
+                async with pool.use(ids[0]):
+                    pass
+            async with pool.use(ids[3]) as session:
+                self.assertEqual(len(session.messages), 1)
+            self.assertEqual(len(pool._journals), 2)
+
+        asyncio.run(run())
+        self.assertEqual(len(list(Path(self.temp_dir.name).glob('*.jsonl'))), 6)
+
+    def test_errors(self):
+        """Test kesalahan dijawab dengan status HTTP yang sesuai."""
+        async def scenario(server, call, port):
+            self.assertEqual((await call('POST', '/sessions/tidak-ada/chat', {'message': 'x'}))[0], 404)
+            self.assertEqual((await call('GET', '/tidak-ada'))[0], 404)
+            self.assertEqual((await call('PUT', '/sessions'))[0], 405)
+            _, body = await call('POST', '/sessions')
+            self.assertEqual((await call('POST', f"/sessions/{body['session_id']}/chat", {}))[0], 400)
+            self.assertEqual((await call('POST', '/sessions/load', {'filepath': '../../etc/passwd'}))[0], 400)
+            self.assertEqual((await call('GET', '/search?q=x&mode=lain'))[0], 400)
+
+        self.run_server(scenario)
+
+    def test_connection_limit(self):
+        """Test koneksi di atas batas langsung dijawab 503."""
+        async def scenario(server, call, port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                await asyncio.sleep(0.05)
+                status, body = await call('GET', '/health')
+                self.assertEqual(status, 503)
+            finally:
+                writer.close()
+
+        self.run_server(scenario, max_connections=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Tambahkan direktori root ke path Python
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chatbot.config import Config
+from src.chatbot.sqlite_storage import SQLiteChatHistory
+from src.chatbot.storage import ChatHistory, create_storage
+
+
+class TestSQLiteChatHistory(unittest.TestCase):
+    def setUp(self):
+        """Menyiapkan environment pengujian."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = SQLiteChatHistory(Path(self.temp_dir.name) / "chat.sqlite3")
+        self.sample_messages = [
+            {"role": "system", "content": "Anda adalah asisten AI yang ramah."},
+            {"role": "user", "content": "Halo, apa kabar?"},
+            {"role": "assistant", "content": "Halo! Saya baik, terima kasih! Ada yang bisa saya bantu?"}
+        ]
+
+    def tearDown(self):
+        """Bersihkan setelah pengujian."""
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def test_save_and_load_chat(self):
+        """Test menyimpan dan memuat sesi dengan rujukan db#id."""
+        messages = self.sample_messages + [{"role": "user", "content": "lagi", "timestamp": "2024-01-01"}]
+        ref = self.storage.save_chat(messages, "test_session")
+        self.assertIn("#", ref)
+
+        data = self.storage.load_chat(ref)
+        self.assertEqual(data["session_name"], "test_session")
+        self.assertEqual(data["messages"], messages)
+        with self.assertRaises(KeyError):
+            self.storage.load_chat(ref.rsplit("#", 1)[0] + "#999")
+
+    def test_journal_append(self):
+        """Test menambah pesan ke sesi secara bertahap."""
+        ref = self.storage.create_journal(self.sample_messages[:1], "jurnal")
+        self.storage.append_to_journal(ref, self.sample_messages[1:], 1)
+
+        self.assertEqual(self.storage.load_chat(ref)["messages"], self.sample_messages)
+        self.assertEqual(self.storage.list_sessions()[0]["message_count"], 3)
+        self.assertEqual(self.storage.compact_journal(ref), ref)
+
+    def test_search_ranked_with_snippets(self):
+        """Test pencarian substring tanpa huruf besar, berurutan relevansi."""
+        self.storage.save_chat(self.sample_messages, "sesi_1")
+        self.storage.save_chat([
+            {"role": "user", "content": "Kabar kabar KABAR"},
+            {"role": "assistant", "content": "tidak relevan"}
+        ], "sesi_2")
+
+        results = self.storage.search_messages("kabar")
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["session"], "sesi_2")
+        self.assertIn("kabar", results[1]["snippet"].lower())
+        self.assertEqual(len(self.storage.search_messages("kabar", limit=1)), 1)
+
+        # Substring di tengah kata dan kueri pendek (tanpa FTS)
+        self.assertEqual(len(self.storage.search_messages("erima")), 1)
+        self.assertEqual(len(self.storage.search_messages("ik")), 1)
+        self.assertEqual(self.storage.search_messages("tidak ada"), [])
+
+    def test_paginated_listing(self):
+        """Test daftar sesi dengan limit dan offset."""
+        for i in range(5):
+            self.storage.save_chat(self.sample_messages, f"sesi_{i}")
+
+        self.assertEqual(self.storage.count_sessions(), 5)
+        page = self.storage.list_sessions(limit=2, offset=1)
+        self.assertEqual([s["name"] for s in page], ["sesi_3", "sesi_2"])
+
+    def test_import_directory_is_idempotent(self):
+        """Test migrasi direktori JSON ke SQLite dan impor ulang yang aman."""
+        source = ChatHistory(Path(self.temp_dir.name) / "json")
+        source.save_chat(self.sample_messages, "lama_1")
+        source.save_chat(self.sample_messages[:2], "lama_2")
+
+        self.assertEqual(self.storage.import_directory(source.storage_dir), 2)
+        self.assertEqual(self.storage.import_directory(source.storage_dir), 0)
+        self.assertEqual(self.storage.count_sessions(), 2)
+        self.assertEqual(len(self.storage.search_messages("apa kabar")), 2)
+
+    def test_import_keeps_null_and_non_string_values(self):
+        """Test pesan dengan content null atau peran bukan string tidak menggagalkan migrasi."""
+        source = ChatHistory(Path(self.temp_dir.name) / "json")
+        odd = self.sample_messages + [{"role": "user", "content": None}, {"role": ["user"], "content": ["x"]}]
+        source.save_chat(odd, "aneh")
+        source.save_chat(self.sample_messages, "biasa")
+
+        self.assertEqual(self.storage.import_directory(source.storage_dir), 2)
+        loaded = [self.storage.load_chat(s['filepath']) for s in self.storage.list_sessions()]
+        self.assertIn(odd, [data['messages'] for data in loaded])
+
+    def test_create_storage(self):
+        """Test memilih backend penyimpanan dari konfigurasi."""
+        with patch.object(Config, 'STORAGE_DIR', self.temp_dir.name), \
+                patch.object(Config, 'STORAGE_DB', ''):
+            self.assertIsInstance(create_storage('files'), ChatHistory)
+            storage = create_storage('sqlite')
+            self.assertEqual(storage.db_path, Path(self.temp_dir.name) / "chat.sqlite3")
+            storage.close()
+            with self.assertRaises(ValueError):
+                create_storage('mongo')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_does_not_load_heavy_dependencies(self):
+        """Test import package tidak memuat google.generativeai, fpdf, atau asyncio."""
+        code = (
+            "import sys, src.chatbot\n"
+            "heavy = ('google.generativeai', 'fpdf', 'numpy', 'asyncio')\n"
+            "print(','.join(m for m in heavy if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), '')
+
+    def test_async_chatbot_is_loaded_on_access(self):
+        """Test AsyncChatbot tetap bisa diimpor dari package."""
+        from src.chatbot import AsyncChatbot
+        from src.chatbot.aio import AsyncChatbot as Original
+        self.assertIs(AsyncChatbot, Original)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -65,5 +65,250 @@ class TestChatHistory(unittest.TestCase):
         self.assertGreater(len(results), 0)
         self.assertIn("Halo", results[0]["content"])
 
+    def test_search_index_matches_full_scan(self):
+        """Test hasil pencarian lewat indeks sama dengan pemindaian penuh."""
+        self.storage.save_chat(self.sample_messages, "sesi_satu")
+        self.storage.save_chat([
+            {"role": "user", "content": "Bagaimana CARA memasak nasi?"},
+            {"role": "assistant", "content": "Cuci beras, lalu masak dengan air."}
+        ], "sesi_dua")
+        
+        for query in ["halo", "AS", "masak", "nasi?", "tidak-ada"]:
+            indexed = self.storage.search_messages(query)
+            scanned = self.storage._scan_messages(query)
+            key = lambda r: (r["filepath"], r["content"])
+            self.assertEqual(sorted(indexed, key=key), sorted(scanned, key=key), query)
+    
+    def test_search_index_picks_up_external_files(self):
+        """Test file sesi yang ditambahkan di luar save_chat tetap ditemukan."""
+        self.storage.save_chat(self.sample_messages, "sesi_awal")
+        self.storage.search_messages("halo")
+        
+        external = Path(self.temp_dir.name) / "eksternal.json"
+        with open(external, 'w', encoding='utf-8') as f:
+            json.dump({"session_name": "eksternal", "messages": [
+                {"role": "user", "content": "Pesan dari luar aplikasi"}
+            ]}, f)
+        
+        results = self.storage.search_messages("luar")
+        self.assertEqual([r["session"] for r in results], ["eksternal"])
+        
+        os.remove(external)
+        self.assertEqual(self.storage.search_messages("luar"), [])
+    
+    def test_search_index_compacts_dead_entries(self):
+        """Test log indeks dipadatkan saat baris sesi yang disimpan ulang melebihi baris hidup."""
+        from src.chatbot import index as index_module
+
+        filepath = self.storage.save_chat(self.sample_messages, "sesi_ulang")
+        other = self.storage.save_chat([{"role": "user", "content": "Resep nasi goreng"}], "sesi_lain")
+        with patch.object(index_module, 'COMPACT_MIN_DEAD', 4):
+            for i in range(10):
+                self.storage.update_chat(filepath, self.sample_messages + [
+                    {"role": "user", "content": f"pertanyaan{i}"}
+                ])
+
+        with open(self.storage.index.path, encoding='utf-8') as f:
+            lines = f.readlines()
+        self.assertLess(len(lines), 10)
+        self.assertEqual(self.storage.index.lookup("pertanyaan9"), {self.storage._session_key(filepath): [3]})
+        self.assertEqual(self.storage.index.lookup("pertanyaan0"), {})
+        self.assertIn(self.storage._session_key(other), self.storage.index.lookup("nasi"))
+
+        # Proses lain yang membuka indeks yang sama melihat isi hasil pemadatan
+        reopened = index_module.SearchIndex(self.storage.index.path)
+        self.assertEqual(reopened.sessions, self.storage.index.sessions)
+        self.assertEqual(reopened.lengths(self.storage._session_key(filepath)),
+                         self.storage.index.lengths(self.storage._session_key(filepath)))
+
+    def test_rebuild_index(self):
+        """Test membangun ulang indeks untuk direktori yang sudah ada."""
+        self.storage.save_chat(self.sample_messages, "sesi_a")
+        self.storage.save_chat(self.sample_messages, "sesi_b")
+        self.storage.index.clear()
+        
+        self.assertEqual(self.storage.rebuild_index(), 2)
+        self.assertEqual(len(self.storage.search_messages("kabar")), 2)
+
+    def test_list_sessions_uses_catalog(self):
+        """Test daftar sesi diambil dari katalog tanpa membaca ulang file."""
+        filepath = self.storage.save_chat(self.sample_messages, "sesi_katalog")
+        
+        with patch.object(ChatHistory, 'load_chat', side_effect=AssertionError("file dibaca ulang")):
+            sessions = self.storage.list_sessions()
+        
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual(sessions[0]["name"], "sesi_katalog")
+        self.assertEqual(sessions[0]["message_count"], 3)
+        self.assertEqual(Path(sessions[0]["filepath"]).resolve(), Path(filepath))
+    
+    def test_catalog_record_appends_to_log(self):
+        """Test penyimpanan sesi hanya menambah baris log katalog, lalu log digabung saat terlalu panjang."""
+        from src.chatbot import catalog as catalog_module
+
+        catalog = self.storage.catalog
+        with patch.object(catalog_module, 'COMPACT_MIN_LINES', 6):
+            first = self.storage.save_chat(self.sample_messages, "sesi_a")
+            with patch.object(catalog_module.SessionCatalog, 'save', side_effect=AssertionError("katalog ditulis ulang")):
+                for _ in range(3):
+                    self.storage.update_chat(first, self.sample_messages[:2])
+            self.assertFalse(catalog.path.exists())
+            self.assertEqual(len(catalog.log_path.read_text(encoding='utf-8').splitlines()), 4)
+
+            # Proses lain membaca katalog + log dengan hasil yang sama
+            other = ChatHistory(storage_dir=self.temp_dir.name)
+            self.assertEqual(other.catalog.get(self.storage._session_key(first))['message_count'], 2)
+
+            for i in range(3):
+                self.storage.save_chat(self.sample_messages, f"sesi_{i}")
+        # Baris ke-6 memicu penggabungan; hanya penyimpanan terakhir yang tersisa di log
+        self.assertTrue(catalog.path.exists())
+        self.assertEqual(len(catalog.log_path.read_text(encoding='utf-8').splitlines()), 1)
+        self.assertEqual(len(catalog.load()), 4)
+        self.assertEqual(len(other.catalog.load()), 4)
+
+    def test_list_sessions_detects_external_changes(self):
+        """Test katalog memperbarui file baru, berubah, dan terhapus."""
+        filepath = self.storage.save_chat(self.sample_messages, "sesi_lama")
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({"session_name": "sesi_diubah", "messages": self.sample_messages[:1]}, f)
+        external = Path(self.temp_dir.name) / "eksternal.json"
+        with open(external, 'w', encoding='utf-8') as f:
+            json.dump({"session_name": "eksternal", "messages": []}, f)
+        
+        sessions = {s["name"]: s for s in self.storage.list_sessions()}
+        self.assertEqual(set(sessions), {"sesi_diubah", "eksternal"})
+        self.assertEqual(sessions["sesi_diubah"]["message_count"], 1)
+        
+        os.remove(external)
+        self.assertEqual([s["name"] for s in self.storage.list_sessions()], ["sesi_diubah"])
+
+    def test_journal_append_and_load(self):
+        """Test jurnal ditambah per pesan dan dimuat ulang secara utuh."""
+        filepath = self.storage.create_journal(self.sample_messages[:1], "sesi_jurnal")
+        self.assertTrue(filepath.endswith('.jsonl'))
+        
+        self.storage.append_to_journal(filepath, self.sample_messages[1:2], 1)
+        self.storage.append_to_journal(filepath, self.sample_messages[2:], 2)
+        with open(filepath, 'r', encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 4)  # header + 3 pesan
+        
+        # Baris terakhir yang terpotong diabaikan
+        with open(filepath, 'a', encoding='utf-8') as f:
+            f.write('{"role": "user", "cont')
+        
+        loaded = self.storage.load_chat(filepath)
+        self.assertEqual(loaded["messages"], self.sample_messages)
+        self.assertEqual(loaded["session_name"], "sesi_jurnal")
+        self.assertEqual(len(self.storage.search_messages("baik")), 1)
+    
+    def test_failed_journal_create_leaves_no_file(self):
+        """Test jurnal yang gagal dibuat tidak meninggalkan file terpotong."""
+        with patch('src.chatbot.fsutil.os.replace', side_effect=OSError('disk penuh')):
+            with self.assertRaises(IOError):
+                self.storage.create_journal(self.sample_messages, "jurnal_gagal")
+        
+        leftovers = [p for p in Path(self.temp_dir.name).rglob('*') if p.is_file() and 'jurnal_gagal' in p.name]
+        self.assertEqual(leftovers, [])
+        self.assertEqual(self.storage.list_sessions(), [])
+    
+    def test_compact_journal(self):
+        """Test pemadatan jurnal menjadi snapshot JSON."""
+        filepath = self.storage.create_journal(self.sample_messages, "sesi_padat")
+        snapshot = self.storage.compact_journal(filepath)
+        
+        self.assertFalse(os.path.exists(filepath))
+        self.assertTrue(snapshot.endswith('.json'))
+        with open(snapshot, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data["messages"], self.sample_messages)
+        
+        results = self.storage.search_messages("kabar")
+        self.assertEqual([Path(r["filepath"]).resolve() for r in results], [Path(snapshot)])
+    
+    def test_session_formats_round_trip(self):
+        """Test setiap format sesi bisa disimpan dan dimuat tanpa melihat ekstensi."""
+        sizes = {}
+        for session_format in ('json', 'compact', 'gzip', 'bz2', 'xz'):
+            filepath = self.storage.save_chat(self.sample_messages, f"sesi_{session_format}", session_format)
+            self.assertEqual(self.storage.load_chat(filepath)["messages"], self.sample_messages)
+            sizes[session_format] = os.path.getsize(filepath)
+        
+        self.assertTrue(filepath.endswith('.json.xz'))
+        self.assertLess(sizes['compact'], sizes['json'])
+        self.assertEqual(len(self.storage.list_sessions()), 5)
+        self.assertEqual(len(self.storage.search_messages("kabar")), 5)
+        with self.assertRaises(ValueError):
+            self.storage.save_chat(self.sample_messages, "x", "tidak-ada")
+    
+    def test_convert_all(self):
+        """Test konversi massal ke gzip tetap bisa dicari dan didaftar."""
+        self.storage.save_chat(self.sample_messages, "sesi_1")
+        self.storage.save_chat(self.sample_messages, "sesi.dengan.titik")
+        journal = self.storage.create_journal(self.sample_messages, "jurnal")
+        
+        stats = self.storage.convert_all('gzip')
+        self.assertEqual(stats['sessions'], 2)
+        self.assertLess(stats['bytes_after'], stats['bytes_before'])
+        
+        names = sorted(p.name for p in Path(self.temp_dir.name).iterdir() if not p.name.startswith('.'))
+        self.assertTrue(names[0].startswith('jurnal_') and names[0].endswith('.jsonl'))
+        self.assertTrue(names[1].startswith('sesi.dengan.titik_') and names[1].endswith('.json.gz'))
+        self.assertTrue(os.path.exists(journal))
+        self.assertEqual(len(self.storage.list_sessions()), 3)
+        self.assertEqual(len(self.storage.search_messages("kabar")), 3)
+    
+    def test_corrupt_compressed_file_is_skipped(self):
+        """Test file terkompresi yang rusak dilewati saat daftar dan pencarian."""
+        self.storage.save_chat(self.sample_messages, "sesi_baik")
+        with open(Path(self.temp_dir.name) / "rusak.json.gz", 'wb') as f:
+            f.write(b'\x1f\x8b bukan gzip')
+        
+        self.assertEqual(len(self.storage.list_sessions()), 1)
+        self.assertEqual(len(self.storage.search_messages("kabar")), 1)
+        self.assertEqual(len(self.storage.search_messages("apa kabar")), 1)
+
+    def test_names_unique_within_same_second(self):
+        """Test sesi bernama sama yang disimpan pada detik yang sama tidak saling menimpa."""
+        paths = {self.storage.save_chat(self.sample_messages, "sama") for _ in range(5)}
+        self.assertEqual(len(paths), 5)
+        self.assertEqual(len(self.storage.list_sessions()), 5)
+    
+    def test_date_layout_and_mixed_directories(self):
+        """Test tata letak shard tanggal dan direktori campuran datar + shard."""
+        flat = self.storage.save_chat(self.sample_messages, "datar")
+        sharded = ChatHistory(self.temp_dir.name, layout='date')
+        nested = sharded.save_chat(self.sample_messages + [{"role": "user", "content": "bersarang"}], "shard")
+        
+        key = sharded._session_key(nested)
+        self.assertRegex(key, r'^\d{4}/\d{2}/\d{2}/shard_[^/]+\.json$')
+        self.assertEqual({s['name'] for s in sharded.list_sessions()}, {"datar", "shard"})
+        self.assertEqual(len(sharded.search_messages("kabar")), 2)
+        self.assertEqual(sharded.search_messages("bersarang")[0]['session'], "shard")
+        self.assertEqual(sharded.load_chat(nested)['session_name'], "shard")
+        self.assertEqual(len(sharded.load_chat(flat)['messages']), 3)
+        
+        with self.assertRaises(ValueError):
+            ChatHistory(self.temp_dir.name, layout='acak')
+    
+    def test_migrate_layout(self):
+        """Test migrasi direktori datar ke shard tanggal lalu kembali, dengan pencarian tetap jalan."""
+        self.storage.save_chat(self.sample_messages, "satu")
+        self.storage.save_chat(self.sample_messages, "dua")
+        self.storage.search_messages("kabar")
+        
+        self.assertEqual(self.storage.migrate_layout('date'), 2)
+        self.assertEqual(self.storage.migrate_layout('date'), 0)
+        files = list(self.storage.iter_session_files())
+        self.assertEqual(len(files), 2)
+        self.assertTrue(all(len(Path(self.storage._session_key(f)).parts) == 4 for f in files))
+        self.assertEqual(len(self.storage.search_messages("kabar")), 2)
+        self.assertEqual({s['name'] for s in self.storage.list_sessions()}, {"satu", "dua"})
+        
+        self.assertEqual(self.storage.migrate_layout('flat'), 2)
+        self.assertEqual(sorted(p.name for p in Path(self.temp_dir.name).iterdir() if p.is_dir()), ['.meta'])
+        self.assertEqual(len(self.storage.search_messages("kabar")), 2)
+
 if __name__ == "__main__":
     unittest.main()